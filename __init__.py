@@ -1 +1 @@
-__all__ = ["api", "app", "protocol", "transport"]
+__all__ = ["api", "app", "pic", "protocol", "telemetry", "transport"]
@@ -1,9 +1,35 @@
 from .common import HomeAutomationSystemConnection
+from .port_worker import PRIO_GET, PRIO_POLL, PRIO_SET, PortWorker, PortWorkerStats
+from .board_connection import BoardConnection
+from .register_cache import CacheStats, RegisterCache
+from .poller import BoardPoller, PollerStats, Snapshot
+from .set_coalescer import SetCoalescer, SetStats
+from .settle import SettleResult
 from .air_conditioner import AirConditionerSystemConnection
 from .curtain_control import CurtainControlSystemConnection
+from .async_common import AsyncHomeAutomationSystemConnection
+from .async_air_conditioner import AsyncAirConditionerSystemConnection
+from .async_curtain_control import AsyncCurtainControlSystemConnection
 
 __all__ = [
     "HomeAutomationSystemConnection",
+    "PortWorker",
+    "PortWorkerStats",
+    "PRIO_SET",
+    "PRIO_GET",
+    "PRIO_POLL",
+    "BoardConnection",
+    "RegisterCache",
+    "CacheStats",
+    "BoardPoller",
+    "PollerStats",
+    "Snapshot",
+    "SetCoalescer",
+    "SetStats",
+    "SettleResult",
     "AirConditionerSystemConnection",
     "CurtainControlSystemConnection",
+    "AsyncHomeAutomationSystemConnection",
+    "AsyncAirConditionerSystemConnection",
+    "AsyncCurtainControlSystemConnection",
 ]
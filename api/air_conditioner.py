@@ -22,10 +22,17 @@ AUTHORS:
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, Iterable, Optional
 
+from .board_connection import apply_read, field_age_s, read_registers
 from .common import HomeAutomationSystemConnection
+from .poller import BoardPoller, Snapshot
+from .register_cache import RegisterCache, refresh_expired
+from .set_coalescer import SetCoalescer, SetStats
+from .settle import SettleResult, wait_for_value
 from ..protocol import board1
+from ..protocol.common import make_set_high, make_set_low
 
 
 @dataclass
@@ -41,95 +48,167 @@ class AirConditionerSystemConnection:
     ambientTemperature: float = 0.0
     fanSpeed: int = 0
 
-    def update(self) -> None:
+    # Registers that could not be read and read times (Implementation Detail)
+    stale: FrozenSet[str] = frozenset()
+    updated_at: Dict[str, float] = field(default_factory=dict)
+
+    # Optional read-through cache: getters refresh only expired registers
+    cache: Optional[RegisterCache] = None
+
+    # Optional background poller: getters serve from its latest snapshot
+    poller: Optional[BoardPoller] = None
+
+    # Coalescing SET path, created by the first setDesiredTemp(coalesce=True)
+    coalescer: Optional[SetCoalescer] = field(default=None, repr=False)
+    _observed_t: float = field(default=0.0, repr=False)   # Last set-point read seen by it
+
+    def update(self, fields: Optional[Iterable[str]] = None) -> None:
         """
         [R2.3-1] Updates the member data by communicating with the board.
         It sends GET commands to retrieve current values.
+
+        'fields' selects registers ("desired_temp", "ambient_temp",
+        "fan_speed_rps"); only their GETs are sent and the other members are
+        not touched. Every value read gets a timestamp in 'updated_at'.
+        Values that could not be read keep their old value and their
+        register name is put into 'stale'.
         """
-        st = board1.AirState()
-        
-        def req(cmd: int, retries: int = 5) -> int:
-            """
-            Helper function to send a command and wait for a response.
-            It retries if communication fails.
-            """
-            for attempt in range(retries):
-                self.connection.write(cmd)
-                resp = self.connection.read(timeout_s=1.0)
-                if resp != -1:
-                    return resp
-                import time
-                time.sleep(0.3)
-            return 0  # Default value if failed
-
-        # [R2.1.4-1] Read Desired Temperature (Low and High bytes)
-        low = req(board1.GET_DESIRED_TEMP_LOW)
-        board1.decode_get_response(board1.GET_DESIRED_TEMP_LOW, low, st)
-
-        high = req(board1.GET_DESIRED_TEMP_HIGH)
-        board1.decode_get_response(board1.GET_DESIRED_TEMP_HIGH, high, st)
-
-        # [R2.1.4-1] Read Ambient Temperature (Low and High bytes)
-        low = req(board1.GET_AMBIENT_TEMP_LOW)
-        board1.decode_get_response(board1.GET_AMBIENT_TEMP_LOW, low, st)
-
-        high = req(board1.GET_AMBIENT_TEMP_HIGH)
-        board1.decode_get_response(board1.GET_AMBIENT_TEMP_HIGH, high, st)
-
-        # [R2.1.4-1] Read Fan Speed
-        fs = req(board1.GET_FAN_SPEED_RPS)
-        board1.decode_get_response(board1.GET_FAN_SPEED_RPS, fs, st)
-
-        # Update local member variables
-        self.desiredTemperature = st.desired_temp.to_float()
-        self.ambientTemperature = st.ambient_temp.to_float()
-        self.fanSpeed = int(st.fan_speed_rps)
-
-    def setDesiredTemp(self, temp: float) -> bool:
+        # [R2.1.4-1] GET desired temp (low/high), ambient temp (low/high)
+        # and fan speed; the sequence comes from the board's register map
+        result = read_registers(self.connection, board1.REGISTER_MAP, names=fields)
+        st, fresh = result.state, result.fresh
+        self.stale = apply_read(result, self.stale, self.updated_at)
+
+        # Update local member variables (only the ones that were read)
+        if "desired_temp" in fresh:
+            self.desiredTemperature = st.desired_temp.to_float()
+            if self.coalescer is not None:
+                # Board #1 reads back its set-point (it may be changed on the board)
+                self.coalescer.observe(make_set_low(st.desired_temp.frac_digit),
+                                       make_set_high(st.desired_temp.integral))
+        if "ambient_temp" in fresh:
+            self.ambientTemperature = st.ambient_temp.to_float()
+        if "fan_speed_rps" in fresh:
+            self.fanSpeed = int(st.fan_speed_rps)
+
+    def age_s(self, name: str) -> float:
+        """Seconds since register 'name' was read (inf if never)."""
+        return field_age_s(self.updated_at, name)
+
+    def start_polling(self, periods_s: Optional[Dict[str, float]] = None) -> BoardPoller:
+        """
+        Starts polling the board in the background. From now on the getters
+        return the values of the latest snapshot without any serial I/O.
+        """
+        if self.poller is None:
+            self.poller = BoardPoller(self.connection, board1.REGISTER_MAP, dict(periods_s or {}),
+                                      name="board1")
+            self.poller.subscribe(self._observe_snapshot)
+        return self.poller.start()
+
+    def _observe_snapshot(self, snap: Snapshot) -> None:
+        """Poll listener: a set-point read by the poller goes to the coalescer."""
+        t = snap.t.get("desired_temp")
+        if self.coalescer is None or t is None or t == self._observed_t or "desired_temp" in snap.stale:
+            return
+        self._observed_t = t
+        try:
+            low_cmd, high_cmd = board1.encode_set_desired_temp(snap.value("desired_temp"))
+        except ValueError:
+            self.coalescer.forget()     # Out of the SET range: no pair can equal it
+            return
+        self.coalescer.observe(low_cmd, high_cmd)
+
+    def stop_polling(self) -> None:
+        if self.poller is not None:
+            self.poller.stop()
+            self.poller = None
+
+    def setDesiredTemp(self, temp: float, coalesce: bool = False) -> bool:
         """
         [R2.3-1] Sets the desired temperature by sending a message to the board.
         Target range: 10.0 - 50.0 Celcius.
+
+        With 'coalesce' (interactive control) the call does not wait: the
+        SET is skipped if the board already has the value, and a newer call
+        replaces a SET that is still queued (see set_coalescer.py).
         """
         try:
             # Encode float into Low/High byte commands
             low_cmd, high_cmd = board1.encode_set_desired_temp(temp)
-            
-            # [R2.1.4-1] Send SET commands via UART
-            self.connection.write(low_cmd)
-            self.connection.write(high_cmd)
-
-            # Wait for PIC to process and clear buffers
-            import time
-            time.sleep(0.2)
-            
-            # Clear input buffer to remove potential echoes
-            if hasattr(self.connection.transport, '_ser') and self.connection.transport._ser:
-                ser = self.connection.transport._ser
-                ser.reset_input_buffer()
-                if ser.in_waiting > 0:
-                    ser.read(ser.in_waiting)
-                ser.reset_input_buffer()
-
-            # Update local cache immediately
+
+            if coalesce:
+                self.set_coalescer().submit(low_cmd, high_cmd)
+            else:
+                # [R2.1.4-1] Send SET commands via UART as one transaction, so the
+                # low/high pair is never split by another thread's request
+                self.connection.send(bytes([low_cmd, high_cmd]))
+                if self.coalescer is not None:
+                    self.coalescer.forget()
+
+            # Update local cache immediately (write-through, no read-back)
             self.desiredTemperature = round(float(temp), 1)
+            self.stale -= {"desired_temp"}
+            if self.cache is not None:
+                self.cache.write("desired_temp", self.updated_at)
+            if self.poller is not None:
+                self.poller.write("desired_temp", self.desiredTemperature)
             return True
         except Exception:
             return False
 
+    def wait_until_settled(self, target: Optional[float] = None, tolerance: float = 0.5,
+                           timeout: float = 120.0,
+                           progress: Optional[Callable[[float], None]] = None) -> SettleResult:
+        """
+        Waits until the ambient temperature is within 'tolerance' of
+        'target' (default: the desired temperature) or stops changing.
+        Only the ambient temperature registers are read.
+        'progress' is called with every temperature read.
+        """
+        if target is None:
+            target = self.desiredTemperature
+
+        def read() -> Optional[float]:
+            self.update(fields=("ambient_temp",))
+            return None if "ambient_temp" in self.stale else self.ambientTemperature
+
+        # The room changes slowly: poll every 0.5 s at most every 5 s
+        return wait_for_value(read, float(target), tolerance, timeout, progress,
+                              min_interval_s=0.5, max_interval_s=5.0, settle_s=15.0)
+
+    def set_coalescer(self) -> SetCoalescer:
+        if self.coalescer is None:
+            self.coalescer = SetCoalescer(self.connection, key="board1.desired_temp")
+        return self.coalescer
+
+    def set_stats(self) -> SetStats:
+        """Requested / sent / skipped / coalesced SETs of the coalescing path."""
+        return self.coalescer.stats() if self.coalescer is not None else SetStats()
+
     def getAmbientTemp(self) -> float:
         """
         [R2.3-1] Get the ambient temperature.
         """
+        if self.poller is not None:
+            return float(self.poller.latest().value("ambient_temp"))
+        refresh_expired(self, self.cache, "ambient_temp")
         return float(self.ambientTemperature)
 
     def getFanSpeed(self) -> int:
         """
         [R2.3-1] Get the fan speed.
         """
+        if self.poller is not None:
+            return int(self.poller.latest().value("fan_speed_rps"))
+        refresh_expired(self, self.cache, "fan_speed_rps")
         return int(self.fanSpeed)
 
     def getDesiredTemp(self) -> float:
         """
         [R2.3-1] Get the desired temperature.
         """
+        if self.poller is not None:
+            return float(self.poller.latest().value("desired_temp"))
+        refresh_expired(self, self.cache, "desired_temp")
         return float(self.desiredTemperature)
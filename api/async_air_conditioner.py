@@ -0,0 +1,83 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/api/async_air_conditioner.py
+DESCRIPTION:
+    asyncio version of the High-Level API for Board #1 (Air Conditioner).
+    It has the same members and getters as 'AirConditionerSystemConnection'
+    and uses the same protocol codecs (protocol/board1.py), but update() and
+    setDesiredTemp() are coroutines.
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, Optional
+
+from .async_common import AsyncHomeAutomationSystemConnection
+from .board_connection import apply_read
+from ..protocol import board1
+
+
+@dataclass
+class AsyncAirConditionerSystemConnection:
+    """
+    asyncio counterpart of AirConditionerSystemConnection (Board #1).
+    """
+    connection: AsyncHomeAutomationSystemConnection
+
+    desiredTemperature: float = 0.0
+    ambientTemperature: float = 0.0
+    fanSpeed: int = 0
+    stale: FrozenSet[str] = frozenset()
+    updated_at: Dict[str, float] = field(default_factory=dict)
+
+    async def update(self, fields: Optional[Iterable[str]] = None) -> None:
+        """
+        Updates the member data by communicating with the board.
+        Other boards on the same event loop run while this one waits.
+        'fields' selects registers like in the blocking class; read times
+        go to 'updated_at'. Registers that could not be read keep their
+        value and are listed in 'stale'.
+        """
+        result = await self.connection.read_registers(board1.REGISTER_MAP, names=fields)
+        st, fresh = result.state, result.fresh
+        self.stale = apply_read(result, self.stale, self.updated_at)
+
+        if "desired_temp" in fresh:
+            self.desiredTemperature = st.desired_temp.to_float()
+        if "ambient_temp" in fresh:
+            self.ambientTemperature = st.ambient_temp.to_float()
+        if "fan_speed_rps" in fresh:
+            self.fanSpeed = int(st.fan_speed_rps)
+
+    async def setDesiredTemp(self, temp: float) -> bool:
+        """
+        Sets the desired temperature (10.0 - 50.0 Celcius).
+        """
+        try:
+            low_cmd, high_cmd = board1.encode_set_desired_temp(temp)
+            await self.connection.send(bytes([low_cmd, high_cmd]))
+
+            self.desiredTemperature = round(float(temp), 1)
+            return True
+        except Exception:
+            return False
+
+    def getAmbientTemp(self) -> float:
+        """Get the ambient temperature."""
+        return float(self.ambientTemperature)
+
+    def getFanSpeed(self) -> int:
+        """Get the fan speed."""
+        return int(self.fanSpeed)
+
+    def getDesiredTemp(self) -> float:
+        """Get the desired temperature."""
+        return float(self.desiredTemperature)
@@ -0,0 +1,340 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/api/async_common.py
+DESCRIPTION:
+    asyncio version of the base connection class.
+    It has the same members and error handling as
+    'HomeAutomationSystemConnection', but works on an AsyncTransport.
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional
+
+from .board_connection import RegisterRead
+from .retry_policy import CircuitBreaker, RetryPolicy
+from ..protocol.common import RX_FIFO_DEPTH
+from ..protocol.registers import BoardMap
+from ..transport.async_base import AsyncTransport
+from ..transport.base import TransportError
+
+
+@dataclass
+class AsyncHomeAutomationSystemConnection:
+    """
+    Base class for asyncio system connections.
+    It encapsulates the AsyncTransport object and manages connection state.
+    """
+    transport: AsyncTransport
+    comPort: str
+    baudRate: int
+    last_error: Optional[str] = None
+
+    # Retry rules and offline detection, as in the blocking connection
+    retry_policy: RetryPolicy = field(default_factory=RetryPolicy, repr=False, compare=False)
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker, repr=False, compare=False)
+
+    # Whether the firmware answers GET_ALL, by board map name (unknown until tried)
+    snapshot_support: Dict[str, bool] = field(default_factory=dict, repr=False, compare=False)
+    # GETs sent before the first answer arrives (1: stop-and-wait)
+    pipeline_window: int = field(default=RX_FIFO_DEPTH, compare=False)
+    # SET bytes sent since the last answer (they count against the window)
+    _unread_sets: int = field(default=0, repr=False, compare=False)
+    # Serializes requests, pipelines, snapshots and SET pairs, so two tasks
+    # cannot interleave their bytes (created on first use, inside the loop)
+    _lock: Optional[asyncio.Lock] = field(default=None, repr=False, compare=False)
+
+    async def open(self) -> bool:
+        """
+        Initiate a connection to the Board.
+        Returns:
+            bool: True if connection is successful, False otherwise.
+        """
+        try:
+            await self.transport.open()
+            self.last_error = None
+            return True
+        except TransportError as e:
+            self.last_error = str(e)
+            return False
+        except Exception as e:
+            self.last_error = repr(e)
+            return False
+
+    async def close(self) -> bool:
+        """
+        Closes the connection to the board.
+        Returns:
+            bool: True if closed successfully.
+        """
+        try:
+            await self.transport.close()
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.last_error = repr(e)
+            return False
+
+    def is_open(self) -> bool:
+        """Checks if the transport layer is currently open."""
+        return self.transport.is_open()
+
+    async def write(self, b: int) -> None:
+        """Sends a single byte to the hardware."""
+        await self.write_bytes(bytes([int(b) & 0xFF]))
+
+    async def write_bytes(self, buf: bytes) -> None:
+        """Sends several bytes to the hardware in one call."""
+        try:
+            await self.transport.write_bytes(buf)
+        except TransportError as e:
+            self.last_error = str(e)
+            raise
+        self._unread_sets += sum(1 for b in bytes(buf) if b >= 0x80)
+
+    async def read(self, timeout_s: float = 1.0) -> int:
+        """
+        Reads a single byte from the hardware.
+        Returns -1 if a timeout occurs.
+        """
+        try:
+            b = await self.transport.read_byte(timeout_s=timeout_s)
+        except TransportError as e:
+            self.last_error = str(e)
+            return -1
+        self._unread_sets = 0
+        return b
+
+    async def read_exact(self, n: int, timeout_s: float = 1.0) -> bytes:
+        """
+        Reads exactly 'n' bytes from the hardware.
+        Returns an empty bytes object if they do not arrive in time.
+        """
+        deadline = asyncio.get_running_loop().time() + timeout_s
+        try:
+            data = await self.transport.read_exact(n, deadline)
+        except TransportError as e:
+            self.last_error = str(e)
+            return b""
+        self._unread_sets = 0
+        return data
+
+    async def drain(self) -> int:
+        """Discards unread input bytes. Returns the number discarded."""
+        try:
+            return await self.transport.drain()
+        except TransportError as e:
+            self.last_error = str(e)
+            return 0
+
+    def lock(self) -> asyncio.Lock:
+        """The lock that serializes exchanges on this connection."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def send(self, payload: bytes) -> None:
+        """
+        Sends bytes that expect no answer (e.g. a SET pair) as one
+        exchange. Raises TransportError on failure, like write_bytes().
+        """
+        async with self.lock():
+            await self.write_bytes(payload)
+            await self.drain()
+
+    def response_timeout(self, cmd: int) -> float:
+        """Time to wait for the answer to 'cmd'."""
+        return self.transport.response_timeout(cmd)
+
+    def retry_delay(self, cmd: int) -> float:
+        """Time to wait after a timeout of 'cmd' before sending it again."""
+        return self.transport.retry_delay(cmd)
+
+    async def request(self, cmd: int, retries: Optional[int] = None,
+                      deadline: Optional[float] = None) -> int:
+        """
+        Sends a GET command and waits for its answer, with retries.
+        Returns -1 if the board never answered. Attempts, the 'deadline'
+        (time.monotonic()), the backoff between attempts and the offline
+        check follow 'retry_policy' and 'breaker' like request_byte().
+        """
+        async with self.lock():
+            return await self._request(cmd, retries, deadline)
+
+    async def _request(self, cmd: int, retries: Optional[int] = None,
+                       deadline: Optional[float] = None) -> int:
+        """request() for a caller that holds the lock."""
+        policy, breaker = self.retry_policy, self.breaker
+        attempts = policy.max_attempts if retries is None else retries
+        if deadline is None:
+            deadline = policy.deadline()
+
+        for attempt in range(attempts):
+            # Deadline first: allow() may take the single half-open probe
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not breaker.allow():
+                break
+            await self.write(cmd)
+            resp = await self.read(timeout_s=min(self.response_timeout(cmd), remaining))
+            if resp != -1:
+                breaker.record_success()
+                return resp
+            breaker.record_failure()
+
+            if attempt + 1 < attempts:
+                delay = policy.backoff(attempt, self.retry_delay(cmd))
+                if time.monotonic() + delay >= deadline:
+                    break
+                await asyncio.sleep(delay)
+            await self.drain()
+        return -1
+
+    async def pipeline(self, cmds: bytes, window: Optional[int] = None) -> bytes:
+        """
+        Sends the GETs 'cmds' with up to 'window' (default:
+        'pipeline_window') of them in flight and returns their answers in
+        order, up to the first timeout (see the synchronous version). SET
+        bytes sent since the last answer take a place in the window too.
+        """
+        async with self.lock():
+            return await self._pipeline(cmds, window)
+
+    async def _pipeline(self, cmds: bytes, window: Optional[int] = None,
+                        deadline: Optional[float] = None) -> bytes:
+        """pipeline() for a caller that holds the lock; stops at 'deadline'."""
+        window = max(1, self.pipeline_window if window is None else window)
+        cmds = bytes(cmds)
+        sent = min(max(1, window - self._unread_sets), len(cmds))
+        out = bytearray()
+        try:
+            await self.write_bytes(cmds[:sent])
+            while len(out) < len(cmds):
+                timeout_s = self.response_timeout(cmds[len(out)])
+                if deadline is not None:
+                    timeout_s = min(timeout_s, deadline - time.monotonic())
+                data = await self.read_exact(1, timeout_s=timeout_s)
+                if not data:
+                    break
+                out += data
+                if sent < len(cmds):
+                    more = min(len(cmds) - sent, window - (sent - len(out)))
+                    await self.write_bytes(cmds[sent:sent + more])
+                    sent += more
+        except TransportError:
+            pass    # last_error is set; the answers read so far are kept
+        return bytes(out)
+
+    async def read_snapshot(self, board_map: BoardMap) -> Optional[Any]:
+        """
+        Reads all registers of 'board_map' with one GET_ALL.
+        Returns the new state, or None if there was no valid answer
+        (a wrong size is remembered in 'snapshot_support'). The circuit
+        breaker sees the result as in the synchronous read_snapshot().
+        """
+        async with self.lock():
+            return await self._read_snapshot(board_map)
+
+    async def _read_snapshot(self, board_map: BoardMap,
+                             deadline: Optional[float] = None) -> Optional[Any]:
+        """read_snapshot() for a caller that holds the lock."""
+        code = board_map.get_all
+        supported = self.snapshot_support.get(board_map.name)
+        if code is None or supported is False:
+            return None
+        if deadline is None:
+            deadline = self.retry_policy.deadline()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not self.breaker.allow():
+            return None
+
+        await self.write(code)
+        data = await self.read_exact(1 + len(board_map.get_commands),
+                                     timeout_s=min(self.response_timeout(code), remaining))
+        if not data:
+            await self.drain()
+            if supported:
+                self.breaker.record_failure()
+            else:
+                self.breaker.release()      # Older firmware never answers it
+            return None
+        self.breaker.record_success()
+        try:
+            st = board_map.decode_snapshot(data)
+        except ValueError:
+            self.snapshot_support[board_map.name] = False
+            return None
+        self.snapshot_support[board_map.name] = True
+        return st
+
+    async def read_registers(self, board_map: BoardMap, previous: Any = None,
+                             names: Optional[Iterable[str]] = None) -> RegisterRead:
+        """
+        Reads the registers 'names' (all if None) of 'board_map'; only
+        their GETs are sent (pipelined), or one GET_ALL for all registers
+        if the firmware supports it. Registers whose GETs failed keep their
+        value from 'previous' and are reported as stale. The whole read
+        holds the connection's lock.
+        """
+        async with self.lock():
+            return await self._read_registers(board_map, previous, names)
+
+    async def _read_registers(self, board_map: BoardMap, previous: Any,
+                              names: Optional[Iterable[str]]) -> RegisterRead:
+        """read_registers() for a caller that holds the lock."""
+        cmds = board_map.commands_for(names)
+        everything = frozenset(reg.name for reg in board_map.registers)
+        requested = everything if names is None else frozenset(names)
+
+        # Drop late answers from an earlier request so responses stay aligned
+        await self.drain()
+
+        st, failed = None, []
+        probing = False
+        if requested == everything and board_map.get_all is not None:
+            probing = board_map.name not in self.snapshot_support
+            st = await self._read_snapshot(board_map)
+        if st is None:
+            # Register by register, with a deadline of their own
+            deadline = self.retry_policy.deadline()
+            st = board_map.new_state()
+            rest = cmds
+            if self.pipeline_window > 1 and len(cmds) > 1 and self.breaker.allow():
+                answers = await self._pipeline(bytes(cmds), deadline=deadline)
+                for cmd, b in zip(cmds, answers):
+                    board_map.decode(cmd, b, st)
+                if answers:
+                    self.breaker.record_success()
+                else:
+                    self.breaker.record_failure()
+                rest = cmds[len(answers):]
+                if rest:
+                    # Late answers of the GETs in flight, then stop-and-wait
+                    delay = min(self.retry_delay(rest[0]), deadline - time.monotonic())
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    await self.drain()
+            for cmd in rest:
+                resp = await self._request(cmd, deadline=deadline)
+                if resp == -1:
+                    failed.append(cmd)
+                else:
+                    board_map.decode(cmd, resp, st)
+            if probing and not failed and board_map.name not in self.snapshot_support:
+                # The board answers its GETs but not GET_ALL: older firmware
+                self.snapshot_support[board_map.name] = False
+
+        stale = board_map.stale_registers(failed) & requested
+        keep = frozenset(reg.name for reg in board_map.registers if reg.name not in requested) | stale
+        if keep and previous is not None:
+            board_map.copy_registers(previous, st, keep)
+        return RegisterRead(st, stale, requested - stale, time.monotonic())
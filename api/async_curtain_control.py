@@ -0,0 +1,91 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/api/async_curtain_control.py
+DESCRIPTION:
+    asyncio version of the High-Level API for Board #2 (Curtain Control).
+    It has the same members and getters as 'CurtainControlSystemConnection'
+    and uses the same protocol codecs (protocol/board2.py), but update() and
+    setCurtainStatus() are coroutines.
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, Optional
+
+from .async_common import AsyncHomeAutomationSystemConnection
+from .board_connection import apply_read
+from ..protocol import board2
+
+
+@dataclass
+class AsyncCurtainControlSystemConnection:
+    """
+    asyncio counterpart of CurtainControlSystemConnection (Board #2).
+    """
+    connection: AsyncHomeAutomationSystemConnection
+
+    curtainStatus: float = 0.0
+    outdoorTemperature: float = 0.0
+    outdoorPressure: float = 0.0
+    lightIntensity: float = 0.0
+    stale: FrozenSet[str] = frozenset()
+    updated_at: Dict[str, float] = field(default_factory=dict)
+
+    light_high_cmd: int = board2.GET_LIGHT_INTENSITY_HIGH_DEFAULT
+    curtain_set_mode: str = "scaled_0_63"  # Options: "scaled_0_63" or "raw_0_63"
+
+    async def update(self, fields: Optional[Iterable[str]] = None) -> None:
+        """
+        Updates the member data by communicating with the board.
+        Other boards on the same event loop run while this one waits.
+        'fields' selects registers like in the blocking class; read times
+        go to 'updated_at'. Registers that could not be read keep their
+        value and are listed in 'stale'.
+        """
+        board_map = board2.register_map(self.light_high_cmd)
+        result = await self.connection.read_registers(board_map, names=fields)
+        st, fresh = result.state, result.fresh
+        self.stale = apply_read(result, self.stale, self.updated_at)
+
+        if "desired_curtain" in fresh:
+            self.curtainStatus = board_map.value(st, "desired_curtain",
+                                                 scaled=(self.curtain_set_mode == "scaled_0_63"))
+        if "outdoor_temp" in fresh:
+            self.outdoorTemperature = st.outdoor_temp.to_float()
+        if "outdoor_press" in fresh:
+            self.outdoorPressure = st.outdoor_press.to_float()
+        if "light_intensity" in fresh:
+            self.lightIntensity = st.light_intensity.to_float()
+
+    async def setCurtainStatus(self, value: float) -> bool:
+        """
+        Sets the desired curtain openness (0-100%, or 0-63 in raw mode).
+        """
+        try:
+            low_cmd, high_cmd = board2.encode_set_desired_curtain(float(value), mode=self.curtain_set_mode)
+            await self.connection.send(bytes([low_cmd, high_cmd]))
+
+            self.curtainStatus = round(float(value), 1)
+            return True
+        except Exception:
+            return False
+
+    def getOutdoorTemp(self) -> float:
+        """Get the outdoor temperature."""
+        return float(self.outdoorTemperature)
+
+    def getOutdoorPress(self) -> float:
+        """Get the outdoor pressure."""
+        return float(self.outdoorPressure)
+
+    def getLightIntensity(self) -> float:
+        """Get the light intensity."""
+        return float(self.lightIntensity)
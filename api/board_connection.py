@@ -0,0 +1,300 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/api/board_connection.py
+DESCRIPTION:
+    Generic board API driven by a register map (protocol/registers.py).
+    'read_registers' sends every GET of the map (with the connection's
+    retry policy and circuit breaker) and decodes the answers; registers
+    that could not be read are reported as stale. If the firmware has a
+    GET_ALL command, all registers are read in one round trip instead;
+    boards that do not answer it are read register by register, with up
+    to 'pipeline_window' GETs in flight. If the board agreed to the framed
+    protocol v2 (protocol/frames.py), all GETs go into one frame.
+    'BoardConnection' wraps it with update/get/set, so a new board only
+    needs a BoardMap. The UML classes of Board #1 and Board #2 use the
+    same functions for update().
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from .common import HomeAutomationSystemConnection
+from ..protocol.registers import BoardMap
+
+
+def request_byte(connection: HomeAutomationSystemConnection, cmd: int,
+                 retries: Optional[int] = None, verbose: bool = False,
+                 deadline: Optional[float] = None, priority: Optional[int] = None) -> Optional[int]:
+    """
+    Sends one GET and returns the answer byte, or None if it failed.
+
+    The connection's RetryPolicy limits the attempts ('retries' overrides
+    the number) and the time (until the monotonic 'deadline'); the delay
+    between attempts grows exponentially with jitter. If the connection's
+    CircuitBreaker says the board is offline, no request is sent at all.
+    'priority' is the class used by the connection's PortWorker.
+    """
+    policy, breaker = connection.retry_policy, connection.breaker
+    attempts = policy.max_attempts if retries is None else retries
+    if deadline is None:
+        deadline = policy.deadline()
+
+    for attempt in range(attempts):
+        # Deadline first: allow() may take the single half-open probe,
+        # which must then end in record_success() or record_failure()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        if not breaker.allow():
+            break   # Board offline: fail fast
+        if attempt > 0:
+            connection.record_retry(cmd)
+
+        # One transaction: GET + its answer (safe with a shared port)
+        timeout_s = min(connection.response_timeout(cmd), remaining)
+        data = connection.transact(bytes([cmd]), 1, timeout_s, priority)
+        if data:
+            breaker.record_success()
+            resp = data[0]
+            if verbose and attempt > 0:
+                print(f"[DEBUG] CMD=0x{cmd:02X} -> RESP=0x{resp:02X} ({resp}) [attempt {attempt+1}]")
+            return resp
+        breaker.record_failure()
+
+        # Timeout occurred, wait (backoff) and retry if there is time left
+        if attempt + 1 < attempts:
+            delay = policy.backoff(attempt, connection.retry_delay(cmd))
+            if time.monotonic() + delay >= deadline:
+                break
+            time.sleep(delay)
+
+    if verbose:
+        state = "board offline" if not breaker.is_online() else "no answer"
+        print(f"[DEBUG] CMD=0x{cmd:02X} -> FAILED ({state}), value is stale")
+    return None
+
+
+def read_snapshot(connection: HomeAutomationSystemConnection, board_map: BoardMap,
+                  deadline: Optional[float] = None, priority: Optional[int] = None) -> Optional[Any]:
+    """
+    Reads all registers of 'board_map' with one GET_ALL and returns the new
+    state, or None if there was no valid answer. An answer of the wrong
+    size means the firmware does not know GET_ALL; this is remembered in
+    the connection's 'snapshot_support' and the command is not sent again.
+    The result goes to the circuit breaker like any GET; only while it is
+    unknown whether the firmware has GET_ALL, a missing answer is left to
+    the GETs that follow (older firmware does not answer it at all).
+    """
+    code = board_map.get_all
+    supported = connection.snapshot_support.get(board_map.name)
+    if code is None or supported is False:
+        return None
+    if deadline is None:
+        deadline = connection.retry_policy.deadline()
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+    breaker = connection.breaker
+    if not breaker.allow():
+        return None
+
+    data = connection.transact(bytes([code]), 1 + len(board_map.get_commands),
+                               min(connection.response_timeout(code), remaining), priority)
+    if not data:
+        if supported:
+            breaker.record_failure()
+        else:
+            breaker.release()
+        return None
+    breaker.record_success()        # The board answered, even if not GET_ALL
+    try:
+        st = board_map.decode_snapshot(data)
+    except ValueError:
+        connection.snapshot_support[board_map.name] = False
+        return None
+    connection.snapshot_support[board_map.name] = True
+    return st
+
+
+def read_pipelined(connection: HomeAutomationSystemConnection, board_map: BoardMap, cmds: Tuple[int, ...],
+                   state: Any, verbose: bool = False, deadline: Optional[float] = None,
+                   priority: Optional[int] = None) -> Tuple[int, ...]:
+    """
+    Sends the GETs 'cmds' with the connection's 'pipeline_window' of them
+    in flight (with protocol v2: in one GET frame) and decodes the answers
+    into 'state'. Returns the GETs that were not answered: after the first
+    timeout the remaining registers are left to the stop-and-wait path
+    (request_byte() with retries). A pipeline without any answer is one
+    failure for the circuit breaker.
+    """
+    window = connection.pipeline_window
+    if connection.protocol_version >= 2:
+        window = max(window, 2)     # One GET frame for all registers
+    if window <= 1 or len(cmds) <= 1:
+        return tuple(cmds)
+    if deadline is None:
+        deadline = connection.retry_policy.deadline()
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return tuple(cmds)
+    breaker = connection.breaker
+    if not breaker.allow():
+        return tuple(cmds)
+
+    answers = connection.pipeline(bytes(cmds), window, remaining, priority)
+    for cmd, b in zip(cmds, answers):
+        board_map.decode(cmd, b, state)
+    if answers:
+        breaker.record_success()
+    else:
+        breaker.record_failure()
+    rest = tuple(cmds[len(answers):])
+    if rest:
+        # A GET after an answer is not a failure yet: it is retried stop-and-wait
+        if verbose:
+            print(f"[DEBUG] CMD=0x{rest[0]:02X} timed out in the pipeline, continuing stop-and-wait")
+        # Let late answers of the GETs still in flight arrive; the next
+        # request drains them before it is sent
+        delay = min(connection.retry_delay(rest[0]), deadline - time.monotonic())
+        if delay > 0:
+            time.sleep(delay)
+    return rest
+
+
+@dataclass
+class RegisterRead:
+    """
+    Result of read_registers().
+    'fresh' registers were read at time 't' (time.monotonic()); 'stale'
+    ones were requested but could not be read. All other registers in
+    'state' (stale or not requested) keep the previous value, if one was
+    given, or the default.
+    """
+    state: Any
+    stale: FrozenSet[str] = frozenset()
+    fresh: FrozenSet[str] = frozenset()
+    t: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.stale
+
+
+def read_registers(connection: HomeAutomationSystemConnection, board_map: BoardMap,
+                   retries: Optional[int] = None, verbose: bool = False,
+                   previous: Any = None, names: Optional[Iterable[str]] = None,
+                   priority: Optional[int] = None) -> RegisterRead:
+    """
+    Reads the registers 'names' (all if None) of 'board_map' into a new
+    state object; only the GETs of these registers are sent. A read of all
+    registers is one GET_ALL if the firmware supports it; otherwise the
+    GETs are pipelined (read_pipelined()) and share one deadline from the
+    connection's RetryPolicy.
+    Failed registers keep their value from 'previous' and are reported as
+    stale instead of being set to 0.
+    """
+    cmds = board_map.commands_for(names)
+    everything = frozenset(reg.name for reg in board_map.registers)
+    requested = everything if names is None else frozenset(names)
+
+    st, failed = None, []
+    probing = False
+    if requested == everything and board_map.get_all is not None and connection.protocol_version < 2:
+        probing = board_map.name not in connection.snapshot_support
+        st = read_snapshot(connection, board_map, priority=priority)
+    if st is None:
+        # Register by register, with a deadline of their own
+        deadline = connection.retry_policy.deadline()
+        st = board_map.new_state()
+        rest = read_pipelined(connection, board_map, cmds, st, verbose, deadline, priority)
+        for cmd in rest:
+            b = request_byte(connection, cmd, retries, verbose, deadline, priority)
+            if b is None:
+                failed.append(cmd)
+            else:
+                board_map.decode(cmd, b, st)
+        if probing and not failed and board_map.name not in connection.snapshot_support:
+            # The board answers its GETs but not GET_ALL: older firmware
+            connection.snapshot_support[board_map.name] = False
+            if verbose:
+                print(f"[DEBUG] {board_map.name}: no GET_ALL, reading register by register")
+
+    stale = board_map.stale_registers(failed) & requested
+    keep = frozenset(reg.name for reg in board_map.registers if reg.name not in requested) | stale
+    if keep and previous is not None:
+        board_map.copy_registers(previous, st, keep)
+    return RegisterRead(st, stale, requested - stale, time.monotonic())
+
+
+def apply_read(result: RegisterRead, stale: FrozenSet[str], updated_at: Dict[str, float]) -> FrozenSet[str]:
+    """
+    Records the read time of the fresh registers in 'updated_at' and
+    returns the new stale set (registers not requested keep their flag).
+    """
+    for name in result.fresh:
+        updated_at[name] = result.t
+    return (stale - result.fresh) | result.stale
+
+
+def field_age_s(updated_at: Dict[str, float], name: str) -> float:
+    """Seconds since 'name' was last read, or inf if it never was."""
+    t = updated_at.get(name)
+    return math.inf if t is None else time.monotonic() - t
+
+
+@dataclass
+class BoardConnection:
+    """
+    Board API generated from a register map.
+    'state' holds the values read by the last update().
+    """
+    connection: HomeAutomationSystemConnection
+    board_map: BoardMap
+    retries: Optional[int] = None   # None: use the connection's RetryPolicy
+    state: Any = field(default=None, init=False)
+    stale: FrozenSet[str] = field(default=frozenset(), init=False)
+    updated_at: Dict[str, float] = field(default_factory=dict, init=False)
+
+    def update(self, fields: Optional[Iterable[str]] = None) -> bool:
+        """
+        Reads the registers 'fields' (all if None); the others are not
+        touched. Registers that could not be read keep their old value and
+        are listed in 'stale'. Returns True if everything requested was read.
+        """
+        result = read_registers(self.connection, self.board_map, self.retries,
+                                previous=self.state, names=fields)
+        self.state = result.state
+        self.stale = apply_read(result, self.stale, self.updated_at)
+        return result.ok
+
+    def age_s(self, name: str) -> float:
+        """Seconds since register 'name' was read (inf if never)."""
+        return field_age_s(self.updated_at, name)
+
+    def get(self, name: str, scaled: bool = True) -> float:
+        """Value of register 'name' from the last update() (user units)."""
+        if self.state is None:
+            self.state = self.board_map.new_state()
+        return self.board_map.value(self.state, name, scaled)
+
+    def set(self, value: float, scaled: bool = True) -> bool:
+        """Writes the SET register of the board. Returns False on error."""
+        try:
+            low_cmd, high_cmd = self.board_map.encode_set(value, scaled)
+            # Low/high pair as one transaction, so it is never split
+            self.connection.send(bytes([low_cmd, high_cmd]))
+            return True
+        except Exception as e:
+            self.connection.last_error = repr(e)
+            return False
@@ -22,10 +22,18 @@ AUTHORS:
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, Tuple
 
+from ..protocol import frames
+from ..protocol.common import RX_FIFO_DEPTH
 from ..transport.base import Transport, TransportError
+from .link_stats import ConnectionStats
+from .port_worker import PortWorker, PortWorkerStats, Transaction
+from .retry_policy import CircuitBreaker, RetryPolicy
 
 
 @dataclass
@@ -39,22 +47,56 @@ class HomeAutomationSystemConnection:
     baudRate: int
     last_error: Optional[str] = None 
 
+    # Optional background worker that owns the port (see port_worker.py).
+    # All byte-level access is serialized by '_lock'.
+    worker: Optional[PortWorker] = field(default=None, repr=False, compare=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, repr=False, compare=False)
+
+    # Per-command latency / retry / timeout counters (see link_stats.py)
+    stats: ConnectionStats = field(default_factory=ConnectionStats, repr=False, compare=False)
+
+    # Retry rules and offline detection for GET requests (see retry_policy.py)
+    retry_policy: RetryPolicy = field(default_factory=RetryPolicy, repr=False, compare=False)
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker, repr=False, compare=False)
+
+    # Whether the firmware answers GET_ALL, by board map name (unknown until tried)
+    snapshot_support: Dict[str, bool] = field(default_factory=dict, repr=False, compare=False)
+
+    # GETs sent before the first answer arrives (1: stop-and-wait). More
+    # than the board's receive FIFO holds would be lost (see pipeline()).
+    pipeline_window: int = field(default=RX_FIFO_DEPTH, compare=False)
+    # SET bytes sent since the last answer: the board may not have read
+    # them from its FIFO yet, so they count against the window
+    _unread_sets: int = field(default=0, repr=False, compare=False)
+
+    # Protocol: "legacy" single bytes, or "auto" to offer the framed
+    # protocol v2 at open() (protocol/frames.py). 'protocol_version' is
+    # what the board agreed to; 'frame_parser' counts resynchronizations.
+    framing: str = "legacy"
+    protocol_version: int = field(default=1, compare=False)
+    frame_parser: frames.FrameParser = field(default_factory=frames.FrameParser, repr=False, compare=False)
+    _seq: int = field(default=0, repr=False, compare=False)
+
     def open(self) -> bool:
         """
         [R2.3-1] Initiate a connection to the Board via UART port.
         Returns:
             bool: True if connection is successful, False otherwise.
         """
+        t0 = time.monotonic()
         try:
             self.transport.open()
             self.last_error = None
+            if self.framing == "auto":
+                self.negotiate()
+            self.stats.record_open(time.monotonic() - t0, True)
             return True
         except TransportError as e:
             self.last_error = str(e)
-            return False
         except Exception as e:
             self.last_error = repr(e)
-            return False
+        self.stats.record_open(time.monotonic() - t0, False)
+        return False
 
     def close(self) -> bool:
         """
@@ -62,9 +104,11 @@ class HomeAutomationSystemConnection:
         Returns:
             bool: True if closed successfully.
         """
+        t0 = time.monotonic()
         try:
             self.transport.close()
             self.last_error = None
+            self.stats.record_close(time.monotonic() - t0)
             return True
         except Exception as e:
             self.last_error = repr(e)
@@ -98,7 +142,9 @@ class HomeAutomationSystemConnection:
         Wrapper around the transport layer's write method.
         """
         try:
-            self.transport.write_byte(b)
+            with self._lock:
+                self.transport.write_byte(b)
+            self.stats.record_bytes(sent=1)
         except TransportError as e:
             self.last_error = str(e)
             raise
@@ -109,7 +155,373 @@ class HomeAutomationSystemConnection:
         Returns -1 if a timeout occurs.
         """
         try:
-            return self.transport.read_byte(timeout_s=timeout_s)
+            with self._lock:
+                b = self.transport.read_byte(timeout_s=timeout_s)
+            self.stats.record_bytes(received=1)
+            return b
         except TransportError as e:
             self.last_error = str(e)
             return -1  # Return -1 on timeout or error
+
+    def write_bytes(self, buf: bytes) -> None:
+        """
+        Sends several bytes to the hardware in one call.
+        Used for SET commands (low byte + high byte).
+        """
+        try:
+            with self._lock:
+                self.transport.write_bytes(buf)
+            self.stats.record_bytes(sent=len(buf))
+        except TransportError as e:
+            self.last_error = str(e)
+            raise
+
+    def read_exact(self, n: int, timeout_s: float = 1.0) -> bytes:
+        """
+        Reads exactly 'n' bytes from the hardware.
+        Returns an empty bytes object if they do not arrive in time.
+        """
+        try:
+            with self._lock:
+                data = self.transport.read_exact(n, time.monotonic() + timeout_s)
+            self.stats.record_bytes(received=len(data))
+            return data
+        except TransportError as e:
+            self.last_error = str(e)
+            return b""
+
+    def drain(self) -> int:
+        """
+        Discards unread input bytes (e.g. a late answer to a timed-out GET).
+        Returns the number of discarded bytes.
+        """
+        try:
+            with self._lock:
+                return self.transport.drain()
+        except TransportError as e:
+            self.last_error = str(e)
+            return 0
+
+    def response_timeout(self, cmd: int) -> float:
+        """
+        Time to wait for the answer to 'cmd'.
+        Comes from the transport, which may learn it from the link.
+        """
+        return self.transport.response_timeout(cmd)
+
+    def retry_delay(self, cmd: int) -> float:
+        """
+        Time to wait after a timeout of 'cmd' before sending it again.
+        """
+        return self.transport.retry_delay(cmd)
+
+    def negotiate(self, timeout_s: Optional[float] = None) -> int:
+        """
+        Offers the framed protocol v2 (HELLO frame) and returns the version
+        used from now on: 2 if the board answered HELLO, else 1 (legacy).
+        Legacy firmware at most answers the HELLO bytes as GETs; these
+        answers are drained before the legacy protocol is used.
+        """
+        if timeout_s is None:
+            timeout_s = self.transport.response_timeout(frames.FRAME_START)
+        version = 1
+        with self._lock:
+            self.transport.drain()
+            try:
+                self.transport.write_bytes(frames.HELLO_REQUEST)
+                got = self._read_frames({0}, time.monotonic() + timeout_s)
+            except TransportError as e:
+                self.last_error = str(e)
+                got = {}
+            hello = got.get(0)
+            if hello is not None and hello.opcode == frames.OP_HELLO | frames.REPLY and hello.payload:
+                version = min(frames.VERSION, hello.payload[0])
+            if version < 2:
+                self.transport.drain()
+        self.protocol_version = version
+        return version
+
+    # --------------------------------------------------------------------------
+    # Instrumentation
+    # --------------------------------------------------------------------------
+    def enable_stats(self, on: bool = True) -> None:
+        """Switches the link statistics on or off (off = almost no overhead)."""
+        self.stats.enabled = bool(on)
+
+    def stats_snapshot(self) -> ConnectionStats:
+        """Copy of the link statistics (per command byte)."""
+        return self.stats.snapshot()
+
+    def record_retry(self, cmd: int) -> None:
+        """Called by the API when a request of 'cmd' is repeated."""
+        self.stats.record_retry(cmd)
+
+    # --------------------------------------------------------------------------
+    # Transactions (thread-safe command/answer exchanges)
+    # --------------------------------------------------------------------------
+    def start_worker(self) -> PortWorker:
+        """
+        Starts a background worker that owns this port.
+        After this, transactions from any thread are queued and executed in
+        order, so API objects in different threads can share the port.
+        """
+        if self.worker is None:
+            self.worker = PortWorker(execute=self._execute, name=self.comPort)
+        self.worker.start()
+        return self.worker
+
+    def stop_worker(self) -> None:
+        """Stops the background worker (queued transactions are finished)."""
+        if self.worker is not None:
+            self.worker.stop()
+
+    def worker_stats(self) -> Optional[PortWorkerStats]:
+        """Queue depth / wait / service time counters, if a worker exists."""
+        return self.worker.stats() if self.worker is not None else None
+
+    def submit(self, payload: bytes, expect: int = 0, timeout_s: Optional[float] = None,
+               priority: Optional[int] = None, key: Optional[Hashable] = None,
+               window: int = 1) -> Future:
+        """
+        Queues a transaction: write 'payload', then read 'expect' bytes.
+        'priority' is a class of port_worker.py (default: SET or GET by
+        'expect'; background polling passes PRIO_POLL). A queued transaction
+        with the same coalescing 'key' is replaced (its Future returns None).
+        Returns a Future with the answer bytes. Without a running worker the
+        transaction is executed immediately in the calling thread.
+        """
+        if self.worker is not None and self.worker.is_running():
+            return self.worker.submit(payload, expect, timeout_s, priority, key, window)
+
+        txn = Transaction(payload=bytes(payload), expect=int(expect), timeout_s=timeout_s,
+                          window=int(window))
+        try:
+            txn.future.set_result(self._execute(txn))
+        except Exception as e:
+            txn.future.set_exception(e)
+        return txn.future
+
+    def transact(self, payload: bytes, expect: int = 0, timeout_s: Optional[float] = None,
+                 priority: Optional[int] = None) -> bytes:
+        """
+        Runs a transaction and waits for it.
+        Returns the answer bytes, or an empty bytes object on timeout/error.
+        """
+        try:
+            return self.submit(payload, expect, timeout_s, priority).result()
+        except TransportError as e:
+            self.last_error = str(e)
+            return b""
+
+    def pipeline(self, cmds: bytes, window: Optional[int] = None, timeout_s: Optional[float] = None,
+                 priority: Optional[int] = None) -> bytes:
+        """
+        Sends the GETs 'cmds' (one answer byte each) with up to 'window'
+        (default: 'pipeline_window') of them in flight: the next GET goes
+        out as soon as an answer arrives, not one board turnaround later.
+        SET bytes sent since the last answer take a place in the window
+        too, so right after a SET the first GET goes out alone.
+        Answers are matched to the GETs in order. Returns the answers read;
+        after the first timeout the rest is not waited for, so the result
+        is shorter than 'cmds' (empty on error). 'timeout_s' bounds the
+        whole exchange.
+        """
+        if window is None:
+            window = self.pipeline_window
+        try:
+            return self.submit(cmds, len(cmds), timeout_s, priority, window=max(1, window)).result()
+        except TransportError as e:
+            self.last_error = str(e)
+            return b""
+
+    def send(self, payload: bytes) -> None:
+        """
+        Sends bytes that expect no answer (e.g. a SET pair) as one
+        transaction. Raises TransportError on failure, like write().
+        """
+        try:
+            self.submit(payload).result()
+        except TransportError as e:
+            self.last_error = str(e)
+            raise
+
+    def _execute(self, txn: Transaction) -> bytes:
+        """
+        Performs one transaction on the transport (called by the worker or
+        inline). Input left over from earlier exchanges is drained before a
+        GET, so the answer read is always the answer to this command.
+        The exchange is recorded in 'stats' (GETs by their command byte,
+        SETs by their first byte).
+        """
+        if self.protocol_version >= 2:
+            return self._execute_framed(txn)
+        if txn.window > 1 and txn.expect == len(txn.payload) > 1:
+            return self._execute_pipelined(txn)
+
+        stats = self.stats if self.stats.enabled else None
+        payload = txn.payload
+        cmd = (payload[-1] if txn.expect else payload[0]) if payload else 0
+
+        with self._lock:
+            if txn.expect:
+                self.transport.drain()
+
+            t0 = time.monotonic()
+            if payload:
+                try:
+                    self.transport.write_bytes(payload)
+                except TransportError:
+                    if stats is not None:
+                        stats.record_exchange(cmd, 0, 0, None, error=True)
+                    raise
+            if not txn.expect:
+                self._unread_sets += sum(1 for b in payload if b >= 0x80)
+                if stats is not None:
+                    stats.record_exchange(cmd, len(payload), 0, None)
+                return b""
+
+            timeout_s = txn.timeout_s
+            if timeout_s is None:
+                timeout_s = self.transport.response_timeout(cmd)
+            try:
+                data = self.transport.read_exact(txn.expect, time.monotonic() + timeout_s)
+            except TransportError:
+                if stats is not None:
+                    stats.record_exchange(cmd, len(payload), 0, None, timeout=True)
+                raise
+            self._unread_sets = 0      # The board has read everything before the GET
+            if stats is not None:
+                stats.record_exchange(cmd, len(payload), len(data), time.monotonic() - t0)
+            return data
+
+    def _execute_pipelined(self, txn: Transaction) -> bytes:
+        """
+        Pipelined GETs (see pipeline()): up to 'txn.window' commands are
+        unanswered at any time, less the SET bytes not yet known to be read
+        (but at least one GET). Each answer is waited for up to the
+        response timeout of its command, counted from the previous answer
+        (the board handles them one after the other). Stops at the first
+        timeout and returns the answers read so far. If the worker has a
+        transaction of a higher class waiting, no more GETs are sent: once
+        the ones in flight are answered the transaction pauses (the worker
+        runs the other one and then continues with the rest of 'payload').
+        """
+        stats = self.stats if self.stats.enabled else None
+        payload = txn.payload[len(txn.answered):]
+        n = len(payload)
+        transport = self.transport
+        worker = self.worker
+
+        with self._lock:
+            transport.drain()
+            t0 = time.monotonic()
+            end = (txn.started_t or t0) + txn.timeout_s if txn.timeout_s is not None else None
+            sent_t = []
+            out = bytearray()
+
+            def send_next(count: int) -> None:
+                first = len(sent_t)
+                try:
+                    transport.write_bytes(payload[first:first + count])
+                except TransportError:
+                    if stats is not None:
+                        stats.record_exchange(payload[first], 0, 0, None, error=True)
+                    raise
+                sent_t.extend([time.monotonic()] * count)
+
+            send_next(min(max(1, txn.window - self._unread_sets), n))
+            while len(out) < len(sent_t):
+                cmd = payload[len(out)]
+                deadline = time.monotonic() + transport.response_timeout(cmd)
+                if end is not None:
+                    deadline = min(deadline, end)
+                try:
+                    out += transport.read_exact(1, deadline)
+                except TransportError:
+                    if stats is not None:
+                        stats.record_exchange(cmd, 1, 0, None, timeout=True)
+                    break
+                self._unread_sets = 0
+                if stats is not None:
+                    stats.record_exchange(cmd, 1, 1, time.monotonic() - sent_t[len(out) - 1])
+                if len(sent_t) < n:
+                    if worker is not None and worker.should_yield(txn):
+                        continue    # Collect the answers in flight, then pause
+                    send_next(min(n - len(sent_t), txn.window - (len(sent_t) - len(out))))
+            txn.yielded = len(out) == len(sent_t) < n
+            return bytes(out)
+
+    def _execute_framed(self, txn: Transaction) -> bytes:
+        """
+        Performs a transaction with protocol v2 frames: the GET codes (or
+        SET bytes) of the payload go into as many frames as needed, all
+        sent at once; answers are matched by their sequence number. Late
+        answers to earlier requests and stray bytes are skipped by the
+        frame parser, so nothing is drained. A SET raises TransportError
+        if the board does not confirm it; a pipelined GET (window > 1)
+        returns the answers up to the first missing frame.
+        """
+        stats = self.stats if self.stats.enabled else None
+        payload = txn.payload
+        opcode = frames.OP_GET if txn.expect else frames.OP_SET
+        cmd = payload[0] if payload else 0
+        step = frames.MAX_PAYLOAD - frames.MAX_PAYLOAD % 2      # Keep SET pairs together
+        requests: List[Tuple[int, bytes]] = []
+        for i in range(0, len(payload), step):
+            self._seq = self._seq % 255 + 1                     # 0 is used by HELLO
+            requests.append((self._seq, frames.encode_frame(self._seq, opcode, payload[i:i + step])))
+        data = b"".join(frame for _, frame in requests)
+
+        timeout_s = txn.timeout_s
+        if timeout_s is None:
+            timeout_s = self.transport.response_timeout(frames.FRAME_START) * len(requests)
+        with self._lock:
+            t0 = time.monotonic()
+            try:
+                self.transport.write_bytes(data)
+            except TransportError:
+                if stats is not None:
+                    stats.record_exchange(cmd, 0, 0, None, error=True)
+                raise
+            got = self._read_frames({seq for seq, _ in requests}, t0 + timeout_s)
+
+        out = bytearray()
+        complete = True
+        for seq, _ in requests:
+            answer = got.get(seq)
+            if answer is None or answer.opcode != opcode | frames.REPLY:
+                complete = False
+                break
+            out += answer.payload
+        if stats is not None:
+            stats.record_exchange(cmd, len(data), len(out), time.monotonic() - t0 if complete else None,
+                                  timeout=not complete)
+
+        if not txn.expect:
+            if not complete:
+                raise TransportError(f"SET 0x{cmd:02X} not confirmed by the board")
+            return b""
+        if txn.window > 1:
+            return bytes(out[:txn.expect])
+        if not complete or len(out) < txn.expect:
+            raise TransportError(f"Timeout: no v2 answer to 0x{cmd:02X}")
+        return bytes(out[:txn.expect])
+
+    def _read_frames(self, seqs, deadline: float) -> Dict[int, frames.Frame]:
+        """
+        Reads frames until one with every sequence number in 'seqs' arrived
+        or the 'deadline' passed. Frames with other numbers (answers to
+        requests that timed out earlier) are dropped.
+        """
+        parser, got = self.frame_parser, {}
+        while len(got) < len(seqs):
+            try:
+                b = self.transport.read_exact(1, deadline)
+            except TransportError:
+                found = parser.flush_partial()     # A stray START must not block the next reply
+                got.update((f.seq, f) for f in found if f.seq in seqs)
+                break
+            for f in parser.feed(b):
+                if f.seq in seqs:
+                    got[f.seq] = f
+        return got
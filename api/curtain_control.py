@@ -22,9 +22,15 @@ AUTHORS:
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, Iterable, Optional
 
+from .board_connection import apply_read, field_age_s, read_registers
 from .common import HomeAutomationSystemConnection
+from .poller import BoardPoller
+from .register_cache import RegisterCache, refresh_expired
+from .set_coalescer import SetCoalescer, SetStats
+from .settle import SettleResult, wait_for_value
 from ..protocol import board2
 
 
@@ -46,78 +52,81 @@ class CurtainControlSystemConnection:
     light_high_cmd: int = board2.GET_LIGHT_INTENSITY_HIGH_DEFAULT
     curtain_set_mode: str = "scaled_0_63"  # Options: "scaled_0_63" or "raw_0_63"
 
-    def update(self) -> None:
+    # Registers that could not be read and read times
+    stale: FrozenSet[str] = frozenset()
+    updated_at: Dict[str, float] = field(default_factory=dict)
+
+    # Optional read-through cache: getters refresh only expired registers
+    cache: Optional[RegisterCache] = None
+
+    # Optional background poller: getters serve from its latest snapshot
+    poller: Optional[BoardPoller] = None
+
+    # Coalescing SET path, created by the first setCurtainStatus(coalesce=True).
+    # GET_DESIRED_CURTAIN returns the motor position, not the set-point, so
+    # only our own SETs tell what the board has.
+    coalescer: Optional[SetCoalescer] = field(default=None, repr=False)
+
+    def update(self, fields: Optional[Iterable[str]] = None) -> None:
         """
         [R2.3-1] Updates the member data by communicating with the board.
         It sends GET commands defined in [R2.2.6-1] to retrieve current values.
+
+        'fields' selects registers ("desired_curtain", "outdoor_temp",
+        "outdoor_press", "light_intensity"); only their GETs are sent (e.g.
+        light_intensity -> GET_LIGHT_INTENSITY_LOW + light_high_cmd) and the
+        other members are not touched. Every value read gets a timestamp in
+        'updated_at'. Values that could not be read keep their old value and
+        their register name is put into 'stale'.
         """
-        st = board2.CurtainState()
-
-        def req(cmd: int, retries: int = 5) -> int:
-            """
-            Helper function to send a command and wait for a response.
-            It includes retry logic to ensure reliable communication.
-            """
-            for attempt in range(retries):
-                self.connection.write(cmd)
-                resp = self.connection.read(timeout_s=1.0)  # Use longer timeout for safety
-                if resp != -1:  # Success
-                    if attempt > 0:
-                        print(f"[DEBUG] CMD=0x{cmd:02X} -> RESP=0x{resp:02X} ({resp}) [attempt {attempt+1}]")
-                    return resp
-                
-                # Timeout occurred, wait and retry
-                import time
-                time.sleep(0.3)
-            
-            # All attempts failed
-            print(f"[DEBUG] CMD=0x{cmd:02X} -> FAILED after {retries} attempts, returning 0")
-            return 0  # Return default value
-
-        # [R2.2.6-1] Read Desired Curtain Status (Low and High bytes)
-        low = req(board2.GET_DESIRED_CURTAIN_LOW)
-        board2.decode_get_response(board2.GET_DESIRED_CURTAIN_LOW, low, st, light_high_cmd=self.light_high_cmd)
-
-        high = req(board2.GET_DESIRED_CURTAIN_HIGH)
-        board2.decode_get_response(board2.GET_DESIRED_CURTAIN_HIGH, high, st, light_high_cmd=self.light_high_cmd)
-
-        # [R2.2.6-1] Read Outdoor Temperature (Low and High bytes)
-        low = req(board2.GET_OUTDOOR_TEMP_LOW)
-        board2.decode_get_response(board2.GET_OUTDOOR_TEMP_LOW, low, st, light_high_cmd=self.light_high_cmd)
-
-        high = req(board2.GET_OUTDOOR_TEMP_HIGH)
-        board2.decode_get_response(board2.GET_OUTDOOR_TEMP_HIGH, high, st, light_high_cmd=self.light_high_cmd)
-
-        # [R2.2.6-1] Read Outdoor Pressure (Low and High bytes)
-        low = req(board2.GET_OUTDOOR_PRESS_LOW)
-        board2.decode_get_response(board2.GET_OUTDOOR_PRESS_LOW, low, st, light_high_cmd=self.light_high_cmd)
-
-        high = req(board2.GET_OUTDOOR_PRESS_HIGH)
-        board2.decode_get_response(board2.GET_OUTDOOR_PRESS_HIGH, high, st, light_high_cmd=self.light_high_cmd)
-
-        # [R2.2.6-1] Read Light Intensity (Low and High bytes)
-        low = req(board2.GET_LIGHT_INTENSITY_LOW)
-        board2.decode_get_response(board2.GET_LIGHT_INTENSITY_LOW, low, st, light_high_cmd=self.light_high_cmd)
-
-        high = req(self.light_high_cmd)
-        board2.decode_get_response(self.light_high_cmd, high, st, light_high_cmd=self.light_high_cmd)
+        # [R2.2.6-1] GET curtain, outdoor temp, pressure and light (low/high
+        # each); the sequence comes from the board's register map
+        board_map = board2.register_map(self.light_high_cmd)
+        result = read_registers(self.connection, board_map, verbose=True, names=fields)
+        st, fresh = result.state, result.fresh
+        self.stale = apply_read(result, self.stale, self.updated_at)
 
         # Update local member variables based on decoded state
-        raw = st.desired_curtain.to_float()
-        if self.curtain_set_mode == "scaled_0_63":
-            # Scale 0-63 raw value to 0-100%
-            self.curtainStatus = round((raw / 63.0) * 100.0, 1)
-        else:
-            self.curtainStatus = round(raw, 1)
-
-        self.outdoorTemperature = st.outdoor_temp.to_float()
-        self.outdoorPressure = st.outdoor_press.to_float()
-        self.lightIntensity = st.light_intensity.to_float()
-
-    def setCurtainStatus(self, value: float) -> bool:
+        # (scaled mode maps the 0-63 raw value to 0-100%)
+        if "desired_curtain" in fresh:
+            self.curtainStatus = board_map.value(st, "desired_curtain",
+                                                 scaled=(self.curtain_set_mode == "scaled_0_63"))
+        if "outdoor_temp" in fresh:
+            self.outdoorTemperature = st.outdoor_temp.to_float()
+        if "outdoor_press" in fresh:
+            self.outdoorPressure = st.outdoor_press.to_float()
+        if "light_intensity" in fresh:
+            self.lightIntensity = st.light_intensity.to_float()
+
+    def age_s(self, name: str) -> float:
+        """Seconds since register 'name' was read (inf if never)."""
+        return field_age_s(self.updated_at, name)
+
+    def start_polling(self, periods_s: Optional[Dict[str, float]] = None) -> BoardPoller:
+        """
+        Starts polling the board in the background. From now on the getters
+        return the values of the latest snapshot without any serial I/O.
+        """
+        if self.poller is None:
+            self.poller = BoardPoller(self.connection, board2.register_map(self.light_high_cmd),
+                                      dict(periods_s or {}),
+                                      scaled=(self.curtain_set_mode == "scaled_0_63"), name="board2")
+        return self.poller.start()
+
+    def stop_polling(self) -> None:
+        if self.poller is not None:
+            self.poller.stop()
+            self.poller = None
+
+    def setCurtainStatus(self, value: float, coalesce: bool = False) -> bool:
         """
         [R2.3-1] Sets the desired curtain openness (0-100%).
         It converts the percentage to the protocol format and sends it via UART.
+
+        With 'coalesce' (e.g. a slider) the call does not wait: the SET is
+        skipped if the board already has the value, and a newer call
+        replaces a SET that is still queued, so the motor does not chase
+        every intermediate value (see set_coalescer.py).
         """
         try:
             v = float(value)
@@ -132,46 +141,102 @@ class CurtainControlSystemConnection:
 
             # [R2.2.6-1] Encode value into SET commands
             low_cmd, high_cmd = board2.encode_set_desired_curtain(v, mode=self.curtain_set_mode)
-            print(f"[DEBUG SET] Sending LOW=0x{low_cmd:02X}, HIGH=0x{high_cmd:02X}")
-            
-            # Send SET commands (No response expected)
-            self.connection.write(low_cmd)
-            self.connection.write(high_cmd)
-
-            # Wait for PIC to process
-            import time
-            time.sleep(0.2)
-            
-            # Clear input buffer to prevent reading echoes or old data
-            if hasattr(self.connection.transport, '_ser') and self.connection.transport._ser:
-                ser = self.connection.transport._ser
-                ser.reset_input_buffer()
-                if ser.in_waiting > 0:
-                    garbage = ser.read(ser.in_waiting)
-                    print(f"[DEBUG SET] Cleared {len(garbage)} bytes")
-                ser.reset_input_buffer()
-
-            # Update local cache immediately
+
+            if coalesce:
+                self.set_coalescer().submit(low_cmd, high_cmd)
+            else:
+                print(f"[DEBUG SET] Sending LOW=0x{low_cmd:02X}, HIGH=0x{high_cmd:02X}")
+
+                # Send SET commands (No response expected) as one transaction,
+                # so the low/high pair is never split by another thread's request
+                self.connection.send(bytes([low_cmd, high_cmd]))
+                if self.coalescer is not None:
+                    self.coalescer.forget()
+
+            # Update local cache immediately (write-through, no read-back)
             self.curtainStatus = round(v, 1)
+            self.stale -= {"desired_curtain"}
+            if self.cache is not None:
+                self.cache.write("desired_curtain", self.updated_at)
+            if self.poller is not None:
+                self.poller.write("desired_curtain", self.curtainStatus)
             return True
         except Exception as e:
             print("setCurtainStatus error:", repr(e))
             return False
 
+    def wait_until_reached(self, target: Optional[float] = None, tolerance: float = 0.5,
+                           timeout: float = 30.0,
+                           progress: Optional[Callable[[float], None]] = None) -> SettleResult:
+        """
+        Waits until the curtain position is within 'tolerance' of 'target'
+        (default: the last set value) or of the whole motor step the board
+        stops at for it, or stops moving. Only the curtain registers are
+        read; fast while the motor moves (one step takes about 120 ms), less
+        often when the position does not change.
+        'progress' is called with every position read.
+        """
+        if target is None:
+            target = self.curtainStatus
+        # Board #2 stops at whole steps (100/63 % scaled): accept everything
+        # from that step to the requested value (plus 'tolerance' on both sides)
+        top = 100.0 if self.curtain_set_mode == "scaled_0_63" else float(board2.RAW_MAX)
+        stop = board2.curtain_stop_position(min(top, max(0.0, float(target))), mode=self.curtain_set_mode)
+        tolerance += abs(float(target) - stop) / 2.0
+        target = (float(target) + stop) / 2.0
+
+        def read() -> Optional[float]:
+            # GET_DESIRED_CURTAIN returns the current motor position
+            self.update(fields=("desired_curtain",))
+            return None if "desired_curtain" in self.stale else self.curtainStatus
+
+        result = wait_for_value(read, float(target), tolerance, timeout, progress,
+                                min_interval_s=0.1, max_interval_s=0.5, settle_s=1.0)
+        if self.poller is not None and result.value is not None:
+            self.poller.write("desired_curtain", result.value)
+        return result
+
+    def set_coalescer(self) -> SetCoalescer:
+        if self.coalescer is None:
+            self.coalescer = SetCoalescer(self.connection, key="board2.desired_curtain")
+        return self.coalescer
+
+    def set_stats(self) -> SetStats:
+        """Requested / sent / skipped / coalesced SETs of the coalescing path."""
+        return self.coalescer.stats() if self.coalescer is not None else SetStats()
+
     def getOutdoorTemp(self) -> float:
         """
         [R2.3-1] Get the outdoor temperature.
         """
+        if self.poller is not None:
+            return float(self.poller.latest().value("outdoor_temp"))
+        refresh_expired(self, self.cache, "outdoor_temp")
         return float(self.outdoorTemperature)
 
     def getOutdoorPress(self) -> float:
         """
         [R2.3-1] Get the outdoor pressure.
         """
+        if self.poller is not None:
+            return float(self.poller.latest().value("outdoor_press"))
+        refresh_expired(self, self.cache, "outdoor_press")
         return float(self.outdoorPressure)
 
     def getLightIntensity(self) -> float:
         """
         [R2.3-1] Get the light intensity.
         """
+        if self.poller is not None:
+            return float(self.poller.latest().value("light_intensity"))
+        refresh_expired(self, self.cache, "light_intensity")
         return float(self.lightIntensity)
+
+    def getCurtainStatus(self) -> float:
+        """
+        Get the curtain openness (last value read or set).
+        """
+        if self.poller is not None:
+            return float(self.poller.latest().value("desired_curtain"))
+        refresh_expired(self, self.cache, "desired_curtain")
+        return float(self.curtainStatus)
@@ -0,0 +1,225 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/api/link_stats.py
+DESCRIPTION:
+    Instrumentation of a connection.
+    For every command byte we count requests, retries, timeouts, errors and
+    bytes sent/received, and keep a round-trip latency histogram. The
+    histogram has fixed, logarithmic buckets (4 per doubling, 100 us up to
+    about 100 s), so memory does not grow with the number of samples.
+    Open/close durations of the port are recorded too.
+
+    Recording can be switched off with 'enabled'; then every record call
+    returns after one flag check.
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class LatencyHistogram:
+    """
+    Log-bucketed histogram of durations (seconds).
+    Bucket i holds values below min_s * ratio**(i+1); the last bucket also
+    holds everything larger.
+    """
+    min_s: float = 1e-4
+    buckets_per_doubling: int = 4
+    n_buckets: int = 80
+    counts: List[int] = field(default_factory=list)
+    count: int = 0
+    total_s: float = 0.0
+    min_seen_s: float = math.inf
+    max_seen_s: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * self.n_buckets
+        self._scale = self.buckets_per_doubling / math.log(2.0)
+
+    def bucket_of(self, seconds: float) -> int:
+        if seconds < self.min_s:
+            return 0
+        return min(self.n_buckets - 1, int(math.log(seconds / self.min_s) * self._scale))
+
+    def upper_bound(self, i: int) -> float:
+        """Upper edge of bucket i in seconds."""
+        return self.min_s * 2.0 ** ((i + 1) / self.buckets_per_doubling)
+
+    def record(self, seconds: float) -> None:
+        self.counts[self.bucket_of(seconds)] += 1
+        self.count += 1
+        self.total_s += seconds
+        if seconds < self.min_seen_s:
+            self.min_seen_s = seconds
+        if seconds > self.max_seen_s:
+            self.max_seen_s = seconds
+
+    def mean_s(self) -> float:
+        return self.total_s / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """
+        Approximate q-th percentile (0..100): the upper edge of the bucket
+        that contains it, clamped to the largest value seen.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * q / 100.0))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(self.upper_bound(i), self.max_seen_s)
+        return self.max_seen_s
+
+    def copy(self) -> "LatencyHistogram":
+        return LatencyHistogram(self.min_s, self.buckets_per_doubling, self.n_buckets,
+                                list(self.counts), self.count, self.total_s,
+                                self.min_seen_s, self.max_seen_s)
+
+
+@dataclass
+class CommandStats:
+    """Counters of one command byte."""
+    requests: int = 0           # Transactions sent with this command
+    retries: int = 0            # Repeated requests after a failure
+    timeouts: int = 0           # No (complete) answer in time
+    errors: int = 0             # Other transport errors
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def copy(self) -> "CommandStats":
+        return CommandStats(self.requests, self.retries, self.timeouts, self.errors,
+                            self.bytes_sent, self.bytes_received, self.latency.copy())
+
+
+@dataclass
+class ConnectionStats:
+    """
+    All counters of one connection. 'commands' is keyed by command byte.
+    """
+    enabled: bool = True
+    commands: Dict[int, CommandStats] = field(default_factory=dict)
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    opens: int = 0
+    open_failures: int = 0
+    last_open_s: float = 0.0
+    total_open_s: float = 0.0
+    closes: int = 0
+    last_close_s: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def _cmd(self, cmd: int) -> CommandStats:
+        st = self.commands.get(cmd)
+        if st is None:
+            st = self.commands[cmd] = CommandStats()
+        return st
+
+    # --------------------------------------------------------------------------
+    # Recording (called by the connection)
+    # --------------------------------------------------------------------------
+    def record_exchange(self, cmd: int, sent: int, received: int, rtt_s: Optional[float],
+                        timeout: bool = False, error: bool = False) -> None:
+        """One transaction of command 'cmd'. 'rtt_s' is None for SETs and failures."""
+        if not self.enabled:
+            return
+        with self._lock:
+            st = self._cmd(cmd)
+            st.requests += 1
+            st.bytes_sent += sent
+            st.bytes_received += received
+            if timeout:
+                st.timeouts += 1
+            if error:
+                st.errors += 1
+            if rtt_s is not None:
+                st.latency.record(rtt_s)
+            self.bytes_sent += sent
+            self.bytes_received += received
+
+    def record_bytes(self, sent: int = 0, received: int = 0) -> None:
+        """Bytes moved outside transactions (raw write/read calls)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.bytes_sent += sent
+            self.bytes_received += received
+
+    def record_retry(self, cmd: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._cmd(cmd).retries += 1
+
+    def record_open(self, duration_s: float, ok: bool) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if ok:
+                self.opens += 1
+                self.last_open_s = duration_s
+                self.total_open_s += duration_s
+            else:
+                self.open_failures += 1
+
+    def record_close(self, duration_s: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.closes += 1
+            self.last_close_s = duration_s
+
+    # --------------------------------------------------------------------------
+    # Reading
+    # --------------------------------------------------------------------------
+    def snapshot(self) -> "ConnectionStats":
+        """Consistent copy of all counters (safe to read from any thread)."""
+        with self._lock:
+            return ConnectionStats(
+                enabled=self.enabled,
+                commands={c: st.copy() for c, st in self.commands.items()},
+                bytes_sent=self.bytes_sent,
+                bytes_received=self.bytes_received,
+                opens=self.opens,
+                open_failures=self.open_failures,
+                last_open_s=self.last_open_s,
+                total_open_s=self.total_open_s,
+                closes=self.closes,
+                last_close_s=self.last_close_s,
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self.commands.clear()
+            self.bytes_sent = self.bytes_received = 0
+            self.opens = self.open_failures = self.closes = 0
+            self.last_open_s = self.total_open_s = self.last_close_s = 0.0
+
+    def summary_lines(self) -> List[str]:
+        """Human readable table (one line per command)."""
+        lines = [f"open: {self.opens}x, last {self.last_open_s * 1000:.0f} ms; "
+                 f"bytes tx/rx: {self.bytes_sent}/{self.bytes_received}"]
+        for cmd in sorted(self.commands):
+            st = self.commands[cmd]
+            h = st.latency
+            lines.append(
+                f"0x{cmd:02X}: n={st.requests} retry={st.retries} timeout={st.timeouts} err={st.errors} "
+                f"rtt mean={h.mean_s() * 1000:.1f} p50={h.percentile(50) * 1000:.1f} "
+                f"p99={h.percentile(99) * 1000:.1f} max={h.max_seen_s * 1000:.1f} ms"
+            )
+        return lines
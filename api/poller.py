@@ -0,0 +1,235 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/api/poller.py
+DESCRIPTION:
+    Background polling of one board.
+    A 'BoardPoller' thread reads every register at its own period (default:
+    the register's TTL from the register map) and publishes the values as
+    an immutable, timestamped 'Snapshot'. Publishing replaces one reference,
+    so readers never wait for the serial link: a getter only looks up a
+    value in the latest snapshot.
+
+    With the connection's PortWorker running, poll GETs use the lowest
+    priority class, so user SETs and GETs overtake waiting polls.
+
+    The poller measures itself: duration of a poll cycle, lag (how late a
+    cycle started) and missed deadlines (a register was read more than one
+    period too late).
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional
+
+from .board_connection import read_registers
+from .common import HomeAutomationSystemConnection
+from .link_stats import LatencyHistogram
+from .port_worker import PRIO_POLL
+from ..protocol.registers import BoardMap
+
+# Period of registers without a TTL in the register map
+DEFAULT_PERIOD_S = 1.0
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Values of all registers of a board at one moment (user units).
+    't' holds the read time (time.monotonic()) of every register that was
+    read at least once; 'seq' counts the published snapshots.
+    """
+    values: Mapping[str, float]
+    t: Mapping[str, float]
+    stale: FrozenSet[str] = frozenset()
+    seq: int = 0
+
+    def value(self, name: str) -> float:
+        return self.values[name]
+
+    def age_s(self, name: str) -> float:
+        """Seconds since 'name' was read (inf if never)."""
+        t = self.t.get(name)
+        return math.inf if t is None else time.monotonic() - t
+
+
+@dataclass
+class PollerStats:
+    """Counters of a BoardPoller (copy, see BoardPoller.stats())."""
+    cycles: int = 0
+    registers_read: int = 0
+    missed_deadlines: int = 0
+    errors: int = 0
+    cycle: LatencyHistogram = field(default_factory=LatencyHistogram)   # Duration of a cycle
+    lag: LatencyHistogram = field(default_factory=LatencyHistogram)     # Start - scheduled time
+
+    def copy(self) -> "PollerStats":
+        return replace(self, cycle=self.cycle.copy(), lag=self.lag.copy())
+
+
+@dataclass
+class BoardPoller:
+    """
+    Polls the registers of 'board_map' over 'connection' in a background
+    thread. 'periods_s' overrides the poll period of single registers;
+    'scaled' selects user units (True) or raw values for scaled registers.
+    """
+    connection: HomeAutomationSystemConnection
+    board_map: BoardMap
+    periods_s: Dict[str, float] = field(default_factory=dict)
+    scaled: bool = True
+    name: str = ""
+
+    _snapshot: Snapshot = field(init=False, repr=False)
+    _state: Any = field(default=None, init=False, repr=False)
+    _stats: PollerStats = field(default_factory=PollerStats, init=False, repr=False)
+    _publish_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _stop: threading.Event = field(default_factory=threading.Event, init=False, repr=False)
+    _thread: Optional[threading.Thread] = field(default=None, init=False, repr=False)
+    _listeners: List[Callable[[Snapshot], None]] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Unknown names are typing errors, not silently ignored settings
+        self.board_map.commands_for(self.periods_s)
+        self._state = self.board_map.new_state()
+        names = [reg.name for reg in self.board_map.registers]
+        self._snapshot = Snapshot(MappingProxyType({n: self._value(n) for n in names}),
+                                  MappingProxyType({}))
+
+    def period_s(self, name: str) -> float:
+        if name in self.periods_s:
+            return self.periods_s[name]
+        ttl = self.board_map.register(name).ttl_s
+        return DEFAULT_PERIOD_S if ttl is None else ttl
+
+    # --------------------------------------------------------------------------
+    # Readers (never block)
+    # --------------------------------------------------------------------------
+    def latest(self) -> Snapshot:
+        """The newest published snapshot."""
+        return self._snapshot
+
+    def stats(self) -> PollerStats:
+        with self._publish_lock:
+            return self._stats.copy()
+
+    # --------------------------------------------------------------------------
+    # Control
+    # --------------------------------------------------------------------------
+    def start(self) -> "BoardPoller":
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"poller-{self.name or self.board_map.name}",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def subscribe(self, listener: Callable[[Snapshot], None]) -> None:
+        """
+        Calls 'listener(snapshot)' after every poll, in the poll thread;
+        it must be fast (e.g. queue the snapshot) and not raise.
+        """
+        self._listeners.append(listener)
+
+    def write(self, name: str, value: float) -> Snapshot:
+        """
+        Publishes a value the caller has just written to the board (SET),
+        so readers see it before the next poll of that register.
+        """
+        with self._publish_lock:
+            old = self._snapshot
+            snap = Snapshot(MappingProxyType({**old.values, name: value}),
+                            MappingProxyType({**old.t, name: time.monotonic()}),
+                            old.stale - {name}, old.seq + 1)
+            self._snapshot = snap
+            return snap
+
+    def poll_once(self, names=None) -> Snapshot:
+        """
+        Reads the registers 'names' (all if None) and publishes the result.
+        Used by the thread; can also be called directly (e.g. in tests).
+        """
+        result = read_registers(self.connection, self.board_map, previous=self._state, names=names,
+                                priority=PRIO_POLL)
+        self._state = result.state
+
+        with self._publish_lock:
+            old = self._snapshot
+            values = dict(old.values)
+            t = dict(old.t)
+            for n in result.fresh:
+                values[n] = self._value(n)
+                t[n] = result.t
+            stale = (old.stale - result.fresh) | result.stale
+            snap = Snapshot(MappingProxyType(values), MappingProxyType(t), stale, old.seq + 1)
+            self._snapshot = snap
+            self._stats.registers_read += len(result.fresh)
+            if result.stale:
+                self._stats.errors += 1
+
+        for listener in self._listeners:
+            try:
+                listener(snap)
+            except Exception:
+                with self._publish_lock:
+                    self._stats.errors += 1
+        return snap
+
+    # --------------------------------------------------------------------------
+    # Thread
+    # --------------------------------------------------------------------------
+    def _value(self, name: str) -> float:
+        return self.board_map.value(self._state, name, self.scaled)
+
+    def _run(self) -> None:
+        names = [reg.name for reg in self.board_map.registers]
+        start = time.monotonic()
+        next_due = {n: start for n in names}
+
+        while not self._stop.is_set():
+            scheduled = min(next_due.values())
+            wait = scheduled - time.monotonic()
+            if wait > 0 and self._stop.wait(wait):
+                break
+
+            t0 = time.monotonic()
+            due = [n for n in names if next_due[n] <= t0]
+            missed = sum(1 for n in due if t0 - next_due[n] > self.period_s(n))
+            try:
+                self.poll_once(due)
+            except Exception:
+                with self._publish_lock:
+                    self._stats.errors += 1
+            t1 = time.monotonic()
+
+            # Next read one period after the scheduled time (no drift); if
+            # the board is too slow for the period, continue from now
+            for n in due:
+                next_due[n] = max(next_due[n] + self.period_s(n), t1)
+
+            with self._publish_lock:
+                self._stats.cycles += 1
+                self._stats.missed_deadlines += missed
+                self._stats.cycle.record(t1 - t0)
+                self._stats.lag.record(max(0.0, t0 - scheduled))
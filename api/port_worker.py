@@ -0,0 +1,250 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/api/port_worker.py
+DESCRIPTION:
+    Thread-safe port multiplexer.
+    A 'PortWorker' is a background thread that owns one serial port. Any
+    thread can submit a transaction (command bytes + number of answer bytes)
+    and gets a Future back. The worker runs the transactions one after the
+    other, so a GET and its answer can never be split by another thread's
+    GET or SET, and several API objects can share one port safely.
+
+    Waiting transactions are ordered by priority class: user SETs first,
+    then user GETs, then background polling. A transaction that has started
+    is always finished, so a waiting SET goes out at the next GET/answer
+    boundary, and its low/high pair (one transaction) is never split. A
+    pipelined row of GETs is the exception: when a higher class is waiting
+    it pauses once the GETs in flight are answered, and continues after it
+    (before the rest of its own class).
+
+    A transaction can carry a coalescing key (e.g. "board2.set"). A newer
+    transaction with the same key replaces a queued one that has not been
+    started yet (last write wins); the replaced one is never sent and its
+    Future returns None.
+
+    Queue depth, waiting time and service time of the transactions are
+    recorded in 'PortWorkerStats', the waiting time also per class.
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Hashable, Optional
+
+from .link_stats import LatencyHistogram
+
+# Priority classes (lower runs first)
+PRIO_SET = 0        # User SET (no answer expected)
+PRIO_GET = 1        # User GET
+PRIO_POLL = 2       # Background polling
+_PRIO_STOP = 3      # Stop marker, after everything queued before it
+
+CLASS_NAMES = {PRIO_SET: "set", PRIO_GET: "get", PRIO_POLL: "poll"}
+
+
+def default_priority(expect: int) -> int:
+    """Class of a user transaction: SET if no answer is expected, else GET."""
+    return PRIO_GET if expect else PRIO_SET
+
+
+@dataclass
+class Transaction:
+    """
+    One exchange on the port: write 'payload', then read 'expect' bytes.
+    SET commands are sent as one transaction (low + high byte), so the pair
+    is never split. With a 'window' above 1 the payload is a row of GETs
+    that are pipelined (see HomeAutomationSystemConnection.pipeline).
+    """
+    payload: bytes
+    expect: int = 0
+    timeout_s: Optional[float] = None
+    window: int = 1                         # GETs in flight at once
+    priority: int = PRIO_GET
+    key: Optional[Hashable] = None          # Coalescing key (None: never replaced)
+    superseded: bool = False                # Replaced by a newer one with the same key
+    future: Future = field(default_factory=Future, repr=False)
+    submitted_t: float = 0.0
+    started_t: float = 0.0
+    seq: int = 0                            # Submit order within the class
+    answered: bytes = b""                   # Answers read before a pause
+    yielded: bool = False                   # Set by 'execute' to pause it
+
+
+@dataclass
+class PortWorkerStats:
+    """Counters of a PortWorker. All times are in seconds."""
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    coalesced: int = 0              # Replaced before being sent
+    queue_depth: int = 0            # Transactions waiting right now
+    max_queue_depth: int = 0
+    total_wait_s: float = 0.0       # Time between submit and start
+    max_wait_s: float = 0.0
+    total_service_s: float = 0.0    # Time the port was busy with it
+    max_service_s: float = 0.0
+    wait_by_class: Dict[int, LatencyHistogram] = field(default_factory=dict)
+
+    def copy(self) -> "PortWorkerStats":
+        return replace(self, wait_by_class={k: h.copy() for k, h in self.wait_by_class.items()})
+
+    def class_wait(self, priority: int) -> LatencyHistogram:
+        """Waiting time histogram of one priority class (empty if unused)."""
+        return self.wait_by_class.get(priority) or LatencyHistogram()
+
+    def mean_wait_s(self) -> float:
+        done = self.completed + self.failed
+        return self.total_wait_s / done if done else 0.0
+
+    def mean_service_s(self) -> float:
+        done = self.completed + self.failed
+        return self.total_service_s / done if done else 0.0
+
+
+@dataclass
+class PortWorker:
+    """
+    Background thread that executes transactions on one port, by priority
+    class and in submit order within a class.
+    'execute' performs a transaction and returns the answer bytes.
+    """
+    execute: Callable[[Transaction], bytes]
+    name: str = "port"
+
+    _queue: "queue.PriorityQueue" = field(default_factory=queue.PriorityQueue, repr=False)
+    _seq: "itertools.count" = field(default_factory=itertools.count, repr=False)
+    _thread: Optional[threading.Thread] = field(default=None, repr=False)
+    _stats: PortWorkerStats = field(default_factory=PortWorkerStats, repr=False)
+    _stats_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _pending: Dict[Hashable, Transaction] = field(default_factory=dict, repr=False)
+
+    def start(self) -> None:
+        """Starts the worker thread (does nothing if already running)."""
+        if self.is_running():
+            return
+        self._thread = threading.Thread(target=self._run, name=f"PortWorker-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_s: Optional[float] = None) -> None:
+        """
+        Stops the worker after the transactions already queued.
+        """
+        if not self.is_running():
+            return
+        self._queue.put((_PRIO_STOP, next(self._seq), None))
+        self._thread.join(timeout_s)
+        self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, payload: bytes, expect: int = 0, timeout_s: Optional[float] = None,
+               priority: Optional[int] = None, key: Optional[Hashable] = None,
+               window: int = 1) -> Future:
+        """
+        Queues a transaction and returns its Future.
+        'priority' is PRIO_SET/PRIO_GET/PRIO_POLL (default: by 'expect').
+        With a 'key', a queued transaction with the same key is replaced.
+        The result is the answer bytes (None if replaced); transport errors
+        are raised by Future.result().
+        """
+        if priority is None:
+            priority = default_priority(expect)
+        txn = Transaction(payload=bytes(payload), expect=int(expect), timeout_s=timeout_s,
+                          priority=priority, key=key, window=int(window), seq=next(self._seq))
+        txn.submitted_t = time.monotonic()
+        with self._stats_lock:
+            self._stats.submitted += 1
+            self._stats.queue_depth += 1
+            self._stats.max_queue_depth = max(self._stats.max_queue_depth, self._stats.queue_depth)
+            if key is not None:
+                old = self._pending.get(key)
+                if old is not None:
+                    old.superseded = True
+                self._pending[key] = txn
+        self._queue.put((priority, txn.seq, txn))
+        return txn.future
+
+    def should_yield(self, txn: Transaction) -> bool:
+        """True if a transaction of a higher class than 'txn' is waiting."""
+        with self._queue.mutex:
+            waiting = self._queue.queue
+            return bool(waiting) and waiting[0][0] < txn.priority
+
+    def stats(self) -> PortWorkerStats:
+        """Returns a copy of the counters."""
+        with self._stats_lock:
+            return self._stats.copy()
+
+    def _run(self) -> None:
+        while True:
+            _, _, txn = self._queue.get()
+            if txn is None:
+                return
+            with self._stats_lock:
+                self._stats.queue_depth -= 1
+                superseded = txn.superseded
+                if superseded:
+                    self._stats.coalesced += 1
+                elif txn.key is not None and self._pending.get(txn.key) is txn:
+                    del self._pending[txn.key]
+            if txn.started_t:
+                self._execute(txn)      # Continues after a pause
+                continue
+            if not txn.future.set_running_or_notify_cancel():
+                continue
+            if superseded:
+                txn.future.set_result(None)
+                continue
+
+            txn.started_t = time.monotonic()
+            self._execute(txn)
+
+    def _execute(self, txn: Transaction) -> None:
+        ok = True
+        try:
+            result = self.execute(txn)
+        except BaseException as e:
+            ok = False
+            txn.future.set_exception(e)
+        else:
+            if txn.yielded:
+                # Paused for a higher class: queued again at its old place
+                txn.yielded = False
+                txn.answered += result
+                with self._stats_lock:
+                    self._stats.queue_depth += 1
+                self._queue.put((txn.priority, txn.seq, txn))
+                return
+            txn.future.set_result(txn.answered + result)
+        self._record(txn, ok, time.monotonic())
+
+    def _record(self, txn: Transaction, ok: bool, done_t: float) -> None:
+        wait = txn.started_t - txn.submitted_t
+        service = done_t - txn.started_t
+        with self._stats_lock:
+            st = self._stats
+            if ok:
+                st.completed += 1
+            else:
+                st.failed += 1
+            st.total_wait_s += wait
+            st.max_wait_s = max(st.max_wait_s, wait)
+            hist = st.wait_by_class.get(txn.priority)
+            if hist is None:
+                hist = st.wait_by_class[txn.priority] = LatencyHistogram()
+            hist.record(wait)
+            st.total_service_s += service
+            st.max_service_s = max(st.max_service_s, service)
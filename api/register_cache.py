@@ -0,0 +1,108 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/api/register_cache.py
+DESCRIPTION:
+    Read-through cache with a time-to-live (TTL) per register.
+    The API classes keep the read time of every register ('updated_at').
+    With a RegisterCache attached, a getter first asks the cache which of
+    its registers are older than their TTL and refreshes only those with
+    update(fields=...). A successful SET writes the new value through into
+    the cache, so no read-back GET is needed afterwards.
+
+    The default TTLs come from the register map ('Register.ttl_s'); they
+    can be overridden per register.
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from ..protocol.registers import BoardMap
+
+
+@dataclass
+class CacheStats:
+    """Counters of a RegisterCache (copy, see RegisterCache.stats())."""
+    hits: int = 0           # Register read from the cache
+    misses: int = 0         # Register was expired and had to be read
+    refreshes: int = 0      # update() calls caused by misses
+    writes: int = 0         # Values written through by a SET
+
+
+@dataclass
+class RegisterCache:
+    """
+    TTL of every register of 'board_map'. A register without TTL (None)
+    is always read from the board; a TTL of inf means "read once".
+    """
+    board_map: BoardMap
+    ttl_overrides: Dict[str, float] = field(default_factory=dict)
+    counters: CacheStats = field(default_factory=CacheStats, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Unknown names are typing errors, not silently ignored settings
+        self.board_map.commands_for(self.ttl_overrides)
+
+    def ttl(self, name: str) -> Optional[float]:
+        if name in self.ttl_overrides:
+            return self.ttl_overrides[name]
+        return self.board_map.register(name).ttl_s
+
+    def expired(self, names: Iterable[str], updated_at: Dict[str, float],
+                stale: FrozenSet[str] = frozenset()) -> List[str]:
+        """
+        Registers of 'names' that must be read again: never read, older
+        than their TTL, or stale. Counts one hit or miss per register.
+        """
+        names = tuple(names)
+        now = time.monotonic()
+        out = []
+        for name in names:
+            ttl = self.ttl(name)
+            t = updated_at.get(name)
+            if ttl is None or t is None or name in stale or now - t >= ttl:
+                out.append(name)
+        with self._lock:
+            self.counters.misses += len(out)
+            self.counters.hits += len(names) - len(out)
+            if out:
+                self.counters.refreshes += 1
+        return out
+
+    def write(self, name: str, updated_at: Dict[str, float]) -> None:
+        """Marks register 'name' as just written (value set by the caller)."""
+        updated_at[name] = time.monotonic()
+        with self._lock:
+            self.counters.writes += 1
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            c = self.counters
+            return CacheStats(c.hits, c.misses, c.refreshes, c.writes)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.counters = CacheStats()
+
+
+def refresh_expired(owner, cache: Optional[RegisterCache], *names: str) -> None:
+    """
+    Calls owner.update(fields=...) for the registers of 'names' that the
+    cache says are expired. Does nothing without a cache.
+    """
+    if cache is None:
+        return
+    expired = cache.expired(names, owner.updated_at, owner.stale)
+    if expired:
+        owner.update(fields=expired)
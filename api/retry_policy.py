@@ -0,0 +1,117 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/api/retry_policy.py
+DESCRIPTION:
+    Retry rules for GET requests.
+    - 'RetryPolicy': number of attempts, an overall deadline for one
+      update(), and exponential backoff with random jitter between attempts.
+    - 'CircuitBreaker': after several failures in a row the board is marked
+      offline and requests fail immediately. After 'reset_timeout_s' one
+      probe request is let through (half-open); if it succeeds the board is
+      online again.
+
+    One dead board therefore costs at most one deadline, not 5 timeouts per
+    register, and the caller gets "stale" instead of fake zero values.
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+# Circuit breaker states
+CLOSED = "closed"        # Board online, requests pass
+OPEN = "open"            # Board offline, requests fail fast
+HALF_OPEN = "half_open"  # One probe request is allowed
+
+
+@dataclass
+class RetryPolicy:
+    """
+    How often and how fast a failed request is repeated.
+    The first delay is the transport's retry delay for the command; every
+    further delay is 'multiplier' times longer (up to 'max_delay_s') and is
+    randomly changed by +-'jitter' (fraction) so boards do not retry in step.
+    """
+    max_attempts: int = 5
+    deadline_s: float = 5.0         # Overall time for one update()
+    multiplier: float = 2.0
+    max_delay_s: float = 2.0
+    jitter: float = 0.2
+    rng: random.Random = field(default_factory=random.Random, repr=False, compare=False)
+
+    def backoff(self, attempt: int, base_s: float) -> float:
+        """Delay after failed attempt number 'attempt' (0 = first)."""
+        delay = min(self.max_delay_s, base_s * self.multiplier ** attempt)
+        if self.jitter:
+            delay *= 1.0 + self.rng.uniform(-self.jitter, self.jitter)
+        return max(0.0, delay)
+
+    def deadline(self) -> float:
+        """Absolute deadline (time.monotonic()) for an update starting now."""
+        return time.monotonic() + self.deadline_s
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    Marks a board offline after 'failure_threshold' failed requests in a
+    row and lets one probe through every 'reset_timeout_s'.
+    """
+    failure_threshold: int = 5
+    reset_timeout_s: float = 10.0
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False, compare=False)
+
+    state: str = CLOSED
+    failures: int = 0               # Failures in a row
+    opened_at: float = 0.0
+    trips: int = 0                  # How often the board went offline
+    _probing: bool = field(default=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def allow(self) -> bool:
+        """True if a request may be sent now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() - self.opened_at >= self.reset_timeout_s:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True    # Only one probe at a time
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                if self.state == CLOSED:
+                    self.trips += 1
+                self.state = OPEN
+                self.opened_at = self.clock()
+                self._probing = False
+
+    def release(self) -> None:
+        """Gives back a probe that was let through but decided nothing."""
+        with self._lock:
+            self._probing = False
+
+    def is_online(self) -> bool:
+        return self.state == CLOSED
@@ -0,0 +1,106 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/api/set_coalescer.py
+DESCRIPTION:
+    Coalescing SET path for interactive control (e.g. a slider).
+    - A SET whose encoded low/high pair equals the value the board already
+      has (the last pair sent) is not sent at all.
+    - SETs are queued with a coalescing key, so while the port is busy only
+      the newest set-point waits; older queued ones are dropped (last write
+      wins, see port_worker.py). This needs the connection's PortWorker;
+      without it every SET is sent at once and only equal ones are skipped.
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field, replace
+from typing import Optional
+
+from .common import HomeAutomationSystemConnection
+
+
+@dataclass
+class SetStats:
+    """Counters of a SetCoalescer (copy, see SetCoalescer.stats())."""
+    requested: int = 0      # SET calls
+    sent: int = 0           # Pairs written to the port
+    skipped: int = 0        # Board already had the value
+    coalesced: int = 0      # Replaced by a newer value before being sent
+    failed: int = 0
+
+    def saved(self) -> int:
+        """SET pairs that did not have to be written."""
+        return self.skipped + self.coalesced
+
+
+@dataclass
+class SetCoalescer:
+    """
+    Coalescing SET path of one board register. 'key' identifies the
+    register on the port (e.g. "board1.desired_temp").
+    """
+    connection: HomeAutomationSystemConnection
+    key: str
+
+    _known: Optional[bytes] = field(default=None, repr=False)   # Pair the board will have
+    _pending: int = field(default=0, repr=False)                # SETs not finished yet
+    _stats: SetStats = field(default_factory=SetStats, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def submit(self, low_cmd: int, high_cmd: int) -> Optional[Future]:
+        """
+        Queues the SET pair. Returns None if it was skipped because the
+        board already has this value, else the Future of the transaction.
+        """
+        pair = bytes([low_cmd, high_cmd])
+        with self._lock:
+            self._stats.requested += 1
+            if pair == self._known:
+                self._stats.skipped += 1
+                return None
+            # The queue ends with the newest pair, so this is the value the
+            # board will have once the queue is done
+            self._known = pair
+            self._pending += 1
+
+        fut = self.connection.submit(pair, key=self.key)
+        fut.add_done_callback(self._done)
+        return fut
+
+    def observe(self, low_cmd: int, high_cmd: int) -> None:
+        """
+        The board reported its set-point (read back). Ignored while own
+        SETs are still queued, since the read may be older than them.
+        """
+        with self._lock:
+            if not self._pending:
+                self._known = bytes([low_cmd, high_cmd])
+
+    def forget(self) -> None:
+        """The board's value is unknown again (next SET is always sent)."""
+        with self._lock:
+            self._known = None
+
+    def stats(self) -> SetStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def _done(self, fut: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            if fut.cancelled() or fut.exception() is not None:
+                self._stats.failed += 1
+                self._known = None
+            elif fut.result() is None:
+                self._stats.coalesced += 1
+            else:
+                self._stats.sent += 1
@@ -0,0 +1,82 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/api/settle.py
+DESCRIPTION:
+    Waiting for a slow physical value (curtain position, ambient
+    temperature) instead of sleeping a fixed time.
+    'wait_for_value' reads the value again and again until it is within a
+    tolerance of the target, or stops changing for 'settle_s', or the
+    timeout expires. The poll interval is adaptive: short while the value
+    is changing, doubled (up to a maximum) every time it did not change.
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass
+class SettleResult:
+    """
+    Result of a wait. 'reached': the value came within the tolerance;
+    'settled': it stopped changing somewhere else (e.g. end stop, fault).
+    Neither: timeout or no answer from the board.
+    """
+    reached: bool
+    settled: bool
+    value: Optional[float]      # Last value read (None if none could be read)
+    elapsed_s: float
+    reads: int
+
+    def __bool__(self) -> bool:
+        return self.reached
+
+
+def wait_for_value(read: Callable[[], Optional[float]], target: float, tolerance: float,
+                   timeout_s: float, progress: Optional[Callable[[float], None]] = None,
+                   min_interval_s: float = 0.1, max_interval_s: float = 1.0,
+                   settle_s: float = 1.0) -> SettleResult:
+    """
+    Polls 'read()' (None = could not be read) until the value is within
+    'tolerance' of 'target', has not changed for 'settle_s' or 'timeout_s'
+    is over. 'progress' is called with every value read.
+    """
+    t0 = time.monotonic()
+    deadline = t0 + timeout_s
+    last: Optional[float] = None
+    last_change = t0
+    interval = min_interval_s
+    reads = 0
+
+    while True:
+        v = read()
+        reads += 1
+        now = time.monotonic()
+        if v is not None:
+            if progress is not None:
+                progress(v)
+            if abs(v - target) <= tolerance:
+                return SettleResult(True, False, v, now - t0, reads)
+            if last is None or v != last:
+                # Still moving: keep polling fast
+                last_change = now
+                interval = min_interval_s
+            else:
+                interval = min(max_interval_s, interval * 2.0)
+                if now - last_change >= settle_s:
+                    return SettleResult(False, True, v, now - t0, reads)
+            last = v
+
+        remaining = deadline - now
+        if remaining <= 0:
+            return SettleResult(False, False, last, now - t0, reads)
+        time.sleep(min(interval, remaining))
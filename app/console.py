@@ -27,14 +27,21 @@ AUTHORS:
 from __future__ import annotations
 
 import argparse
+import json
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, List, Sequence, Tuple
 
 from ..api import (
     HomeAutomationSystemConnection,
     AirConditionerSystemConnection,
     CurtainControlSystemConnection,
 )
-from ..transport import FakeTransport
+from ..api.port_worker import CLASS_NAMES
+from ..protocol import board1, board2
+from ..transport import CaptureTransport, FakeTransport
 
 
 def fmt_1dp(x: float) -> str:
@@ -50,6 +57,26 @@ def parse_float(s: str) -> float:
     return float(s.strip().replace(",", "."))
 
 
+def show_progress(label: str, unit: str):
+    """Progress callback that rewrites one console line."""
+    def show(value: float) -> None:
+        print(f"\r{label}: {fmt_1dp(value)} {unit}   ", end="", flush=True)
+    return show
+
+
+def current_stale(api):
+    """Stale registers of a board API (from the poller if one runs)."""
+    return api.poller.latest().stale if api.poller is not None else api.stale
+
+
+def report_stale(stale, conn: HomeAutomationSystemConnection) -> None:
+    """Warns when some values could not be read and old ones are shown."""
+    if not stale:
+        return
+    state = "offline" if not conn.breaker.is_online() else "not answering"
+    print(f"Warning: board {state}, old values shown for: {', '.join(sorted(stale))}")
+
+
 def air_conditioner_menu(air: AirConditionerSystemConnection, port: str, baud: int) -> None:
     """
     [R2.4-1] Sub-menu for Air Conditioner System (Board #1).
@@ -57,16 +84,19 @@ def air_conditioner_menu(air: AirConditionerSystemConnection, port: str, baud: i
     Matches the layout in Figure 18.
     """
     while True:
-        # Update data from the board
-        try:
-            air.update()
-        except Exception:
-            pass  # Ignore temporary errors to keep menu alive
+        # Update data from the board (not needed when a poller runs in the
+        # background: the getters then read its latest snapshot)
+        if air.poller is None:
+            try:
+                air.update()
+            except Exception:
+                pass  # Ignore temporary errors to keep menu alive
 
         # [Figure 18] Display System Information
         print("\nHome Ambient Temperature:", fmt_1dp(air.getAmbientTemp()), "°C")
         print("Home Desired Temperature:", fmt_1dp(air.getDesiredTemp()), "°C")
         print("Fan Speed:", f"{air.getFanSpeed()} rps")
+        report_stale(current_stale(air), air.connection)
         print("-" * 48)
         print("Connection Port:", port)
         print("Connection Baudrate:", baud)
@@ -96,9 +126,12 @@ def air_conditioner_menu(air: AirConditionerSystemConnection, port: str, baud: i
             # Send command to Board #1
             ok = air.setDesiredTemp(temp)
             print("OK" if ok else "FAILED")
-            
-            # Wait briefly to let user see result
-            time.sleep(1)
+
+            # Show the ambient temperature for a moment (returns at once if
+            # it is already at the new set-point)
+            if ok:
+                air.wait_until_settled(temp, timeout=1.0, progress=show_progress("Ambient", "°C"))
+                print()
             continue
 
         elif choice == "2":
@@ -115,17 +148,19 @@ def curtain_control_menu(cur: CurtainControlSystemConnection, port: str, baud: i
     Matches the layout in Figure 18.
     """
     while True:
-        # Update data from the board
-        try:
-            cur.update()
-        except Exception:
-            pass
+        # Update data from the board (skipped when polled in the background)
+        if cur.poller is None:
+            try:
+                cur.update()
+            except Exception:
+                pass
 
         # [Figure 18] Display System Information
         print("\nOutdoor Temperature:", fmt_1dp(cur.getOutdoorTemp()), "°C")
         print("Outdoor Pressure:", fmt_1dp(cur.getOutdoorPress()), "hPa")
-        print("Curtain Status:", fmt_1dp(cur.curtainStatus), "%")
+        print("Curtain Status:", fmt_1dp(cur.getCurtainStatus()), "%")
         print("Light Intensity:", fmt_1dp(cur.getLightIntensity()), "Lux")
+        report_stale(current_stale(cur), cur.connection)
         print("-" * 48)
         print("Connection Port:", port)
         print("Connection Baudrate:", baud)
@@ -155,10 +190,15 @@ def curtain_control_menu(cur: CurtainControlSystemConnection, port: str, baud: i
             # Send command to Board #2
             ok = cur.setCurtainStatus(pct)
             print("OK" if ok else "FAILED")
-            
-            # Wait for motor movement (Simulation delay)
-            print("Waiting for motor to finish...")
-            time.sleep(3) 
+
+            # Wait until the motor is done (not longer)
+            if ok:
+                print("Waiting for motor to finish...")
+                res = cur.wait_until_reached(pct, progress=show_progress("Curtain", "%"))
+                print()
+                if not res.reached:
+                    where = "?" if res.value is None else fmt_1dp(res.value)
+                    print(f"Curtain stopped at {where} % (target {fmt_1dp(pct)} %)")
             continue
 
         elif choice == "2":
@@ -168,6 +208,143 @@ def curtain_control_menu(cur: CurtainControlSystemConnection, port: str, baud: i
             print("Invalid selection.")
 
 
+def base_transport(conn: HomeAutomationSystemConnection):
+    """The real transport of 'conn' (below a CaptureTransport, if any)."""
+    return getattr(conn.transport, "inner", conn.transport)
+
+
+def _timing_path(timing_dir: str, name: str) -> str:
+    """Path of the saved link timing profile of one board."""
+    return os.path.join(timing_dir, f"{name}_timing.json")
+
+
+def load_timing_profiles(timing_dir: str, t1, t2) -> None:
+    """
+    Loads saved link timing profiles into the serial transports, and the
+    static firmware bounds ({board}_static.json, see tools/firmware_latency.py)
+    as their floor. Missing or broken files are ignored (the link is simply
+    re-learned).
+    """
+    from ..transport.link_timing import LinkTimingProfile
+
+    for name, t in (("board1", t1), ("board2", t2)):
+        path = _timing_path(timing_dir, name)
+        if os.path.exists(path):
+            try:
+                t.timing = LinkTimingProfile.load(path)
+            except (OSError, ValueError, TypeError) as e:
+                print(f"Warning: Could not load timing profile {path}. {e}")
+        path = os.path.join(timing_dir, f"{name}_static.json")
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    t.apply_static_bounds(json.load(f))
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                print(f"Warning: Could not load static bounds {path}. {e}")
+
+
+def save_timing_profiles(timing_dir: str, c1, c2) -> None:
+    """Saves the link timing learned during this session."""
+    os.makedirs(timing_dir, exist_ok=True)
+    for name, c in (("board1", c1), ("board2", c2)):
+        timing = getattr(base_transport(c), "timing", None)
+        if timing is None:
+            continue
+        try:
+            timing.save(_timing_path(timing_dir, name))
+        except OSError as e:
+            print(f"Warning: Could not save timing profile for {name}. {e}")
+
+
+@dataclass
+class BoardReadiness:
+    """Result of opening and syncing one board at start-up."""
+    name: str
+    opened: bool
+    synced: bool
+    ready_s: float                  # Open + initial update() time
+    error: str = ""
+
+
+def bring_up_board(name: str, conn: HomeAutomationSystemConnection, api: Any) -> BoardReadiness:
+    """Opens one board and runs the initial update() (sync)."""
+    t0 = time.monotonic()
+    if not conn.open():
+        return BoardReadiness(name, False, False, time.monotonic() - t0, conn.last_error or "")
+    try:
+        api.update()
+        synced, error = not getattr(api, "stale", None), ""
+    except Exception as e:
+        synced, error = False, repr(e)
+    return BoardReadiness(name, True, synced, time.monotonic() - t0, error)
+
+
+def bring_up_boards(boards: Sequence[Tuple[str, HomeAutomationSystemConnection, Any]]) -> List[BoardReadiness]:
+    """
+    Opens and syncs all boards at the same time (one thread per board), so
+    start-up takes as long as the slowest board instead of the sum.
+    Every board has its own port, so the threads never share a transport.
+    """
+    if not boards:
+        return []
+    with ThreadPoolExecutor(max_workers=len(boards), thread_name_prefix="bring-up") as pool:
+        futures = [pool.submit(bring_up_board, name, conn, api) for name, conn, api in boards]
+        return [f.result() for f in futures]
+
+
+def report_readiness(ready: BoardReadiness, conn: HomeAutomationSystemConnection) -> None:
+    """Prints how long a board took to become ready."""
+    if not ready.opened:
+        print(f"Warning: Could not open connection for {ready.name} ({conn.comPort}). {ready.error}".strip())
+        return
+    line = f"{ready.name} ({conn.comPort}) {'ready' if ready.synced else 'opened, NOT synced'} after {ready.ready_s * 1000:.0f} ms"
+
+    # Serial ports also report the warm-up part of the time
+    report = getattr(base_transport(conn), "last_open_report", None)
+    if report is not None:
+        state = "ready" if report.ready else "NOT ready"
+        line += f" (port {state} after {report.ready_s * 1000:.0f} ms [{report.mode}])"
+    if conn.framing != "legacy":
+        line += f", protocol v{conn.protocol_version}"
+    print(line)
+
+
+def print_link_stats(*conns: HomeAutomationSystemConnection) -> None:
+    """Prints latency / retry / timeout counters of each connection."""
+    for conn in conns:
+        print(f"\nLink statistics of {conn.comPort}:")
+        for line in conn.stats_snapshot().summary_lines():
+            print("  " + line)
+
+
+def print_poller_stats(*apis) -> None:
+    """Prints cycle time, lag and missed deadlines of the running pollers."""
+    for api in apis:
+        if api.poller is None:
+            continue
+        st = api.poller.stats()
+        print(f"\nPoller of {api.connection.comPort}: {st.cycles} cycles, "
+              f"{st.registers_read} registers read, {st.missed_deadlines} missed deadlines, {st.errors} errors")
+        print(f"  cycle p50={st.cycle.percentile(50) * 1000:.1f} ms p99={st.cycle.percentile(99) * 1000:.1f} ms, "
+              f"lag p99={st.lag.percentile(99) * 1000:.1f} ms")
+        ws = api.connection.worker_stats()
+        if ws is not None:
+            waits = ", ".join(f"{label} p99={ws.class_wait(prio).percentile(99) * 1000:.1f} ms"
+                              for prio, label in CLASS_NAMES.items())
+            print(f"  queue wait: {waits}")
+
+
+def start_telemetry(folder: str, air, cur):
+    """Records the snapshots of the running pollers into 'folder'."""
+    from ..telemetry import TelemetryRecorder, TelemetryStore
+
+    recorder = TelemetryRecorder(TelemetryStore(folder))
+    for api, board in ((air, "board1"), (cur, "board2")):
+        if api.poller is not None:
+            recorder.attach(api.poller, board)
+    return recorder.start()
+
+
 def build_system(args):
     """
     Initializes the system connections based on command line arguments.
@@ -175,8 +352,9 @@ def build_system(args):
     """
     if args.fake:
         # Use FakeTransport for testing without hardware
-        t1 = FakeTransport(board="board1")
-        t2 = FakeTransport(board="board2")
+        # The simulated firmware also speaks protocol v2 (used with --framing auto)
+        t1 = FakeTransport(board="board1", framed=True)
+        t2 = FakeTransport(board="board2", framed=True)
         c1 = HomeAutomationSystemConnection(transport=t1, comPort="FAKE1", baudRate=args.baud)
         c2 = HomeAutomationSystemConnection(transport=t2, comPort="FAKE2", baudRate=args.baud)
     else:
@@ -187,35 +365,53 @@ def build_system(args):
         # Import SerialTransport only if needed (requires pyserial)
         from ..transport.serial_transport import SerialTransport
 
-        t1 = SerialTransport(port=args.port1, baudrate=args.baud)
-        t2 = SerialTransport(port=args.port2, baudrate=args.baud)
+        t1 = SerialTransport(port=args.port1, baudrate=args.baud, board="board1")
+        t2 = SerialTransport(port=args.port2, baudrate=args.baud, board="board2")
+
+        # Fast open: probe each board with a harmless GET instead of the
+        # fixed 2.3 s warm-up
+        if args.fast_open:
+            for t, cmd in ((t1, board1.GET_FAN_SPEED_RPS), (t2, board2.GET_DESIRED_CURTAIN_LOW)):
+                t.open_mode = "probe"
+                t.probe_cmd = cmd
+                t.ready_timeout_s = args.ready_timeout
+
+        # Reuse the link timing learned in the previous session (if any)
+        if args.timing_dir:
+            load_timing_profiles(args.timing_dir, t1, t2)
         c1 = HomeAutomationSystemConnection(transport=t1, comPort=args.port1, baudRate=args.baud)
         c2 = HomeAutomationSystemConnection(transport=t2, comPort=args.port2, baudRate=args.baud)
 
+    # Offer the framed protocol v2 when the ports are opened
+    for c in (c1, c2):
+        c.framing = args.framing
+
+    # Record the raw traffic of both boards for later replay
+    if args.capture:
+        os.makedirs(args.capture, exist_ok=True)
+        for name, c in (("board1", c1), ("board2", c2)):
+            c.transport = CaptureTransport(c.transport, os.path.join(args.capture, f"{name}.cap"))
+
     # Initialize High-Level API objects
     air = AirConditionerSystemConnection(connection=c1)
     cur = CurtainControlSystemConnection(connection=c2)
 
-    # Open Connections
-    if not c1.open():
-        msg = c1.last_error or ""
-        print(f"Warning: Could not open connection for Board#1 ({c1.comPort}). {msg}".strip())
-    else:
-        # Initial sync
-        try:
-            air.update()
-        except Exception:
-            pass
-            
-    if not c2.open():
-        msg = c2.last_error or ""
-        print(f"Warning: Could not open connection for Board#2 ({c2.comPort}). {msg}".strip())
-    else:
-        # Initial sync
-        try:
-            cur.update()
-        except Exception:
-            pass
+    # Open and sync both boards concurrently; the menu appears as soon as
+    # the slowest board is ready
+    t0 = time.monotonic()
+    results = bring_up_boards((("Board#1", c1, air), ("Board#2", c2, cur)))
+    for ready, conn in zip(results, (c1, c2)):
+        report_readiness(ready, conn)
+    if not args.fake:
+        print(f"System ready after {(time.monotonic() - t0) * 1000:.0f} ms")
+
+    # Keep the values fresh in the background so menus never wait for I/O.
+    # The port worker runs user SETs/GETs before waiting poll requests.
+    if args.poll:
+        for ready, api in zip(results, (air, cur)):
+            if ready.opened:
+                api.connection.start_worker()
+                api.start_polling()
 
     return air, cur, c1, c2
 
@@ -230,10 +426,24 @@ def main(argv=None) -> int:
     parser.add_argument("--port1", type=str, default="", help="COM port for Board#1 (Air Conditioner)")
     parser.add_argument("--port2", type=str, default="", help="COM port for Board#2 (Curtain Control)")
     parser.add_argument("--baud", type=int, default=9600, help="Baud rate")
+    parser.add_argument("--fast-open", action="store_true", help="Probe the boards instead of the fixed 2 s warm-up")
+    parser.add_argument("--ready-timeout", type=float, default=3.0, help="Max seconds to wait for a board in --fast-open mode")
+    parser.add_argument("--timing-dir", type=str, default="", help="Folder to load/save learned link timing")
+    parser.add_argument("--stats", action="store_true", help="Print per-command link statistics on exit")
+    parser.add_argument("--poll", action="store_true", help="Poll the boards in the background (menus do not block)")
+    parser.add_argument("--telemetry", type=str, default="", help="Folder to record 1 Hz telemetry into (implies --poll)")
+    parser.add_argument("--capture", type=str, default="", help="Folder to record the raw UART traffic into (board1.cap, board2.cap)")
+    parser.add_argument("--framing", choices=("legacy", "auto"), default="legacy",
+                        help="'auto': use the framed protocol v2 if the boards support it")
     args = parser.parse_args(argv)
 
+    # Telemetry records the poller snapshots
+    if args.telemetry:
+        args.poll = True
+
     # Build system components
     air, cur, c1, c2 = build_system(args)
+    recorder = start_telemetry(args.telemetry, air, cur) if args.telemetry else None
 
     # [R2.4-1] Main Menu Loop
     while True:
@@ -251,6 +461,18 @@ def main(argv=None) -> int:
             curtain_control_menu(cur, c2.comPort, c2.baudRate)
         elif choice == "3":
             # Close connections and Exit
+            if args.timing_dir and not args.fake:
+                save_timing_profiles(args.timing_dir, c1, c2)
+            if args.stats:
+                print_link_stats(c1, c2)
+                print_poller_stats(air, cur)
+            air.stop_polling()
+            cur.stop_polling()
+            if recorder is not None:
+                recorder.stop()
+                recorder.store.close()
+            c1.stop_worker()
+            c2.stop_worker()
             c1.close()
             c2.close()
             return 0
@@ -580,7 +580,13 @@ PARSE_COMMAND:
     BTFSC   STATUS, Z
     GOTO    SEND_FAN
 
-    ; 6. SET Desired Temp High (Integral) - Cmd: 11xxxxxx
+    ; 6. GET All - Cmd: 0x7F (answers of 0x01..0x05 in one burst)
+    MOVF    UART_DAT, W
+    XORLW   0x7F
+    BTFSC   STATUS, Z
+    GOTO    SEND_ALL
+
+    ; 7. SET Desired Temp High (Integral) - Cmd: 11xxxxxx
     MOVF    UART_DAT, W
     ANDLW   b'11000000'     ; Mask top 2 bits
     XORLW   b'11000000'     ; Check if it is '11'
@@ -609,6 +615,23 @@ SEND_FAN:
     CALL    UART_SEND_BYTE
     RETURN
 
+SEND_ALL:
+    ; Number of values, then the same bytes as GET 0x01..0x05 in order,
+    ; so the PC gets a consistent snapshot in one round trip
+    MOVLW   d'5'
+    CALL    UART_SEND_BYTE
+    MOVLW   d'0'            ; 0x01: Desired Temp Low
+    CALL    UART_SEND_BYTE
+    MOVF    DESIRED_TEMP, W ; 0x02: Desired Temp High
+    CALL    UART_SEND_BYTE
+    MOVLW   d'0'            ; 0x03: Ambient Temp Low
+    CALL    UART_SEND_BYTE
+    MOVF    TEMP_VAL, W     ; 0x04: Ambient Temp High
+    CALL    UART_SEND_BYTE
+    MOVF    FAN_SPEED_RPS, W ; 0x05: Fan Speed
+    CALL    UART_SEND_BYTE
+    RETURN
+
 SET_DESIRED_CMD:
     ; Parse 6-bit data from 11xxxxxx
     MOVF    UART_DAT, W
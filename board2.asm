@@ -353,6 +353,12 @@ UART_DINLE_VE_ISLE
     BTFSC   STATUS, Z
     GOTO    TX_LIGHT_HIGH
     
+    ; Request: All values in one burst (0x7F)
+    MOVLW   0x7F
+    SUBWF   UART_TEMP, W
+    BTFSC   STATUS, Z
+    GOTO    TX_ALL
+    
     ; Set Command: 10xxxxxx or 11xxxxxx
     MOVF    UART_TEMP, W
     ANDLW   B'11000000'
@@ -403,6 +409,28 @@ TX_DUMMY
     MOVLW   D'0'
     GOTO    TX_W
 
+TX_ALL
+    ; Number of values, then the same bytes as GET 0x01..0x08 in order,
+    ; so the PC gets a consistent snapshot in one round trip
+    MOVLW   D'8'
+    CALL    TX_W
+    MOVLW   D'0'            ; 0x01: Desired curtain low
+    CALL    TX_W
+    MOVF    CURRENT_ST, W   ; 0x02: Desired curtain high
+    CALL    TX_W
+    MOVLW   D'0'            ; 0x03 - 0x06: Dummy responses
+    CALL    TX_W
+    MOVLW   D'0'
+    CALL    TX_W
+    MOVLW   D'0'
+    CALL    TX_W
+    MOVLW   D'0'
+    CALL    TX_W
+    MOVLW   D'0'            ; 0x07: Light low
+    CALL    TX_W
+    MOVF    LDR_VAL, W      ; 0x08: Light high
+    GOTO    TX_W
+
 TX_W
     BANKSEL PIR1
 WT_TX
@@ -0,0 +1,19 @@
+from .assembler import AsmError, Program, assemble, assemble_file
+from .cpu import PIC16
+from .boards import Board1Environment, Board2Environment, firmware, load_board
+from .wcet import LatencyAnalyzer, LatencyReport, analyze_board
+
+__all__ = [
+    "AsmError",
+    "Program",
+    "assemble",
+    "assemble_file",
+    "PIC16",
+    "Board1Environment",
+    "Board2Environment",
+    "firmware",
+    "load_board",
+    "LatencyAnalyzer",
+    "LatencyReport",
+    "analyze_board",
+]
@@ -0,0 +1,443 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/pic/assembler.py
+DESCRIPTION:
+    A two-pass assembler for the MPASM subset used by board1.asm and
+    board2.asm. It produces the real 14-bit PIC16 instruction words, so the
+    emulator (cpu.py) runs exactly what would be programmed into the chip.
+
+    Supported:
+    - all 35 mid-range instructions, BANKSEL and PAGESEL,
+    - ORG, END, EQU, SET, CBLOCK/ENDC, #define (text substitution),
+      INCLUDE "P16F877A.INC", LIST/__CONFIG/ERRORLEVEL/RADIX (ignored),
+    - labels with or without ':', numbers as 0x1F, H'1F', D'25', B'0101',
+      O'17', .25, 'A' and plain numbers in the default radix (hex),
+    - expressions with + - * / % & | ^ << >> ~, parentheses, HIGH/LOW and $.
+    As in MPASM, file register operands are truncated to 7 bits (the bank
+    is selected with RP0/RP1) and a missing destination means F.
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from . import p16f877a as chip
+
+
+class AsmError(ValueError):
+    """Syntax or semantic error in the source (with file name and line)."""
+    pass
+
+
+# Byte-oriented file register operations: opcode bits 13..8
+_BYTE_OPS = {
+    "ADDWF": 0x07, "ANDWF": 0x05, "COMF": 0x09, "DECF": 0x03, "DECFSZ": 0x0B,
+    "INCF": 0x0A, "INCFSZ": 0x0F, "IORWF": 0x04, "MOVF": 0x08, "RLF": 0x0D,
+    "RRF": 0x0C, "SUBWF": 0x02, "SWAPF": 0x0E, "XORWF": 0x06,
+}
+# Bit-oriented operations: opcode bits 13..10
+_BIT_OPS = {"BCF": 0x4, "BSF": 0x5, "BTFSC": 0x6, "BTFSS": 0x7}
+# Literal operations: opcode bits 13..8
+_LIT_OPS = {"ADDLW": 0x3E, "ANDLW": 0x39, "IORLW": 0x38, "MOVLW": 0x30,
+            "RETLW": 0x34, "SUBLW": 0x3C, "XORLW": 0x3A}
+# Operations without operands
+_FIXED_OPS = {"CLRW": 0x0100, "NOP": 0x0000, "RETURN": 0x0008, "RETFIE": 0x0009,
+              "SLEEP": 0x0063, "CLRWDT": 0x0064}
+
+MNEMONICS = frozenset(_BYTE_OPS) | frozenset(_BIT_OPS) | frozenset(_LIT_OPS) | frozenset(_FIXED_OPS) | {
+    "CLRF", "MOVWF", "CALL", "GOTO", "BANKSEL", "PAGESEL"}
+DIRECTIVES = frozenset({"LIST", "INCLUDE", "#INCLUDE", "__CONFIG", "ERRORLEVEL", "RADIX", "PROCESSOR",
+                        "ORG", "END", "EQU", "SET", "CBLOCK", "ENDC", "#DEFINE", "#UNDEFINE", "TITLE",
+                        "SUBTITLE", "NOLIST", "EXPAND", "NOEXPAND", "MESSG"})
+
+_NUM_RE = re.compile(r"([HDBOhdbo])'([0-9A-Fa-f]+)'")
+_TOKEN_RE = re.compile(r"\s*(?:(0[xX][0-9A-Fa-f]+)|([HDBOhdbo]'[0-9A-Fa-f]+')|('(?:\\.|[^'])')"
+                       r"|(\.[0-9]+)|([0-9][0-9A-Fa-f]*)|([A-Za-z_#$?][A-Za-z0-9_#$?]*)"
+                       r"|(<<|>>|[-+*/%&|^~()]))")
+_IDENT_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_#$?]*")
+
+
+@dataclass
+class Program:
+    """Assembled program: 14-bit words by address and the symbol tables."""
+    name: str
+    words: Dict[int, int] = field(default_factory=dict)
+    labels: Dict[str, int] = field(default_factory=dict)
+    symbols: Dict[str, int] = field(default_factory=dict)
+    lines: Dict[int, int] = field(default_factory=dict)     # address -> source line
+
+    def image(self, size: int = chip.PROGRAM_WORDS) -> List[int]:
+        """Program memory contents; erased locations read 0x3FFF."""
+        mem = [0x3FFF] * size
+        for addr, word in self.words.items():
+            mem[addr] = word
+        return mem
+
+    def label_at(self, addr: int) -> str:
+        """'LABEL+offset' of a program address (for traces and errors)."""
+        best = None
+        for name, a in self.labels.items():
+            if a <= addr and (best is None or a > best[1]):
+                best = (name, a)
+        if best is None:
+            return f"0x{addr:04X}"
+        return best[0] if best[1] == addr else f"{best[0]}+{addr - best[1]}"
+
+
+@dataclass
+class _Line:
+    number: int
+    label: Optional[str]
+    op: Optional[str]           # Upper case mnemonic or directive
+    args: List[str]
+    text: str                   # Operand text (for EQU/#define)
+
+
+class _Expr:
+    """Recursive descent evaluator for MPASM expressions."""
+
+    _BINARY = (("|",), ("^",), ("&",), ("<<", ">>"), ("+", "-"), ("*", "/", "%"))
+
+    def __init__(self, text: str, lookup, radix: int):
+        self.tokens = self._tokenize(text)
+        self.pos = 0
+        self.lookup = lookup
+        self.radix = radix
+
+    @staticmethod
+    def _tokenize(text: str) -> List[Tuple[str, str]]:
+        out, pos, text = [], 0, text.rstrip()
+        while pos < len(text):
+            m = _TOKEN_RE.match(text, pos)
+            if not m or m.end() == pos:
+                raise AsmError(f"bad expression '{text}'")
+            pos = m.end()
+            hexnum, based, char, dec, plain, ident, oper = m.groups()
+            if hexnum:
+                out.append(("num", str(int(hexnum, 16))))
+            elif based:
+                base = {"H": 16, "D": 10, "B": 2, "O": 8}[based[0].upper()]
+                out.append(("num", str(int(based[2:-1], base))))
+            elif char:
+                out.append(("num", str(ord(char[1:-1].encode().decode("unicode_escape")))))
+            elif dec:
+                out.append(("num", dec[1:]))
+            elif plain:
+                out.append(("plain", plain))
+            elif ident:
+                out.append(("id", ident))
+            else:
+                out.append(("op", oper))
+        return out
+
+    def value(self) -> int:
+        v = self._binary(0)
+        if self.pos != len(self.tokens):
+            raise AsmError(f"unexpected '{self.tokens[self.pos][1]}'")
+        return v
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _binary(self, level: int) -> int:
+        if level == len(self._BINARY):
+            return self._unary()
+        v = self._binary(level + 1)
+        while True:
+            tok = self._peek()
+            if tok is None or tok[0] != "op" or tok[1] not in self._BINARY[level]:
+                return v
+            self.pos += 1
+            rhs = self._binary(level + 1)
+            op = tok[1]
+            if op == "|":
+                v |= rhs
+            elif op == "^":
+                v ^= rhs
+            elif op == "&":
+                v &= rhs
+            elif op == "<<":
+                v <<= rhs
+            elif op == ">>":
+                v >>= rhs
+            elif op == "+":
+                v += rhs
+            elif op == "-":
+                v -= rhs
+            elif op == "*":
+                v *= rhs
+            elif op == "/":
+                v //= rhs
+            else:
+                v %= rhs
+
+    def _unary(self) -> int:
+        tok = self._peek()
+        if tok is None:
+            raise AsmError("missing operand")
+        self.pos += 1
+        kind, text = tok
+        if kind == "op":
+            if text == "-":
+                return -self._unary()
+            if text == "+":
+                return self._unary()
+            if text == "~":
+                return ~self._unary()
+            if text == "(":
+                v = self._binary(0)
+                if self._peek() != ("op", ")"):
+                    raise AsmError("missing ')'")
+                self.pos += 1
+                return v
+            raise AsmError(f"unexpected '{text}'")
+        if kind == "num":
+            return int(text)
+        if kind == "plain":
+            return int(text, self.radix)
+        name = text.upper()
+        if name in ("HIGH", "LOW", "UPPER") and self._peek() is not None:
+            v = self._unary()
+            return {"LOW": v & 0xFF, "HIGH": (v >> 8) & 0xFF, "UPPER": (v >> 16) & 0xFF}[name]
+        return self.lookup(text)
+
+
+class Assembler:
+    """Assembles one source file. Use assemble() / assemble_file()."""
+
+    def __init__(self, name: str = "<asm>"):
+        self.name = name
+        self.symbols: Dict[str, int] = {}
+        self.labels: Dict[str, int] = {}
+        self.defines: Dict[str, str] = {}
+        self.radix = 16
+        self.address = 0
+
+    # --------------------------------------------------------------------------
+    # Source parsing
+    # --------------------------------------------------------------------------
+    @staticmethod
+    def _strip_comment(line: str) -> str:
+        quote = False
+        for i, ch in enumerate(line):
+            if ch in "'\"":
+                quote = not quote
+            elif ch == ";" and not quote:
+                return line[:i]
+        return line
+
+    @staticmethod
+    def _split_args(text: str) -> List[str]:
+        out, depth, cur, quote = [], 0, "", False
+        for ch in text:
+            if ch in "'\"":
+                quote = not quote
+            elif not quote and ch == "(":
+                depth += 1
+            elif not quote and ch == ")":
+                depth -= 1
+            if ch == "," and depth == 0 and not quote:
+                out.append(cur.strip())
+                cur = ""
+            else:
+                cur += ch
+        if cur.strip():
+            out.append(cur.strip())
+        return out
+
+    def _parse(self, number: int, raw: str) -> Optional[_Line]:
+        code = self._strip_comment(raw).rstrip()
+        if not code.strip():
+            return None
+        parts = code.split(None, 1)
+        first = parts[0]
+        rest = parts[1] if len(parts) > 1 else ""
+
+        label = None
+        if not code[0].isspace() and first.rstrip(":").upper() not in MNEMONICS | DIRECTIVES:
+            label = first.rstrip(":")
+            parts = rest.split(None, 1)
+            if not parts:
+                return _Line(number, label, None, [], "")
+            first, rest = parts[0], parts[1] if len(parts) > 1 else ""
+        op = first.upper()
+        if op not in ("#DEFINE", "#UNDEFINE", "EQU", "SET"):
+            rest = self._substitute(rest)
+        return _Line(number, label, op, self._split_args(rest), rest.strip())
+
+    def _substitute(self, text: str) -> str:
+        if not self.defines:
+            return text
+        return _IDENT_RE.sub(lambda m: self.defines.get(m.group(0), m.group(0)), text)
+
+    # --------------------------------------------------------------------------
+    # Expressions
+    # --------------------------------------------------------------------------
+    def _lookup(self, name: str) -> int:
+        if name == "$":
+            return self.address
+        if name in self.labels:
+            return self.labels[name]
+        if name in self.symbols:
+            return self.symbols[name]
+        raise AsmError(f"undefined symbol '{name}'")
+
+    def eval(self, text: str) -> int:
+        return _Expr(text, self._lookup, self.radix).value()
+
+    # --------------------------------------------------------------------------
+    # Passes
+    # --------------------------------------------------------------------------
+    def assemble(self, source: str) -> Program:
+        lines = []
+        for number, raw in enumerate(source.splitlines(), 1):
+            try:
+                line = self._directives_pass(number, raw)
+            except AsmError as e:
+                raise AsmError(f"{self.name}:{number}: {e}") from None
+            if line == "END":
+                break
+            if line is not None:
+                lines.append(line)
+
+        prog = Program(self.name, labels=dict(self.labels), symbols=dict(self.symbols))
+        for line, addr in lines:
+            self.address = addr
+            try:
+                for i, word in enumerate(self._encode(line)):
+                    if addr + i in prog.words:
+                        raise AsmError(f"address 0x{addr + i:04X} used twice")
+                    prog.words[addr + i] = word & 0x3FFF
+                    prog.lines[addr + i] = line.number
+            except AsmError as e:
+                raise AsmError(f"{self.name}:{line.number}: {e}") from None
+        return prog
+
+    _cblock: Optional[int] = None
+
+    def _directives_pass(self, number: int, raw: str):
+        """Pass 1: directives, symbols and label addresses."""
+        if self._cblock is not None:
+            code = self._strip_comment(raw).strip()
+            if code.upper() == "ENDC":
+                self._cblock = None
+                return None
+            for item in self._split_args(code):
+                name, _, size = item.partition(":")
+                self.symbols[name.strip()] = self._cblock
+                self._cblock += self.eval(size) if size else 1
+            return None
+
+        line = self._parse(number, raw)
+        if line is None:
+            return None
+        op, args = line.op, line.args
+
+        if op == "EQU" or op == "SET":
+            if not line.label:
+                raise AsmError(f"{op} needs a name")
+            self.symbols[line.label] = self.eval(self._substitute(line.text))
+            return None
+        if line.label:
+            if line.label in self.labels:
+                raise AsmError(f"label '{line.label}' defined twice")
+            self.labels[line.label] = self.address
+
+        if op is None:
+            return None
+        if op == "#DEFINE":
+            name, _, text = line.text.partition(" ")
+            self.defines[name.strip()] = self._substitute(text.strip())
+        elif op == "#UNDEFINE":
+            self.defines.pop(line.text.strip(), None)
+        elif op in ("INCLUDE", "#INCLUDE"):
+            inc = line.text.strip("\"<> ").upper()
+            if inc != "P16F877A.INC":
+                raise AsmError(f"include file '{inc}' is not supported")
+            self.symbols.update(chip.SYMBOLS)
+        elif op == "RADIX":
+            self.radix = {"HEX": 16, "DEC": 10, "OCT": 8}.get(line.text.strip().upper(), 16)
+        elif op == "ORG":
+            self.address = self.eval(args[0])
+        elif op == "CBLOCK":
+            self._cblock = self.eval(args[0]) if args else 0
+        elif op == "END":
+            return "END"
+        elif op in DIRECTIVES:
+            pass                        # LIST, __CONFIG, ERRORLEVEL, ...
+        elif op in MNEMONICS:
+            addr = self.address
+            self.address += 2 if op in ("BANKSEL", "PAGESEL") else 1
+            return line, addr
+        else:
+            raise AsmError(f"unknown instruction '{op}'")
+        return None
+
+    def _encode(self, line: _Line) -> List[int]:
+        """Pass 2: instruction words of one source line."""
+        op, args = line.op, line.args
+
+        def need(n: int, m: Optional[int] = None) -> None:
+            if not (n <= len(args) <= (n if m is None else m)):
+                raise AsmError(f"{op} takes {n if m is None else f'{n}-{m}'} operands")
+
+        if op in _FIXED_OPS:
+            need(0)
+            return [_FIXED_OPS[op]]
+        if op in _BYTE_OPS:
+            need(1, 2)
+            d = self.eval(args[1]) if len(args) == 2 else 1
+            return [(_BYTE_OPS[op] << 8) | ((d & 1) << 7) | (self.eval(args[0]) & 0x7F)]
+        if op == "CLRF" or op == "MOVWF":
+            need(1)
+            return [(0x01 if op == "CLRF" else 0x00) << 8 | 0x80 | (self.eval(args[0]) & 0x7F)]
+        if op in _BIT_OPS:
+            need(2)
+            b = self.eval(args[1])
+            if not 0 <= b <= 7:
+                raise AsmError(f"bit number {b} out of range")
+            return [(_BIT_OPS[op] << 10) | (b << 7) | (self.eval(args[0]) & 0x7F)]
+        if op in _LIT_OPS:
+            need(1)
+            k = self.eval(args[0])
+            if not -128 <= k <= 255:
+                raise AsmError(f"literal {k} out of range")
+            return [(_LIT_OPS[op] << 8) | (k & 0xFF)]
+        if op == "CALL" or op == "GOTO":
+            need(1)
+            return [(0x2000 if op == "CALL" else 0x2800) | (self.eval(args[0]) & 0x7FF)]
+        if op == "BANKSEL":
+            need(1)
+            bank = (self.eval(args[0]) >> 7) & 3
+            return [self._bit_status(chip.RP0, bank & 1), self._bit_status(chip.RP1, bank & 2)]
+        if op == "PAGESEL":
+            need(1)
+            page = (self.eval(args[0]) >> 11) & 3
+            return [(_BIT_OPS["BSF" if page & 1 else "BCF"] << 10) | (3 << 7) | chip.PCLATH,
+                    (_BIT_OPS["BSF" if page & 2 else "BCF"] << 10) | (4 << 7) | chip.PCLATH]
+        raise AsmError(f"unknown instruction '{op}'")
+
+    @staticmethod
+    def _bit_status(bit: int, on: int) -> int:
+        return (_BIT_OPS["BSF" if on else "BCF"] << 10) | (bit << 7) | chip.STATUS
+
+
+def assemble(source: str, name: str = "<asm>") -> Program:
+    """Assembles MPASM source text."""
+    return Assembler(name).assemble(source)
+
+
+def assemble_file(path: str) -> Program:
+    """Assembles an .asm file (Latin-1 tolerant, like MPASM)."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return assemble(f.read(), os.path.basename(path))
@@ -0,0 +1,97 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/pic/boards.py
+DESCRIPTION:
+    The shipped firmware (board1.asm, board2.asm) on an emulated PIC16F877A
+    together with a small model of the hardware around it:
+    - Board #1: LM35 on AN0 (10 mV/C), fan tachometer on T1CKI that turns
+      while the heater output (RC1) is on, keypad rows with pull-ups.
+    - Board #2: LDR on AN0 and potentiometer on AN1 (8-bit values, as the
+      firmware reads ADRESH), auto/manual switch on RA2.
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from . import p16f877a as chip
+from .assembler import Program, assemble_file
+from .cpu import PIC16
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Firmware source of each board
+FIRMWARE = {
+    "board1": os.path.join(_ROOT, "board1.asm"),
+    "board2": os.path.join(_ROOT, "board2.asm"),
+}
+
+
+@dataclass
+class Board1Environment:
+    """Room and fan of the air conditioner board."""
+    ambient_c: float = 24.0
+    fan_rps: float = 30.0           # Tachometer pulses per second while heating
+
+    def __call__(self, cpu: PIC16) -> None:
+        cpu.analog[0] = self.ambient_c * 0.01
+        heating = cpu.mem[chip.PORTC] & ~cpu.mem[chip.TRISC] & 0x02
+        fan = self.fan_rps if heating else 0.0
+        if fan != cpu.t1_external_hz:
+            cpu.set_t1_external_hz(fan)
+
+
+@dataclass
+class Board2Environment:
+    """Light, potentiometer and mode switch of the curtain board."""
+    light: int = 200                # Value the firmware reads from the LDR (0-255)
+    pot: int = 128                  # Potentiometer (0-255)
+    manual: bool = False            # Auto/manual switch on RA2
+
+    @staticmethod
+    def _volts(value8: int, vref: float) -> float:
+        # Middle of the 10-bit code whose upper 8 bits are 'value8'
+        return (max(0, min(255, int(value8))) * 4 + 2) / 1023.0 * vref
+
+    def __call__(self, cpu: PIC16) -> None:
+        cpu.analog[0] = self._volts(self.light, cpu.vref)
+        cpu.analog[1] = self._volts(self.pot, cpu.vref)
+        if self.manual:
+            cpu.pin_inputs[0] |= 1 << 2
+        else:
+            cpu.pin_inputs[0] &= ~(1 << 2) & 0xFF
+
+
+@functools.lru_cache(maxsize=None)
+def _assemble(path: str, mtime: float) -> Program:
+    return assemble_file(path)
+
+
+def firmware(board: str, asm_path: Optional[str] = None) -> Program:
+    """Assembled firmware of 'board' (cached until the file changes)."""
+    path = asm_path or FIRMWARE.get(board)
+    if path is None:
+        raise ValueError(f"Unknown board '{board}'")
+    return _assemble(os.path.abspath(path), os.path.getmtime(path))
+
+
+def default_environment(board: str):
+    return Board1Environment() if board == "board1" else Board2Environment()
+
+
+def load_board(board: str, clock_hz: float = 4e6, asm_path: Optional[str] = None,
+               environment=None) -> PIC16:
+    """A PIC16 with the firmware of 'board' and its environment, after reset."""
+    cpu = PIC16(firmware(board, asm_path), clock_hz)
+    cpu.environment = environment if environment is not None else default_environment(board)
+    return cpu
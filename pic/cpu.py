@@ -0,0 +1,592 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/pic/cpu.py
+DESCRIPTION:
+    Instruction-level emulator of the PIC16F877A (mid-range core) with the
+    peripherals the two boards use, modelled at instruction cycle
+    resolution (one cycle = 4 oscillator periods):
+
+    - core: all 35 instructions with their cycle counts (2 for jumps, calls,
+      returns and taken skips), banked and indirect addressing, the 8-level
+      hardware stack, PCL/PCLATH computed jumps, interrupts (vector 0x004),
+    - Timer0 (internal clock, prescaler) with T0IF,
+    - Timer1 (internal or external clock; the external clock is a pulse
+      rate set by the environment, e.g. the fan tachometer),
+    - 10-bit ADC (channel, TAD, conversion time 12 TAD, ADFM justification)
+      reading the voltages in 'analog',
+    - USART: 2-byte receive FIFO with RCIF and overrun (OERR), transmit
+      holding register + shift register (TXIF, TRMT), bit time from
+      SPBRG/BRGH,
+    - I/O ports: latches and TRIS; input pins read 'pin_inputs'.
+
+    Peripherals are event driven: the interpreter only stops at the next
+    timer overflow, ADC completion, UART bit boundary or environment tick,
+    and counters are computed from the cycle count when they are read.
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+from typing import Callable, List, Optional, Tuple, Union
+
+from . import p16f877a as chip
+from .assembler import Program
+
+INF = float("inf")
+
+# Internal operation codes of the decoded instructions
+(OP_ADDWF, OP_ANDWF, OP_CLRF, OP_CLRW, OP_COMF, OP_DECF, OP_DECFSZ, OP_INCF, OP_INCFSZ,
+ OP_IORWF, OP_MOVF, OP_MOVWF, OP_NOP, OP_RLF, OP_RRF, OP_SUBWF, OP_SWAPF, OP_XORWF,
+ OP_BCF, OP_BSF, OP_BTFSC, OP_BTFSS,
+ OP_ADDLW, OP_ANDLW, OP_CALL, OP_CLRWDT, OP_GOTO, OP_IORLW, OP_MOVLW, OP_RETFIE, OP_RETLW,
+ OP_RETURN, OP_SLEEP, OP_SUBLW, OP_XORLW) = range(35)
+
+_BYTE_DECODE = {0x07: OP_ADDWF, 0x05: OP_ANDWF, 0x09: OP_COMF, 0x03: OP_DECF, 0x0B: OP_DECFSZ,
+                0x0A: OP_INCF, 0x0F: OP_INCFSZ, 0x04: OP_IORWF, 0x08: OP_MOVF, 0x0D: OP_RLF,
+                0x0C: OP_RRF, 0x02: OP_SUBWF, 0x0E: OP_SWAPF, 0x06: OP_XORWF}
+
+# Registers whose access has side effects (canonical addresses)
+_SPECIAL = (chip.INDF, chip.TMR0, chip.PCL, chip.PORTA, chip.PORTB, chip.PORTC, chip.PORTD,
+            chip.PORTE, chip.INTCON, chip.PIR1, chip.TMR1L, chip.TMR1H, chip.T1CON, chip.RCSTA,
+            chip.TXREG, chip.RCREG, chip.ADCON0, chip.OPTION_REG, chip.PIE1, chip.TXSTA)
+
+
+def decode(word: int) -> Tuple[int, int, int]:
+    """(operation, file register or literal, destination or bit) of a word."""
+    word &= 0x3FFF
+    top = word >> 12
+    if top == 0:
+        op6, f, d = (word >> 8) & 0x3F, word & 0x7F, (word >> 7) & 1
+        if op6 == 0:
+            if d:
+                return OP_MOVWF, f, 1
+            return {0x08: (OP_RETURN, 0, 0), 0x09: (OP_RETFIE, 0, 0), 0x63: (OP_SLEEP, 0, 0),
+                    0x64: (OP_CLRWDT, 0, 0)}.get(word & 0xFF, (OP_NOP, 0, 0))
+        if op6 == 1:
+            return (OP_CLRF, f, 1) if d else (OP_CLRW, 0, 0)
+        return _BYTE_DECODE[op6], f, d
+    if top == 1:
+        return (OP_BCF, OP_BSF, OP_BTFSC, OP_BTFSS)[(word >> 10) & 3], word & 0x7F, (word >> 7) & 7
+    if top == 2:
+        return (OP_GOTO if word & 0x800 else OP_CALL), word & 0x7FF, 0
+    k, op = word & 0xFF, (word >> 8) & 0x0F
+    if op < 4:
+        return OP_MOVLW, k, 0
+    if op < 8:
+        return OP_RETLW, k, 0
+    if op == 8:
+        return OP_IORLW, k, 0
+    if op == 9:
+        return OP_ANDLW, k, 0
+    if op == 10:
+        return OP_XORLW, k, 0
+    if op < 14:
+        return OP_SUBLW, k, 0
+    return OP_ADDLW, k, 0
+
+
+class PIC16:
+    """
+    One PIC16F877A running a program at 'clock_hz' (oscillator frequency).
+    Time is counted in instruction cycles ('cycles'); run() executes until
+    a cycle limit or until 'stop()' returns True at an event.
+    """
+
+    def __init__(self, program: Union[Program, List[int]], clock_hz: float = 4e6):
+        self.program = program if isinstance(program, Program) else None
+        image = program.image() if isinstance(program, Program) else list(program)
+        image += [0x3FFF] * (chip.PROGRAM_WORDS - len(image))
+        self.code = [decode(w) for w in image]
+        self.clock_hz = float(clock_hz)
+        self.cycle_hz = self.clock_hz / 4.0
+
+        self.bank_map = chip.bank_map()
+        self.special = [False] * chip.DATA_BYTES
+        for a in _SPECIAL:
+            self.special[a] = True
+
+        # Outside world
+        self.analog: List[float] = [0.0] * 8            # Volts on AN0..AN7
+        self.vref = 5.0
+        self.pin_inputs: List[int] = [0x00, 0xFF, 0x00, 0x00, 0x00]    # PORTA..PORTE pins
+        self.t1_external_hz = 0.0                       # Pulses on T1CKI
+        self.tx_sink: Optional[Callable[[int, int], None]] = None       # (cycle, byte) sent
+        self.rx_read_sink: Optional[Callable[[int, int], None]] = None  # (cycle, byte) from RCREG
+        self.environment: Optional[Callable[["PIC16"], None]] = None
+        self.environment_period_s = 0.01
+        self.reset()
+
+    # --------------------------------------------------------------------------
+    # State
+    # --------------------------------------------------------------------------
+    def reset(self) -> None:
+        """Power-on reset."""
+        self.mem = [0] * chip.DATA_BYTES
+        for addr, v in chip.RESET_VALUES.items():
+            self.mem[addr] = v
+        self.w = 0
+        self.pc = 0
+        self.stack = [0] * chip.STACK_DEPTH
+        self.sp = 0
+        self.cycles = 0
+        self.instructions = 0
+
+        self._t0_origin, self._t0_v0, self._t0_ps, self._t0_next = 0, 0, 0, INF
+        self._t1_origin, self._t1_v0, self._t1_rate = 0, 0.0, 0.0
+        self._adc_done = INF
+        self._rx_events: List[Tuple[int, int]] = []
+        self._rx_fifo: List[int] = []
+        self._tx_tsr: Optional[int] = None
+        self._tx_hold: Optional[int] = None
+        self._tx_done = INF
+        self._env_next = 0
+        self._next_event = 0
+
+    def seconds(self, cycles: Optional[float] = None) -> float:
+        """Time in seconds of a cycle count (default: now)."""
+        return (self.cycles if cycles is None else cycles) / self.cycle_hz
+
+    def cycles_for(self, seconds: float) -> int:
+        return int(round(seconds * self.cycle_hz))
+
+    def read(self, addr: int) -> int:
+        """Register value at a (bank * 128 + f) address, as the program reads it."""
+        a = self.bank_map[addr]
+        return self._read_special(a) if self.special[a] else self.mem[a]
+
+    def label(self) -> str:
+        """Current position in the program ('LABEL+n')."""
+        return self.program.label_at(self.pc) if self.program is not None else f"0x{self.pc:04X}"
+
+    # --------------------------------------------------------------------------
+    # Outside world
+    # --------------------------------------------------------------------------
+    def uart_bit_cycles(self) -> int:
+        """Instruction cycles per bit from SPBRG and BRGH."""
+        return chip.uart_bit_cycles(self.mem[chip.SPBRG], self.mem[chip.TXSTA])
+
+    def uart_receive(self, byte: int, at_cycle: int) -> None:
+        """A byte whose stop bit arrives at 'at_cycle' (must not be in the past)."""
+        self._rx_events.append((max(int(at_cycle), self.cycles), int(byte) & 0xFF))
+        self._rx_events.sort(key=lambda e: e[0])
+        self._next_event = min(self._next_event, self._rx_events[0][0])
+
+    def set_t1_external_hz(self, hz: float) -> None:
+        self._t1_rebase()
+        self.t1_external_hz = float(hz)
+        self._t1_rebase()
+
+    # --------------------------------------------------------------------------
+    # Interpreter
+    # --------------------------------------------------------------------------
+    def run(self, until_cycle: float, stop: Optional[Callable[[], bool]] = None) -> bool:
+        """
+        Executes instructions until 'until_cycle' or until 'stop()' (checked
+        after every peripheral event) returns True. Returns True if stopped
+        by 'stop'.
+        """
+        code, mem, bmap, special = self.code, self.mem, self.bank_map, self.special
+        stack = self.stack
+        pc, w, cyc, sp = self.pc, self.w, self.cycles, self.sp
+        until = until_cycle
+        next_ev = min(self._next_event, until)
+        check_irq = True
+        executed = 0
+        stopped = False
+
+        while True:
+            if cyc >= next_ev:
+                self.pc, self.w, self.cycles, self.sp = pc, w, cyc, sp
+                self._service()
+                if stop is not None and stop():
+                    stopped = True
+                    break
+                if cyc >= until:
+                    break
+                next_ev = min(self._next_event, until)
+                check_irq = True
+
+            if check_irq:
+                check_irq = False
+                intcon = mem[11]
+                if intcon & 0x80 and (
+                        (intcon & 0x38) >> 3 & intcon & 0x07
+                        or intcon & 0x40 and mem[0x8C] & mem[12]):
+                    stack[sp] = pc
+                    sp = (sp + 1) & 7
+                    mem[11] = intcon & 0x7F
+                    pc = 4
+                    cyc += 2
+                    continue
+
+            op, f, d = code[pc]
+            pc = (pc + 1) & 0x1FFF
+            cyc += 1
+            executed += 1
+
+            if op <= OP_XORWF:
+                # ---------------- byte-oriented file register operations
+                if op == OP_MOVWF:
+                    a = bmap[((mem[3] & 0x60) << 2) | f] if f else bmap[((mem[3] & 0x80) << 1) | mem[4]]
+                    if special[a]:
+                        if a == 2:
+                            pc = ((mem[10] << 8) | w) & 0x1FFF
+                            cyc += 1
+                        elif a:
+                            self.cycles = cyc
+                            self._write_special(a, w)
+                            next_ev = min(self._next_event, until)
+                            check_irq = True
+                    else:
+                        mem[a] = w
+                    continue
+                if op == OP_NOP or op == OP_CLRW:
+                    if op == OP_CLRW:
+                        w = 0
+                        mem[3] |= 4
+                    continue
+
+                a = bmap[((mem[3] & 0x60) << 2) | f] if f else bmap[((mem[3] & 0x80) << 1) | mem[4]]
+                if special[a]:
+                    self.cycles = cyc
+                    v = self._read_special(a) if a != 2 else pc & 0xFF
+                else:
+                    v = mem[a]
+
+                if op == OP_DECFSZ:
+                    r = (v - 1) & 0xFF
+                    if r == 0:
+                        pc = (pc + 1) & 0x1FFF
+                        cyc += 1
+                elif op == OP_MOVF:
+                    r = v
+                    mem[3] = (mem[3] & 0xFB) | (0 if r else 4)
+                elif op == OP_DECF:
+                    r = (v - 1) & 0xFF
+                    mem[3] = (mem[3] & 0xFB) | (0 if r else 4)
+                elif op == OP_INCF:
+                    r = (v + 1) & 0xFF
+                    mem[3] = (mem[3] & 0xFB) | (0 if r else 4)
+                elif op == OP_INCFSZ:
+                    r = (v + 1) & 0xFF
+                    if r == 0:
+                        pc = (pc + 1) & 0x1FFF
+                        cyc += 1
+                elif op == OP_SUBWF:
+                    t = v - w
+                    r = t & 0xFF
+                    mem[3] = (mem[3] & 0xF8) | (1 if t >= 0 else 0) | (2 if (v & 15) >= (w & 15) else 0) \
+                        | (0 if r else 4)
+                elif op == OP_ADDWF:
+                    t = v + w
+                    r = t & 0xFF
+                    mem[3] = (mem[3] & 0xF8) | (1 if t > 255 else 0) | (2 if (v & 15) + (w & 15) > 15 else 0) \
+                        | (0 if r else 4)
+                elif op == OP_XORWF:
+                    r = v ^ w
+                    mem[3] = (mem[3] & 0xFB) | (0 if r else 4)
+                elif op == OP_ANDWF:
+                    r = v & w
+                    mem[3] = (mem[3] & 0xFB) | (0 if r else 4)
+                elif op == OP_IORWF:
+                    r = v | w
+                    mem[3] = (mem[3] & 0xFB) | (0 if r else 4)
+                elif op == OP_CLRF:
+                    r = 0
+                    mem[3] |= 4
+                elif op == OP_COMF:
+                    r = v ^ 0xFF
+                    mem[3] = (mem[3] & 0xFB) | (0 if r else 4)
+                elif op == OP_RLF:
+                    r = ((v << 1) | (mem[3] & 1)) & 0xFF
+                    mem[3] = (mem[3] & 0xFE) | (v >> 7)
+                elif op == OP_RRF:
+                    r = (v >> 1) | ((mem[3] & 1) << 7)
+                    mem[3] = (mem[3] & 0xFE) | (v & 1)
+                else:   # OP_SWAPF
+                    r = ((v << 4) | (v >> 4)) & 0xFF
+
+                if d:
+                    if special[a]:
+                        if a == 2:
+                            pc = ((mem[10] << 8) | r) & 0x1FFF
+                            cyc += 1
+                        elif a:
+                            self.cycles = cyc
+                            self._write_special(a, r)
+                            next_ev = min(self._next_event, until)
+                            check_irq = True
+                    else:
+                        mem[a] = r
+                else:
+                    w = r
+
+            elif op <= OP_BTFSS:
+                # ---------------- bit-oriented operations
+                a = bmap[((mem[3] & 0x60) << 2) | f] if f else bmap[((mem[3] & 0x80) << 1) | mem[4]]
+                if special[a]:
+                    self.cycles = cyc
+                    v = self._read_special(a) if a != 2 else pc & 0xFF
+                else:
+                    v = mem[a]
+                mask = 1 << d
+                if op == OP_BTFSS:
+                    if v & mask:
+                        pc = (pc + 1) & 0x1FFF
+                        cyc += 1
+                elif op == OP_BTFSC:
+                    if not v & mask:
+                        pc = (pc + 1) & 0x1FFF
+                        cyc += 1
+                else:
+                    r = (v | mask) if op == OP_BSF else (v & ~mask & 0xFF)
+                    if special[a]:
+                        if a == 2:
+                            pc = ((mem[10] << 8) | r) & 0x1FFF
+                            cyc += 1
+                        elif a:
+                            self._write_special(a, r)
+                            next_ev = min(self._next_event, until)
+                            check_irq = True
+                    else:
+                        mem[a] = r
+
+            elif op == OP_GOTO:
+                pc = ((mem[10] & 0x18) << 8) | f
+                cyc += 1
+            elif op == OP_MOVLW:
+                w = f
+            elif op == OP_CALL:
+                stack[sp] = pc
+                sp = (sp + 1) & 7
+                pc = ((mem[10] & 0x18) << 8) | f
+                cyc += 1
+            elif op == OP_RETURN or op == OP_RETLW or op == OP_RETFIE:
+                sp = (sp - 1) & 7
+                pc = stack[sp]
+                cyc += 1
+                if op == OP_RETLW:
+                    w = f
+                elif op == OP_RETFIE:
+                    mem[11] |= 0x80
+                    check_irq = True
+            elif op == OP_XORLW:
+                w ^= f
+                mem[3] = (mem[3] & 0xFB) | (0 if w else 4)
+            elif op == OP_ANDLW:
+                w &= f
+                mem[3] = (mem[3] & 0xFB) | (0 if w else 4)
+            elif op == OP_IORLW:
+                w |= f
+                mem[3] = (mem[3] & 0xFB) | (0 if w else 4)
+            elif op == OP_SUBLW:
+                t = f - w
+                r = t & 0xFF
+                mem[3] = (mem[3] & 0xF8) | (1 if t >= 0 else 0) | (2 if (f & 15) >= (w & 15) else 0) | (0 if r else 4)
+                w = r
+            elif op == OP_ADDLW:
+                t = f + w
+                r = t & 0xFF
+                mem[3] = (mem[3] & 0xF8) | (1 if t > 255 else 0) | (2 if (f & 15) + (w & 15) > 15 else 0) | (0 if r else 4)
+                w = r
+            elif op == OP_SLEEP:
+                # Oscillator stopped: nothing happens until the next event
+                if next_ev < INF:
+                    cyc = max(cyc, int(next_ev))
+            # OP_CLRWDT: the watchdog is disabled in both configurations
+
+        self.pc, self.w, self.cycles, self.sp = pc, w, cyc, sp
+        self.instructions += executed
+        return stopped
+
+    def run_for(self, seconds: float, stop: Optional[Callable[[], bool]] = None) -> bool:
+        return self.run(self.cycles + self.cycles_for(seconds), stop)
+
+    # --------------------------------------------------------------------------
+    # Special function registers
+    # --------------------------------------------------------------------------
+    def _read_special(self, a: int) -> int:
+        mem = self.mem
+        if a == chip.TMR0:
+            return self._t0_value()
+        if chip.PORTA <= a <= chip.PORTE:
+            i = a - chip.PORTA
+            tris = mem[chip.TRISA + i]
+            return ((mem[a] & ~tris) | (self.pin_inputs[i] & tris)) & 0xFF
+        if a == chip.TMR1L:
+            return self._t1_value() & 0xFF
+        if a == chip.TMR1H:
+            return self._t1_value() >> 8
+        if a == chip.RCREG:
+            fifo = self._rx_fifo
+            v = fifo.pop(0) if fifo else mem[a]
+            mem[a] = v
+            if not fifo:
+                mem[chip.PIR1] &= ~(1 << chip.RCIF) & 0xFF
+            if self.rx_read_sink is not None:
+                self.rx_read_sink(self.cycles, v)
+            return v
+        if a == chip.PIR1:
+            self._t1_rebase()
+        if a == chip.TXSTA:
+            return (mem[a] & ~(1 << chip.TRMT) & 0xFF) | (2 if self._tx_tsr is None else 0)
+        return mem[a]       # INDF through INDF reads 0
+
+    def _write_special(self, a: int, v: int) -> None:
+        mem = self.mem
+        old = mem[a]
+        if a == chip.PIR1:
+            hw = (1 << chip.RCIF) | (1 << chip.TXIF)    # Read-only flags
+            mem[a] = (v & ~hw) | (old & hw)
+        elif a == chip.TMR0:
+            self._t0_v0, self._t0_origin = v, self.cycles + 2   # Increment inhibited for 2 cycles
+            self._t0_schedule()
+        elif a == chip.OPTION_REG:
+            self._t0_v0, self._t0_origin = self._t0_value(), self.cycles
+            mem[a] = v
+            self._t0_schedule()
+        elif a in (chip.TMR1L, chip.TMR1H):
+            self._t1_rebase()
+            count = int(self._t1_v0)
+            self._t1_v0 = float((count & 0xFF00) | v if a == chip.TMR1L else (count & 0xFF) | (v << 8))
+        elif a == chip.T1CON:
+            self._t1_rebase()
+            mem[a] = v
+            self._t1_rebase()
+        elif a == chip.TXREG:
+            mem[a] = v
+            self._tx_hold = v
+            mem[chip.PIR1] &= ~(1 << chip.TXIF) & 0xFF
+            self._tx_start()
+        elif a == chip.TXSTA:
+            mem[a] = v & ~(1 << chip.TRMT) & 0xFF
+            self._tx_start()
+        elif a == chip.RCSTA:
+            if not v & (1 << chip.CREN):
+                v &= ~(1 << chip.OERR) & 0xFF              # Clearing CREN resets the overrun
+            else:
+                v = (v & ~(1 << chip.OERR)) | (old & (1 << chip.OERR))
+            mem[a] = v
+            self._tx_start()
+        elif a == chip.ADCON0:
+            mem[a] = v
+            go = 1 << chip.GO
+            if v & go and v & 1 and not old & go:
+                self._adc_done = self.cycles + self._adc_cycles()
+            elif not v & go:
+                self._adc_done = INF
+        else:
+            mem[a] = v      # Port latches, INTCON, PIE1
+        self._next_event = self._first_event()
+
+    # --------------------------------------------------------------------------
+    # Peripherals
+    # --------------------------------------------------------------------------
+    def _t0_value(self) -> int:
+        if not self._t0_ps or self.cycles < self._t0_origin:
+            return self._t0_v0 & 0xFF
+        return (self._t0_v0 + (self.cycles - self._t0_origin) // self._t0_ps) & 0xFF
+
+    def _t0_schedule(self) -> None:
+        opt = self.mem[chip.OPTION_REG]
+        if opt & (1 << chip.T0CS):
+            self._t0_ps, self._t0_next = 0, INF         # Counts RA4/T0CKI edges: not connected
+            return
+        self._t0_ps = 1 if opt & (1 << chip.PSA) else 2 << (opt & 7)
+        self._t0_next = self._t0_origin + (256 - (self._t0_v0 & 0xFF)) * self._t0_ps
+
+    def _t1_value(self) -> int:
+        return int(self._t1_v0 + (self.cycles - self._t1_origin) * self._t1_rate) & 0xFFFF
+
+    def _t1_rebase(self) -> None:
+        # The count is kept as a float, so frequent reads do not lose the
+        # fraction of an external pulse period
+        total = self._t1_v0 + (self.cycles - self._t1_origin) * self._t1_rate
+        if total >= 0x10000:
+            self.mem[chip.PIR1] |= 1 << chip.TMR1IF
+            total %= 0x10000
+        self._t1_v0, self._t1_origin = total, self.cycles
+        con = self.mem[chip.T1CON]
+        pre = 1 << ((con >> 4) & 3)
+        if not con & 1:
+            self._t1_rate = 0.0
+        elif con & (1 << chip.TMR1CS):
+            self._t1_rate = self.t1_external_hz / self.cycle_hz / pre
+        else:
+            self._t1_rate = 1.0 / pre
+
+    def _adc_cycles(self) -> int:
+        return chip.adc_conversion_cycles(self.mem[chip.ADCON0], self.mem[chip.ADCON1], self.clock_hz)
+
+    def _adc_finish(self) -> None:
+        mem = self.mem
+        ch = (mem[chip.ADCON0] >> 3) & 7
+        value = int(round(self.analog[ch] / self.vref * 1023))
+        value = min(1023, max(0, value))
+        if mem[chip.ADCON1] & (1 << chip.ADFM):
+            mem[chip.ADRESH], mem[chip.ADRESL] = value >> 8, value & 0xFF
+        else:
+            mem[chip.ADRESH], mem[chip.ADRESL] = value >> 2, (value & 3) << 6
+        mem[chip.ADCON0] &= ~(1 << chip.GO) & 0xFF
+        mem[chip.PIR1] |= 1 << chip.ADIF
+        self._adc_done = INF
+
+    def _tx_enabled(self) -> bool:
+        return bool(self.mem[chip.TXSTA] & (1 << chip.TXEN) and self.mem[chip.RCSTA] & (1 << chip.SPEN))
+
+    def _tx_start(self) -> None:
+        """Moves TXREG into the idle shift register."""
+        if self._tx_tsr is None and self._tx_hold is not None and self._tx_enabled():
+            self._tx_tsr, self._tx_hold = self._tx_hold, None
+            self.mem[chip.PIR1] |= 1 << chip.TXIF
+            self._tx_done = self.cycles + 1 + 10 * self.uart_bit_cycles()
+
+    def _tx_finish(self) -> None:
+        byte, done = self._tx_tsr, self._tx_done
+        self._tx_tsr, self._tx_done = None, INF
+        if self.tx_sink is not None:
+            self.tx_sink(int(done), byte)
+        if self._tx_hold is not None:
+            saved, self.cycles = self.cycles, int(done)
+            self._tx_start()
+            self.cycles = saved
+
+    def _rx_complete(self, byte: int) -> None:
+        mem = self.mem
+        rcsta = mem[chip.RCSTA]
+        if not (rcsta & (1 << chip.SPEN) and rcsta & (1 << chip.CREN)) or rcsta & (1 << chip.OERR):
+            return                                      # Receiver off or stopped by an overrun
+        if len(self._rx_fifo) >= 2:
+            mem[chip.RCSTA] = rcsta | (1 << chip.OERR)  # Third byte: overrun, byte lost
+            return
+        self._rx_fifo.append(byte)
+        mem[chip.PIR1] |= 1 << chip.RCIF
+
+    def _first_event(self) -> float:
+        rx = self._rx_events[0][0] if self._rx_events else INF
+        env = self._env_next if self.environment is not None else INF
+        return min(self._t0_next, self._adc_done, self._tx_done, rx, env)
+
+    def _service(self) -> None:
+        """Handles all peripheral events due at 'cycles'."""
+        c = self.cycles
+        while c >= self._t0_next:
+            self.mem[chip.INTCON] |= 1 << chip.T0IF
+            self._t0_origin, self._t0_v0 = self._t0_next, 0
+            self._t0_next += 256 * self._t0_ps
+        if c >= self._adc_done:
+            self._adc_finish()
+        while self._rx_events and self._rx_events[0][0] <= c:
+            self._rx_complete(self._rx_events.pop(0)[1])
+        while c >= self._tx_done:
+            self._tx_finish()
+        if self.environment is not None and c >= self._env_next:
+            self.environment(self)
+            self._env_next = c + max(1, self.cycles_for(self.environment_period_s))
+        self._next_event = self._first_event()
@@ -0,0 +1,169 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/pic/p16f877a.py
+DESCRIPTION:
+    The symbols of Microchip's "P16F877A.INC" (register file addresses and
+    bit numbers) used by the assembler, and the memory layout of the
+    PIC16F877A used by the emulator (banked registers and their mirrors).
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, List
+
+# ------------------------------------------------------------------------------
+# Register file (bank 0 / bank 1 addresses as in the include file)
+# ------------------------------------------------------------------------------
+INDF = 0x00
+TMR0 = 0x01
+PCL = 0x02
+STATUS = 0x03
+FSR = 0x04
+PORTA = 0x05
+PORTB = 0x06
+PORTC = 0x07
+PORTD = 0x08
+PORTE = 0x09
+PCLATH = 0x0A
+INTCON = 0x0B
+PIR1 = 0x0C
+PIR2 = 0x0D
+TMR1L = 0x0E
+TMR1H = 0x0F
+T1CON = 0x10
+TMR2 = 0x11
+T2CON = 0x12
+SSPBUF = 0x13
+SSPCON = 0x14
+CCPR1L = 0x15
+CCPR1H = 0x16
+CCP1CON = 0x17
+RCSTA = 0x18
+TXREG = 0x19
+RCREG = 0x1A
+CCPR2L = 0x1B
+CCPR2H = 0x1C
+CCP2CON = 0x1D
+ADRESH = 0x1E
+ADCON0 = 0x1F
+
+OPTION_REG = 0x81
+TRISA = 0x85
+TRISB = 0x86
+TRISC = 0x87
+TRISD = 0x88
+TRISE = 0x89
+PIE1 = 0x8C
+PIE2 = 0x8D
+PCON = 0x8E
+SSPCON2 = 0x91
+PR2 = 0x92
+SSPADD = 0x93
+SSPSTAT = 0x94
+TXSTA = 0x98
+SPBRG = 0x99
+CMCON = 0x9C
+CVRCON = 0x9D
+ADRESL = 0x9E
+ADCON1 = 0x9F
+
+EEDATA = 0x10C
+EEADR = 0x10D
+EEDATH = 0x10E
+EEADRH = 0x10F
+EECON1 = 0x18C
+EECON2 = 0x18D
+
+# ------------------------------------------------------------------------------
+# Bit numbers
+# ------------------------------------------------------------------------------
+# STATUS
+C, DC, Z, NOT_PD, NOT_TO, RP0, RP1, IRP = range(8)
+# INTCON
+RBIF, INTF, T0IF, RBIE, INTE, T0IE, PEIE, GIE = range(8)
+# PIR1 / PIE1
+TMR1IF, TMR2IF, CCP1IF, SSPIF, TXIF, RCIF, ADIF, PSPIF = range(8)
+TMR1IE, TMR2IE, CCP1IE, SSPIE, TXIE, RCIE, ADIE, PSPIE = range(8)
+# OPTION_REG
+PS0, PS1, PS2, PSA, T0SE, T0CS, INTEDG, NOT_RBPU = range(8)
+# T1CON
+TMR1ON, TMR1CS, NOT_T1SYNC, T1OSCEN, T1CKPS0, T1CKPS1 = range(6)
+# RCSTA
+RX9D, OERR, FERR, ADDEN, CREN, SREN, RX9, SPEN = range(8)
+# TXSTA
+TX9D, TRMT, BRGH, SYNC, TXEN, TX9, CSRC = 0, 1, 2, 4, 5, 6, 7
+# ADCON0 / ADCON1
+ADON, GO, CHS0, CHS1, CHS2, ADCS0, ADCS1 = 0, 2, 3, 4, 5, 6, 7
+GO_DONE, NOT_DONE = GO, GO
+PCFG0, PCFG1, PCFG2, PCFG3, ADCS2, ADFM = 0, 1, 2, 3, 6, 7
+
+W = 0       # Destination: W register
+F = 1       # Destination: file register
+
+
+# All symbols of the include file (name -> value) for the assembler
+SYMBOLS: Dict[str, int] = {k: v for k, v in globals().items() if k.isupper() and isinstance(v, int)}
+
+
+# ------------------------------------------------------------------------------
+# Memory layout
+# ------------------------------------------------------------------------------
+PROGRAM_WORDS = 0x2000          # 8K words of flash
+STACK_DEPTH = 8
+DATA_BYTES = 0x200              # 4 banks of 128 bytes
+
+# Power-on values of the special function registers (unimplemented = 0)
+RESET_VALUES = {
+    STATUS: 0x18, OPTION_REG: 0xFF, TRISA: 0x3F, TRISB: 0xFF, TRISC: 0xFF,
+    TRISD: 0xFF, TRISE: 0x07, TXSTA: 0x02, PIR1: 0x10,
+}
+
+# Registers that appear in every bank, and the bank 2/3 mirrors
+_ALL_BANKS = (INDF, PCL, STATUS, FSR, PCLATH, INTCON)
+
+
+def bank_map() -> List[int]:
+    """
+    For every banked address (bank * 128 + f, 0..511) the address of the
+    register that is really accessed, so mirrors share one storage cell.
+    """
+    out = []
+    for addr in range(DATA_BYTES):
+        bank, f = divmod(addr, 0x80)
+        if f in _ALL_BANKS:
+            addr = f
+        elif f >= 0x70:
+            addr = f                    # Common RAM 0x70-0x7F
+        elif bank == 2 and f in (TMR0, PORTB):
+            addr = f
+        elif bank == 3 and f in (OPTION_REG & 0x7F, TRISB & 0x7F):
+            addr = 0x80 | f
+        out.append(addr)
+    return out
+
+
+# ------------------------------------------------------------------------------
+# Peripheral timing (in instruction cycles, one cycle = 4 oscillator periods)
+# ------------------------------------------------------------------------------
+def uart_bit_cycles(spbrg: int, txsta: int) -> int:
+    """Instruction cycles per UART bit for the asynchronous baud rate generator."""
+    x = (spbrg & 0xFF) + 1
+    return 4 * x if txsta & (1 << BRGH) else 16 * x
+
+
+def adc_conversion_cycles(adcon0: int, adcon1: int, clock_hz: float) -> int:
+    """Instruction cycles of one 10-bit conversion (12 TAD) for the ADCS bits."""
+    adcs = (adcon0 >> 6) & 3
+    if adcs == 3:
+        tad_s = 4e-6                                # Internal RC oscillator
+    else:
+        tad_s = (2, 8, 32)[adcs] * (2 if adcon1 & (1 << ADCS2) else 1) / clock_hz
+    return max(1, int(math.ceil(12 * tad_s * clock_hz / 4.0)))
@@ -0,0 +1,1138 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/pic/wcet.py
+DESCRIPTION:
+    Static worst-case response latency of the board firmware.
+
+    The assembled program (not the source text) is executed abstractly:
+    every register holds an interval plus the bits known for sure, and
+    every branch whose condition is not known is followed both ways. So
+    counted delay loops (MOVLW n / DECFSZ) get their exact bounds, loops
+    like "subtract 10 while >= 10" are bounded by the interval of the
+    counter, and a loop whose exit depends on an input that can stay the
+    same forever (e.g. waiting for a key to be released) is reported as
+    unbounded. Calls are summarized per function: the result of a call is
+    reused whenever the registers the function actually read are equal.
+
+    The UART receive poll (BTFSS/BTFSC PIR1,RCIF) splits the main loop:
+    - wait:    longest time between two polls, idle or after handling any
+               byte (a byte arriving just after a poll waits this long);
+               after a GET it counts from the last answer byte,
+    - service: from the poll that sees a command to its write into TXREG,
+    - burst:   further answer bytes (GET_ALL) after the first one,
+    - ISR:     worst-case interrupt handler, added once per interrupt
+               period that fits into the window.
+
+    Hardware the loops wait for is modelled by time: the ADC clears GO
+    12 TAD after it was set, TXIF/TRMT follow the shift register. At a
+    poll the transmitter is idle (the PC sends a command only after the
+    answer to the previous one). Receive errors (OERR, FERR) are assumed
+    not to happen; min_gap_s is what keeps OERR away.
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import p16f877a as chip
+from .assembler import Program
+from .cpu import (
+    OP_ADDLW, OP_ADDWF, OP_ANDLW, OP_ANDWF, OP_BCF, OP_BSF, OP_BTFSC, OP_BTFSS, OP_CALL, OP_CLRF,
+    OP_CLRW, OP_CLRWDT, OP_COMF, OP_DECF, OP_DECFSZ, OP_GOTO, OP_INCF, OP_INCFSZ, OP_IORLW, OP_IORWF,
+    OP_MOVF, OP_MOVLW, OP_MOVWF, OP_NOP, OP_RETFIE, OP_RETLW, OP_RETURN, OP_RLF, OP_RRF, OP_SLEEP,
+    OP_SUBLW, OP_SUBWF, OP_SWAPF, OP_XORLW, OP_XORWF, decode,
+)
+
+
+class Unbounded(Exception):
+    """No finite bound exists (or none was found) for a path of the program."""
+    pass
+
+
+# Inputs that are assumed while analysing each board (register -> (mask, bits))
+BOARD_ASSUMPTIONS: Dict[str, Dict[int, Tuple[int, int]]] = {
+    # Keypad idle: the column inputs RB4-RB7 read 1 (pull-ups). A held key
+    # keeps Board #1 in its key release loop, which has no bound.
+    "board1": {chip.PORTB: (0xF0, 0xF0)},
+    "board2": {},
+}
+
+# Interrupt entry (vector call) and the longest number of outcomes kept per call
+INTERRUPT_LATENCY = 4
+MAX_OUTCOMES = 8
+MAX_LOOP_VISITS = 100_000
+MAX_STEPS = 20_000_000
+MAX_ROUNDS = 12
+_ANY_BYTE = -1                          # A received byte of unknown value
+
+_PORTS = (chip.PORTA, chip.PORTB, chip.PORTC, chip.PORTD, chip.PORTE)
+_TIME = ("adc", "tsr", "hold")          # Cycle at which the hardware is ready
+# Registers whose bits cannot be narrowed by testing them (read from hardware)
+_VOLATILE = frozenset(_PORTS + (chip.STATUS, chip.PIR1, chip.ADCON0, chip.TXSTA, chip.RCSTA, chip.RCREG,
+                                chip.TMR0, chip.TMR1L, chip.TMR1H, chip.ADRESH, chip.ADRESL, chip.INDF))
+
+# ------------------------------------------------------------------------------
+# Values: (lo, hi, known mask, known bits) of an 8-bit register
+# ------------------------------------------------------------------------------
+Val = Tuple[int, int, int, int]
+TOP: Val = (0, 0xFF, 0, 0)
+
+
+def const(v: int) -> Val:
+    v &= 0xFF
+    return (v, v, 0xFF, v)
+
+
+def _mk(lo: int, hi: int, km: int = 0, kb: int = 0) -> Optional[Val]:
+    """A value from an interval and known bits; None if they contradict."""
+    km &= 0xFF
+    kb &= km
+    lo, hi = max(lo, kb), min(hi, kb | (~km & 0xFF))
+    if lo > hi:
+        return None
+    if lo == hi:
+        return (lo, lo, 0xFF, lo)
+    return (lo, hi, km, kb)
+
+
+def _is_const(v: Val) -> bool:
+    return v[0] == v[1]
+
+
+def _wrap(lo: int, hi: int) -> Val:
+    """Interval of an 8-bit result whose exact range is lo..hi before wrapping."""
+    if lo // 256 != hi // 256:
+        return TOP
+    base = 256 * (lo // 256)
+    return _mk(lo - base, hi - base)
+
+
+def _zero(v: Val) -> Optional[int]:
+    """Z flag of a result: 1, 0 or None (unknown)."""
+    if _is_const(v):
+        return int(v[0] == 0)
+    return 0 if v[0] > 0 or v[3] else None
+
+
+def _join(a, b, name=None):
+    """Least upper bound of two values of the same name."""
+    if a == b:
+        return a
+    if name in _TIME:
+        return max(a, b)                # Ready later is the worse case
+    if isinstance(a, tuple) and isinstance(b, tuple):
+        km = a[2] & b[2] & ~(a[3] ^ b[3])
+        return _mk(min(a[0], b[0]), max(a[1], b[1]), km, a[3] & km)
+    return None                         # Flag or received byte: unknown
+
+
+def _default(name) -> Any:
+    if name in _TIME:
+        return 0
+    if name == "BANK":
+        return (0, 7, 0xF8, 0)
+    if name == "W":
+        return TOP
+    if isinstance(name, str):
+        return None                     # Flags unknown, no received byte
+    return TOP
+
+
+class _Join:
+    """Outcome value that is joined with the caller's value when applied."""
+    __slots__ = ("v",)
+
+    def __init__(self, v):
+        self.v = v
+
+    def __eq__(self, other):
+        return isinstance(other, _Join) and other.v == self.v
+
+    def __hash__(self):
+        return hash(("join", self.v))
+
+
+# ------------------------------------------------------------------------------
+# Abstract machine state
+# ------------------------------------------------------------------------------
+class _Base:
+    """Values at the start of an exploration (names not listed are unknown)."""
+
+    def __init__(self, values: Optional[Dict[Any, Any]] = None):
+        self.values = values or {}
+
+    def get(self, name):
+        return self.values.get(name, _default(name))
+
+
+class _Frame:
+    """
+    Source of the values a path has not touched yet: the caller's state.
+    Everything pulled from the caller is remembered, it is the key of the
+    function summary. Time values are made relative to the call.
+    """
+    __slots__ = ("parent", "entry", "reads")
+
+    def __init__(self, parent, entry: int):
+        self.parent, self.entry, self.reads = parent, entry, {}
+
+    def pull(self, name):
+        reads = self.reads
+        if name in reads:
+            return reads[name]
+        v = self.parent.get(name)
+        if name in _TIME:
+            v = max(0, v - self.entry)
+        reads[name] = v
+        return v
+
+
+class _Path:
+    """One path through the program (registers by canonical address, W, flags)."""
+    __slots__ = ("pc", "stack", "cycle", "mem", "written", "reasons", "wsrc", "heads", "frame",
+                 "start", "answer")
+
+    def __init__(self, pc: int, frame, stack: Tuple[int, ...] = ()):
+        self.pc, self.stack, self.cycle = pc, stack, 0
+        self.mem: Dict[Any, Any] = {}
+        self.written: set = set()
+        self.reasons: Dict[str, Tuple[str, Any, int, bool]] = {}
+        self.wsrc = None                # Register W was copied from/to
+        self.heads: Dict[int, Tuple[Any, int]] = {}
+        self.frame = frame
+        self.start: Optional[int] = None
+        self.answer: Optional[int] = None
+
+    def copy(self) -> "_Path":
+        p = _Path.__new__(_Path)
+        p.pc, p.stack, p.cycle, p.frame = self.pc, self.stack, self.cycle, self.frame
+        p.mem, p.written, p.reasons = dict(self.mem), set(self.written), dict(self.reasons)
+        p.wsrc, p.heads = self.wsrc, dict(self.heads)
+        p.start, p.answer = self.start, self.answer
+        return p
+
+    def get(self, name):
+        mem = self.mem
+        if name in mem:
+            return mem[name]
+        v = mem[name] = self.frame.pull(name)
+        return v
+
+    def set(self, name, v) -> None:
+        self.mem[name] = v
+        self.written.add(name)
+        if self.wsrc == name or name == "W":
+            self.wsrc = None
+        reasons = self.reasons
+        if reasons:
+            if name in reasons:
+                del reasons[name]
+            for flag in [k for k, r in reasons.items() if r[1] == name or (name == "W" and r[3])]:
+                del reasons[flag]
+
+    def flag(self, name: str, v: Optional[int], reason=None) -> None:
+        self.set(name, v)
+        if reason is not None and v is None:
+            self.reasons[name] = reason
+
+    def key(self):
+        """Everything the future of the path depends on."""
+        cyc = self.cycle
+        items = frozenset((n, max(0, v - cyc) if n in _TIME else v) for n, v in self.mem.items())
+        return (self.pc, self.stack, items, frozenset(self.written), self.wsrc,
+                frozenset(self.reasons.items()), self.answer is None, self.start is None)
+
+
+# ------------------------------------------------------------------------------
+# Report
+# ------------------------------------------------------------------------------
+@dataclass
+class CommandBound:
+    """Worst case of one received byte that the firmware answers."""
+    cmd: int
+    service_cycles: int         # Poll that sees the byte -> write into TXREG
+    response_cycles: int        # First bit from the PC -> last bit of the answer at the PC
+    response_s: float
+    burst_cycles: int = 0       # Answers of several bytes (GET_ALL): after the first one
+
+
+@dataclass
+class LatencyReport:
+    """Static timing of one firmware at one oscillator frequency."""
+    board: str
+    clock_hz: float
+    baudrate: float                     # From SPBRG/BRGH after initialization
+    bit_cycles: int
+    poll_interval_cycles: Optional[int]     # Longest time between two idle polls
+    busy_interval_cycles: Optional[int]     # Longest wait for a poll after a byte (counted from its answer)
+    wait_cycles: Optional[int]              # Worst time a byte waits to be picked up
+    isr_cycles: int                         # One interrupt, including entry
+    isr_period_cycles: Optional[int]        # None if interrupts are disabled
+    min_gap_s: Optional[float]
+    commands: Dict[int, CommandBound] = field(default_factory=dict)
+    silent: List[int] = field(default_factory=list)     # Bytes never answered (SETs)
+    worst_path: str = ""
+    unbounded: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+    def cycles_to_s(self, cycles: float) -> float:
+        return cycles * 4.0 / self.clock_hz
+
+    def timeout_s(self, cmd: int) -> Optional[float]:
+        """Minimum safe time to wait for the answer to 'cmd' (None: no bound)."""
+        b = self.commands.get(int(cmd) & 0xFF)
+        return None if b is None else b.response_s
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["commands"] = {f"0x{c:02X}": asdict(b) for c, b in sorted(self.commands.items())}
+        d["silent"] = [f"0x{c:02X}" for c in self.silent]
+        return d
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "LatencyReport":
+        d = dict(d)
+        commands = {int(k, 16): CommandBound(**v) for k, v in d.pop("commands", {}).items()}
+        silent = [int(c, 16) for c in d.pop("silent", [])]
+        rep = cls(**d)
+        rep.commands, rep.silent = commands, silent
+        return rep
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "LatencyReport":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+# ------------------------------------------------------------------------------
+# Analyzer
+# ------------------------------------------------------------------------------
+class LatencyAnalyzer:
+    """
+    Worst-case response latency of 'program' at 'clock_hz'.
+    'assumptions' fixes input pins: {PORTx: (mask, bits)}.
+    """
+
+    def __init__(self, program: Program, clock_hz: float = 4e6,
+                 assumptions: Optional[Dict[int, Tuple[int, int]]] = None, board: str = ""):
+        self.program = program
+        self.board = board or program.name
+        self.clock_hz = float(clock_hz)
+        self.assumptions = dict(assumptions or {})
+        image = program.image()
+        self.code = [decode(w) for w in image]
+        self.bank_map = chip.bank_map()
+        self.warnings: List[str] = []
+
+        self._polls = {pc for pc, (op, f, b) in enumerate(self.code)
+                       if op in (OP_BTFSC, OP_BTFSS) and f == chip.PIR1 and b == chip.RCIF
+                       and pc in program.words}
+        self._leaders, self._heads = self._find_leaders()
+        self._pcl_writers = {pc for pc in program.words if self._writes_pcl(pc)}
+        self._reach: Dict[int, bool] = {}
+        self._summaries: Dict[int, List[Tuple[Tuple, List]]] = {}
+        self._base = _Base()
+
+    # --------------------------------------------------------------------------
+    # Control flow
+    # --------------------------------------------------------------------------
+    def _table(self, pc: int) -> List[int]:
+        """Entries of the jump table following a computed jump at 'pc'."""
+        out, a = [], pc + 1
+        while a in self.program.words and self.code[a][0] in (OP_RETLW, OP_RETURN, OP_GOTO):
+            out.append(a)
+            a += 1
+        return out
+
+    def _successors(self, pc: int) -> List[int]:
+        op, f, b = self.code[pc]
+        if op in (OP_RETURN, OP_RETLW, OP_RETFIE, OP_SLEEP):
+            return []
+        if op == OP_GOTO:
+            return [f]
+        if op in (OP_BTFSC, OP_BTFSS, OP_DECFSZ, OP_INCFSZ):
+            return [pc + 1, pc + 2]
+        if self._writes_pcl(pc):
+            return self._table(pc)
+        return [pc + 1]
+
+    def _writes_pcl(self, pc: int) -> bool:
+        op, f, d = self.code[pc]
+        if f != chip.PCL:
+            return False
+        return op == OP_MOVWF or (op in (OP_ADDWF, OP_IORWF, OP_ANDWF, OP_XORWF, OP_SUBWF, OP_INCF,
+                                         OP_DECF, OP_MOVF, OP_COMF, OP_RLF, OP_RRF, OP_SWAPF) and d)
+
+    def _find_leaders(self):
+        leaders, heads = set(), set()
+        for pc in self.program.words:
+            op, f, b = self.code[pc]
+            if op == OP_CALL:
+                leaders.update((f, pc + 1))
+            succ = self._successors(pc)
+            if len(succ) != 1 or op == OP_GOTO:
+                leaders.update(succ)
+            if op == OP_GOTO and f <= pc:
+                heads.add(f)
+        return leaders, heads
+
+    def _reaches_poll(self, entry: int) -> bool:
+        """Whether a function (and what it calls) contains an RCIF poll."""
+        if entry in self._reach:
+            return self._reach[entry]
+        self._reach[entry] = False          # Recursion guard
+        seen, todo, found = set(), [entry], False
+        while todo and not found:
+            pc = todo.pop()
+            if pc in seen or pc not in self.program.words:
+                continue
+            seen.add(pc)
+            if pc in self._polls:
+                found = True
+            op, f, b = self.code[pc]
+            if op == OP_CALL and self._reaches_poll(f):
+                found = True
+            todo.extend(self._successors(pc))
+        self._reach[entry] = found
+        return found
+
+    # --------------------------------------------------------------------------
+    # Register file
+    # --------------------------------------------------------------------------
+    def _addrs(self, p: _Path, f: int) -> List[int]:
+        """Canonical addresses a file register operand can refer to."""
+        if f in (chip.INDF, chip.PCL, chip.STATUS, chip.FSR, chip.PCLATH, chip.INTCON) or f >= 0x70:
+            return [f]
+        bank = p.get("BANK")
+        if bank[2] & 3 == 3:
+            return [self.bank_map[((bank[3] & 3) << 7) | f]]
+        # RP1:RP0 not known: every bank it can be
+        banks = [n for n in range(4) if (n & bank[2]) == (bank[3] & bank[2] & 3)]
+        return sorted({self.bank_map[(n << 7) | f] for n in banks})
+
+    def _read(self, p: _Path, f: int) -> Val:
+        addrs = self._addrs(p, f)
+        v = self._read_one(p, addrs[0])
+        for a in addrs[1:]:
+            v = _join(v, self._read_one(p, a))
+        return v
+
+    def _read_one(self, p: _Path, a: int) -> Val:
+        if a == chip.STATUS:
+            bank = p.get("BANK")
+            km, kb = 0x18 | (bank[2] << 5), 0x18 | (bank[3] << 5)
+            for bit, name in ((0, "C"), (1, "DC"), (2, "Z")):
+                v = p.get(name)
+                if v is not None:
+                    km |= 1 << bit
+                    kb |= v << bit
+            return _mk(0, 0xFF, km, kb)
+        if a in _PORTS:
+            tris = p.get(a | 0x80)
+            latch = p.get(a)
+            out_known = tris[2] & ~tris[3]                  # Known to be outputs
+            km, kb = out_known & latch[2], latch[3] & out_known & latch[2]
+            mask, bits = self.assumptions.get(a, (0, 0))
+            inputs = mask & tris[2] & tris[3]               # Known inputs with an assumed level
+            return _mk(0, 0xFF, km | inputs, kb | (bits & inputs))
+        if a in (chip.TMR0, chip.TMR1L, chip.TMR1H, chip.ADRESH, chip.ADRESL, chip.INDF):
+            return TOP
+        if a == chip.RCREG:
+            rx = p.get("rx")
+            if rx is None:
+                return TOP
+            p.set("rx", None)
+            return const(rx)
+        if a == chip.PCL:
+            return const(p.pc & 0xFF)
+        v = p.get(a)
+        if a == chip.ADCON0:
+            go = 1 if p.cycle < p.get("adc") else 0
+            return _mk(0, 0xFF, v[2] | (1 << chip.GO), (v[3] & ~(1 << chip.GO)) | (go << chip.GO))
+        if a == chip.PIR1:
+            txif = 1 if p.cycle >= p.get("hold") else 0
+            m = (1 << chip.TXIF) | (1 << chip.RCIF)
+            return _mk(0, 0xFF, (v[2] | m) & ~(1 << chip.RCIF), (v[3] & ~m) | (txif << chip.TXIF))
+        if a == chip.TXSTA:
+            trmt = 1 if p.cycle >= p.get("tsr") else 0
+            m = 1 << chip.TRMT
+            return _mk(0, 0xFF, v[2] | m, (v[3] & ~m) | (trmt << chip.TRMT))
+        if a == chip.RCSTA:
+            m = (1 << chip.OERR) | (1 << chip.FERR)         # Assumed: no receive errors
+            return _mk(0, 0xFF, v[2] | m, v[3] & ~m)
+        return v
+
+    def _write(self, p: _Path, f: int, v: Val) -> None:
+        addrs = self._addrs(p, f)
+        for a in addrs:
+            self._write_one(p, a, v if len(addrs) == 1 else _join(v, self._read_one(p, a)))
+
+    def _write_one(self, p: _Path, a: int, v: Val) -> None:
+        if a == chip.STATUS:
+            p.set("BANK", _mk(0, 7, (v[2] >> 5) | 0xF8, v[3] >> 5))
+            for bit, name in ((0, "C"), (1, "DC"), (2, "Z")):
+                p.flag(name, (v[3] >> bit) & 1 if v[2] >> bit & 1 else None)
+            return
+        if a == chip.INDF:
+            raise Unbounded(f"indirect write at {self.program.label_at(p.pc)} is not supported")
+        if a == chip.TXREG:
+            self._transmit(p)
+        elif a == chip.ADCON0:
+            if v[2] >> chip.GO & 1 and v[3] >> chip.GO & 1:
+                if p.cycle >= p.get("adc"):
+                    p.set("adc", p.cycle + self._adc_cycles(p, v))
+            elif v[2] >> chip.GO & 1:
+                p.set("adc", 0)
+            v = _mk(0, 0xFF, v[2], v[3] & ~(1 << chip.GO))
+        p.set(a, v)
+
+    def _transmit(self, p: _Path) -> None:
+        frame = 1 + 10 * self._bit_cycles(p)
+        tsr = p.get("tsr")
+        if p.cycle >= tsr:
+            p.set("tsr", p.cycle + frame)
+            p.set("hold", p.cycle + 1)
+        else:
+            p.set("hold", tsr)
+            p.set("tsr", tsr + frame)
+        if p.answer is None:
+            p.answer = p.cycle
+
+    def _bit_cycles(self, p: _Path) -> int:
+        spbrg, txsta = p.get(chip.SPBRG), p.get(chip.TXSTA)
+        if not _is_const(spbrg) or not txsta[2] >> chip.BRGH & 1:
+            raise Unbounded("baud rate (SPBRG/BRGH) not known when transmitting")
+        return chip.uart_bit_cycles(spbrg[0], txsta[3])
+
+    def _adc_cycles(self, p: _Path, adcon0: Val) -> int:
+        adcon1 = p.get(chip.ADCON1)
+        cands = [c for c in range(4) if (c << 6) & adcon0[2] == adcon0[3] & adcon0[2] & 0xC0]
+        div2 = [0, 1] if not adcon1[2] >> chip.ADCS2 & 1 else [adcon1[3] >> chip.ADCS2 & 1]
+        return max(chip.adc_conversion_cycles(c << 6, d << chip.ADCS2, self.clock_hz)
+                   for c in cands for d in div2)
+
+    # --------------------------------------------------------------------------
+    # Exploration
+    # --------------------------------------------------------------------------
+    def _explore(self, root: _Path, mode: str, byte: Optional[int] = None) -> List[_Path]:
+        """
+        Runs every path from 'root' and returns the paths where they ended:
+        "init": at the first poll, "frame": at the return of the function,
+        "poll": at the next poll after the one the exploration starts at
+        (which sees RCIF = 1 with 'byte', or RCIF = 0 if 'byte' is None;
+        _ANY_BYTE is a received byte of any value).
+        """
+        todo, ends, seen = [root], [], {}
+        steps = 0
+        while todo:
+            p = todo.pop()
+            while True:
+                steps += 1
+                if steps > MAX_STEPS:
+                    raise Unbounded(f"step limit reached near {self.program.label_at(p.pc)}")
+                pc = p.pc
+                if pc in self._leaders and not self._visit(p, seen):
+                    break
+                if pc in self._polls and mode != "frame" and self._is_pir1(p):
+                    if mode == "init" or p.start is not None:
+                        ends.append(p)
+                        break
+                    p.start = p.cycle
+                    if byte is not None and byte != _ANY_BYTE:
+                        p.set("rx", byte)
+                    op = self.code[pc][0]
+                    rcif = byte is not None
+                    p.cycle += 2 if (op == OP_BTFSS) == rcif else 1
+                    p.pc = pc + (2 if (op == OP_BTFSS) == rcif else 1)
+                    continue
+                status = self._step(p, todo)
+                if status == "end":
+                    ends.append(p)
+                    break
+                if status == "dead":
+                    break
+        return ends
+
+    def _is_pir1(self, p: _Path) -> bool:
+        return chip.PIR1 in self._addrs(p, chip.PIR1)
+
+    def _visit(self, p: _Path, seen: Dict) -> bool:
+        """Pruning at a join point; False if an equal state was already explored."""
+        key = p.key()
+        pc = p.pc
+        if pc in self._heads:
+            last = p.heads.get(pc)
+            count = 1 if last is None else last[1] + 1
+            if last is not None and last[0] == key[1:]:
+                raise Unbounded(f"loop at {self.program.label_at(pc)} can run forever")
+            if count > MAX_LOOP_VISITS:
+                raise Unbounded(f"no bound found for the loop at {self.program.label_at(pc)}")
+            p.heads[pc] = (key[1:], count)
+        base = p.start if p.start is not None else 0
+        cost = (p.cycle - base, -1 if p.answer is None else p.answer - base)
+        old = seen.get(key)
+        if old is not None and cost[0] <= old[0] and cost[1] <= old[1]:
+            return False
+        seen[key] = cost if old is None else (max(cost[0], old[0]), max(cost[1], old[1]))
+        return True
+
+    def _fork(self, p: _Path, todo: List[_Path], alt_pc: int, alt_cycles: int, refine=None) -> None:
+        q = p.copy()
+        q.pc, q.cycle = alt_pc, q.cycle + alt_cycles
+        if refine is None or refine(q):
+            todo.append(q)
+
+    def _step(self, p: _Path, todo: List[_Path]) -> str:
+        """Executes one instruction; 'end', 'dead' or '' (continue)."""
+        pc = p.pc
+        if pc not in self.program.words:
+            raise Unbounded(f"execution reaches unprogrammed address 0x{pc:04X}")
+        op, f, d = self.code[pc]
+        p.pc = pc + 1
+        p.cycle += 1
+        if pc in self._pcl_writers:
+            return self._computed_jump(p, todo, pc)
+
+        if op == OP_MOVLW:
+            p.set("W", const(f))
+        elif op == OP_MOVWF:
+            self._write(p, f, p.get("W"))
+            p.wsrc = self._name(p, f)
+        elif op == OP_MOVF:
+            v = self._read(p, f)
+            self._result(p, f, d, v)
+            p.flag("Z", _zero(v), ("eq", self._name(p, f), 0, False))
+            if not d:
+                p.wsrc = self._name(p, f)
+        elif op in (OP_CLRF, OP_CLRW):
+            self._result(p, f, op == OP_CLRF, const(0))
+            p.flag("Z", 1)
+        elif op in (OP_ADDWF, OP_SUBWF, OP_ADDLW, OP_SUBLW):
+            self._arith(p, op, f, d)
+        elif op in (OP_ANDWF, OP_IORWF, OP_XORWF, OP_ANDLW, OP_IORLW, OP_XORLW):
+            self._logic(p, op, f, d)
+        elif op in (OP_INCF, OP_DECF, OP_INCFSZ, OP_DECFSZ):
+            v = self._read(p, f)
+            step = 1 if op in (OP_INCF, OP_INCFSZ) else -1
+            r = _wrap(v[0] + step, v[1] + step) if not _is_const(v) else const(v[0] + step)
+            if op in (OP_INCF, OP_DECF):
+                self._result(p, f, d, r)
+                p.flag("Z", _zero(r))
+            else:
+                z = _zero(r)
+                if z is None:
+                    # Fork: the skip path sees 0, the other path anything else
+                    def skip(q, f=f, d=d):
+                        self._result(q, f, d, const(0))
+                        return True
+                    self._fork(p, todo, pc + 2, 1, skip)
+                    r = _mk(max(r[0], 1), r[1], r[2], r[3]) or r
+                    self._result(p, f, d, r)
+                else:
+                    self._result(p, f, d, r)
+                    if z:
+                        p.pc, p.cycle = pc + 2, p.cycle + 1
+        elif op in (OP_COMF, OP_SWAPF, OP_RLF, OP_RRF):
+            self._rotate(p, op, f, d)
+        elif op in (OP_BCF, OP_BSF):
+            v = self._read(p, f)
+            m = 1 << d
+            km, kb = v[2] | m, (v[3] | m) if op == OP_BSF else (v[3] & ~m)
+            self._write(p, f, _mk(0, 0xFF, km, kb))
+        elif op in (OP_BTFSC, OP_BTFSS):
+            return self._bit_test(p, todo, pc, op, f, d)
+        elif op == OP_GOTO:
+            p.pc, p.cycle = f, p.cycle + 1
+        elif op == OP_CALL:
+            p.cycle += 1
+            if self._reaches_poll(f):
+                p.stack = p.stack + (pc + 1,)
+                p.pc = f
+            else:
+                return self._call(p, todo, f)
+        elif op in (OP_RETURN, OP_RETLW, OP_RETFIE):
+            p.cycle += 1
+            if op == OP_RETLW:
+                p.set("W", const(f))
+            if not p.stack:
+                return "end"
+            p.pc, p.stack = p.stack[-1], p.stack[:-1]
+        elif op == OP_SLEEP:
+            raise Unbounded(f"SLEEP at {self.program.label_at(pc)}")
+        elif op in (OP_NOP, OP_CLRWDT):
+            pass
+        return ""
+
+    def _name(self, p: _Path, f: int):
+        addrs = self._addrs(p, f)
+        return addrs[0] if len(addrs) == 1 else None
+
+    def _result(self, p: _Path, f: int, d: int, v: Val) -> None:
+        if d:
+            self._write(p, f, v)
+        else:
+            p.set("W", v)
+
+    def _arith(self, p: _Path, op: int, f: int, d: int) -> None:
+        w = p.get("W")
+        if op in (OP_ADDLW, OP_SUBLW):
+            a, d, reg = const(f), 0, None
+        else:
+            a, reg = self._read(p, f), self._name(p, f)
+        if op in (OP_ADDWF, OP_ADDLW):
+            lo, hi = a[0] + w[0], a[1] + w[1]
+            r = const(lo) if lo == hi else _wrap(lo, hi)
+            c = 1 if lo >= 256 else (0 if hi < 256 else None)
+            z = _zero(r) if _is_const(r) or not (lo <= 256 <= hi) else None
+            dc = (((a[0] & 0xF) + (w[0] & 0xF)) >> 4) if lo == hi else None
+            reason_c = reason_z = None
+        else:
+            # a - W; C = no borrow (a >= W)
+            lo, hi = a[0] - w[1], a[1] - w[0]
+            r = const(lo) if lo == hi else _wrap(lo, hi)
+            c = 1 if lo >= 0 else (0 if hi < 0 else None)
+            z = _zero(r) if _is_const(r) or not (lo <= 0 <= hi) else None
+            dc = int((a[0] & 0xF) >= (w[0] & 0xF)) if lo == hi else None
+            reason_c = reason_z = None
+            if _is_const(w) and reg is not None and not d:
+                # W = f - k: narrowing f also narrows W
+                reason_c, reason_z = ("ge", reg, w[0], True), ("eq", reg, w[0], True)
+            elif op == OP_SUBLW and p.wsrc is not None:
+                reason_c, reason_z = ("le", p.wsrc, f, False), ("eq", p.wsrc, f, False)
+        self._result(p, f, d, r)
+        p.flag("C", c, reason_c)
+        p.flag("DC", dc)
+        p.flag("Z", z, reason_z)
+
+    def _logic(self, p: _Path, op: int, f: int, d: int) -> None:
+        w = p.get("W")
+        if op in (OP_ANDLW, OP_IORLW, OP_XORLW):
+            a, d = const(f), 0
+        else:
+            a = self._read(p, f)
+        src = p.wsrc
+        if op in (OP_ANDWF, OP_ANDLW):
+            km = (a[2] & w[2]) | (a[2] & ~a[3]) | (w[2] & ~w[3])
+            r = _mk(0, min(a[1], w[1]), km, a[3] & w[3] & km)
+        elif op in (OP_IORWF, OP_IORLW):
+            km = (a[2] & w[2]) | a[3] | w[3]
+            r = _mk(max(a[0], w[0]), 0xFF, km, a[3] | w[3])
+        else:
+            km = a[2] & w[2]
+            r = _mk(0, 0xFF, km, (a[3] ^ w[3]) & km)
+        reason = None
+        if op == OP_XORLW and src is not None:
+            reason = ("eq", src, f, False)
+        elif not d:
+            reason = ("eq", "W", 0, False)
+        self._result(p, f, d, r)
+        p.flag("Z", _zero(r), reason)
+
+    def _rotate(self, p: _Path, op: int, f: int, d: int) -> None:
+        v = self._read(p, f)
+        km, kb = v[2], v[3]
+        if op == OP_COMF:
+            r = _mk(0xFF - v[1], 0xFF - v[0], km, ~kb & km)
+            self._result(p, f, d, r)
+            p.flag("Z", _zero(r))
+            return
+        if op == OP_SWAPF:
+            sw = lambda x: ((x << 4) | (x >> 4)) & 0xFF
+            self._result(p, f, d, _mk(0, 0xFF, sw(km), sw(kb)))
+            return
+        c = p.get("C")
+        cm, cb = (1, c) if c is not None else (0, 0)
+        if op == OP_RLF:
+            out = (kb >> 7) & 1 if km & 0x80 else None
+            nkm, nkb = ((km << 1) | cm) & 0xFF, ((kb << 1) | cb) & 0xFF
+        else:
+            out = kb & 1 if km & 1 else None
+            nkm, nkb = (km >> 1) | (cm << 7), (kb >> 1) | (cb << 7)
+        self._result(p, f, d, _mk(0, 0xFF, nkm, nkb))
+        p.flag("C", out)
+
+    def _bit_test(self, p: _Path, todo: List[_Path], pc: int, op: int, f: int, bit: int) -> str:
+        v = self._read(p, f)
+        m = 1 << bit
+        val = (v[3] >> bit) & 1 if v[2] & m else None
+        skip_if = 1 if op == OP_BTFSS else 0
+        if val is not None:
+            if val == skip_if:
+                p.pc, p.cycle = pc + 2, p.cycle + 1
+            return ""
+        # Unknown: follow both ways, each with the bit (and what it means) known
+        name = {chip.Z: "Z", chip.C: "C", chip.DC: "DC"}.get(bit) if f == chip.STATUS else None
+        target = self._name(p, f)
+
+        reason = p.reasons.get(name) if name is not None else None
+
+        def refine(q: _Path, value: int) -> bool:
+            if name is not None:
+                q.set(name, value)
+                return reason is None or self._apply_reason(q, reason, value)
+            if target is None or target in _VOLATILE:
+                return True
+            cur = q.get(target)
+            new = _mk(cur[0], cur[1], cur[2] | m, (cur[3] & ~m) | (value << bit))
+            if new is None:
+                return False
+            q.set(target, new)
+            return True
+
+        self._fork(p, todo, pc + 2, 1, lambda q: refine(q, skip_if))
+        if not refine(p, 1 - skip_if):
+            return "dead"
+        return ""
+
+    @staticmethod
+    def _apply_reason(q: _Path, reason, value: int) -> bool:
+        """Narrows the register a flag was computed from; False if impossible."""
+        kind, name, k, w_diff = reason
+        if name is None:
+            return True
+        cur = q.get(name)
+        lo, hi, km, kb = cur
+        if kind == "eq":
+            new = _mk(max(lo, k), min(hi, k), km, kb) if value else _mk(
+                lo + (lo == k), hi - (hi == k), km, kb)
+        elif kind == "ge":
+            new = _mk(max(lo, k), hi, km, kb) if value else _mk(lo, min(hi, k - 1), km, kb)
+        else:   # "le"
+            new = _mk(lo, min(hi, k), km, kb) if value else _mk(max(lo, k + 1), hi, km, kb)
+        if new is None:
+            return False
+        q.mem[name] = new               # Same value, only narrowed: not a write
+        if w_diff:
+            q.mem["W"] = _wrap(new[0] - k, new[1] - k)
+        return True
+
+    def _computed_jump(self, p: _Path, todo: List[_Path], pc: int) -> str:
+        """Writes to PCL: one path per reachable entry of the jump table."""
+        op = self.code[pc][0]
+        if op not in (OP_ADDWF, OP_MOVWF):
+            raise Unbounded(f"computed jump at {self.program.label_at(pc)} is not supported")
+        w = p.get("W")
+        pclath = p.get(chip.PCLATH)
+        if not _is_const(pclath):
+            raise Unbounded(f"computed jump at {self.program.label_at(pc)} with unknown PCLATH")
+        table = self._table(pc)
+        if op == OP_ADDWF:
+            offsets = range(w[0], w[1] + 1)
+            targets = [((pclath[0] & 0x1F) << 8) | ((pc + 1 + o) & 0xFF) for o in offsets]
+        else:
+            targets = [((pclath[0] & 0x1F) << 8) | v for v in range(w[0], w[1] + 1)]
+        valid = [t for t in targets if t in table]
+        if len(valid) < len(targets):
+            self._warn(f"jump table at {self.program.label_at(pc)}: index {w[0]}..{w[1]} "
+                       f"can leave the {len(table)} entries (only the table is analysed)")
+        if any(t < pc for t in valid):
+            self._warn(f"jump table at {self.program.label_at(pc)} crosses a 256-word page")
+        if not valid:
+            return "dead"
+        for t in valid[1:]:
+            self._fork(p, todo, t, 1)
+        p.pc, p.cycle = valid[0], p.cycle + 1
+        return ""
+
+    def _warn(self, text: str) -> None:
+        if text not in self.warnings:
+            self.warnings.append(text)
+
+    # --------------------------------------------------------------------------
+    # Function summaries
+    # --------------------------------------------------------------------------
+    def _call(self, p: _Path, todo: List[_Path], entry: int) -> str:
+        outcomes = self._summary(entry, p)
+        ret, base = p.pc, p.cycle
+        for i, (cycles, answer, writes) in enumerate(outcomes):
+            q = p if i == len(outcomes) - 1 else p.copy()
+            q.wsrc = None
+            for n, v in writes:
+                if isinstance(v, _Join):
+                    v = _join(q.get(n), base + v.v if n in _TIME else v.v, n)
+                elif n in _TIME:
+                    v = base + v
+                q.set(n, v)
+            q.reasons.clear()
+            q.pc, q.cycle = ret, base + cycles
+            if answer is not None and q.answer is None:
+                q.answer = base + answer
+            if q is not p:
+                todo.append(q)
+        return "" if outcomes else "dead"
+
+    def _summary(self, entry: int, p: _Path):
+        for key, outcomes in self._summaries.get(entry, ()):
+            if all(self._frame_value(p, n) == v for n, v in key):
+                return outcomes
+        frame = _Frame(p, p.cycle)
+        ends = self._explore(_Path(entry, frame), "frame")
+        groups: Dict[Tuple, List] = {}
+        for e in ends:
+            writes = tuple(sorted(((n, e.mem[n]) for n in e.written), key=repr))
+            k = (writes, e.answer is None)
+            old = groups.get(k)
+            ans = e.answer
+            if old is None:
+                groups[k] = [e.cycle, ans, writes]
+            else:
+                old[0] = max(old[0], e.cycle)
+                old[1] = None if ans is None else max(old[1], ans)
+        outcomes = [tuple(g) for g in groups.values()]
+        if len(outcomes) > MAX_OUTCOMES:
+            outcomes = self._merge(outcomes)
+        self._summaries.setdefault(entry, []).append((tuple(frame.reads.items()), outcomes))
+        return outcomes
+
+    @staticmethod
+    def _frame_value(p: _Path, name):
+        v = p.get(name)
+        return max(0, v - p.cycle) if name in _TIME else v
+
+    @staticmethod
+    def _merge(outcomes):
+        """Joins outcomes into one per (answered, received byte) group."""
+        groups: Dict[Tuple, List] = {}
+        for o in outcomes:
+            w = dict(o[2])
+            groups.setdefault((o[1] is None, w.get("rx", "-")), []).append(o)
+        merged = []
+        for group in groups.values():
+            names = set()
+            for o in group:
+                names.update(n for n, _ in o[2])
+            writes = []
+            for n in sorted(names, key=repr):
+                values = [dict(o[2]).get(n, _Join) for o in group]
+                present = [v for v in values if v is not _Join]
+                v = present[0]
+                for x in present[1:]:
+                    v = _join(v, x, n)
+                writes.append((n, _Join(v) if len(present) < len(values) else v))
+            answers = [o[1] for o in group if o[1] is not None]
+            merged.append((max(o[0] for o in group), max(answers) if answers else None, tuple(writes)))
+        return merged
+
+    # --------------------------------------------------------------------------
+    # Analysis
+    # --------------------------------------------------------------------------
+    def _reset_base(self) -> _Base:
+        values = {}
+        for a in range(chip.DATA_BYTES):
+            c = self.bank_map[a]
+            if (c & 0x7F) < 0x20 and c not in _PORTS and c not in values:
+                values[c] = const(chip.RESET_VALUES.get(c, 0))
+        values.pop(chip.STATUS, None)
+        values["BANK"] = const(0)
+        return _Base(values)
+
+    def _end_values(self, ends: List[_Path], source: Dict, states: Dict[Tuple[int, ...], Dict]) -> None:
+        """
+        Joins the registers at the polls where 'ends' stopped (explored from
+        the values 'source') into the state of that poll.
+        """
+        for e in ends:
+            full = dict(source)
+            full.update(e.mem)
+            full.pop("rx", None)
+            full.pop("tsr", None)           # Transmitter idle at a poll (see above)
+            full.pop("hold", None)
+            if "adc" in full:
+                full["adc"] = max(0, full["adc"] - e.cycle)
+            into = states.get((e.pc, e.stack))
+            if into is None:
+                states[(e.pc, e.stack)] = full
+                continue
+            for n in set(into) | set(full):
+                into[n] = _join(into.get(n, _default(n)), full.get(n, _default(n)), n)
+
+    @staticmethod
+    def _widen(old: Dict, new: Dict) -> Dict:
+        """Interval widening: a bound that still moves goes to the end of the range."""
+        out = dict(new)
+        for n, v in new.items():
+            o = old.get(n)
+            if isinstance(v, tuple) and isinstance(o, tuple) and v != o:
+                out[n] = _mk(0 if v[0] < o[0] else v[0], 0xFF if v[1] > o[1] else v[1], v[2], v[3])
+        return out
+
+    def analyze(self) -> LatencyReport:
+        rep = LatencyReport(board=self.board, clock_hz=self.clock_hz, baudrate=0.0, bit_cycles=0,
+                            poll_interval_cycles=None, busy_interval_cycles=None, wait_cycles=None,
+                            isr_cycles=0, isr_period_cycles=None, min_gap_s=None)
+        if not self._polls:
+            rep.unbounded.append("no UART receive poll (RCIF) found")
+            return rep
+
+        # 1. Initialization: from reset to the first poll
+        reset = self._reset_base()
+        init = self._explore(_Path(0, _Frame(reset, 0)), "init")
+        states: Dict[Tuple[int, Tuple[int, ...]], Dict] = {}
+        self._end_values(init, reset.values, states)
+
+        # 2. The main loop, poll to poll, until the registers at every poll are
+        # stable. Any received byte is one symbolic byte here; the 256 bytes
+        # one by one only once, in the last round.
+        try:
+            for rnd in range(MAX_ROUNDS):
+                new = {poll: dict(state) for poll, state in states.items()}
+                for poll, state in states.items():
+                    for byte in (None, _ANY_BYTE):
+                        self._end_values(self._poll_ends(poll, state, byte), state, new)
+                if rnd >= 2:
+                    new = {poll: self._widen(states.get(poll, {}), state) for poll, state in new.items()}
+                if new == states:
+                    break
+                states = new
+            else:
+                raise Unbounded(f"register values at the polls not stable after {MAX_ROUNDS} rounds")
+            idle, busy, answers, worst = self._loop_round(states)
+        except Unbounded as e:
+            rep.unbounded.append(str(e))
+        rep.warnings = self.warnings
+        if rep.unbounded:
+            return rep
+
+        state = {}
+        for values in states.values():
+            for n, v in values.items():
+                state[n] = _join(state[n], v, n) if n in state else v
+        frame_cycles = self._frame_cycles(state)
+        rep.bit_cycles = frame_cycles // 10
+        rep.baudrate = self.clock_hz / 4.0 / rep.bit_cycles
+        rep.worst_path = worst[1]
+
+        rep.poll_interval_cycles, rep.busy_interval_cycles = idle, busy
+        wait = max(idle, busy)
+
+        # 3. Interrupts
+        isr, period = self._interrupts(state)
+        rep.isr_cycles, rep.isr_period_cycles = isr, period
+        rep.wait_cycles = wait
+        rep.min_gap_s = rep.cycles_to_s(self._with_interrupts(wait, isr, period))
+
+        for cmd, answer in sorted(answers.items()):
+            if answer is None:
+                rep.silent.append(cmd)
+                continue
+            # Command on the wire, wait for the poll, service, answer on the wire
+            service, burst = answer
+            total = frame_cycles + self._with_interrupts(wait + service + 1 + burst, isr, period) + frame_cycles
+            rep.commands[cmd] = CommandBound(cmd, service, total, rep.cycles_to_s(total), burst)
+        return rep
+
+    def _poll_ends(self, poll: Tuple[int, Tuple[int, ...]], state: Dict, byte) -> List[_Path]:
+        """Paths from the poll at (pc, return stack) to the next poll."""
+        pc, stack = poll
+        try:
+            return self._explore(_Path(pc, _Frame(_Base(state), 0), stack), "poll", byte)
+        except Unbounded as e:
+            raise Unbounded(f"{self._where(pc, stack)}: {e}") from None
+
+    def _loop_round(self, states: Dict):
+        """Longest idle and busy poll intervals and the service time of every byte."""
+        idle, busy, answers, worst = 0, 0, {}, (-1, "")
+        for poll, state in states.items():
+            for byte in [None] + list(range(256)):
+                ends = self._poll_ends(poll, state, byte)
+                what = "idle" if byte is None else f"0x{byte:02X}"
+                for e in ends:
+                    span = e.cycle - e.start
+                    if byte is None:
+                        idle = max(idle, span)
+                    else:
+                        # The next command is sent after the last answer byte
+                        if e.answer is not None and e.answer >= e.start:
+                            span = max(0, e.cycle - max(e.start, e.mem["tsr"]))
+                        busy = max(busy, span)
+                    if span > worst[0]:
+                        worst = (span, f"{self._where(*poll)} -> {self._where(e.pc, e.stack)} ({what})")
+                if byte is None:
+                    continue
+                done = [e for e in ends if e.answer is not None and e.answer >= e.start]
+                if done and len(done) < len(ends):
+                    self._warn(f"byte 0x{byte:02X} is answered on some paths only")
+                if not done:
+                    answers.setdefault(byte, None)
+                    continue
+                service = max(e.answer - e.start for e in done)
+                # Last stop bit out minus that of a single byte answer
+                burst = max(e.mem["tsr"] - e.answer - 1 - 10 * self._bit_cycles(e) for e in done)
+                prev = answers.get(byte) or (0, 0)
+                answers[byte] = (max(prev[0], service), max(prev[1], burst))
+        return idle, busy, answers, worst
+
+    def _where(self, pc: int, stack: Tuple[int, ...]) -> str:
+        """Where a poll is: the call that leads to it, or the poll itself."""
+        return self.program.label_at(stack[-1] - 1 if stack else pc)
+
+    def _frame_cycles(self, state: Dict) -> int:
+        spbrg, txsta = state.get(chip.SPBRG, TOP), state.get(chip.TXSTA, TOP)
+        if not _is_const(spbrg) or not txsta[2] >> chip.BRGH & 1:
+            raise Unbounded("baud rate (SPBRG/BRGH) not known after initialization")
+        return 10 * chip.uart_bit_cycles(spbrg[0], txsta[3])
+
+    def _interrupts(self, state: Dict) -> Tuple[int, Optional[int]]:
+        """(cycles of one interrupt, shortest period) with the loop's INTCON/OPTION."""
+        intcon = state.get(chip.INTCON, TOP)
+        bit = lambda v, n: (v[3] >> n) & 1 if v[2] >> n & 1 else None
+        if bit(intcon, chip.GIE) == 0:
+            return 0, None
+        ends = self._explore(_Path(4, _Frame(_Base(), 0)), "frame")
+        isr = INTERRUPT_LATENCY + max((e.cycle for e in ends), default=0)
+        period = None
+        if bit(intcon, chip.T0IE) != 0:
+            option = state.get(chip.OPTION_REG, TOP)
+            if bit(option, chip.T0CS) == 0 and bit(option, chip.PSA) == 0 and option[2] & 7 == 7:
+                period = 256 * (2 << (option[3] & 7))
+            elif bit(option, chip.T0CS) == 0 and bit(option, chip.PSA) == 1:
+                period = 256
+            else:
+                period = 256
+                self._warn("Timer0 source/prescaler not known: interrupt every 256 cycles assumed")
+        pie1 = state.get(chip.PIE1, TOP)
+        if bit(intcon, chip.PEIE) != 0 and pie1[3] | (~pie1[2] & 0xFF):
+            self._warn("peripheral interrupts may be enabled: counted once per window")
+            period = period or 0
+        if bit(intcon, chip.INTE) != 0 or bit(intcon, chip.RBIE) != 0:
+            self._warn("RB0/port change interrupts may be enabled: counted once per window")
+            period = period or 0
+        return isr, period
+
+    @staticmethod
+    def _with_interrupts(cycles: int, isr: int, period: Optional[int]) -> int:
+        """A window of 'cycles' stretched by every interrupt that can occur in it."""
+        if period is None or isr == 0:
+            return cycles
+        if period == 0:
+            return cycles + isr
+        if isr >= period:
+            raise Unbounded("the interrupt handler takes longer than its period")
+        total = cycles
+        for _ in range(1000):
+            new = cycles + isr * math.ceil(total / period)
+            if new == total:
+                break
+            total = new
+        return total
+
+
+def analyze_board(board: str, clock_hz: float = 4e6, asm_path: Optional[str] = None) -> LatencyReport:
+    """Static latency report of the firmware of 'board' ("board1" or "board2")."""
+    from .boards import firmware
+    analyzer = LatencyAnalyzer(firmware(board, asm_path), clock_hz, BOARD_ASSUMPTIONS.get(board), board)
+    return analyzer.analyze()
@@ -1 +1,13 @@
 from . import board1, board2
+
+# Register maps of the known boards, by name
+BOARD_MAPS = {
+    "board1": board1.REGISTER_MAP,
+    "board2": board2.REGISTER_MAP,
+}
+
+# Minimum time between two bytes sent to each board (see MIN_BYTE_GAP_S)
+BOARD_MIN_BYTE_GAP_S = {
+    "board1": board1.MIN_BYTE_GAP_S,
+    "board2": board2.MIN_BYTE_GAP_S,
+}
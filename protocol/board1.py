@@ -20,7 +20,8 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Tuple
 
-from .common import Fixed1dp, PAYLOAD_MASK_6BIT, make_set_high, make_set_low
+from .common import GET_ALL, Fixed1dp, PAYLOAD_MASK_6BIT
+from .registers import BoardMap, Register
 
 
 # ------------------------------------------------------------------------------
@@ -43,6 +44,13 @@ GET_AMBIENT_TEMP_HIGH = 0x04
 # Command to get fan speed (0x05)
 GET_FAN_SPEED_RPS = 0x05
 
+# GET_ALL (0x7F, from common.py): count 5, then the answers of 0x01..0x05
+
+# Safe time between two bytes sent to the board: its main loop polls RCIF
+# at least every 6.16 ms (static bound, tools/firmware_latency.py), so one
+# byte per poll never overruns the 2-byte receive FIFO.
+MIN_BYTE_GAP_S = 0.007
+
 # ------------------------------------------------------------------------------
 # SET COMMAND CONSTANTS
 # The protocol uses 6-bit payload for SET commands.
@@ -70,6 +78,42 @@ class AirState:
     fan_speed_rps: int = 0
 
 
+def update_fan_speed(state: AirState) -> None:
+    """
+    Fan logic of the board after a new set point [R2.1.1-5]:
+    the fan runs (30 rps) while heating is needed.
+    """
+    desired = state.desired_temp.to_float()
+    ambient = state.ambient_temp.to_float()
+    state.fan_speed_rps = 30 if desired > ambient else 0
+
+
+# ------------------------------------------------------------------------------
+# REGISTER MAP [R2.1.4-1]
+# The dispatch table, the update() sequence and the SET encoder are all
+# generated from this description. 'ttl_s': the set-point only changes by
+# our own SET, ambient temperature and fan speed change all the time.
+# ------------------------------------------------------------------------------
+REGISTER_MAP = BoardMap(
+    name="board1",
+    state_type=AirState,
+    registers=(
+        Register("desired_temp", low=GET_DESIRED_TEMP_LOW, high=GET_DESIRED_TEMP_HIGH,
+                 mask=PAYLOAD_MASK_6BIT, set_min=MIN_DESIRED_TEMP_C, set_max=MAX_DESIRED_TEMP_C,
+                 label="Desired temperature", ttl_s=30.0),
+        Register("ambient_temp", low=GET_AMBIENT_TEMP_LOW, high=GET_AMBIENT_TEMP_HIGH,
+                 mask=PAYLOAD_MASK_6BIT, ttl_s=1.0),
+        Register("fan_speed_rps", high=GET_FAN_SPEED_RPS, ttl_s=0.5),
+    ),
+    set_register="desired_temp",
+    after_set=update_fan_speed,
+    get_all=GET_ALL,
+)
+
+# One entry per command byte, used by the decoder and the simulated boards
+DISPATCH = REGISTER_MAP.dispatch
+
+
 def encode_set_desired_temp(temp_c: float) -> Tuple[int, int]:
     """
     Prepares the UART commands to set the desired temperature.
@@ -83,39 +127,12 @@ def encode_set_desired_temp(temp_c: float) -> Tuple[int, int]:
     Returns:
         Tuple (low_command, high_command)
     """
-    temp_c = round(float(temp_c), 1)
-
-    # Check validity [R2.1.2-3]
-    if not (10.0 <= temp_c <= 50.0):
-        raise ValueError("Desired temperature must be between 10.0 and 50.0")
-
-    fixed = Fixed1dp.from_float(temp_c)
-    
-    # Create the command bytes using helper functions
-    low_cmd = make_set_low(fixed.frac_digit)
-    high_cmd = make_set_high(fixed.integral)
-    
-    return low_cmd, high_cmd
+    return REGISTER_MAP.encode_set(temp_c)
 
 
 def decode_get_response(cmd: int, data_byte: int, state: AirState) -> AirState:
     """
     Updates the state object with data received from Board #1.
-    Matches the command ID with the correct variable.
+    Matches the command ID with the correct variable using DISPATCH.
     """
-    b = int(data_byte) & 0xFF
-
-    if cmd == GET_DESIRED_TEMP_LOW:
-        state.desired_temp.frac_digit = b & PAYLOAD_MASK_6BIT
-    elif cmd == GET_DESIRED_TEMP_HIGH:
-        state.desired_temp.integral = b & PAYLOAD_MASK_6BIT
-        
-    elif cmd == GET_AMBIENT_TEMP_LOW:
-        state.ambient_temp.frac_digit = b & PAYLOAD_MASK_6BIT
-    elif cmd == GET_AMBIENT_TEMP_HIGH:
-        state.ambient_temp.integral = b & PAYLOAD_MASK_6BIT
-        
-    elif cmd == GET_FAN_SPEED_RPS:
-        state.fan_speed_rps = b
-
-    return state
\ No newline at end of file
+    return REGISTER_MAP.decode(cmd, data_byte, state)
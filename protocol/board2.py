@@ -18,9 +18,12 @@ AUTHOR:
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Tuple
 
-from .common import Fixed1dp, make_set_high, make_set_low
+from .common import GET_ALL, PAYLOAD_MASK_6BIT, Fixed1dp
+from .dispatch import DispatchTable
+from .registers import RAW_MAX, BoardMap, Register
 
 
 # ------------------------------------------------------------------------------
@@ -56,6 +59,13 @@ GET_LIGHT_INTENSITY_HIGH  = 0x08
 # Default high byte command for light intensity
 GET_LIGHT_INTENSITY_HIGH_DEFAULT = 0x08
 
+# GET_ALL (0x7F, from common.py): count 8, then the answers of 0x01..0x08
+
+# Safe time between two bytes sent to the board: its main loop polls RCIF
+# only every 125.38 ms (static bound, tools/firmware_latency.py), so bytes
+# sent faster (e.g. a SET pair followed by GETs) overrun the 2-byte FIFO.
+MIN_BYTE_GAP_S = 0.13
+
 
 # ------------------------------------------------------------------------------
 # SET COMMAND DEFINITIONS [R2.2.6-1]
@@ -89,6 +99,46 @@ class CurtainState:
     light_intensity: Fixed1dp = field(default_factory=lambda: Fixed1dp(300, 0))  # Lux
 
 
+# ------------------------------------------------------------------------------
+# REGISTER MAP [R2.2.6-1]
+# The dispatch table, the update() sequence and the SET encoder are all
+# generated from this description. 'sim_value' are the start values of the
+# simulated board (raw bytes that fit the protocol), 'ttl_s' how long a
+# read value may be served from the cache.
+# ------------------------------------------------------------------------------
+REGISTER_MAP = BoardMap(
+    name="board2",
+    state_type=CurtainState,
+    registers=(
+        Register("desired_curtain", low=GET_DESIRED_CURTAIN_LOW, high=GET_DESIRED_CURTAIN_HIGH,
+                 full_scale=100.0, set_min=0.0, set_max=100.0, sim_value=32.0,
+                 label="Curtain percent", ttl_s=30.0),
+        Register("outdoor_temp", low=GET_OUTDOOR_TEMP_LOW, high=GET_OUTDOOR_TEMP_HIGH, sim_value=20.0,
+                 ttl_s=5.0),
+        Register("outdoor_press", low=GET_OUTDOOR_PRESS_LOW, high=GET_OUTDOOR_PRESS_HIGH, sim_value=101.3,
+                 ttl_s=10.0),
+        Register("light_intensity", low=GET_LIGHT_INTENSITY_LOW, high=GET_LIGHT_INTENSITY_HIGH, sim_value=200.0,
+                 ttl_s=1.0),
+    ),
+    set_register="desired_curtain",
+    get_all=GET_ALL,
+)
+
+
+@lru_cache(maxsize=None)
+def register_map(light_high_cmd: int = GET_LIGHT_INTENSITY_HIGH_DEFAULT) -> BoardMap:
+    """
+    Register map for a given light high command. The fixed command (0x08)
+    is still answered, other GETs win if the codes collide.
+    """
+    return REGISTER_MAP.with_high_code("light_intensity", light_high_cmd)
+
+
+def dispatch_table(light_high_cmd: int = GET_LIGHT_INTENSITY_HIGH_DEFAULT) -> DispatchTable:
+    """Returns the 256-entry dispatch table of Board #2."""
+    return register_map(light_high_cmd).dispatch
+
+
 # ------------------------------------------------------------------------------
 # HELPER FUNCTIONS
 # ------------------------------------------------------------------------------
@@ -114,35 +164,22 @@ def encode_set_desired_curtain(percent: float, mode: str = "scaled_0_63") -> Tup
     if mode not in ("raw_0_63", "scaled_0_63"):
         raise ValueError("mode must be 'raw_0_63' or 'scaled_0_63'")
 
+    # Scaling (0-100% -> 0-63) and range checks come from REGISTER_MAP
+    return REGISTER_MAP.encode_set(percent, scaled=(mode == "scaled_0_63"))
+
+
+def curtain_stop_position(percent: float, mode: str = "scaled_0_63") -> float:
+    """
+    Curtain status the motor stops at after a SET of 'percent', in the
+    units of 'mode' (% when scaled, the raw 0-63 step otherwise).
+    The board moves in whole steps: it keeps only the integral part of the
+    0-63 value, so e.g. 50 % (31.5) stops at step 31 = 49.2 %.
+    """
+    _, high_cmd = encode_set_desired_curtain(percent, mode=mode)
+    step = high_cmd & PAYLOAD_MASK_6BIT
     if mode == "raw_0_63":
-        # Direct raw value mode (for debugging specific PIC values)
-        v = round(float(percent), 1)
-        if not (0.0 <= v <= 63.0):
-            raise ValueError("raw_0_63 mode requires 0.0 <= value <= 63.0")
-        fixed = Fixed1dp.from_float(v)
-        
-        # Create command bytes: 10xxxxxx (Low) and 11xxxxxx (High)
-        low_cmd = make_set_low(fixed.frac_digit)
-        high_cmd = make_set_high(fixed.integral)
-        return low_cmd, high_cmd
-
-
-    # scaled_0_63 mode: Normal Operation
-    # Scale the percentage (0-100) to the PIC's internal range (0-63)
-    if percent < 0 or percent > 100:
-        raise ValueError("Curtain percent must be 0..100 in scaled_0_63 mode")
-
-    # Mapping Formula: (Percent / 100.0) * 63.0
-    # This maintains the 1 decimal place precision used in Fixed1dp.
-    scaled = round((percent / 100.0) * 63.0, 1)
-    
-    fixed = Fixed1dp.from_float(scaled)
-    
-    # Generate the actual command bytes as per protocol [R2.2.6-1]
-    low_cmd = make_set_low(fixed.frac_digit)
-    high_cmd = make_set_high(fixed.integral)
-    
-    return low_cmd, high_cmd
+        return float(step)
+    return round((step / RAW_MAX) * 100.0, 1)
 
 
 def decode_get_response(cmd: int, data_byte: int, state: CurtainState, *, light_high_cmd: int) -> CurtainState:
@@ -160,27 +197,4 @@ def decode_get_response(cmd: int, data_byte: int, state: CurtainState, *, light_
     Returns:
         The updated CurtainState object.
     """
-    b = int(data_byte) & 0xFF  # Ensure byte is treated as unsigned
-    
-    if cmd == GET_DESIRED_CURTAIN_LOW:
-        state.desired_curtain.frac_digit = b
-    elif cmd == GET_DESIRED_CURTAIN_HIGH:
-        state.desired_curtain.integral = b
-        
-    elif cmd == GET_OUTDOOR_TEMP_LOW:
-        state.outdoor_temp.frac_digit = b
-    elif cmd == GET_OUTDOOR_TEMP_HIGH:
-        state.outdoor_temp.integral = b
-        
-    elif cmd == GET_OUTDOOR_PRESS_LOW:
-        state.outdoor_press.frac_digit = b
-    elif cmd == GET_OUTDOOR_PRESS_HIGH:
-        state.outdoor_press.integral = b
-        
-    elif cmd == GET_LIGHT_INTENSITY_LOW:
-        state.light_intensity.frac_digit = b
-    elif cmd == light_high_cmd or cmd == GET_LIGHT_INTENSITY_HIGH:
-        # Some implementations might use a dynamic command for light high byte
-        state.light_intensity.integral = b
-        
-    return state
\ No newline at end of file
+    return register_map(light_high_cmd).decode(cmd, data_byte, state)
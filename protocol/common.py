@@ -37,6 +37,22 @@ SET_HIGH_PREFIX = 0b11 << 6   # 0xC0
 # We use the lower 6 bits for data (0-63)
 PAYLOAD_MASK_6BIT = 0b0011_1111
 
+# ------------------------------------------------------------------------------
+# SNAPSHOT COMMAND (both boards)
+# The board answers with the number of values N, then the N bytes it would
+# send for its GETs in register order (low byte first): the whole register
+# set in one round trip. Older firmware does not answer it.
+# ------------------------------------------------------------------------------
+GET_ALL = 0x7F
+
+# ------------------------------------------------------------------------------
+# RECEIVE FIFO (both boards)
+# The PIC16F877A holds 2 received bytes; a third one that completes before
+# the firmware reads RCREG is lost (OERR). So at most 2 GETs may wait on
+# the board, which is the default pipelining window of the API.
+# ------------------------------------------------------------------------------
+RX_FIFO_DEPTH = 2
+
 
 def split_1dp(value: float) -> Tuple[int, int]:
     """
@@ -0,0 +1,190 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/protocol/dispatch.py
+DESCRIPTION:
+    Table-driven command dispatch.
+    For every board a table with 256 entries (one per possible command byte)
+    is built once from the command constants. Each entry says what the byte
+    is (GET, GET_ALL snapshot, SET low, SET high or nothing) and which state variable it reads
+    or writes. The decoders, the FakeTransport and the serial board
+    simulator all use these tables, so handling one byte is a single list
+    lookup instead of a long if/elif chain.
+
+    Reference: [R2.1.4-1] (Board 1) and [R2.2.6-1] (Board 2) command sets.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .common import PAYLOAD_MASK_6BIT, SET_HIGH_PREFIX, SET_LOW_PREFIX
+
+
+# Kinds of command bytes
+NONE = 0        # Not part of the protocol, the board does not answer
+GET = 1         # Board answers with one data byte
+SET_LOW = 2     # 10xxxxxx, no answer
+SET_HIGH = 3    # 11xxxxxx, no answer
+SNAPSHOT = 4    # GET_ALL, board answers with several bytes
+
+
+@dataclass(frozen=True)
+class Command:
+    """
+    One entry of a dispatch table.
+    'read' gets the register value from a state object, 'write' stores a
+    value into it. 'mask' is applied to answer bytes when decoding.
+    'after' is called after a SET (e.g. the fan logic of Board 1).
+    'burst' returns the answer bytes of a SNAPSHOT command.
+    """
+    code: int
+    kind: int = NONE
+    register: str = ""
+    mask: int = 0xFF
+    read: Optional[Callable[[Any], int]] = None
+    write: Optional[Callable[[Any, int], None]] = None
+    after: Optional[Callable[[Any], None]] = None
+    burst: Optional[Callable[[Any], bytes]] = None
+
+
+@dataclass(frozen=True)
+class DispatchTable:
+    """
+    The 256 Command entries of a board plus flat per-byte tuples of the
+    functions, so the hot path is only tuple indexing (no attribute lookups
+    on the entries).
+    """
+    commands: Tuple[Command, ...]
+    readers: Tuple[Optional[Callable[[Any], int]], ...] = field(init=False, repr=False)
+    writers: Tuple[Optional[Callable[[Any, int], None]], ...] = field(init=False, repr=False)
+    afters: Tuple[Optional[Callable[[Any], None]], ...] = field(init=False, repr=False)
+    masks: Tuple[int, ...] = field(init=False, repr=False)
+    bursts: Tuple[Optional[Callable[[Any], bytes]], ...] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        cs = self.commands
+        object.__setattr__(self, "readers", tuple(c.read for c in cs))
+        object.__setattr__(self, "writers", tuple(c.write for c in cs))
+        object.__setattr__(self, "afters", tuple(c.after for c in cs))
+        object.__setattr__(self, "masks", tuple(c.mask for c in cs))
+        object.__setattr__(self, "bursts", tuple(c.burst for c in cs))
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def __getitem__(self, cmd: int) -> Command:
+        return self.commands[cmd]
+
+
+def _writer(path: str) -> Callable[[Any, int], None]:
+    """Returns a function that sets 'a.b' on a state object."""
+    owner, _, attr = path.rpartition(".")
+    get_owner = attrgetter(owner) if owner else (lambda st: st)
+
+    def write(state: Any, value: int) -> None:
+        setattr(get_owner(state), attr, value)
+
+    return write
+
+
+def build_table(
+    gets: Dict[int, Tuple[str, int]],
+    set_low: str,
+    set_high: str,
+    after_set: Optional[Callable[[Any], None]] = None,
+    snapshot: Optional[Tuple[int, Callable[[Any], bytes]]] = None,
+) -> DispatchTable:
+    """
+    Builds a 256-entry table.
+
+    Args:
+        gets: GET command byte -> (register path, decode mask),
+              e.g. {0x01: ("desired_temp.frac_digit", 0x3F)}.
+        set_low: Register written by SET low bytes (10xxxxxx).
+        set_high: Register written by SET high bytes (11xxxxxx).
+        after_set: Optional function called with the state after a SET high.
+        snapshot: Optional (GET_ALL code, function returning the answer bytes).
+    """
+    table = [Command(code) for code in range(256)]
+
+    w_low, w_high = _writer(set_low), _writer(set_high)
+    for code in range(SET_LOW_PREFIX, SET_HIGH_PREFIX):
+        table[code] = Command(code, SET_LOW, set_low, PAYLOAD_MASK_6BIT, write=w_low)
+    for code in range(SET_HIGH_PREFIX, 256):
+        table[code] = Command(code, SET_HIGH, set_high, PAYLOAD_MASK_6BIT, write=w_high, after=after_set)
+
+    # GET entries are added last, so they win if a GET code is ever >= 0x80
+    for code, (path, mask) in gets.items():
+        if 0 <= code <= 0xFF:
+            table[code] = Command(code, GET, path, mask, read=attrgetter(path), write=_writer(path))
+
+    if snapshot is not None:
+        code, burst = snapshot
+        table[code] = Command(code, SNAPSHOT, burst=burst)
+
+    return DispatchTable(tuple(table))
+
+
+def respond(table: DispatchTable, cmd: int, state: Any) -> Optional[int]:
+    """
+    Board side: handles one received byte like the PIC does.
+    Returns the answer byte for a GET, otherwise applies the SET (if any)
+    to 'state' and returns None. A SNAPSHOT has no single answer byte, its
+    answer comes from respond_bytes().
+    """
+    cmd &= 0xFF
+    read = table.readers[cmd]
+    if read is not None:
+        return read(state) & 0xFF
+    write = table.writers[cmd]
+    if write is not None:
+        write(state, cmd & PAYLOAD_MASK_6BIT)
+        after = table.afters[cmd]
+        if after is not None:
+            after(state)
+    return None
+
+
+def respond_bytes(table: DispatchTable, data: bytes, state: Any) -> bytes:
+    """
+    Same as respond() for a whole buffer of received bytes.
+    Returns all answer bytes in order. This is the fast path for load tests.
+    """
+    readers, writers, afters, bursts = table.readers, table.writers, table.afters, table.bursts
+    out = bytearray()
+    for cmd in data:
+        read = readers[cmd]
+        if read is not None:
+            out.append(read(state) & 0xFF)
+            continue
+        write = writers[cmd]
+        if write is not None:
+            write(state, cmd & PAYLOAD_MASK_6BIT)
+            after = afters[cmd]
+            if after is not None:
+                after(state)
+            continue
+        burst = bursts[cmd]
+        if burst is not None:
+            out += burst(state)
+    return bytes(out)
+
+
+def decode(table: DispatchTable, cmd: int, data_byte: int, state: Any) -> Any:
+    """
+    PC side: stores the answer to GET 'cmd' into 'state'.
+    Bytes that are not GET commands are ignored.
+    """
+    cmd &= 0xFF
+    if table.readers[cmd] is not None:
+        table.writers[cmd](state, int(data_byte) & table.masks[cmd])
+    return state
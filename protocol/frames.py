@@ -0,0 +1,240 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/protocol/frames.py
+DESCRIPTION:
+    Framed protocol v2 (optional, negotiated when the port is opened).
+
+    The legacy protocol sends single bytes: a lost or extra byte shifts
+    every later answer by one, so the PC has to flush its input before
+    each GET and can never have two requests in flight. Protocol v2 puts
+    every request and answer into a frame:
+
+        START  SEQ  OPCODE  LEN  PAYLOAD (LEN bytes)  CRC
+        0x7E   0-255        0-32                       CRC-8 over SEQ..PAYLOAD
+
+    - SEQ:     chosen by the PC and copied into the answer, so answers
+               are matched to requests (late answers are recognized),
+    - OPCODE:  HELLO, GET or SET; answers have bit 7 set, ERROR is 0xFF,
+    - GET:     payload = legacy GET codes, answer = their answer bytes in
+               the same order (several registers in one frame),
+    - SET:     payload = legacy SET bytes (make_set_low / make_set_high),
+               applied in order; the answer confirms them,
+    - CRC:     CRC-8, polynomial 0x07 (x^8 + x^2 + x + 1), initial value 0.
+
+    Resynchronization needs no flush: the receiver looks for START, and a
+    header with an impossible length or a CRC error only drops that START
+    byte, after which the search goes on inside the same bytes.
+
+    Negotiation: the PC sends HELLO_REQUEST once. All its bytes are below
+    0x80, so legacy firmware sees only GET codes (never a SET byte) and at
+    most answers them; without a HELLO answer the PC stays with the legacy
+    protocol. Boards that speak v2 still answer legacy bytes outside of
+    frames.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, List
+
+from .dispatch import DispatchTable, respond_bytes
+
+VERSION = 2
+
+FRAME_START = 0x7E
+HEADER_SIZE = 4                 # START, SEQ, OPCODE, LEN
+MAX_PAYLOAD = 32
+
+# Opcodes (answers: opcode | REPLY)
+OP_HELLO = 0x01
+OP_GET = 0x02
+OP_SET = 0x03
+REPLY = 0x80
+OP_ERROR = 0xFF
+
+# ERROR payload: code, offending byte
+ERR_OPCODE = 0x01
+ERR_REGISTER = 0x02
+ERR_LENGTH = 0x03
+
+
+def crc8(data: bytes, crc: int = 0) -> int:
+    """CRC-8 with polynomial 0x07 (bitwise, as the PIC would compute it)."""
+    for b in data:
+        crc ^= b
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+@dataclass(frozen=True)
+class Frame:
+    """One v2 frame (without START and CRC)."""
+    seq: int
+    opcode: int
+    payload: bytes = b""
+
+    def encode(self) -> bytes:
+        return encode_frame(self.seq, self.opcode, self.payload)
+
+    @property
+    def is_error(self) -> bool:
+        return self.opcode == OP_ERROR
+
+
+def encode_frame(seq: int, opcode: int, payload: bytes = b"") -> bytes:
+    """Frame bytes including START and CRC. Raises ValueError if too long."""
+    payload = bytes(payload)
+    if len(payload) > MAX_PAYLOAD:
+        raise ValueError(f"Frame payload of {len(payload)} bytes (max {MAX_PAYLOAD})")
+    body = bytes([seq & 0xFF, opcode & 0xFF, len(payload)]) + payload
+    return bytes([FRAME_START]) + body + bytes([crc8(body)])
+
+
+def error_frame(seq: int, code: int, detail: int = 0) -> Frame:
+    return Frame(seq, OP_ERROR, bytes([code, detail & 0xFF]))
+
+
+# Sent once when the port is opened; safe for legacy firmware (see above)
+HELLO_REQUEST = encode_frame(0, OP_HELLO, bytes([VERSION]))        # 7E 00 01 01 02 70
+
+
+@dataclass
+class FrameParser:
+    """
+    Splits a received byte stream into valid frames.
+    Bytes outside of frames and frames with a CRC error are skipped and
+    counted; the parser never needs the input to be flushed.
+    """
+    skipped: int = 0            # Bytes dropped while searching for a frame
+    crc_errors: int = 0
+    _buf: bytearray = field(default_factory=bytearray, repr=False)
+
+    def feed(self, data: bytes) -> List[Frame]:
+        """Adds received bytes and returns the frames completed by them."""
+        buf = self._buf
+        buf += data
+        frames = []
+        while buf:
+            i = buf.find(FRAME_START)
+            if i < 0:
+                self.skipped += len(buf)
+                buf.clear()
+                break
+            if i:
+                self.skipped += i
+                del buf[:i]
+            if len(buf) < HEADER_SIZE:
+                break
+            length = buf[3]
+            if length > MAX_PAYLOAD:
+                self._drop_start()      # Not a real header
+                continue
+            total = HEADER_SIZE + length + 1
+            if len(buf) < total:
+                break
+            if crc8(buf[1:total - 1]) != buf[total - 1]:
+                self.crc_errors += 1
+                self._drop_start()
+                continue
+            frames.append(Frame(buf[1], buf[2], bytes(buf[HEADER_SIZE:total - 1])))
+            del buf[:total]
+        return frames
+
+    def flush_partial(self) -> List[Frame]:
+        """
+        Gives up on an incomplete frame (e.g. a stray START byte whose
+        "frame" never completes) and returns the frames found after it.
+        """
+        if not self._buf:
+            return []
+        self._drop_start()
+        return self.feed(b"")
+
+    def pending(self) -> int:
+        """Bytes of an incomplete frame."""
+        return len(self._buf)
+
+    def _drop_start(self) -> None:
+        self.skipped += 1
+        del self._buf[:1]
+
+
+def respond_frame(table: DispatchTable, frame: Frame, state: Any) -> Frame:
+    """Board side: handles one request frame and returns the answer frame."""
+    seq, op, payload = frame.seq, frame.opcode, frame.payload
+    if op == OP_HELLO:
+        return Frame(seq, OP_HELLO | REPLY, bytes([VERSION, MAX_PAYLOAD]))
+
+    if op == OP_GET:
+        readers, bursts = table.readers, table.bursts
+        out = bytearray()
+        for code in payload:
+            read = readers[code]
+            if read is not None:
+                out.append(read(state) & 0xFF)
+            elif bursts[code] is not None:
+                out += bursts[code](state)
+            else:
+                return error_frame(seq, ERR_REGISTER, code)
+        if len(out) > MAX_PAYLOAD:
+            return error_frame(seq, ERR_LENGTH, len(out))
+        return Frame(seq, OP_GET | REPLY, bytes(out))
+
+    if op == OP_SET:
+        for code in payload:
+            if table.writers[code] is None or table.readers[code] is not None:
+                return error_frame(seq, ERR_REGISTER, code)
+        respond_bytes(table, payload, state)
+        return Frame(seq, OP_SET | REPLY)
+
+    return error_frame(seq, ERR_OPCODE, op)
+
+
+@dataclass
+class BoardLink:
+    """
+    Board side byte handler that speaks both protocols: bytes from START
+    up to the end of a frame form a v2 request, every other byte is
+    handled like the legacy firmware does. Frames with a bad CRC or
+    length are dropped without an answer (the PC times out and retries).
+    """
+    table: DispatchTable
+    frames: int = 0
+    bad_frames: int = 0
+    _frame: bytearray = field(default_factory=bytearray, repr=False)
+
+    def feed(self, data: bytes, state: Any) -> bytes:
+        """Handles received bytes; returns all answer bytes in order."""
+        out = bytearray()
+        frame = self._frame
+        for b in bytes(data):
+            if not frame:
+                if b != FRAME_START:
+                    out += respond_bytes(self.table, bytes([b]), state)
+                    continue
+            frame.append(b)
+            if len(frame) < HEADER_SIZE:
+                continue
+            if frame[3] > MAX_PAYLOAD:
+                self.bad_frames += 1
+                frame.clear()
+                continue
+            total = HEADER_SIZE + frame[3] + 1
+            if len(frame) < total:
+                continue
+            if crc8(frame[1:total - 1]) == frame[total - 1]:
+                self.frames += 1
+                request = Frame(frame[1], frame[2], bytes(frame[HEADER_SIZE:total - 1]))
+                out += respond_frame(self.table, request, state).encode()
+            else:
+                self.bad_frames += 1
+            frame.clear()
+        return bytes(out)
@@ -0,0 +1,236 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/protocol/registers.py
+DESCRIPTION:
+    Declarative register map of a board.
+    A board is described once as a list of registers (name, GET codes of the
+    low/high byte, payload mask, scaling, SET range). Everything else is
+    generated from this description and cached:
+    - the 256-entry dispatch table (decoder, fake board, simulator),
+    - the GET sequence used by update(),
+    - the GET_ALL snapshot (answer of the simulated boards, decoder),
+    - the SET encoder with range checks and scaling,
+    - the start values of the simulated boards,
+    - the default time-to-live of every register for the read cache.
+
+    A new board or firmware revision only needs a new BoardMap.
+
+    Reference: [R2.1.4-1] (Board 1) and [R2.2.6-1] (Board 2) command sets.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from functools import cached_property
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from . import dispatch
+from .common import PAYLOAD_MASK_6BIT, Fixed1dp, make_set_high, make_set_low
+
+
+# Largest raw value of a 6-bit SET payload
+RAW_MAX = float(PAYLOAD_MASK_6BIT)
+
+
+@dataclass(frozen=True)
+class Register:
+    """
+    One value of a board.
+
+    A two-byte register is a Fixed1dp attribute of the state: 'low' reads
+    the fractional digit, 'high' the integral part. A one-byte register
+    ('low' is None) is a plain int attribute read by 'high'.
+    """
+    name: str                           # Attribute of the state object
+    high: int                           # GET code of the high (or only) byte
+    low: Optional[int] = None           # GET code of the low byte
+    mask: int = 0xFF                    # Applied to answer bytes
+    aliases: Tuple[int, ...] = ()       # Other GET codes that also read 'high'
+    full_scale: Optional[float] = None  # User value of raw 63.0 (e.g. 100 %)
+    set_min: Optional[float] = None     # Valid SET range in user units
+    set_max: Optional[float] = None
+    sim_value: Optional[float] = None   # Start value of the simulated board
+    label: str = ""                     # For error messages
+    ttl_s: Optional[float] = None       # How long a read value is good (cache)
+
+    def codes(self) -> Tuple[int, ...]:
+        """GET codes read by update(), low byte first."""
+        return (self.high,) if self.low is None else (self.low, self.high)
+
+
+@dataclass(frozen=True)
+class BoardMap:
+    """
+    Register description of one board.
+    'set_register' is the register written by SET low/high bytes,
+    'after_set' is the board logic run after a SET (may be None),
+    'get_all' the code of the snapshot command (None: firmware has none).
+    """
+    name: str
+    state_type: Callable[[], Any]
+    registers: Tuple[Register, ...]
+    set_register: str
+    after_set: Optional[Callable[[Any], None]] = None
+    get_all: Optional[int] = None
+
+    def register(self, name: str) -> Register:
+        for reg in self.registers:
+            if reg.name == name:
+                return reg
+        raise KeyError(f"{self.name} has no register '{name}'")
+
+    # --------------------------------------------------------------------------
+    # Generated tables (built once per map)
+    # --------------------------------------------------------------------------
+    @cached_property
+    def get_commands(self) -> Tuple[int, ...]:
+        """All GET codes read by update(), in register order."""
+        return tuple(code for reg in self.registers for code in reg.codes())
+
+    @cached_property
+    def dispatch(self) -> dispatch.DispatchTable:
+        """256-entry dispatch table. Earlier registers win on equal codes."""
+        gets: Dict[int, Tuple[str, int]] = {}
+        for reg in self.registers:
+            if reg.low is None:
+                gets.setdefault(reg.high, (reg.name, reg.mask))
+            else:
+                gets.setdefault(reg.low, (f"{reg.name}.frac_digit", reg.mask))
+                gets.setdefault(reg.high, (f"{reg.name}.integral", reg.mask))
+        for reg in self.registers:
+            target = reg.name if reg.low is None else f"{reg.name}.integral"
+            for code in reg.aliases:
+                gets.setdefault(code, (target, reg.mask))
+
+        return dispatch.build_table(
+            gets,
+            set_low=f"{self.set_register}.frac_digit",
+            set_high=f"{self.set_register}.integral",
+            after_set=self.after_set,
+            snapshot=None if self.get_all is None else (self.get_all, self.snapshot),
+        )
+
+    def commands_for(self, names: Optional[Iterable[str]] = None) -> Tuple[int, ...]:
+        """
+        GET codes needed to read only the registers 'names' (all if None),
+        in register order. Unknown names raise ValueError.
+        """
+        if names is None:
+            return self.get_commands
+        wanted = set(names)
+        unknown = wanted.difference(reg.name for reg in self.registers)
+        if unknown:
+            raise ValueError(f"{self.name} has no register(s) {', '.join(sorted(unknown))}")
+        return tuple(code for reg in self.registers if reg.name in wanted for code in reg.codes())
+
+    def with_high_code(self, name: str, code: int) -> "BoardMap":
+        """
+        Copy of the map where register 'name' is read with GET 'code'.
+        The old code stays valid as an alias (firmware revisions).
+        """
+        reg = self.register(name)
+        if code == reg.high:
+            return self
+        new = replace(reg, high=code, aliases=(reg.high,) + reg.aliases)
+        return replace(self, registers=tuple(new if r is reg else r for r in self.registers))
+
+    # --------------------------------------------------------------------------
+    # Codecs
+    # --------------------------------------------------------------------------
+    def new_state(self) -> Any:
+        return self.state_type()
+
+    def simulated_state(self, state: Any = None) -> Any:
+        """Sets the 'sim_value' of every register (new state if None)."""
+        st = self.new_state() if state is None else state
+        for reg in self.registers:
+            if reg.sim_value is None:
+                continue
+            if reg.low is None:
+                setattr(st, reg.name, int(reg.sim_value))
+            else:
+                setattr(st, reg.name, Fixed1dp.from_float(reg.sim_value))
+        return st
+
+    def decode(self, cmd: int, data_byte: int, state: Any) -> Any:
+        """Stores the answer to GET 'cmd' into 'state'."""
+        return dispatch.decode(self.dispatch, cmd, data_byte, state)
+
+    def decode_all(self, answers: bytes, state: Any = None) -> Any:
+        """Decodes the answers to get_commands (same order)."""
+        st = self.new_state() if state is None else state
+        table = self.dispatch
+        for cmd, b in zip(self.get_commands, answers):
+            dispatch.decode(table, cmd, b, st)
+        return st
+
+    def snapshot(self, state: Any) -> bytes:
+        """Board side: answer to GET_ALL (count, then the answers to get_commands)."""
+        readers = self.dispatch.readers
+        cmds = self.get_commands
+        return bytes([len(cmds)] + [readers[cmd](state) & 0xFF for cmd in cmds])
+
+    def decode_snapshot(self, data: bytes, state: Any = None) -> Any:
+        """
+        PC side: decodes the answer to GET_ALL. Raises ValueError if it does
+        not hold exactly one byte per GET of this map.
+        """
+        n = len(self.get_commands)
+        if len(data) != n + 1 or data[0] != n:
+            raise ValueError(f"{self.name}: bad GET_ALL answer {bytes(data).hex()}")
+        return self.decode_all(bytes(data[1:]), state)
+
+    def stale_registers(self, failed_cmds) -> FrozenSet[str]:
+        """Names of the registers that have a byte in 'failed_cmds'."""
+        failed = set(failed_cmds)
+        return frozenset(reg.name for reg in self.registers if failed.intersection(reg.codes()))
+
+    def copy_registers(self, src: Any, dst: Any, names) -> Any:
+        """Copies the values of registers 'names' from state 'src' to 'dst'."""
+        for name in names:
+            v = getattr(src, name)
+            setattr(dst, name, replace(v) if isinstance(v, Fixed1dp) else v)
+        return dst
+
+    def value(self, state: Any, name: str, scaled: bool = True) -> float:
+        """Value of a register in user units (scaled if it has a full scale)."""
+        reg = self.register(name)
+        if reg.low is None:
+            return float(getattr(state, name))
+        raw = getattr(state, name).to_float()
+        if scaled and reg.full_scale is not None:
+            return round((raw / RAW_MAX) * reg.full_scale, 1)
+        return raw
+
+    def encode_set(self, value: float, scaled: bool = True) -> Tuple[int, int]:
+        """
+        Encodes a SET of 'set_register' into (low_command, high_command).
+        With 'scaled' the value is in user units and checked against the
+        register range; otherwise it is the raw 0..63 value.
+        """
+        reg = self.register(self.set_register)
+        label = reg.label or reg.name
+
+        if scaled and reg.full_scale is not None:
+            v = float(value)
+            if not (reg.set_min <= v <= reg.set_max):
+                raise ValueError(f"{label} must be {reg.set_min:g}..{reg.set_max:g}")
+            raw = round((v / reg.full_scale) * RAW_MAX, 1)
+        elif scaled and reg.set_min is not None:
+            raw = round(float(value), 1)
+            if not (reg.set_min <= raw <= reg.set_max):
+                raise ValueError(f"{label} must be between {reg.set_min:g} and {reg.set_max:g}")
+        else:
+            raw = round(float(value), 1)
+            if not (0.0 <= raw <= RAW_MAX):
+                raise ValueError(f"raw {label} must be 0.0..{RAW_MAX:g}")
+
+        fixed = Fixed1dp.from_float(raw)
+        return make_set_low(fixed.frac_digit), make_set_high(fixed.integral)
@@ -0,0 +1,16 @@
+from .store import BOARD_IDS, COLUMNS, TelemetryStore
+from .recorder import TelemetryRecorder
+from .aggregate import Rollup, RollupSet, downsample, sliding, tumbling, window_percentiles
+
+__all__ = [
+    "TelemetryStore",
+    "TelemetryRecorder",
+    "COLUMNS",
+    "BOARD_IDS",
+    "Rollup",
+    "RollupSet",
+    "tumbling",
+    "sliding",
+    "downsample",
+    "window_percentiles",
+]
@@ -0,0 +1,329 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/telemetry/aggregate.py
+DESCRIPTION:
+    Vectorized aggregation of telemetry columns (NumPy arrays, e.g. the
+    result of TelemetryStore.query()). No Python loop runs per sample:
+    - tumbling(): min / max / mean / last / count per fixed window
+      (minute, hour, day) with ufunc.reduceat,
+    - window_percentiles(): percentiles per window (each window is sorted
+      in place, the percentile positions are computed for all at once),
+    - sliding(): mean / min / max over a moving time window (prefix sums,
+      and doubling ranges for min/max),
+    - downsample(): one value per window,
+    - Rollup / RollupSet: tumbling aggregates that are updated with every
+      new batch of samples, so dashboards never rescan the raw data.
+    Timestamps must be sorted (as stored); NaN values are ignored.
+
+    This module needs NumPy.
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:     # Optional dependency, checked on use
+    np = None
+
+AGGREGATES = ("min", "max", "mean", "last", "count")
+
+# API member -> telemetry column (see telemetry/store.py)
+FIELD_COLUMNS = {
+    "desiredTemperature": "desired_temp",
+    "ambientTemperature": "ambient_temp",
+    "fanSpeed": "fan_rps",
+    "curtainStatus": "curtain",
+    "outdoorTemperature": "outdoor_temp",
+    "outdoorPressure": "outdoor_press",
+    "lightIntensity": "light",
+}
+
+MINUTE_S, HOUR_S, DAY_S = 60.0, 3600.0, 86400.0
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("telemetry aggregation needs NumPy (pip install numpy)")
+
+
+def _clean(t, values):
+    """Float arrays without NaN values."""
+    _require_numpy()
+    t = np.asarray(t, dtype=np.float64)
+    v = np.asarray(values, dtype=np.float64)
+    if t.shape != v.shape:
+        raise ValueError("timestamps and values must have the same length")
+    ok = ~np.isnan(v)
+    if not ok.all():
+        t, v = t[ok], v[ok]
+    return t, v
+
+
+def _windows(t, width_s: float, origin: float):
+    """Window start of every sample, index of the first sample of each window."""
+    bins = np.floor((t - origin) / width_s)
+    first = np.flatnonzero(np.concatenate(([True], bins[1:] != bins[:-1]))) if len(t) else np.empty(0, np.intp)
+    return bins, first
+
+
+def _tumble_raw(t, v, width_s: float, origin: float) -> Dict[str, "np.ndarray"]:
+    """start / min / max / sum / count / last per window (sum instead of mean)."""
+    bins, first = _windows(t, width_s, origin)
+    if not len(first):
+        empty = np.empty(0)
+        return {"start": empty, "min": empty, "max": empty, "sum": empty,
+                "count": np.empty(0, np.int64), "last": empty}
+    ends = np.concatenate((first[1:], [len(t)]))
+    return {
+        "start": origin + bins[first] * width_s,
+        "min": np.minimum.reduceat(v, first),
+        "max": np.maximum.reduceat(v, first),
+        "sum": np.add.reduceat(v, first),
+        "count": (ends - first).astype(np.int64),
+        "last": v[ends - 1],
+    }
+
+
+def tumbling(t, values, width_s: float, aggs: Sequence[str] = AGGREGATES,
+             origin: float = 0.0) -> Dict[str, "np.ndarray"]:
+    """
+    Aggregates per fixed window [start, start + width_s). Windows without
+    samples are left out. Returns "start" and the requested 'aggs'.
+    """
+    unknown = set(aggs).difference(AGGREGATES)
+    if unknown:
+        raise ValueError(f"unknown aggregate(s) {', '.join(sorted(unknown))}")
+    t, v = _clean(t, values)
+    raw = _tumble_raw(t, v, width_s, origin)
+    return _finish(raw, aggs)
+
+
+def _finish(raw: Dict[str, "np.ndarray"], aggs: Sequence[str]) -> Dict[str, "np.ndarray"]:
+    out = {"start": raw["start"]}
+    for a in aggs:
+        out[a] = raw["sum"] / raw["count"] if a == "mean" else raw[a]
+    return out
+
+
+def window_percentiles(t, values, width_s: float, qs: Sequence[float] = (50.0, 95.0),
+                       origin: float = 0.0) -> Dict[str, "np.ndarray"]:
+    """
+    Percentiles (0..100, linear interpolation like np.percentile) per fixed
+    window. Keys: "start" and "p<q>" (e.g. "p95").
+    """
+    t, v = _clean(t, values)
+    bins, first = _windows(t, width_s, origin)
+    out = {"start": origin + bins[first] * width_s if len(first) else np.empty(0)}
+    if not len(first):
+        for q in qs:
+            out[f"p{q:g}"] = np.empty(0)
+        return out
+
+    # Samples of a window are contiguous (sorted times): sorting every
+    # window in place is much faster than one global lexsort
+    counts = np.diff(np.concatenate((first, [len(t)])))
+    sv = v.copy()
+    for a, n in zip(first.tolist(), counts.tolist()):
+        sv[a:a + n].sort()
+    for q in qs:
+        pos = first + (counts - 1) * (q / 100.0)
+        lo = np.floor(pos).astype(np.intp)
+        hi = np.minimum(lo + 1, first + counts - 1)
+        frac = pos - lo
+        out[f"p{q:g}"] = sv[lo] + (sv[hi] - sv[lo]) * frac
+    return out
+
+
+def _range_reduce(v, lo, hi, ufunc):
+    """
+    ufunc over v[lo:hi] for arrays of non-empty ranges (range min/max).
+    Level k holds ufunc over v[i : i + 2**k]; a range of length L is
+    covered by two overlapping level-floor(log2 L) entries. Levels are built
+    one after the other and dropped, so memory stays O(n).
+    """
+    k = np.floor(np.log2(hi - lo)).astype(np.intp)
+    out = np.empty(len(lo))
+    level = v
+    for lv in range(int(k.max()) + 1):
+        sel = np.flatnonzero(k == lv)
+        if len(sel):
+            out[sel] = ufunc(level[lo[sel]], level[hi[sel] - (1 << lv)])
+        half = 1 << lv
+        level = ufunc(level[:-half], level[half:])
+    return out
+
+
+def sliding(t, values, window_s: float, at=None,
+            aggs: Sequence[str] = ("mean", "min", "max", "count")) -> Dict[str, "np.ndarray"]:
+    """
+    Aggregates over the window (end - window_s, end] for every end time in
+    'at' (default: every sample time). Ends without samples give NaN
+    (count 0). Returns "end" and the requested 'aggs'.
+    """
+    t, v = _clean(t, values)
+    ends = t if at is None else np.asarray(at, dtype=np.float64)
+    hi = np.searchsorted(t, ends, side="right")
+    lo = np.searchsorted(t, ends - window_s, side="right")
+    count = hi - lo
+    has = count > 0
+    out = {"end": ends}
+
+    if "mean" in aggs:
+        cs = np.concatenate(([0.0], np.cumsum(v)))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["mean"] = np.where(has, (cs[hi] - cs[lo]) / np.maximum(count, 1), np.nan)
+    for name, ufunc in (("min", np.minimum), ("max", np.maximum)):
+        if name in aggs:
+            res = np.full(len(ends), np.nan)
+            if has.any():
+                res[has] = _range_reduce(v, lo[has], hi[has], ufunc)
+            out[name] = res
+    if "last" in aggs:
+        out["last"] = np.where(has, v[np.maximum(hi - 1, 0)] if len(v) else np.nan, np.nan)
+    if "count" in aggs:
+        out["count"] = count
+    return out
+
+
+def downsample(t, values, width_s: float, how: str = "mean",
+               origin: float = 0.0) -> Tuple["np.ndarray", "np.ndarray"]:
+    """One value per window ('how' is an aggregate); returns (start, value)."""
+    res = tumbling(t, values, width_s, (how,), origin)
+    return res["start"], res[how]
+
+
+def aggregate_columns(columns: Dict[str, Sequence[float]], width_s: float,
+                      aggs: Sequence[str] = AGGREGATES, origin: float = 0.0) -> Dict[str, Dict[str, "np.ndarray"]]:
+    """
+    tumbling() for every value column of a TelemetryStore.query() result.
+    Columns that have no samples in the range are left out.
+    """
+    t = columns["t"]
+    out = {}
+    for name, v in columns.items():
+        if name in ("t", "board"):
+            continue
+        res = tumbling(t, v, width_s, aggs, origin)
+        if len(res["start"]):
+            out[name] = res
+    return out
+
+
+def api_fields(api) -> Dict[str, float]:
+    """
+    Telemetry column values of an AirConditionerSystemConnection or
+    CurtainControlSystemConnection (its member variables).
+    """
+    return {col: float(getattr(api, member)) for member, col in FIELD_COLUMNS.items()
+            if hasattr(api, member)}
+
+
+@dataclass
+class Rollup:
+    """
+    Tumbling aggregates of one series, updated batch by batch.
+    Finished windows are kept as arrays; the window still being filled
+    ('open') is kept as scalars and merged with the next batch.
+    """
+    width_s: float
+    origin: float = 0.0
+
+    _closed: Dict[str, list] = field(default_factory=lambda: {k: [] for k in
+                                                               ("start", "min", "max", "sum", "count", "last")},
+                                     repr=False)
+    _open: Optional[Dict[str, float]] = field(default=None, repr=False)
+    _last_t: float = field(default=float("-inf"), repr=False)
+
+    def add(self, t, values) -> None:
+        """Adds samples (arrays or scalars); timestamps must not decrease."""
+        _require_numpy()
+        t, v = _clean(np.atleast_1d(t), np.atleast_1d(values))
+        if not len(t):
+            return
+        if t[0] < self._last_t or (len(t) > 1 and (np.diff(t) < 0).any()):
+            raise ValueError("rollup timestamps must not decrease")
+        self._last_t = float(t[-1])
+        raw = _tumble_raw(t, v, self.width_s, self.origin)
+
+        start = 0
+        op = self._open
+        if op is not None and raw["start"][0] == op["start"]:
+            # First window of the batch continues the open window
+            op["min"] = min(op["min"], float(raw["min"][0]))
+            op["max"] = max(op["max"], float(raw["max"][0]))
+            op["sum"] += float(raw["sum"][0])
+            op["count"] += int(raw["count"][0])
+            op["last"] = float(raw["last"][0])
+            start = 1
+        n = len(raw["start"])
+        if start < n:
+            if op is not None:
+                for k in self._closed:
+                    self._closed[k].append(np.array([op[k]]))
+            if n - start > 1:
+                for k in self._closed:
+                    self._closed[k].append(raw[k][start:n - 1])
+            self._open = {k: (int(raw[k][-1]) if k == "count" else float(raw[k][-1])) for k in self._closed}
+
+    def result(self, aggs: Sequence[str] = AGGREGATES, include_open: bool = True) -> Dict[str, "np.ndarray"]:
+        """Aggregates of all windows (the open one too, unless excluded)."""
+        _require_numpy()
+        raw = {}
+        for k, parts in self._closed.items():
+            if len(parts) > 1:
+                self._closed[k] = parts = [np.concatenate(parts)]   # Compact
+            arr = parts[0] if parts else np.empty(0)
+            if include_open and self._open is not None:
+                arr = np.concatenate((arr, [self._open[k]]))
+            raw[k] = arr
+        return _finish(raw, aggs)
+
+
+@dataclass
+class RollupSet:
+    """
+    Rollups of several columns at several window widths (default: minute,
+    hour, day). Feed it with store query results, poller snapshots or the
+    members of the board API objects.
+    """
+    widths_s: Tuple[float, ...] = (MINUTE_S, HOUR_S, DAY_S)
+    origin: float = 0.0
+    rollups: Dict[Tuple[str, float], Rollup] = field(default_factory=dict)
+
+    def rollup(self, column: str, width_s: float) -> Rollup:
+        key = (column, width_s)
+        r = self.rollups.get(key)
+        if r is None:
+            r = self.rollups[key] = Rollup(width_s, self.origin)
+        return r
+
+    def add_columns(self, columns: Dict[str, Sequence[float]], t=None) -> None:
+        """Adds a batch: 'columns' like a TelemetryStore.query() result."""
+        t = columns["t"] if t is None else t
+        for name, v in columns.items():
+            if name in ("t", "board"):
+                continue
+            for w in self.widths_s:
+                self.rollup(name, w).add(t, v)
+
+    def add_fields(self, t: float, api) -> None:
+        """Adds the current member values of a board API object at time 't'."""
+        for name, v in api_fields(api).items():
+            for w in self.widths_s:
+                self.rollup(name, w).add(t, v)
+
+    def result(self, column: str, width_s: float, aggs: Sequence[str] = AGGREGATES) -> Dict[str, "np.ndarray"]:
+        return self.rollup(column, width_s).result(aggs)
+
+    def columns(self) -> List[str]:
+        return sorted({c for c, _ in self.rollups})
@@ -0,0 +1,82 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/telemetry/recorder.py
+DESCRIPTION:
+    Records the snapshots of the background pollers (api/poller.py) into a
+    TelemetryStore. The poll thread only appends a row to the store's
+    batch (at most one row per board every 'interval_s'); a separate thread
+    flushes the batch to the column files every 'flush_interval_s', so the
+    disk never slows down polling.
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from .store import TelemetryStore
+
+
+@dataclass
+class TelemetryRecorder:
+    """Samples pollers into 'store' and flushes it in the background."""
+    store: TelemetryStore
+    interval_s: float = 1.0             # Sample rate per board (1 Hz)
+    flush_interval_s: float = 2.0
+    clock: Callable[[], float] = field(default=time.time, repr=False)
+
+    samples: int = field(default=0, init=False)
+    _last: Dict[str, float] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _stop: threading.Event = field(default_factory=threading.Event, init=False, repr=False)
+    _thread: Optional[threading.Thread] = field(default=None, init=False, repr=False)
+
+    def attach(self, poller, board: str) -> None:
+        """Records the snapshots of 'poller' as board 'board' ("board1"...)."""
+        poller.subscribe(lambda snap: self.record(board, snap))
+
+    def record(self, board: str, snapshot) -> bool:
+        """
+        Adds a sample if the last one of this board is old enough. A sample
+        the store rejects (exception) is not counted and does not delay the
+        next one.
+        """
+        with self._lock:
+            # Clock and append inside the lock: samples of both boards stay
+            # in time order
+            now = self.clock()
+            last = self._last.get(board)
+            if last is not None and now - last < self.interval_s:
+                return False
+            self.store.append_snapshot(now, board, snapshot)
+            self._last[board] = now
+            self.samples += 1
+        return True
+
+    def start(self) -> "TelemetryRecorder":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="telemetry-flush", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops the flush thread and writes what is left."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(2.0)
+            self._thread = None
+        self.store.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval_s):
+            self.store.flush()
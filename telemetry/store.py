@@ -0,0 +1,411 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/telemetry/store.py
+DESCRIPTION:
+    Append-only columnar telemetry store.
+    Every sample is one row: time (Unix seconds), board id and the values
+    of both boards (NaN where a board has no such value). Rows are stored
+    in segments of 'segment_rows' rows; a segment is a folder with one
+    fixed-width file per column, preallocated and written through mmap:
+
+        <path>/meta.json            column layout, segment size
+        <path>/index.json           rows and time range of every segment
+        <path>/seg_000000/t.col     float64 timestamps (non-decreasing)
+        <path>/seg_000000/...       float32 values, uint8 board id
+
+    append() only puts the row into a batch (one list append); flush()
+    writes the batch into the column files, syncs them to disk and only
+    then updates the time index.
+    A range query opens only the segments whose time range overlaps, finds
+    the rows by binary search on the timestamps and returns the columns as
+    NumPy arrays (views of the mapped files, no parsing). NumPy is
+    optional: without it the columns are returned as array.array.
+
+AUTHORS:
+    1. Yusuf Yaman 152120221075
+    2. Yigit Ata 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:     # Optional: queries then return array.array columns
+    np = None
+
+
+@dataclass(frozen=True)
+class Column:
+    """One fixed-width column; 'fmt' is an array/struct type code."""
+    name: str
+    fmt: str
+
+    @property
+    def width(self) -> int:
+        return struct.calcsize(self.fmt)
+
+
+# Column layout of a row (the order is the order of the values in append())
+COLUMNS: Tuple[Column, ...] = (
+    Column("t", "d"),                   # Unix time in seconds
+    Column("board", "B"),               # BOARD_IDS
+    Column("desired_temp", "f"),        # Board #1
+    Column("ambient_temp", "f"),
+    Column("fan_rps", "f"),
+    Column("curtain", "f"),             # Board #2
+    Column("outdoor_temp", "f"),
+    Column("outdoor_press", "f"),
+    Column("light", "f"),
+)
+COLUMN_NAMES = tuple(c.name for c in COLUMNS)
+VALUE_NAMES = COLUMN_NAMES[2:]
+
+BOARD_IDS = {"board1": 1, "board2": 2}
+
+# Register name (protocol/registers.py) -> telemetry column
+REGISTER_COLUMNS = {
+    "desired_temp": "desired_temp",
+    "ambient_temp": "ambient_temp",
+    "fan_speed_rps": "fan_rps",
+    "desired_curtain": "curtain",
+    "outdoor_temp": "outdoor_temp",
+    "outdoor_press": "outdoor_press",
+    "light_intensity": "light",
+}
+
+DEFAULT_SEGMENT_ROWS = 7 * 24 * 3600    # One week at 1 Hz (~26 MB)
+_NAN = float("nan")
+
+
+@dataclass
+class SegmentInfo:
+    """Entry of the time index."""
+    seg: int
+    rows: int = 0
+    t_min: float = math.inf
+    t_max: float = -math.inf
+
+    def overlaps(self, t0: float, t1: float) -> bool:
+        return self.rows > 0 and self.t_max >= t0 and self.t_min <= t1
+
+
+@dataclass
+class _Writer:
+    """Open column files of the segment that is being filled."""
+    info: SegmentInfo
+    files: Dict[str, Any]
+    maps: Dict[str, mmap.mmap]
+
+    def sync(self, first_row: int, rows: int) -> None:
+        """Writes rows [first_row, first_row + rows) of every column to disk."""
+        for c in COLUMNS:
+            start = first_row * c.width
+            page = start - start % mmap.ALLOCATIONGRANULARITY
+            self.maps[c.name].flush(page, start + rows * c.width - page)
+
+    def close(self) -> None:
+        for mm in self.maps.values():
+            mm.flush()
+            mm.close()
+        for f in self.files.values():
+            f.close()
+
+
+@dataclass
+class TelemetryStore:
+    """
+    Store in folder 'path' (created if needed). An existing store is
+    reopened with its own segment size.
+    """
+    path: str
+    segment_rows: int = DEFAULT_SEGMENT_ROWS
+
+    segments: List[SegmentInfo] = field(default_factory=list, init=False)
+    _batch: List[tuple] = field(default_factory=list, init=False, repr=False)
+    _last_t: float = field(default=-math.inf, init=False, repr=False)
+    _writer: Optional[_Writer] = field(default=None, init=False, repr=False)
+    _batch_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _write_lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        meta_path = os.path.join(self.path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if [tuple(c) for c in meta["columns"]] != [(c.name, c.fmt) for c in COLUMNS]:
+                raise ValueError(f"{self.path}: unknown column layout")
+            self.segment_rows = int(meta["segment_rows"])
+            with open(os.path.join(self.path, "index.json"), "r", encoding="utf-8") as f:
+                self.segments = [SegmentInfo(**e) for e in json.load(f)]
+            if self.segments and self.segments[-1].rows:
+                self._last_t = self.segments[-1].t_max
+        else:
+            meta = {"version": 1, "segment_rows": self.segment_rows,
+                    "columns": [[c.name, c.fmt] for c in COLUMNS]}
+            _write_json(meta_path, meta)
+            self._write_index()
+
+    # --------------------------------------------------------------------------
+    # Writing
+    # --------------------------------------------------------------------------
+    def append(self, t: float, board: str, **values: float) -> None:
+        """
+        Adds one sample to the batch (written by the next flush()).
+        'values' are column names (VALUE_NAMES); missing ones are NaN.
+        Timestamps must not decrease.
+        """
+        board_id = BOARD_IDS[board]
+        unknown = set(values).difference(VALUE_NAMES)
+        if unknown:
+            raise ValueError(f"unknown telemetry column(s) {', '.join(sorted(unknown))}")
+        row = (t, board_id) + tuple(values.get(n, _NAN) for n in VALUE_NAMES)
+        with self._batch_lock:
+            if t < self._last_t:
+                raise ValueError(f"timestamp {t} is older than the last sample {self._last_t}")
+            self._last_t = t
+            self._batch.append(row)
+
+    def append_snapshot(self, t: float, board: str, snapshot) -> None:
+        """Adds the values of a poller Snapshot (api/poller.py)."""
+        self.append(t, board, **{REGISTER_COLUMNS[n]: v for n, v in snapshot.values.items()
+                                 if n in REGISTER_COLUMNS})
+
+    def append_columns(self, columns: Dict[str, Sequence[float]]) -> int:
+        """
+        Bulk import: writes whole columns at once (e.g. converted logs).
+        All columns must have the same length; missing value columns are NaN.
+        Flushes the batch first so the rows stay in time order.
+        """
+        n = len(columns["t"])
+        if any(len(v) != n for v in columns.values()):
+            raise ValueError("all columns must have the same length")
+        if n == 0:
+            return 0
+        t_first, t_last = float(columns["t"][0]), float(columns["t"][-1])
+        with self._write_lock:
+            self.flush()
+            with self._batch_lock:
+                if t_first < self._last_t:
+                    raise ValueError(f"timestamp {t_first} is older than the last sample {self._last_t}")
+                self._last_t = t_last
+            data = {c.name: _to_bytes(c, columns.get(c.name), n) for c in COLUMNS}
+            self._write(data, n, t_first, t_last, columns["t"])
+        return n
+
+    def pending(self) -> int:
+        """Rows appended but not flushed yet."""
+        return len(self._batch)
+
+    def flush(self) -> int:
+        """Writes the batch into the column files. Returns the rows written."""
+        with self._write_lock:
+            with self._batch_lock:
+                rows, self._batch = self._batch, []
+            if not rows:
+                return 0
+            cols = list(zip(*rows))
+            data = {c.name: array(c.fmt, values).tobytes() for c, values in zip(COLUMNS, cols)}
+            self._write(data, len(rows), rows[0][0], rows[-1][0], cols[0])
+            return len(rows)
+
+    def close(self) -> None:
+        with self._write_lock:
+            self.flush()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def __enter__(self) -> "TelemetryStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --------------------------------------------------------------------------
+    # Reading
+    # --------------------------------------------------------------------------
+    def __len__(self) -> int:
+        return sum(s.rows for s in self.segments)
+
+    def time_range(self) -> Tuple[float, float]:
+        """(first, last) timestamp of the flushed rows (inf, -inf if empty)."""
+        used = [s for s in self.segments if s.rows]
+        if not used:
+            return math.inf, -math.inf
+        return used[0].t_min, used[-1].t_max
+
+    def query(self, t0: float, t1: float, columns: Optional[Sequence[str]] = None,
+              board: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Rows with t0 <= t <= t1 (flushed rows only). Returns a dict of
+        column name -> NumPy array (array.array without NumPy); "t" is
+        always included. 'board' keeps only the rows of one board.
+        """
+        names = list(COLUMN_NAMES if columns is None else columns)
+        unknown = set(names).difference(COLUMN_NAMES)
+        if unknown:
+            raise ValueError(f"unknown telemetry column(s) {', '.join(sorted(unknown))}")
+        if "t" not in names:
+            names.insert(0, "t")
+        if board is not None and "board" not in names:
+            names.append("board")
+            drop_board = True
+        else:
+            drop_board = False
+
+        parts: Dict[str, list] = {n: [] for n in names}
+        for info in [s for s in self.segments if s.overlaps(t0, t1)]:
+            for name, part in self._read_segment(info, t0, t1, names).items():
+                parts[name].append(part)
+
+        out = {n: _concat(_column(n), p) for n, p in parts.items()}
+        if board is not None:
+            out = _filter_board(out, BOARD_IDS[board])
+            if drop_board:
+                del out["board"]
+        return out
+
+    # --------------------------------------------------------------------------
+    # Internals
+    # --------------------------------------------------------------------------
+    def _seg_dir(self, seg: int) -> str:
+        return os.path.join(self.path, f"seg_{seg:06d}")
+
+    def _write_index(self) -> None:
+        _write_json(os.path.join(self.path, "index.json"),
+                    [{"seg": s.seg, "rows": s.rows, "t_min": s.t_min, "t_max": s.t_max}
+                     for s in self.segments])
+
+    def _open_writer(self) -> _Writer:
+        if self.segments and self.segments[-1].rows < self.segment_rows:
+            info = self.segments[-1]
+        else:
+            info = SegmentInfo(seg=len(self.segments))
+            self.segments.append(info)
+        folder = self._seg_dir(info.seg)
+        os.makedirs(folder, exist_ok=True)
+        files, maps = {}, {}
+        for c in COLUMNS:
+            p = os.path.join(folder, f"{c.name}.col")
+            f = open(p, "r+b" if os.path.exists(p) else "w+b")
+            size = self.segment_rows * c.width
+            if os.fstat(f.fileno()).st_size < size:
+                f.truncate(size)    # Preallocate (sparse) the whole segment
+            files[c.name] = f
+            maps[c.name] = mmap.mmap(f.fileno(), size)
+        return _Writer(info, files, maps)
+
+    def _write(self, data: Dict[str, bytes], n: int, t_first: float, t_last: float, ts) -> None:
+        """Copies 'n' rows (column bytes) into the segments, sealing full ones."""
+        done = 0
+        while done < n:
+            if self._writer is None:
+                self._writer = self._open_writer()
+            w = self._writer
+            info = w.info
+            k = min(n - done, self.segment_rows - info.rows)
+            for c in COLUMNS:
+                src = data[c.name]
+                off = info.rows * c.width
+                w.maps[c.name][off:off + k * c.width] = src[done * c.width:(done + k) * c.width]
+            # The rows must be on disk before the index counts them: after a
+            # crash the index may only claim rows that were really written
+            w.sync(info.rows, k)
+            if info.rows == 0:
+                info.t_min = float(ts[done])
+            info.t_max = float(ts[done + k - 1])
+            info.rows += k
+            done += k
+            if info.rows >= self.segment_rows:
+                w.close()           # Sealed: never written again
+                self._writer = None
+        self._write_index()
+
+    def _read_segment(self, info: SegmentInfo, t0: float, t1: float, names) -> Dict[str, Any]:
+        folder = self._seg_dir(info.seg)
+        if np is not None:
+            t = np.memmap(os.path.join(folder, "t.col"), dtype="<f8", mode="r", shape=(info.rows,))
+            a, b = int(np.searchsorted(t, t0, "left")), int(np.searchsorted(t, t1, "right"))
+            out = {}
+            for n in names:
+                col = t if n == "t" else np.memmap(os.path.join(folder, f"{n}.col"), dtype=_dtype(_column(n)),
+                                                   mode="r", shape=(info.rows,))
+                out[n] = col[a:b]
+            return out
+
+        # Without NumPy: binary search on the mapped timestamps, copy slices
+        out = {}
+        with open(os.path.join(folder, "t.col"), "rb") as f, \
+                mmap.mmap(f.fileno(), info.rows * 8, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as raw, raw.cast("d") as t:
+                a, b = bisect.bisect_left(t, t0), bisect.bisect_right(t, t1)
+        for n in names:
+            c = _column(n)
+            with open(os.path.join(folder, f"{n}.col"), "rb") as f:
+                f.seek(a * c.width)
+                arr = array(c.fmt)
+                arr.frombytes(f.read((b - a) * c.width))
+            out[n] = arr
+        return out
+
+
+# ------------------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------------------
+
+def _column(name: str) -> Column:
+    return COLUMNS[COLUMN_NAMES.index(name)]
+
+
+def _dtype(c: Column) -> str:
+    return {"d": "<f8", "f": "<f4", "B": "u1"}[c.fmt]
+
+
+def _to_bytes(c: Column, values, n: int) -> bytes:
+    if values is None:
+        values = [_NAN] * n if c.fmt != "B" else [0] * n
+    if np is not None and isinstance(values, np.ndarray):
+        return np.ascontiguousarray(values, dtype=_dtype(c)).tobytes()
+    return array(c.fmt, values).tobytes()
+
+
+def _concat(c: Column, parts: list):
+    if np is not None:
+        if not parts:
+            return np.empty(0, dtype=_dtype(c))
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+    out = array(c.fmt)
+    for p in parts:
+        out.extend(p)
+    return out
+
+
+def _filter_board(cols: Dict[str, Any], board_id: int) -> Dict[str, Any]:
+    if np is not None:
+        mask = cols["board"] == board_id
+        return {n: v[mask] for n, v in cols.items()}
+    keep = [i for i, b in enumerate(cols["board"]) if b == board_id]
+    return {n: array(_column(n).fmt, (v[i] for i in keep)) for n, v in cols.items()}
+
+
+def _write_json(path: str, obj) -> None:
+    """Writes a JSON file atomically (readers never see half a file)."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
@@ -0,0 +1,113 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_aggregate.py
+DESCRIPTION:
+    Unit tests for the vectorized telemetry aggregation. The results are
+    compared with plain Python loops over the same samples.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import math
+import random
+import statistics
+import unittest
+
+from home_automation.api import AirConditionerSystemConnection, HomeAutomationSystemConnection
+from home_automation.telemetry import aggregate as agg
+from home_automation.transport import FakeTransport
+
+np = agg.np
+
+
+def samples(n=2000, seed=3):
+    rng = random.Random(seed)
+    t, v, now = [], [], 0.0
+    for _ in range(n):
+        now += rng.uniform(0.1, 3.0)
+        t.append(now)
+        v.append(rng.uniform(-10.0, 40.0) if rng.random() > 0.05 else float("nan"))
+    return t, v
+
+
+def reference_windows(t, v, width):
+    """Python loop: window start -> list of values (NaN dropped)."""
+    out = {}
+    for ti, vi in zip(t, v):
+        if not math.isnan(vi):
+            out.setdefault(math.floor(ti / width) * width, []).append(vi)
+    return out
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestAggregation(unittest.TestCase):
+    """Vectorized results equal the Python loops."""
+
+    def test_tumbling(self):
+        t, v = samples()
+        res = agg.tumbling(t, v, 60.0)
+        ref = reference_windows(t, v, 60.0)
+        self.assertEqual(list(res["start"]), sorted(ref))
+        for i, start in enumerate(sorted(ref)):
+            vals = ref[start]
+            self.assertEqual(res["min"][i], min(vals))
+            self.assertEqual(res["max"][i], max(vals))
+            self.assertAlmostEqual(res["mean"][i], statistics.fmean(vals))
+            self.assertEqual(res["last"][i], vals[-1])
+            self.assertEqual(res["count"][i], len(vals))
+
+    def test_percentiles(self):
+        t, v = samples()
+        res = agg.window_percentiles(t, v, 300.0, (0, 50, 95, 100))
+        ref = reference_windows(t, v, 300.0)
+        for i, start in enumerate(sorted(ref)):
+            for q in (0, 50, 95, 100):
+                self.assertAlmostEqual(res[f"p{q}"][i], float(np.percentile(ref[start], q)))
+
+    def test_sliding(self):
+        t, v = samples(500)
+        res = agg.sliding(t, v, 30.0)
+        pairs = [(ti, vi) for ti, vi in zip(t, v) if not math.isnan(vi)]
+        for i, (end, _) in enumerate(pairs):
+            win = [vi for ti, vi in pairs if end - 30.0 < ti <= end]
+            self.assertAlmostEqual(res["mean"][i], statistics.fmean(win))
+            self.assertEqual(res["min"][i], min(win))
+            self.assertEqual(res["max"][i], max(win))
+            self.assertEqual(res["count"][i], len(win))
+
+        empty = agg.sliding(t, v, 0.01, at=[t[0] - 100.0])
+        self.assertEqual(empty["count"][0], 0)
+        self.assertTrue(math.isnan(empty["mean"][0]))
+
+    def test_rollup_matches_batch(self):
+        t, v = samples()
+        r = agg.Rollup(60.0)
+        for a in range(0, len(t), 37):      # Batches that split windows
+            r.add(t[a:a + 37], v[a:a + 37])
+        inc, full = r.result(), agg.tumbling(t, v, 60.0)
+        for k in full:
+            np.testing.assert_allclose(inc[k], full[k])
+        with self.assertRaises(ValueError):
+            r.add([t[0]], [1.0])
+
+    def test_rollup_from_api_fields(self):
+        c = HomeAutomationSystemConnection(transport=FakeTransport(board="board1"), comPort="FAKE1", baudRate=9600)
+        c.open()
+        air = AirConditionerSystemConnection(connection=c)
+        air.update()
+        rs = agg.RollupSet(widths_s=(60.0,))
+        for i in range(120):
+            rs.add_fields(float(i), air)
+        self.assertEqual(rs.columns(), ["ambient_temp", "desired_temp", "fan_rps"])
+        res = rs.result("ambient_temp", 60.0)
+        self.assertEqual(list(res["count"]), [60, 60])
+        self.assertEqual(list(res["mean"]), [24.0, 24.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,227 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_async_api.py
+DESCRIPTION:
+    Unit tests for the asyncio transport and API classes.
+    The fake boards are driven concurrently from one event loop. The real
+    AsyncSerialTransport is tested on a pseudo terminal (POSIX only) with a
+    simulated board on the other end.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import asyncio
+import os
+import threading
+import unittest
+
+from home_automation.api import (
+    AsyncAirConditionerSystemConnection,
+    AsyncCurtainControlSystemConnection,
+    AsyncHomeAutomationSystemConnection,
+)
+from home_automation.api.retry_policy import CircuitBreaker, RetryPolicy
+from home_automation.transport import AsyncFakeTransport, FakeTransport
+
+
+def make_air(name="FAKE1"):
+    t = AsyncFakeTransport(board="board1")
+    c = AsyncHomeAutomationSystemConnection(transport=t, comPort=name, baudRate=9600)
+    return AsyncAirConditionerSystemConnection(connection=c)
+
+
+def make_curtain(name="FAKE2"):
+    t = AsyncFakeTransport(board="board2")
+    c = AsyncHomeAutomationSystemConnection(transport=t, comPort=name, baudRate=9600)
+    return AsyncCurtainControlSystemConnection(connection=c)
+
+
+class TestAsyncApiFake(unittest.TestCase):
+    """Async API classes against the simulated boards."""
+
+    def test_update_and_set(self):
+        """update() reads the defaults; setDesiredTemp() is read back."""
+        async def run():
+            air = make_air()
+            await air.connection.open()
+            await air.update()
+            self.assertEqual(air.getDesiredTemp(), 25.0)
+            self.assertEqual(air.getAmbientTemp(), 24.0)
+
+            self.assertTrue(await air.setDesiredTemp(29.5))
+            await air.update()
+            self.assertEqual(air.getDesiredTemp(), 29.5)
+            self.assertEqual(air.getFanSpeed(), 30)
+
+        asyncio.run(run())
+
+    def test_pipeline_after_set(self):
+        """SET bytes take a place in the pipelining window."""
+        async def run():
+            air = make_air()
+            c = air.connection
+            await c.open()
+            writes = []
+            write = c.transport.fake.write_bytes
+            c.transport.fake.write_bytes = lambda buf: (writes.append(bytes(buf)), write(buf))
+
+            self.assertTrue(await air.setDesiredTemp(29.5))
+            cmds = bytes([0x01, 0x02, 0x03, 0x04])
+            self.assertEqual(await c.pipeline(cmds, window=2), bytes([5, 29, 0, 24]))
+            self.assertEqual([len(w) for w in writes], [2, 1, 2, 1])
+
+        asyncio.run(run())
+
+    def test_set_waits_for_the_update(self):
+        """A SET pair does not drain the answers of an update in progress."""
+        async def run():
+            air = make_air()
+            c = air.connection
+            await c.open()
+            dropped = []
+            drain = c.transport.fake.drain
+            c.transport.fake.drain = lambda: dropped.append(drain()) or dropped[-1]
+
+            await asyncio.gather(air.update(), air.setDesiredTemp(30.0))
+            self.assertEqual(sum(dropped), 0)
+            self.assertEqual(air.stale, frozenset())
+
+        asyncio.run(run())
+
+    def test_dead_board_trips_the_breaker(self):
+        """request() follows the retry policy and fails fast once offline."""
+        async def run():
+            air = make_air()
+            c = air.connection
+            await c.open()
+            c.retry_policy = RetryPolicy(deadline_s=1.0, max_delay_s=0.01, jitter=0.0)
+            c.breaker = CircuitBreaker(failure_threshold=2)
+            writes = []
+            c.transport.fake.write_bytes = writes.append         # The board never answers
+
+            self.assertEqual(await c.request(0x01), -1)
+            self.assertEqual(len(writes), 2)
+            self.assertFalse(c.breaker.is_online())
+            self.assertEqual(await c.request(0x01), -1)
+            self.assertEqual(len(writes), 2)
+
+        asyncio.run(run())
+
+    def test_many_boards_one_loop(self):
+        """Dozens of boards are updated concurrently from one loop."""
+        async def run():
+            boards = [make_curtain(f"FAKE{i}") for i in range(24)]
+            for b in boards:
+                await b.connection.open()
+            await asyncio.gather(*(b.setCurtainStatus(10.0 * (i % 10)) for i, b in enumerate(boards)))
+            await asyncio.gather(*(b.update() for b in boards))
+            return boards
+
+        boards = asyncio.run(run())
+        for i, b in enumerate(boards):
+            self.assertAlmostEqual(b.curtainStatus, 10.0 * (i % 10), delta=0.2)
+            self.assertEqual(b.getLightIntensity(), 200.0)
+
+    def test_closed_port_reports_error(self):
+        """Reading from a closed fake port returns -1 and sets last_error."""
+        async def run():
+            air = make_air()
+            return await air.connection.read(timeout_s=0.01), air.connection.last_error
+
+        resp, err = asyncio.run(run())
+        self.assertEqual(resp, -1)
+        self.assertIsNotNone(err)
+
+
+class _WritablePort:
+    """Minimal open serial port that accepts every write."""
+    is_open = True
+    in_waiting = 0
+
+    def write(self, data):
+        return len(data)
+
+
+class TestAsyncSerialTiming(unittest.TestCase):
+    """RTT samples of AsyncSerialTransport."""
+
+    def test_no_sample_behind_an_outstanding_answer(self):
+        """A GET sent while an earlier answer is outstanding is not measured."""
+        from home_automation.transport.async_serial_transport import AsyncSerialTransport
+
+        async def run():
+            t = AsyncSerialTransport(port="TEST", inter_byte_gap_s=0.0)
+            t._ser, t._loop, t._rx_event = _WritablePort(), asyncio.get_running_loop(), asyncio.Event()
+            await t.write_byte(0x01)
+            await t.write_byte(0x02)            # Pipelined behind 0x01
+            t._rx += b"\x05\x1d"
+            await t.read_exact(1, t._loop.time() + 0.1)
+            await t.read_exact(1, t._loop.time() + 0.1)
+
+            await t.write_byte(0x02)            # Idle link: measured
+            t._rx += b"\x1d"
+            await t.read_exact(1, t._loop.time() + 0.1)
+            return t
+
+        t = asyncio.run(run())
+        self.assertNotIn(0x01, t.timing.commands)
+        self.assertEqual(t.timing.commands[0x02].samples, 1)
+
+
+@unittest.skipUnless(hasattr(os, "openpty"), "needs a POSIX pseudo terminal")
+class TestAsyncSerialTransportPty(unittest.TestCase):
+    """AsyncSerialTransport on a real (pseudo) serial device."""
+
+    def setUp(self):
+        self.master, slave = os.openpty()
+        self.path = os.ttyname(slave)
+        self.slave = slave
+        self.board = FakeTransport(board="board1")
+        self.board.open()
+        self.stop = False
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.stop = True
+        os.close(self.slave)
+        os.close(self.master)
+
+    def _serve(self):
+        """Simulated board on the master side of the pty."""
+        while not self.stop:
+            try:
+                data = os.read(self.master, 64)
+            except OSError:
+                return
+            self.board.write_bytes(data)
+            out = bytes([self.board.read_byte() for _ in range(len(self.board._rx_queue))])
+            if out:
+                os.write(self.master, out)
+
+    def test_update_over_pty(self):
+        """A full update() round-trips through the non-blocking port."""
+        from home_automation.transport.async_serial_transport import AsyncSerialTransport
+
+        async def run():
+            t = AsyncSerialTransport(port=self.path, open_mode="probe", ready_timeout_s=1.0)
+            c = AsyncHomeAutomationSystemConnection(transport=t, comPort=self.path, baudRate=9600)
+            air = AsyncAirConditionerSystemConnection(connection=c)
+            self.assertTrue(await c.open(), c.last_error)
+            await air.update()
+            await c.close()
+            return air, t
+
+        air, t = asyncio.run(run())
+        self.assertEqual(air.getDesiredTemp(), 25.0)
+        self.assertEqual(air.getAmbientTemp(), 24.0)
+        self.assertGreater(t.timing.link.samples, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
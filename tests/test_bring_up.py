@@ -0,0 +1,68 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_bring_up.py
+DESCRIPTION:
+    Unit tests for the concurrent start-up of the console: both boards are
+    opened and synced at the same time and report their readiness.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import time
+import unittest
+from dataclasses import dataclass
+
+from home_automation.api import (
+    AirConditionerSystemConnection,
+    CurtainControlSystemConnection,
+    HomeAutomationSystemConnection,
+)
+from home_automation.app.console import bring_up_boards
+from home_automation.transport import FakeTransport
+
+
+@dataclass
+class SlowOpenBoard(FakeTransport):
+    """Fake board with a warm-up time like a real board after reset."""
+    warm_up_s: float = 0.3
+
+    def open(self) -> None:
+        time.sleep(self.warm_up_s)
+        super().open()
+
+
+class TestBringUp(unittest.TestCase):
+    """Start-up time is bounded by the slowest board."""
+
+    def test_boards_open_concurrently(self):
+        c1 = HomeAutomationSystemConnection(transport=SlowOpenBoard(board="board1"), comPort="FAKE1", baudRate=9600)
+        c2 = HomeAutomationSystemConnection(transport=SlowOpenBoard(board="board2"), comPort="FAKE2", baudRate=9600)
+        air = AirConditionerSystemConnection(connection=c1)
+        cur = CurtainControlSystemConnection(connection=c2)
+
+        t0 = time.monotonic()
+        results = bring_up_boards((("Board#1", c1, air), ("Board#2", c2, cur)))
+        elapsed = time.monotonic() - t0
+
+        self.assertLess(elapsed, 0.55)      # Sequential would be >= 0.6 s
+        self.assertEqual([r.name for r in results], ["Board#1", "Board#2"])
+        self.assertTrue(all(r.opened and r.synced for r in results))
+        self.assertTrue(all(r.ready_s >= 0.3 for r in results))
+        self.assertEqual(air.getAmbientTemp(), 24.0)
+        self.assertEqual(cur.getLightIntensity(), 200.0)
+
+    def test_failed_open_is_reported(self):
+        c = HomeAutomationSystemConnection(transport=FakeTransport(board="board1"), comPort="FAKE1", baudRate=9600)
+        c.open = lambda: False
+        (r,) = bring_up_boards((("Board#1", c, AirConditionerSystemConnection(connection=c)),))
+        self.assertFalse(r.opened)
+        self.assertFalse(r.synced)
+
+
+if __name__ == "__main__":
+    unittest.main()
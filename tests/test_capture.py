@@ -0,0 +1,201 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_capture.py
+DESCRIPTION:
+    Unit tests for the UART capture and replay transports
+    (transport/capture.py): file format, recording of a FakeTransport
+    session, replay of update()/setDesiredTemp() against the recording,
+    divergence detection and real-time playback.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from home_automation.api import AirConditionerSystemConnection, HomeAutomationSystemConnection
+from home_automation.protocol import board1
+from home_automation.transport import (
+    CaptureTransport, FakeTransport, ReplayDivergence, ReplayTransport, TransportError, read_capture,
+)
+from home_automation.transport import capture as cap
+
+
+def _air(transport):
+    conn = HomeAutomationSystemConnection(transport=transport, comPort="T", baudRate=9600)
+    conn.open()
+    return AirConditionerSystemConnection(connection=conn)
+
+
+class _SilentTransport(FakeTransport):
+    """Board #1 that never answers the ambient temperature GETs."""
+
+    def write_bytes(self, buf):
+        super().write_bytes(bytes(b for b in buf if b not in (board1.GET_AMBIENT_TEMP_LOW,
+                                                               board1.GET_AMBIENT_TEMP_HIGH)))
+
+
+class TestCaptureFile(unittest.TestCase):
+    """Recording to disk and loading it back."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix="capture_test_")
+        self.path = os.path.join(self.dir, "board1.cap")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_session_is_recorded_in_order(self):
+        """Every GET is followed by its answer (GET_ALL: count + 5 bytes); SETs are TX only."""
+        air = _air(CaptureTransport(FakeTransport(board="board1"), self.path))
+        air.update()
+        air.setDesiredTemp(27.5)
+        air.connection.close()
+
+        c = read_capture(self.path)
+        self.assertGreater(c.start_wall, 0.0)
+        kinds = [ev.kind for ev in c.events]
+        self.assertEqual(kinds, [cap.TX] + [cap.RX] * 6 + [cap.TX, cap.TX])
+        sent = bytes(ev.value for ev in c.events if ev.kind == cap.TX)
+        self.assertEqual(sent[:1], bytes([board1.GET_ALL]))
+        self.assertEqual(sent[1:], bytes(board1.encode_set_desired_temp(27.5)))
+        times = [ev.t for ev in c.events]
+        self.assertEqual(times, sorted(times))
+
+    def test_timeouts_and_drain_are_recorded(self):
+        t = CaptureTransport(FakeTransport(board="board1"), self.path)
+        t.open()
+        with self.assertRaises(TransportError):
+            t.read_exact(1, time.monotonic() + 0.01)
+        t.inner._rx_queue.extend([1] * 300)
+        self.assertEqual(t.drain(), 300)
+        t.close()
+        c = read_capture(self.path)
+        self.assertEqual([ev.kind for ev in c.events], [cap.TIMEOUT, cap.DRAIN, cap.DRAIN])
+        self.assertEqual(sum(ev.value for ev in c.events if ev.kind == cap.DRAIN), 300)
+
+    def test_reopen_continues_the_file(self):
+        t = CaptureTransport(FakeTransport(board="board1"), self.path)
+        t.open()
+        t.write_bytes(bytes([board1.GET_FAN_SPEED_RPS]))
+        t.close()
+        t.open()
+        t.write_bytes(bytes([board1.GET_FAN_SPEED_RPS]))
+        t.close()
+        self.assertEqual(read_capture(self.path).count(cap.TX), 2)
+
+    def test_truncated_record_is_ignored_and_bad_file_rejected(self):
+        t = CaptureTransport(FakeTransport(board="board1"), self.path)
+        t.open()
+        t.write_bytes(bytes([board1.GET_FAN_SPEED_RPS]))
+        t.close()
+        with open(self.path, "ab") as f:
+            f.write(b"\x01\x02\x03")
+        self.assertEqual(len(read_capture(self.path).events), 1)
+
+        bad = os.path.join(self.dir, "bad.cap")
+        with open(bad, "wb") as f:
+            f.write(b"not a capture file at all")
+        with self.assertRaises(ValueError):
+            read_capture(bad)
+
+
+class TestReplay(unittest.TestCase):
+    """Playing a recorded session back to the API."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix="replay_test_")
+        self.path = os.path.join(self.dir, "board1.cap")
+        air = _air(CaptureTransport(FakeTransport(board="board1"), self.path))
+        air.update()
+        air.setDesiredTemp(30.0)
+        air.update()
+        air.connection.close()
+        self.recorded = (air.desiredTemperature, air.ambientTemperature, air.fanSpeed)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_same_calls_give_the_recorded_values(self):
+        replay = ReplayTransport(self.path)
+        air = _air(replay)
+        air.update()
+        self.assertEqual(air.desiredTemperature, 25.0)
+        self.assertTrue(air.setDesiredTemp(30.0))
+        air.update()
+        self.assertEqual((air.desiredTemperature, air.ambientTemperature, air.fanSpeed), self.recorded)
+        self.assertEqual(air.fanSpeed, 30)
+        replay.assert_finished()
+
+    def test_different_set_diverges_loudly(self):
+        replay = ReplayTransport(self.path)
+        air = _air(replay)
+        air.update()
+        self.assertFalse(air.setDesiredTemp(20.0))   # The API catches it ...
+        self.assertIsNotNone(replay.divergence)
+        with self.assertRaises(ReplayDivergence):    # ... the replay does not
+            air.update()
+        with self.assertRaises(ReplayDivergence):
+            replay.assert_finished()
+
+    def test_unfinished_and_extra_calls_are_reported(self):
+        replay = ReplayTransport(self.path)
+        air = _air(replay)
+        air.update()
+        with self.assertRaises(ReplayDivergence):
+            replay.assert_finished()
+
+        replay.rewind()
+        air.update()
+        air.setDesiredTemp(30.0)
+        air.update()
+        with self.assertRaises(ReplayDivergence):
+            air.update()
+
+    def test_recorded_timeouts_are_replayed(self):
+        """Missing answers come back as timeouts, so retries replay exactly."""
+        path = os.path.join(self.dir, "silent.cap")
+        air = _air(CaptureTransport(_SilentTransport(board="board1"), path))
+        air.connection.snapshot_support["board1"] = False   # Register by register
+        air.connection.retry_policy.max_attempts = 2
+        air.connection.transport.inner.retry_delay = lambda cmd: 0.0
+        air.update()
+        air.connection.close()
+        self.assertEqual(air.stale, frozenset({"ambient_temp"}))
+
+        replay = ReplayTransport(path)
+        again = _air(replay)
+        again.connection.snapshot_support["board1"] = False
+        again.connection.retry_policy.max_attempts = 2
+        again.update()
+        self.assertEqual(again.stale, frozenset({"ambient_temp"}))
+        self.assertEqual(again.desiredTemperature, 25.0)
+        replay.assert_finished()
+
+    def test_realtime_follows_the_recorded_times(self):
+        c = cap.Capture(0.0, [cap.CaptureEvent(0.0, cap.TX, board1.GET_FAN_SPEED_RPS),
+                              cap.CaptureEvent(0.05, cap.RX, 7)])
+        fast = ReplayTransport(c)
+        fast.open()
+        t0 = time.monotonic()
+        fast.write_byte(board1.GET_FAN_SPEED_RPS)
+        self.assertEqual(fast.read_byte(), 7)
+        self.assertLess(time.monotonic() - t0, 0.04)
+
+        slow = ReplayTransport(c, realtime=True)
+        slow.open()
+        slow.write_byte(board1.GET_FAN_SPEED_RPS)
+        self.assertEqual(slow.read_byte(), 7)
+        self.assertGreaterEqual(time.monotonic() - slow._t0, 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_dispatch.py
+DESCRIPTION:
+    Unit tests for the table-driven command dispatch. For all 256 command
+    bytes the tables must behave exactly like the old if/elif chains
+    (kept in tools/bench_dispatch.py).
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import unittest
+
+from home_automation.protocol import board1, board2, dispatch
+from home_automation.tools import bench_dispatch as legacy
+from home_automation.transport import FakeTransport
+
+
+class TestDispatchTables(unittest.TestCase):
+    """Tables vs. the old chains, byte by byte."""
+
+    def test_tables_have_256_entries(self):
+        self.assertEqual(len(board1.DISPATCH), 256)
+        self.assertEqual(len(board2.dispatch_table()), 256)
+        self.assertIs(board2.dispatch_table(0x08), board2.dispatch_table(0x08))
+        self.assertEqual(board1.DISPATCH[0x05].kind, dispatch.GET)
+        self.assertEqual(board1.DISPATCH[0x00].kind, dispatch.NONE)
+        self.assertEqual(board1.DISPATCH[0x9F].kind, dispatch.SET_LOW)
+        self.assertEqual(board1.DISPATCH[0xFF].kind, dispatch.SET_HIGH)
+
+    def test_board1_respond_matches_chain(self):
+        for cmd in range(256):
+            a, b = board1.AirState(), board1.AirState()
+            self.assertEqual(dispatch.respond(board1.DISPATCH, cmd, a),
+                             legacy.legacy_respond_board1(cmd, b), hex(cmd))
+            self.assertEqual(a, b, hex(cmd))
+
+    def test_bulk_respond_matches_single(self):
+        data = bytes(range(256)) * 2
+        a, b = board1.AirState(), board1.AirState()
+        single = bytearray()
+        for c in data:
+            r = dispatch.respond(board1.DISPATCH, c, a)
+            if r is not None:
+                single.append(r)
+            elif board1.DISPATCH[c].kind == dispatch.SNAPSHOT:
+                single += board1.REGISTER_MAP.snapshot(a)
+        self.assertEqual(dispatch.respond_bytes(board1.DISPATCH, data, b), bytes(single))
+        self.assertEqual(a, b)
+
+    def test_board2_respond_matches_chain(self):
+        for light in (0x08, 0x09, 0x03, 0x90):
+            table = board2.dispatch_table(light)
+            for cmd in range(256):
+                a, b = board2.CurtainState(), board2.CurtainState()
+                self.assertEqual(dispatch.respond(table, cmd, a),
+                                 legacy.legacy_respond_board2(cmd, b, light), (hex(light), hex(cmd)))
+                self.assertEqual(a, b, (hex(light), hex(cmd)))
+
+    def test_decoders_match_chain(self):
+        for cmd in range(256):
+            for data in (0x00, 0x2A, 0xFF):
+                self.assertEqual(board1.decode_get_response(cmd, data, board1.AirState()),
+                                 legacy.legacy_decode_board1(cmd, data, board1.AirState()))
+                for light in (0x08, 0x09):
+                    self.assertEqual(
+                        board2.decode_get_response(cmd, data, board2.CurtainState(), light_high_cmd=light),
+                        legacy.legacy_decode_board2(cmd, data, board2.CurtainState(), light))
+
+    def test_fake_transport_uses_table(self):
+        """A custom light high command is answered by the fake board."""
+        t = FakeTransport(board="board2", light_high_cmd=0x09)
+        t.open()
+        t.write_bytes(bytes([0x09, 0x08, 0x00]))
+        self.assertEqual(t.read_exact(2, 0.0), bytes([200, 200]))
+        self.assertEqual(t.drain(), 0)
+
+    def test_benchmark_runs(self):
+        rates = legacy.run(n=2000)
+        self.assertEqual(len(rates), 10)
+        self.assertTrue(all(r > 0 for r in rates.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_frames.py
+DESCRIPTION:
+    Unit tests for the framed protocol v2: CRC-8, frame encoding,
+    resynchronization after stray and corrupted bytes, the board side
+    answers, negotiation with fallback to the legacy protocol, and answers
+    matched by sequence number instead of input flushes.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import unittest
+
+from home_automation.api import AirConditionerSystemConnection, HomeAutomationSystemConnection
+from home_automation.protocol import board1
+from home_automation.protocol import frames as fr
+from home_automation.protocol.common import GET_ALL
+from home_automation.transport import FakeTransport
+from home_automation.transport.emulated_transport import EmulatedTransport
+
+
+class _NoisyTransport(FakeTransport):
+    """Framed Board #1 with stray bytes and a corrupted frame before every answer."""
+
+    NOISE = bytes([0x13, fr.FRAME_START, 0x05]) + bytes([fr.FRAME_START, 1, 0x82, 1, 9, 0x00])
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.drains = 0
+
+    def write_bytes(self, buf):
+        before = len(self._rx_queue)
+        super().write_bytes(buf)
+        if len(self._rx_queue) > before:
+            self._rx_queue[before:before] = list(self.NOISE)
+
+    def drain(self):
+        self.drains += 1
+        return super().drain()
+
+
+class _LateTransport(FakeTransport):
+    """Framed Board #1 whose first answer only arrives with the next request."""
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.held = None
+
+    def write_bytes(self, buf):
+        before = len(self._rx_queue)
+        super().write_bytes(buf)
+        if self.held is None and buf[0] == fr.FRAME_START and buf[2] == fr.OP_GET:
+            self.held = bytes(self._rx_queue[before:])
+            del self._rx_queue[before:]
+        elif self.held:
+            self._rx_queue[before:before] = list(self.held)
+            self.held = b""
+
+
+def make_connection(transport, framing="auto"):
+    c = HomeAutomationSystemConnection(transport=transport, comPort="TEST", baudRate=9600, framing=framing)
+    c.open()
+    return c
+
+
+class TestFrames(unittest.TestCase):
+    """Encoding and parsing."""
+
+    def test_crc8(self):
+        self.assertEqual(fr.crc8(b"123456789"), 0xF4)      # CRC-8 (SMBus) check value
+        frame = fr.encode_frame(7, fr.OP_GET, bytes([1, 2]))
+        self.assertEqual(fr.crc8(frame[1:]), 0)            # CRC over body + CRC is 0
+
+    def test_hello_is_safe_for_legacy_firmware(self):
+        self.assertTrue(all(b < 0x80 for b in fr.HELLO_REQUEST))
+        self.assertNotIn(GET_ALL, fr.HELLO_REQUEST)
+
+    def test_resync_without_flush(self):
+        good = fr.encode_frame(3, fr.OP_GET | fr.REPLY, bytes([25, 0]))
+        bad = bytearray(fr.encode_frame(4, fr.OP_GET | fr.REPLY, bytes([1])))
+        bad[-2] ^= 0x40
+        stream = bytes([0x00, 0x7E, 0x7E, 0xFF]) + bytes(bad) + good + bytes([0x7E, 9])
+
+        p = fr.FrameParser()
+        self.assertEqual(p.feed(stream), [fr.Frame(3, fr.OP_GET | fr.REPLY, bytes([25, 0]))])
+        self.assertGreaterEqual(p.crc_errors, 1)
+        self.assertEqual(p.pending(), 2)                   # Start of a possible next frame
+
+        # Byte by byte gives the same frames
+        q = fr.FrameParser()
+        self.assertEqual([f for b in stream for f in q.feed(bytes([b]))],
+                         [fr.Frame(3, fr.OP_GET | fr.REPLY, bytes([25, 0]))])
+        self.assertEqual((q.crc_errors, q.skipped), (p.crc_errors, p.skipped))
+
+    def test_stray_start_does_not_block(self):
+        p = fr.FrameParser()
+        reply = fr.encode_frame(5, fr.OP_SET | fr.REPLY)
+        self.assertEqual(p.feed(bytes([0x7E, 5, 0x20, 0x20]) + reply), [])   # Waits for a 32 byte "frame"
+        self.assertEqual(p.flush_partial(), [fr.Frame(5, fr.OP_SET | fr.REPLY)])
+
+    def test_board_answers(self):
+        st = board1.REGISTER_MAP.simulated_state()
+        table = board1.DISPATCH
+        get = fr.respond_frame(table, fr.Frame(1, fr.OP_GET, bytes([board1.GET_DESIRED_TEMP_HIGH,
+                                                                    board1.GET_FAN_SPEED_RPS])), st)
+        self.assertEqual(get.payload, bytes([25, st.fan_speed_rps]))
+
+        low, high = board1.REGISTER_MAP.encode_set(27.5)
+        self.assertEqual(fr.respond_frame(table, fr.Frame(2, fr.OP_SET, bytes([low, high])), st).opcode,
+                         fr.OP_SET | fr.REPLY)
+        self.assertEqual(st.desired_temp.to_float(), 27.5)
+
+        self.assertTrue(fr.respond_frame(table, fr.Frame(3, fr.OP_GET, bytes([0x30])), st).is_error)
+        self.assertTrue(fr.respond_frame(table, fr.Frame(4, fr.OP_SET, bytes([0x01])), st).is_error)
+        self.assertTrue(fr.respond_frame(table, fr.Frame(5, 0x42), st).is_error)
+
+
+class TestNegotiation(unittest.TestCase):
+    """HELLO at open() and the fallback to the legacy protocol."""
+
+    def test_v2_board(self):
+        c = make_connection(FakeTransport(board="board1", framed=True))
+        self.assertEqual(c.protocol_version, 2)
+        air = AirConditionerSystemConnection(connection=c)
+        air.update()
+        self.assertEqual((air.stale, air.desiredTemperature), (frozenset(), 25.0))
+        # All five GETs in one frame: 4 header bytes + 5 codes + CRC
+        self.assertEqual(c.stats_snapshot().bytes_sent, 10)
+
+        self.assertTrue(air.setDesiredTemp(27.5))          # Confirmed by the board
+        air.update(fields=("desired_temp",))
+        self.assertEqual(air.desiredTemperature, 27.5)
+
+    def test_legacy_board(self):
+        for t in (FakeTransport(board="board1"), EmulatedTransport("board1")):
+            c = make_connection(t)
+            self.assertEqual(c.protocol_version, 1)
+            air = AirConditionerSystemConnection(connection=c)
+            air.update()
+            self.assertEqual((air.stale, air.desiredTemperature), (frozenset(), 25.0))
+
+    def test_legacy_is_default(self):
+        c = make_connection(FakeTransport(board="board1", framed=True), framing="legacy")
+        self.assertEqual(c.protocol_version, 1)
+
+
+class TestResync(unittest.TestCase):
+    """Answers are matched by sequence number, no input flush is needed."""
+
+    def test_noise_is_skipped(self):
+        t = _NoisyTransport(board="board1", framed=True)
+        c = make_connection(t)
+        drains = t.drains
+        air = AirConditionerSystemConnection(connection=c)
+        for _ in range(3):
+            air.update()
+            self.assertEqual((air.stale, air.desiredTemperature), (frozenset(), 25.0))
+        self.assertEqual(t.drains, drains)
+        self.assertGreater(c.frame_parser.skipped, 0)
+        self.assertGreater(c.frame_parser.crc_errors, 0)
+
+    def test_late_answer_is_not_taken(self):
+        c = make_connection(_LateTransport(board="board1", framed=True))
+        self.assertEqual(c.transact(bytes([board1.GET_DESIRED_TEMP_HIGH]), 1, timeout_s=0.01), b"")
+        # The late answer (25) arrives first but has the old sequence number
+        fan = c.transact(bytes([board1.GET_FAN_SPEED_RPS]), 1)
+        self.assertEqual(fan, bytes([board1.REGISTER_MAP.simulated_state().fan_speed_rps]))
+
+    def test_several_frames_in_flight(self):
+        c = make_connection(FakeTransport(board="board1", framed=True))
+        cmds = bytes(board1.REGISTER_MAP.get_commands) * 10     # 50 GETs: two frames
+        single = c.pipeline(bytes(board1.REGISTER_MAP.get_commands))
+        self.assertEqual(c.pipeline(cmds), single * 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,203 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_get_all.py
+DESCRIPTION:
+    Unit tests for the GET_ALL snapshot command: the answer of the
+    simulated and emulated boards, the decoder, and the fallback to one
+    GET per register for firmware without GET_ALL.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import asyncio
+import dataclasses
+import unittest
+
+from home_automation.api import (
+    AirConditionerSystemConnection,
+    BoardPoller,
+    CurtainControlSystemConnection,
+    HomeAutomationSystemConnection,
+)
+from home_automation.api.async_common import AsyncHomeAutomationSystemConnection
+from home_automation.api.board_connection import read_registers
+from home_automation.api.retry_policy import CLOSED, OPEN, CircuitBreaker, RetryPolicy
+from home_automation.pic.boards import Board1Environment
+from home_automation.protocol import board1, board2
+from home_automation.protocol.common import GET_ALL
+from home_automation.transport import AsyncFakeTransport, FakeTransport
+from home_automation.transport.emulated_transport import EmulatedTransport
+
+# Board #1 with the firmware before GET_ALL
+OLD_BOARD1 = dataclasses.replace(board1.REGISTER_MAP, get_all=None)
+
+
+@dataclasses.dataclass
+class _DeadBoard(FakeTransport):
+    """Fake board that ignores every byte while 'dead' (power lost)."""
+    dead: bool = False
+
+    def write_bytes(self, buf):
+        if not self.dead:
+            super().write_bytes(buf)
+
+    def retry_delay(self, cmd):
+        return 0.01
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def make_connection(transport):
+    c = HomeAutomationSystemConnection(transport=transport, comPort="TEST", baudRate=9600)
+    c.open()
+    return c
+
+
+class TestSnapshot(unittest.TestCase):
+    """Board side answer and PC side decoder."""
+
+    def test_round_trip(self):
+        st = board1.REGISTER_MAP.new_state()
+        board1.REGISTER_MAP.simulated_state(st)
+        data = board1.REGISTER_MAP.snapshot(st)
+        self.assertEqual(data[0], len(board1.REGISTER_MAP.get_commands))
+        self.assertEqual(board1.REGISTER_MAP.decode_snapshot(data), st)
+
+    def test_wrong_size_is_rejected(self):
+        data = board1.REGISTER_MAP.snapshot(board1.REGISTER_MAP.new_state())
+        for bad in (data[:-1], data + b"\x00", bytes([data[0] + 1]) + data[1:]):
+            with self.assertRaises(ValueError):
+                board1.REGISTER_MAP.decode_snapshot(bad)
+
+
+class TestReadRegisters(unittest.TestCase):
+    """read_registers() with and without GET_ALL in the firmware."""
+
+    def test_one_round_trip(self):
+        c = make_connection(FakeTransport(board="board1"))
+        res = read_registers(c, board1.REGISTER_MAP)
+        self.assertEqual(res.stale, frozenset())
+        self.assertEqual(c.snapshot_support, {"board1": True})
+        st = c.stats_snapshot()
+        self.assertEqual(set(st.commands), {GET_ALL})
+        self.assertEqual(st.bytes_sent, 1)
+
+        # Same values as one GET per register
+        names = [reg.name for reg in board1.REGISTER_MAP.registers]
+        self.assertEqual(read_registers(c, board1.REGISTER_MAP, names=names).state, res.state)
+
+    def test_poller_uses_get_all(self):
+        """A poll cycle with every register due is one GET_ALL."""
+        c = make_connection(FakeTransport(board="board1"))
+        poller = BoardPoller(c, board1.REGISTER_MAP)
+        poller.poll_once([reg.name for reg in board1.REGISTER_MAP.registers])
+        self.assertEqual(set(c.stats_snapshot().commands), {GET_ALL})
+
+    def test_fallback_for_old_firmware(self):
+        c = make_connection(FakeTransport(board="board1", board_map=OLD_BOARD1))
+        first = read_registers(c, board1.REGISTER_MAP)
+        self.assertEqual(first.stale, frozenset())
+        self.assertEqual(c.snapshot_support, {"board1": False})
+
+        # GET_ALL is not tried again
+        before = c.stats_snapshot().commands[GET_ALL].requests
+        again = read_registers(c, board1.REGISTER_MAP)
+        self.assertEqual(again.state, first.state)
+        self.assertEqual(c.stats_snapshot().commands[GET_ALL].requests, before)
+
+    def test_async(self):
+        async def run(transport):
+            c = AsyncHomeAutomationSystemConnection(transport=transport, comPort="TEST", baudRate=9600)
+            await c.open()
+            res = await c.read_registers(board2.REGISTER_MAP)
+            return c, res
+
+        c, res = asyncio.run(run(AsyncFakeTransport(board="board2")))
+        self.assertEqual(c.snapshot_support, {"board2": True})
+        self.assertEqual(res.stale, frozenset())
+        self.assertEqual(res.state.light_intensity.to_float(), 200.0)
+
+
+class TestBreaker(unittest.TestCase):
+    """GET_ALL gives its result to the circuit breaker like any GET."""
+
+    def _connect(self, transport):
+        c = make_connection(transport)
+        c.retry_policy = RetryPolicy(deadline_s=0.3, max_attempts=2)
+        self.clock = _Clock()
+        c.breaker = CircuitBreaker(failure_threshold=3, reset_timeout_s=5.0, clock=self.clock)
+        return c
+
+    def test_failed_probe_then_recovery(self):
+        t = _DeadBoard(board="board1")
+        c = self._connect(t)
+        self.assertEqual(read_registers(c, board1.REGISTER_MAP).stale, frozenset())
+
+        t.dead = True
+        while c.breaker.state != OPEN:
+            read_registers(c, board1.REGISTER_MAP)
+
+        # The half-open probe is the GET_ALL, and the board is still down
+        self.clock.t = 5.0
+        self.assertTrue(read_registers(c, board1.REGISTER_MAP).stale)
+        self.assertEqual(c.breaker.state, OPEN)
+
+        t.dead = False
+        self.clock.t = 10.0
+        self.assertEqual(read_registers(c, board1.REGISTER_MAP).stale, frozenset())
+        self.assertEqual(c.breaker.state, CLOSED)
+
+    def test_old_firmware_back_online(self):
+        # Offline before it was known whether the firmware has GET_ALL
+        t = _DeadBoard(board="board1", board_map=OLD_BOARD1, dead=True)
+        c = self._connect(t)
+        while c.breaker.state != OPEN:
+            read_registers(c, board1.REGISTER_MAP)
+        self.assertNotIn("board1", c.snapshot_support)
+
+        t.dead = False
+        self.clock.t = 5.0
+        self.assertEqual(read_registers(c, board1.REGISTER_MAP).stale, frozenset())
+        self.assertEqual(c.breaker.state, CLOSED)
+        self.assertEqual(c.snapshot_support, {"board1": False})
+
+
+class TestFirmware(unittest.TestCase):
+    """board1.asm / board2.asm answer GET_ALL."""
+
+    def test_board1(self):
+        t = EmulatedTransport("board1", environment=Board1Environment(ambient_c=22.0))
+        c = make_connection(t)
+        air = AirConditionerSystemConnection(connection=c)
+        t.advance(1.0)
+        air.update()
+        self.assertEqual(c.snapshot_support, {"board1": True})
+        self.assertEqual(air.stale, frozenset())
+        self.assertEqual((air.desiredTemperature, air.ambientTemperature), (25.0, 22.0))
+        self.assertGreater(air.fanSpeed, 0)
+        self.assertEqual([ex.cmd for ex in t.exchanges], [GET_ALL])
+
+    def test_board2(self):
+        t = EmulatedTransport("board2")
+        c = make_connection(t)
+        cur = CurtainControlSystemConnection(connection=c)
+        cur.update()
+        self.assertEqual(c.snapshot_support, {"board2": True})
+        self.assertEqual(cur.stale, frozenset())
+        self.assertEqual(cur.lightIntensity, 200.0)
+        self.assertEqual([ex.cmd for ex in t.exchanges], [GET_ALL])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_link_stats.py
+DESCRIPTION:
+    Unit tests for the link instrumentation: the log-bucketed latency
+    histogram and the per-command counters of HomeAutomationSystemConnection.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import unittest
+
+from home_automation.api import AirConditionerSystemConnection, HomeAutomationSystemConnection
+from home_automation.api.board_connection import request_byte
+from home_automation.api.link_stats import LatencyHistogram
+from home_automation.protocol import board1
+from home_automation.transport import FakeTransport
+
+
+def make_connection():
+    c = HomeAutomationSystemConnection(transport=FakeTransport(board="board1"), comPort="FAKE1", baudRate=9600)
+    c.open()
+    return c
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Fixed memory and approximate percentiles."""
+
+    def test_fixed_memory(self):
+        h = LatencyHistogram()
+        for i in range(10000):
+            h.record(0.001 * (1 + i % 50))
+        h.record(1e-9)
+        h.record(1e6)
+        self.assertEqual(len(h.counts), h.n_buckets)
+        self.assertEqual(sum(h.counts), h.count)
+
+    def test_percentiles_within_one_bucket(self):
+        h = LatencyHistogram()
+        for ms in range(1, 101):
+            h.record(ms / 1000.0)
+        # 4 buckets per doubling -> upper edge at most ~19 % above the value
+        self.assertGreaterEqual(h.percentile(50), 0.050)
+        self.assertLessEqual(h.percentile(50), 0.050 * 1.19)
+        self.assertEqual(h.percentile(100), 0.100)
+        self.assertAlmostEqual(h.mean_s(), 0.0505)
+
+
+class TestConnectionStats(unittest.TestCase):
+    """Counters recorded by HomeAutomationSystemConnection."""
+
+    def test_update_and_set_are_recorded(self):
+        c = make_connection()
+        air = AirConditionerSystemConnection(connection=c)
+        air.update()
+        air.setDesiredTemp(30.0)
+
+        st = c.stats_snapshot()
+        self.assertEqual(st.opens, 1)
+        # One GET_ALL: count + 5 values
+        self.assertEqual(st.commands[board1.GET_ALL].requests, 1)
+        self.assertEqual(st.commands[board1.GET_ALL].bytes_received, 6)
+        self.assertEqual(st.commands[board1.GET_ALL].latency.count, 1)
+        set_stats = st.commands[0x80]
+        self.assertEqual((set_stats.requests, set_stats.bytes_sent), (1, 2))
+        self.assertEqual(st.bytes_sent, 1 + 2)
+        self.assertEqual(st.bytes_received, 6)
+
+    def test_timeouts_and_retries(self):
+        """A command without an answer counts timeouts and retries."""
+        c = make_connection()
+        self.assertIsNone(request_byte(c, 0x10, retries=2))
+        st = c.stats_snapshot().commands[0x10]
+        self.assertEqual((st.requests, st.timeouts, st.retries), (2, 2, 1))
+        self.assertEqual(st.latency.count, 0)
+
+    def test_snapshot_is_a_copy(self):
+        c = make_connection()
+        snap = c.stats_snapshot()
+        c.transact(bytes([board1.GET_FAN_SPEED_RPS]), 1)
+        self.assertNotIn(board1.GET_FAN_SPEED_RPS, snap.commands)
+        self.assertIn(board1.GET_FAN_SPEED_RPS, c.stats_snapshot().commands)
+        self.assertTrue(c.stats_snapshot().summary_lines())
+
+    def test_disabled_records_nothing(self):
+        c = make_connection()
+        c.enable_stats(False)
+        c.transact(bytes([board1.GET_FAN_SPEED_RPS]), 1)
+        c.close()
+        st = c.stats_snapshot()
+        self.assertEqual(st.commands, {})
+        self.assertEqual(st.closes, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_link_timing.py
+DESCRIPTION:
+    Unit tests for the self-calibrating link timing (RTT estimation,
+    timeout back-off, derived gap and profile persistence).
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import os
+import tempfile
+import unittest
+
+from home_automation.transport.link_timing import LinkTimingProfile
+
+
+class TestLinkTimingProfile(unittest.TestCase):
+    """RTT estimation and derived values."""
+
+    def test_unknown_command_uses_initial_values(self):
+        """Before any measurement the conservative defaults apply."""
+        p = LinkTimingProfile()
+        self.assertEqual(p.timeout_for(0x01), p.initial_timeout_s)
+        self.assertEqual(p.retry_delay_for(0x01), p.initial_retry_delay_s)
+        self.assertEqual(p.inter_byte_gap(0.00104, 0.005), 0.005)
+
+    def test_timeout_converges_to_fast_board(self):
+        """A board answering in ~3 ms gets a timeout in the tens of ms."""
+        p = LinkTimingProfile()
+        for _ in range(50):
+            p.observe(0x02, 0.003)
+        self.assertLess(p.timeout_for(0x02), 0.05)
+        self.assertGreaterEqual(p.timeout_for(0x02), p.min_timeout_s)
+
+    def test_timeout_backs_off_and_recovers(self):
+        """Timeouts double the wait; the next answer resets it."""
+        p = LinkTimingProfile(min_timeout_s=0.001)
+        for _ in range(20):
+            p.observe(0x05, 0.004)
+        base = p.timeout_for(0x05)
+        p.on_timeout(0x05)
+        p.on_timeout(0x05)
+        self.assertAlmostEqual(p.timeout_for(0x05), min(base * 4, p.max_timeout_s))
+        p.observe(0x05, 0.004)
+        self.assertLess(p.timeout_for(0x05), base * 1.5)
+
+    def test_slow_board_raises_timeout(self):
+        """Variance from a slow board (motor moving) widens the timeout."""
+        p = LinkTimingProfile()
+        for _ in range(20):
+            p.observe(0x02, 0.003)
+        fast = p.timeout_for(0x02)
+        for rtt in (0.12, 0.004, 0.13, 0.003):
+            p.observe(0x02, rtt)
+        self.assertGreater(p.timeout_for(0x02), fast * 3)
+
+    def test_save_and_load(self):
+        """A saved profile gives the same timeouts after loading."""
+        p = LinkTimingProfile()
+        for _ in range(10):
+            p.observe(0x07, 0.006)
+        p.on_timeout(0x07)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "board2_timing.json")
+            p.save(path)
+            q = LinkTimingProfile.load(path)
+        self.assertEqual(q.commands[0x07].samples, 10)
+        # The back-off of the previous session is not carried over
+        self.assertEqual(q.commands[0x07].backoff, 0)
+        p.commands[0x07].backoff = 0
+        self.assertAlmostEqual(q.timeout_for(0x07), p.timeout_for(0x07))
+
+
+if __name__ == "__main__":
+    unittest.main()
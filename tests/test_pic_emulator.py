@@ -0,0 +1,273 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_pic_emulator.py
+DESCRIPTION:
+    Unit tests for the PIC16F877A assembler and emulator (pic/) and for
+    the EmulatedTransport that runs board1.asm / board2.asm:
+    instruction encodings, flags and cycle counts, computed jumps,
+    interrupts, UART FIFO/overrun, and the real firmware answering the
+    API through the transport.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import unittest
+
+from home_automation.api import (
+    AirConditionerSystemConnection, CurtainControlSystemConnection, HomeAutomationSystemConnection,
+)
+from home_automation.pic import p16f877a as chip
+from home_automation.pic.assembler import AsmError, assemble
+from home_automation.pic.boards import Board1Environment, firmware
+from home_automation.pic.cpu import PIC16
+from home_automation.protocol import board1
+from home_automation.transport.emulated_transport import EmulatedTransport
+
+_HEADER = """
+    LIST P=16F877A
+    INCLUDE "P16F877A.INC"
+    CBLOCK 0x20
+        A1, B1
+    ENDC
+"""
+
+
+def _run(body: str, cycles: int = 1000) -> PIC16:
+    """Assembles 'body' (after ORG 0), runs it and returns the CPU."""
+    cpu = PIC16(assemble(_HEADER + "    ORG 0\n" + body + "\nHALT GOTO HALT\n    END\n"))
+    cpu.run(cycles)
+    return cpu
+
+
+class TestAssembler(unittest.TestCase):
+    """Instruction words and MPASM syntax."""
+
+    def test_encodings(self):
+        prog = assemble(_HEADER + """
+    ORG 0
+    MOVLW   0x25
+    MOVWF   A1
+    DECFSZ  A1, F
+    BSF     STATUS, RP0
+    RETLW   d'63'
+    GOTO    0x10
+    CALL    LBL
+LBL: RETFIE
+    ADDWF   PCL, F
+    BANKSEL TRISC
+    MOVF    TRISC, W
+    END
+""")
+        words = [prog.words[a] for a in range(len(prog.words))]
+        self.assertEqual(words, [0x3025, 0x00A0, 0x0BA0, 0x1683, 0x343F, 0x2810, 0x2007, 0x0009,
+                                 0x0782, 0x1683, 0x1303, 0x0807])
+        self.assertEqual(prog.labels["LBL"], 7)
+
+    def test_numbers_defines_and_errors(self):
+        prog = assemble(_HEADER + """
+#define LED PORTB, 3
+VAL EQU d'10' + b'11' * 2
+    ORG 0
+    MOVLW VAL
+    MOVLW 'A'
+    MOVLW 10
+    BSF LED
+    END
+""")
+        self.assertEqual([prog.words[a] & 0xFF for a in range(3)], [16, 0x41, 0x10])
+        self.assertEqual(prog.words[3], 0x1586)
+        with self.assertRaises(AsmError):
+            assemble(_HEADER + "    ORG 0\n    GOTO NOWHERE\n    END\n")
+        with self.assertRaises(AsmError):
+            assemble(_HEADER + "    ORG 0\n    FOO 1\n    END\n")
+
+    def test_shipped_firmware_assembles(self):
+        for board in ("board1", "board2"):
+            prog = firmware(board)
+            self.assertGreater(len(prog.words), 300)
+            self.assertLess(max(prog.words), 0x800)     # Fits in page 0
+
+
+class TestCore(unittest.TestCase):
+    """Instruction semantics and timing."""
+
+    def test_arithmetic_flags(self):
+        cpu = _run("""
+    MOVLW   0xF0
+    MOVWF   A1
+    MOVLW   0x20
+    ADDWF   A1, F       ; 0x110: C=1, Z=0
+    MOVF    STATUS, W
+    MOVWF   B1
+""")
+        self.assertEqual(cpu.mem[0x20], 0x10)
+        self.assertEqual(cpu.mem[0x21] & 0x07, 0x01)
+
+        cpu = _run("""
+    MOVLW   5
+    SUBLW   3           ; 3 - 5: borrow (C=0)
+    MOVWF   A1
+    MOVLW   3
+    SUBLW   3           ; 0: C=1, Z=1
+""")
+        self.assertEqual(cpu.mem[0x20], 0xFE)
+        self.assertEqual(cpu.w, 0)
+        self.assertEqual(cpu.mem[chip.STATUS] & 0x05, 0x05)
+
+    def test_cycle_counts(self):
+        """1 cycle per instruction, 2 for GOTO and taken skips: a classic delay loop."""
+        cpu = PIC16(assemble(_HEADER + """
+    ORG 0
+    MOVLW   d'100'
+    MOVWF   A1
+LOOP DECFSZ A1, F
+    GOTO    LOOP
+    SLEEP
+    END
+"""))
+        cpu.run(10_000, stop=None)
+        self.assertEqual(cpu.mem[0x20], 0)
+        # 2 + 99 * 3 + 2 cycles until SLEEP is fetched
+        cpu2 = PIC16(cpu.program)
+        cpu2.run(2 + 99 * 3 + 2)
+        self.assertEqual(cpu2.pc, 4)
+
+    def test_call_table_and_indirect(self):
+        cpu = _run("""
+    MOVLW   2
+    CALL    TABLE
+    MOVWF   A1
+    MOVLW   0x21
+    MOVWF   FSR
+    MOVLW   0x5A
+    MOVWF   INDF
+    GOTO    HALT
+TABLE ADDWF PCL, F
+    RETLW   0x10
+    RETLW   0x11
+    RETLW   0x12
+""")
+        self.assertEqual(cpu.mem[0x20], 0x12)
+        self.assertEqual(cpu.mem[0x21], 0x5A)
+
+    def test_timer0_interrupt(self):
+        cpu = PIC16(assemble(_HEADER + """
+    ORG 0
+    GOTO MAIN
+    ORG 4
+    INCF    A1, F
+    BCF     INTCON, T0IF
+    RETFIE
+MAIN BANKSEL OPTION_REG
+    MOVLW   b'00000000'     ; Timer0 on the instruction clock, prescaler 1:2
+    MOVWF   OPTION_REG
+    BANKSEL PORTA
+    BSF     INTCON, T0IE
+    BSF     INTCON, GIE
+SPIN GOTO SPIN
+    END
+"""))
+        cpu.run(10 * 512 + 20)
+        self.assertEqual(cpu.mem[0x20], 10)
+
+
+class TestUart(unittest.TestCase):
+    """Receive FIFO, overrun and transmit timing."""
+
+    ECHO = """
+    BANKSEL SPBRG
+    MOVLW   d'25'
+    MOVWF   SPBRG
+    MOVLW   b'00100100'
+    MOVWF   TXSTA
+    BANKSEL RCSTA
+    MOVLW   b'10010000'
+    MOVWF   RCSTA
+WAIT BTFSS PIR1, RCIF
+    GOTO    WAIT
+    MOVF    RCREG, W
+    ADDLW   1
+    MOVWF   TXREG
+    GOTO    WAIT
+"""
+
+    def test_echo_timing(self):
+        cpu = _run(self.ECHO, 50)
+        sent = []
+        cpu.tx_sink = lambda c, b: sent.append((c, b))
+        cpu.uart_receive(0x41, 1000)
+        cpu.run(5000)
+        self.assertEqual([b for _, b in sent], [0x42])
+        # 10 bits of 104 cycles after the byte was picked up
+        self.assertTrue(1000 + 1040 <= sent[0][0] <= 1000 + 1040 + 10)
+
+    def test_overrun_stops_the_receiver(self):
+        cpu = PIC16(assemble(_HEADER + "    ORG 0\n" + self.ECHO.split("WAIT")[0] + "HALT GOTO HALT\n    END\n"))
+        cpu.run(50)
+        for i in range(3):
+            cpu.uart_receive(i, 100 + i * 1040)
+        cpu.run(5000)
+        self.assertTrue(cpu.mem[chip.RCSTA] & (1 << chip.OERR))
+        self.assertEqual(cpu.read(chip.RCREG), 0)
+        self.assertEqual(cpu.read(chip.RCREG), 1)
+
+
+class TestEmulatedBoards(unittest.TestCase):
+    """The shipped firmware behind the normal API."""
+
+    def _connect(self, board, **kw):
+        t = EmulatedTransport(board, **kw)
+        conn = HomeAutomationSystemConnection(transport=t, comPort="EMU", baudRate=9600)
+        self.assertTrue(conn.open())
+        return t, conn
+
+    def test_board1_get_and_set(self):
+        t, conn = self._connect("board1", environment=Board1Environment(ambient_c=22.0))
+        air = AirConditionerSystemConnection(connection=conn)
+        t.advance(1.0)          # One fan measurement period
+        air.update()
+        self.assertEqual(air.stale, frozenset())
+        self.assertEqual((air.desiredTemperature, air.ambientTemperature), (25.0, 22.0))
+        self.assertGreater(air.fanSpeed, 0)     # Heating: the fan turns
+
+        self.assertTrue(air.setDesiredTemp(18.0))
+        air.update(fields=("desired_temp",))
+        self.assertEqual(air.desiredTemperature, 18.0)
+
+        # Every GET waited for the main loop to poll RCIF
+        gets = [ex for ex in t.exchanges if ex.cmd == board1.GET_DESIRED_TEMP_HIGH]
+        self.assertTrue(all(ex.latency_s >= 2 * 10 / 9600 for ex in gets))
+        self.assertTrue(all(ex.pickup_s is not None for ex in t.exchanges))
+
+    def test_board2_moves_to_the_set_point(self):
+        t, conn = self._connect("board2", inter_byte_gap_s=0.0)
+        cur = CurtainControlSystemConnection(connection=conn)
+        cur.update()
+        self.assertEqual(cur.lightIntensity, 200.0)
+        self.assertTrue(cur.setCurtainStatus(0.0))
+        t.advance(5.0)
+        cur.update()
+        self.assertEqual(cur.curtainStatus, 0.0)
+        self.assertEqual(cur.stale, frozenset())
+
+    def test_board2_default_gap_keeps_the_fifo(self):
+        t, conn = self._connect("board2")
+        conn.snapshot_support["board2"] = False     # Register by register
+        cur = CurtainControlSystemConnection(connection=conn)
+        t.advance(3.0)
+        for target in (20.0, 60.0):
+            self.assertTrue(cur.setCurtainStatus(target))
+            cur.update()
+            self.assertEqual(cur.stale, frozenset())
+        # No byte was lost in an overrun: the firmware read every one
+        self.assertTrue(all(ex.pickup_s is not None for ex in t.exchanges))
+        self.assertEqual(sum(s.timeouts for s in conn.stats_snapshot().commands.values()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,230 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_pipeline.py
+DESCRIPTION:
+    Unit tests for pipelined GETs: answers matched in order, never more
+    GETs in flight than the window, the fallback to stop-and-wait after a
+    timeout, and the gain on the emulated firmware.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import threading
+import time
+import unittest
+
+from home_automation.api import AirConditionerSystemConnection, HomeAutomationSystemConnection
+from home_automation.api.board_connection import read_registers
+from home_automation.api.port_worker import PRIO_POLL
+from home_automation.api.retry_policy import CLOSED, OPEN, CircuitBreaker, RetryPolicy
+from home_automation.protocol import board1
+from home_automation.protocol.common import RX_FIFO_DEPTH
+from home_automation.transport import FakeTransport
+from home_automation.transport.emulated_transport import EmulatedTransport
+
+
+class _CountingTransport(FakeTransport):
+    """Board #1 that records the most GETs waiting for an answer at once."""
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def write_bytes(self, buf):
+        super().write_bytes(buf)
+        self.in_flight += sum(1 for b in buf if b < 0x80)
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def read_exact(self, n, deadline):
+        data = super().read_exact(n, deadline)
+        self.in_flight -= len(data)
+        return data
+
+    def drain(self):
+        self.in_flight = 0
+        return super().drain()
+
+
+class _RecordingTransport(FakeTransport):
+    """Board #1 that records every write."""
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.writes = []
+
+    def write_bytes(self, buf):
+        self.writes.append(bytes(buf))
+        super().write_bytes(buf)
+
+
+class _SlowTransport(_RecordingTransport):
+    """Board #1 whose every answer takes 'answer_s'."""
+    answer_s = 0.05
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.first_write = threading.Event()
+
+    def write_bytes(self, buf):
+        super().write_bytes(buf)
+        self.first_write.set()
+
+    def read_exact(self, n, deadline):
+        time.sleep(self.answer_s * n)
+        return super().read_exact(n, deadline)
+
+
+class _SilentTransport(FakeTransport):
+    """Board #1 that never answers the ambient temperature GETs."""
+
+    def write_bytes(self, buf):
+        super().write_bytes(bytes(b for b in buf if b not in (board1.GET_AMBIENT_TEMP_LOW,
+                                                               board1.GET_AMBIENT_TEMP_HIGH)))
+
+
+class _DeadBoard(FakeTransport):
+    """Board #1 that ignores every byte while 'dead' (power lost)."""
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.dead = False
+
+    def write_bytes(self, buf):
+        if not self.dead:
+            super().write_bytes(buf)
+
+    def retry_delay(self, cmd):
+        return 0.01
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def make_connection(transport, window=RX_FIFO_DEPTH):
+    c = HomeAutomationSystemConnection(transport=transport, comPort="TEST", baudRate=9600)
+    c.open()
+    c.pipeline_window = window
+    c.snapshot_support["board1"] = False     # Firmware without GET_ALL
+    return c
+
+
+class TestPipeline(unittest.TestCase):
+    """HomeAutomationSystemConnection.pipeline() and read_registers()."""
+
+    def test_answers_in_order(self):
+        c = make_connection(FakeTransport(board="board1"))
+        cmds = board1.REGISTER_MAP.get_commands
+        single = [c.transact(bytes([cmd]), 1)[0] for cmd in cmds]
+        self.assertEqual(list(c.pipeline(bytes(cmds))), single)
+        self.assertEqual(c.stats_snapshot().commands[cmds[0]].requests, 2)
+
+    def test_window_is_respected(self):
+        for window in (1, 2, 3):
+            t = _CountingTransport(board="board1")
+            air = AirConditionerSystemConnection(connection=make_connection(t, window))
+            air.update()
+            self.assertEqual(air.stale, frozenset())
+            self.assertEqual(air.desiredTemperature, 25.0)
+            self.assertEqual(t.max_in_flight, window)
+
+    def test_set_bytes_count_against_the_window(self):
+        t = _RecordingTransport(board="board1")
+        air = AirConditionerSystemConnection(connection=make_connection(t))
+        air.update()
+        self.assertEqual(len(t.writes[0]), RX_FIFO_DEPTH)        # Full window
+
+        self.assertTrue(air.setDesiredTemp(27.5))
+        t.writes.clear()
+        air.update()
+        self.assertEqual(air.desiredTemperature, 27.5)
+        # The SET pair may still be in the FIFO: the first GET goes alone,
+        # the window opens again with its answer
+        self.assertEqual([len(w) for w in t.writes[:2]], [1, RX_FIFO_DEPTH])
+
+    def test_set_overtakes_a_running_poll(self):
+        t = _SlowTransport(board="board1")
+        c = make_connection(t)
+        c.start_worker()
+        try:
+            cmds = board1.REGISTER_MAP.get_commands
+            poll = c.submit(bytes(cmds), len(cmds), priority=PRIO_POLL, window=RX_FIFO_DEPTH)
+            t.first_write.wait(1.0)
+            t0 = time.monotonic()
+            c.send(bytes(board1.encode_set_desired_temp(27.5)))
+            set_s = time.monotonic() - t0
+            answers = poll.result(timeout=2.0)
+        finally:
+            c.stop_worker()
+
+        # Only the GETs already in flight are answered before the SET
+        self.assertLess(set_s, (RX_FIFO_DEPTH + 1) * t.answer_s)
+        self.assertEqual(len(answers), len(cmds))
+        pair = bytes(board1.encode_set_desired_temp(27.5))
+        self.assertLess(t.writes.index(pair), len(t.writes) - 1)
+
+    def test_fallback_after_timeout(self):
+        c = make_connection(_SilentTransport(board="board1"))
+        c.retry_policy.max_attempts = 2
+        c.transport.retry_delay = lambda cmd: 0.0
+        cmds = board1.REGISTER_MAP.get_commands
+        self.assertEqual(len(c.pipeline(bytes(cmds))), cmds.index(board1.GET_AMBIENT_TEMP_LOW))
+
+        # The registers after the silent GETs are read stop-and-wait
+        res = read_registers(c, board1.REGISTER_MAP)
+        self.assertEqual(res.stale, frozenset({"ambient_temp"}))
+        self.assertIn("fan_speed_rps", res.fresh)
+
+    def test_failed_probe_then_recovery(self):
+        t = _DeadBoard(board="board1")
+        c = make_connection(t)
+        c.retry_policy = RetryPolicy(deadline_s=0.3, max_attempts=2)
+        clock = _Clock()
+        c.breaker = CircuitBreaker(failure_threshold=3, reset_timeout_s=5.0, clock=clock)
+
+        t.dead = True
+        while c.breaker.state != OPEN:
+            read_registers(c, board1.REGISTER_MAP)
+
+        # The half-open probe is the pipeline, and the board is still down
+        clock.t = 5.0
+        self.assertTrue(read_registers(c, board1.REGISTER_MAP).stale)
+        self.assertEqual(c.breaker.state, OPEN)
+
+        t.dead = False
+        clock.t = 10.0
+        self.assertEqual(read_registers(c, board1.REGISTER_MAP).stale, frozenset())
+        self.assertEqual(c.breaker.state, CLOSED)
+
+
+class TestEmulatedPipeline(unittest.TestCase):
+    """board1.asm with a slow USB-serial adapter."""
+
+    def _update_s(self, window):
+        t = EmulatedTransport("board1", rx_latency_s=0.016)
+        air = AirConditionerSystemConnection(connection=make_connection(t, window))
+        t.advance(1.0)
+        t0 = t.now_s()
+        air.update()
+        self.assertEqual(air.stale, frozenset())
+        self.assertEqual(air.desiredTemperature, 25.0)
+        return t.now_s() - t0
+
+    def test_fifo_window_is_faster(self):
+        stop_and_wait = self._update_s(1)
+        pipelined = self._update_s(RX_FIFO_DEPTH)
+        self.assertLess(pipelined, 0.75 * stop_and_wait)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_poller.py
+DESCRIPTION:
+    Unit tests for the background poller: per-register periods, immutable
+    snapshots, getters served from the snapshot and the cycle statistics.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import time
+import unittest
+
+from home_automation.api import (
+    AirConditionerSystemConnection,
+    BoardPoller,
+    CurtainControlSystemConnection,
+    HomeAutomationSystemConnection,
+)
+from home_automation.protocol import board1, board2
+from home_automation.protocol.common import GET_ALL
+from home_automation.transport import FakeTransport
+
+
+def make_connection(board):
+    c = HomeAutomationSystemConnection(transport=FakeTransport(board=board), comPort="FAKE", baudRate=9600)
+    c.open()
+    return c
+
+
+class TestBoardPoller(unittest.TestCase):
+    """Snapshots and scheduling."""
+
+    def test_snapshot_is_immutable_and_versioned(self):
+        p = BoardPoller(make_connection("board1"), board1.REGISTER_MAP)
+        first = p.latest()
+        snap = p.poll_once()
+        self.assertEqual(snap.seq, first.seq + 1)
+        self.assertEqual(snap.value("ambient_temp"), 24.0)
+        self.assertEqual(dict(first.t), {})                     # Old snapshot unchanged
+        self.assertEqual(set(snap.t), {"desired_temp", "ambient_temp", "fan_speed_rps"})
+        with self.assertRaises(TypeError):
+            snap.values["ambient_temp"] = 1.0
+        self.assertLess(snap.age_s("fan_speed_rps"), 1.0)
+
+    def test_periods_per_register(self):
+        c = make_connection("board1")
+        p = BoardPoller(c, board1.REGISTER_MAP,
+                        {"desired_temp": 60.0, "ambient_temp": 60.0, "fan_speed_rps": 0.02})
+        p.start()
+        time.sleep(0.25)
+        p.stop()
+
+        st = c.stats_snapshot().commands
+        self.assertEqual(st[GET_ALL].requests, 1)                 # First cycle: all due
+        self.assertNotIn(board1.GET_DESIRED_TEMP_LOW, st)
+        self.assertGreater(st[board1.GET_FAN_SPEED_RPS].requests, 3)
+        ps = p.stats()
+        self.assertGreater(ps.cycles, 3)
+        self.assertEqual(ps.cycle.count, ps.cycles)
+        self.assertEqual(ps.lag.count, ps.cycles)
+
+    def test_unknown_register(self):
+        with self.assertRaises(ValueError):
+            BoardPoller(make_connection("board1"), board1.REGISTER_MAP, {"humidity": 1.0})
+
+
+class TestPolledGetters(unittest.TestCase):
+    """Getters of the UML classes read the latest snapshot."""
+
+    def test_air_conditioner(self):
+        c = make_connection("board1")
+        air = AirConditionerSystemConnection(connection=c)
+        poller = air.start_polling()
+        try:
+            deadline = time.monotonic() + 1.0
+            while poller.latest().seq == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(air.getAmbientTemp(), 24.0)
+
+            # A SET is visible at once, before the next poll
+            self.assertTrue(air.setDesiredTemp(30.0))
+            self.assertEqual(air.getDesiredTemp(), 30.0)
+        finally:
+            air.stop_polling()
+        self.assertIsNone(air.poller)
+
+    def test_curtain_scaled(self):
+        cur = CurtainControlSystemConnection(connection=make_connection("board2"))
+        cur.poller = BoardPoller(cur.connection, board2.register_map(cur.light_high_cmd))
+        cur.poller.poll_once()
+        self.assertEqual(cur.getCurtainStatus(), 50.8)  # raw 32.0 of 63
+        self.assertEqual(cur.getLightIntensity(), 200.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
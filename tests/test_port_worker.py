@@ -0,0 +1,152 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_port_worker.py
+DESCRIPTION:
+    Unit tests for the thread-safe port multiplexer (PortWorker) and the
+    transaction functions of HomeAutomationSystemConnection.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import threading
+import unittest
+
+from home_automation.api import AirConditionerSystemConnection, HomeAutomationSystemConnection
+from home_automation.api.port_worker import PRIO_GET, PRIO_POLL, PRIO_SET, PortWorker
+from home_automation.protocol import board1
+from home_automation.transport import FakeTransport, TransportError
+
+
+def make_connection():
+    t = FakeTransport(board="board1")
+    c = HomeAutomationSystemConnection(transport=t, comPort="FAKE1", baudRate=9600)
+    c.open()
+    return c
+
+
+class TestTransactions(unittest.TestCase):
+    """Transactions with and without a worker thread."""
+
+    def test_inline_transaction(self):
+        """Without a worker the transaction runs in the caller's thread."""
+        c = make_connection()
+        self.assertEqual(c.transact(bytes([board1.GET_DESIRED_TEMP_HIGH]), 1), bytes([25]))
+        self.assertIsNone(c.worker_stats())
+
+    def test_worker_future(self):
+        """submit() returns a Future resolved by the worker."""
+        c = make_connection()
+        c.start_worker()
+        try:
+            fut = c.submit(bytes([board1.GET_AMBIENT_TEMP_HIGH]), 1)
+            self.assertEqual(fut.result(timeout=1.0), bytes([24]))
+        finally:
+            c.stop_worker()
+        st = c.worker_stats()
+        self.assertEqual(st.completed, 1)
+        self.assertEqual(st.queue_depth, 0)
+
+    def test_errors_are_reported(self):
+        """A closed port fails the Future; transact() returns b'' and sets last_error."""
+        c = make_connection()
+        c.close()
+        c.start_worker()
+        try:
+            with self.assertRaises(TransportError):
+                c.submit(bytes([board1.GET_FAN_SPEED_RPS]), 1).result(timeout=1.0)
+            self.assertEqual(c.transact(bytes([board1.GET_FAN_SPEED_RPS]), 1), b"")
+            self.assertIsNotNone(c.last_error)
+        finally:
+            c.stop_worker()
+        self.assertEqual(c.worker_stats().failed, 2)
+
+
+class TestSharedPort(unittest.TestCase):
+    """Many threads and API objects on one port."""
+
+    def test_concurrent_updates_and_sets_stay_aligned(self):
+        """Pollers and setters never decode a foreign answer."""
+        c = make_connection()
+        c.start_worker()
+        # Low and high bytes are separate GETs, so a SET may land between
+        # them; any mix of the set integral/fraction parts is still aligned
+        allowed = {i + f / 10.0 for i in (25, 20, 30, 40) for f in (0, 5)}
+        errors = []
+
+        def poller():
+            air = AirConditionerSystemConnection(connection=c)
+            for _ in range(50):
+                air.update()
+                if (air.getDesiredTemp() not in allowed or air.getAmbientTemp() != 24.0
+                        or air.getFanSpeed() not in (0, 30)):
+                    errors.append((air.getDesiredTemp(), air.getAmbientTemp(), air.getFanSpeed()))
+
+        def setter(temp):
+            air = AirConditionerSystemConnection(connection=c)
+            for _ in range(50):
+                if not air.setDesiredTemp(temp):
+                    errors.append(("set failed", temp))
+
+        threads = [threading.Thread(target=poller) for _ in range(4)]
+        threads += [threading.Thread(target=setter, args=(t,)) for t in (20.5, 30.5, 40.5)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        c.stop_worker()
+
+        self.assertEqual(errors, [])
+        st = c.worker_stats()
+        self.assertEqual(st.completed, 4 * 50 + 3 * 50)     # One GET_ALL per update()
+        self.assertGreaterEqual(st.max_queue_depth, 1)
+        self.assertGreaterEqual(st.mean_service_s(), 0.0)
+
+
+class TestPriorities(unittest.TestCase):
+    """User SETs overtake waiting poll requests."""
+
+    def test_set_preempts_queued_polls(self):
+        gate, busy = threading.Event(), threading.Event()
+        order = []
+
+        def execute(txn):
+            if not order:
+                busy.set()
+                gate.wait(1.0)      # Hold the port until everything is queued
+            order.append(txn.payload)
+            return b"\x00" * txn.expect
+
+        w = PortWorker(execute=execute)
+        w.start()
+        try:
+            futures = [w.submit(bytes([1]), 1, priority=PRIO_POLL)]
+            busy.wait(1.0)
+            futures += [w.submit(bytes([cmd]), 1, priority=PRIO_POLL) for cmd in range(2, 9)]
+            futures.append(w.submit(bytes([0x05]), 1))              # User GET
+            futures.append(w.submit(bytes([0x80, 0xC0])))           # User SET pair
+            gate.set()
+            for f in futures:
+                f.result(timeout=1.0)
+        finally:
+            w.stop()
+
+        # The poll in progress finishes, then SET, GET and the other polls
+        self.assertEqual(order[0], bytes([1]))
+        self.assertEqual(order[1], bytes([0x80, 0xC0]))
+        self.assertEqual(order[2], bytes([0x05]))
+        self.assertEqual(order[3:], [bytes([cmd]) for cmd in range(2, 9)])
+
+        st = w.stats()
+        self.assertEqual(st.class_wait(PRIO_SET).count, 1)
+        self.assertEqual(st.class_wait(PRIO_GET).count, 1)
+        self.assertEqual(st.class_wait(PRIO_POLL).count, 8)
+        self.assertLess(st.class_wait(PRIO_SET).max_seen_s, st.class_wait(PRIO_POLL).max_seen_s)
+
+
+if __name__ == "__main__":
+    unittest.main()
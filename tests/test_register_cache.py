@@ -0,0 +1,89 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_register_cache.py
+DESCRIPTION:
+    Unit tests for the per-register TTL read-through cache: getters read
+    only expired registers, SETs are written through and the hit/miss
+    counters are kept.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import unittest
+
+from home_automation.api import (
+    AirConditionerSystemConnection,
+    CurtainControlSystemConnection,
+    HomeAutomationSystemConnection,
+    RegisterCache,
+)
+from home_automation.protocol import board1, board2
+from home_automation.transport import FakeTransport
+
+
+def make_connection(board):
+    c = HomeAutomationSystemConnection(transport=FakeTransport(board=board), comPort="FAKE", baudRate=9600)
+    c.open()
+    return c
+
+
+class TestRegisterCache(unittest.TestCase):
+    """TTL per register, read-through and write-through."""
+
+    def test_ttl_defaults_and_overrides(self):
+        cache = RegisterCache(board1.REGISTER_MAP, {"ambient_temp": 2.5})
+        self.assertEqual(cache.ttl("ambient_temp"), 2.5)
+        self.assertEqual(cache.ttl("desired_temp"), board1.REGISTER_MAP.register("desired_temp").ttl_s)
+        with self.assertRaises(ValueError):
+            RegisterCache(board1.REGISTER_MAP, {"humidity": 1.0})
+
+    def test_getter_reads_only_expired_register(self):
+        c = make_connection("board1")
+        cache = RegisterCache(board1.REGISTER_MAP, {"fan_speed_rps": 0.0})
+        air = AirConditionerSystemConnection(connection=c, cache=cache)
+
+        self.assertEqual(air.getAmbientTemp(), 24.0)           # Miss: 2 GETs
+        self.assertEqual(c.stats_snapshot().bytes_sent, 2)
+        air.getAmbientTemp()                                   # Hit: nothing sent
+        self.assertEqual(c.stats_snapshot().bytes_sent, 2)
+        air.getFanSpeed()                                      # TTL 0: always read
+        air.getFanSpeed()
+        self.assertEqual(c.stats_snapshot().bytes_sent, 4)
+
+        st = cache.stats()
+        self.assertEqual((st.hits, st.misses, st.refreshes, st.writes), (1, 3, 3, 0))
+
+    def test_set_writes_through(self):
+        c = make_connection("board1")
+        cache = RegisterCache(board1.REGISTER_MAP)
+        air = AirConditionerSystemConnection(connection=c, cache=cache)
+        self.assertTrue(air.setDesiredTemp(30.0))
+        self.assertEqual(air.getDesiredTemp(), 30.0)
+        st = c.stats_snapshot()
+        self.assertEqual(st.bytes_sent, 2)                     # Only the SET pair
+        self.assertEqual(cache.stats().writes, 1)
+
+    def test_curtain(self):
+        c = make_connection("board2")
+        cache = RegisterCache(board2.REGISTER_MAP)
+        cur = CurtainControlSystemConnection(connection=c, cache=cache)
+        self.assertEqual(cur.getLightIntensity(), 200.0)
+        self.assertEqual(cur.getOutdoorTemp(), 20.0)
+        self.assertEqual(c.stats_snapshot().bytes_sent, 4)
+        cur.getLightIntensity()
+        self.assertEqual(cache.stats().hits, 1)
+
+    def test_without_cache_getters_do_not_read(self):
+        c = make_connection("board1")
+        air = AirConditionerSystemConnection(connection=c)
+        self.assertEqual(air.getAmbientTemp(), 0.0)
+        self.assertEqual(c.stats_snapshot().bytes_sent, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_registers.py
+DESCRIPTION:
+    Unit tests for the declarative register maps and the generic
+    BoardConnection, including a made-up third board that is simulated and
+    read without any board-specific code.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import unittest
+from dataclasses import dataclass, field
+
+from home_automation.api import BoardConnection, HomeAutomationSystemConnection
+from home_automation.protocol import board1, board2
+from home_automation.protocol.common import Fixed1dp
+from home_automation.protocol.registers import BoardMap, Register
+from home_automation.transport import FakeTransport
+
+
+@dataclass
+class HumidityState:
+    """State of a made-up humidifier board."""
+    target_humidity: Fixed1dp = field(default_factory=lambda: Fixed1dp(0, 0))
+    humidity: Fixed1dp = field(default_factory=lambda: Fixed1dp(0, 0))
+    pump_on: int = 0
+
+
+HUMIDIFIER = BoardMap(
+    name="humidifier",
+    state_type=HumidityState,
+    registers=(
+        Register("target_humidity", low=0x11, high=0x12, full_scale=100.0,
+                 set_min=0.0, set_max=100.0, sim_value=31.5),
+        Register("humidity", low=0x13, high=0x14, sim_value=40.2),
+        Register("pump_on", high=0x15, sim_value=1),
+    ),
+    set_register="target_humidity",
+)
+
+
+class TestGeneratedCodecs(unittest.TestCase):
+    """The maps of Board 1 and Board 2 reproduce the protocol tables."""
+
+    def test_update_sequences(self):
+        self.assertEqual(board1.REGISTER_MAP.get_commands, (0x01, 0x02, 0x03, 0x04, 0x05))
+        self.assertEqual(board2.register_map().get_commands, tuple(range(1, 9)))
+        self.assertEqual(board2.register_map(0x09).get_commands[-1], 0x09)
+        self.assertIs(board2.register_map(0x09), board2.register_map(0x09))
+
+    def test_set_encoding(self):
+        self.assertEqual(board1.encode_set_desired_temp(25.5), (0x80 | 5, 0xC0 | 25))
+        self.assertEqual(board2.encode_set_desired_curtain(50.0), (0x80 | 5, 0xC0 | 31))
+        self.assertEqual(board2.encode_set_desired_curtain(12.3, mode="raw_0_63"), (0x80 | 3, 0xC0 | 12))
+        with self.assertRaises(ValueError):
+            board2.encode_set_desired_curtain(10.0, mode="percent")
+
+    def test_decode_all_and_scaling(self):
+        st = board2.REGISTER_MAP.decode_all(bytes([5, 31, 0, 20, 3, 101, 0, 200]))
+        self.assertEqual(board2.REGISTER_MAP.value(st, "desired_curtain"), 50.0)
+        self.assertEqual(board2.REGISTER_MAP.value(st, "desired_curtain", scaled=False), 31.5)
+        self.assertEqual(board2.REGISTER_MAP.value(st, "outdoor_press"), 101.3)
+
+    def test_simulated_defaults(self):
+        fake = FakeTransport(board="board2")
+        self.assertEqual(fake.curtain_state.outdoor_press, Fixed1dp(101, 3))
+        self.assertEqual(fake.curtain_state.desired_curtain, Fixed1dp(32, 0))
+
+
+class TestBoardConnection(unittest.TestCase):
+    """A new board only needs a BoardMap."""
+
+    def setUp(self):
+        t = FakeTransport(board="humidifier", board_map=HUMIDIFIER)
+        self.conn = HomeAutomationSystemConnection(transport=t, comPort="FAKE3", baudRate=9600)
+        self.conn.open()
+        self.board = BoardConnection(connection=self.conn, board_map=HUMIDIFIER)
+
+    def test_update_and_set(self):
+        self.board.update()
+        self.assertEqual(self.board.get("target_humidity"), 50.0)
+        self.assertEqual(self.board.get("humidity", scaled=False), 40.2)
+        self.assertEqual(self.board.get("pump_on"), 1.0)
+
+        self.assertTrue(self.board.set(75.0))
+        self.board.update()
+        self.assertAlmostEqual(self.board.get("target_humidity"), 75.0, delta=0.2)
+
+    def test_invalid_set_is_reported(self):
+        self.assertFalse(self.board.set(120.0))
+        self.assertIn("ValueError", self.conn.last_error)
+
+    def test_board1_through_generic_api(self):
+        t = FakeTransport(board="board1")
+        c = HomeAutomationSystemConnection(transport=t, comPort="FAKE1", baudRate=9600)
+        c.open()
+        b = BoardConnection(connection=c, board_map=board1.REGISTER_MAP)
+        self.assertTrue(b.set(30.0))
+        b.update()
+        self.assertEqual(b.get("desired_temp"), 30.0)
+        self.assertEqual(b.get("fan_speed_rps"), 30.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_retry_policy.py
+DESCRIPTION:
+    Unit tests for the retry policy, the circuit breaker and the stale value
+    reporting of update() when a board does not answer.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import random
+import time
+import unittest
+from dataclasses import dataclass
+
+from home_automation.api import AirConditionerSystemConnection, HomeAutomationSystemConnection
+from home_automation.api.board_connection import request_byte
+from home_automation.api.retry_policy import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, RetryPolicy
+from home_automation.transport import FakeTransport
+
+
+@dataclass
+class SilentBoard(FakeTransport):
+    """Fake Board #1 that can stop answering (e.g. power lost)."""
+    silent: bool = False
+
+    def write_bytes(self, buf: bytes) -> None:
+        if not self.silent:
+            super().write_bytes(buf)
+
+    def retry_delay(self, cmd: int) -> float:
+        return 0.01
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Exponential backoff with jitter."""
+
+    def test_backoff_grows_and_is_capped(self):
+        p = RetryPolicy(jitter=0.0, max_delay_s=1.0)
+        self.assertEqual([p.backoff(i, 0.1) for i in range(5)], [0.1, 0.2, 0.4, 0.8, 1.0])
+
+    def test_jitter_stays_in_range(self):
+        p = RetryPolicy(jitter=0.2, rng=random.Random(3))
+        delays = [p.backoff(1, 0.1) for _ in range(200)]
+        self.assertTrue(all(0.16 <= d <= 0.24 for d in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """closed -> open -> half-open -> closed/open."""
+
+    def test_trip_probe_and_recover(self):
+        clock = FakeClock()
+        cb = CircuitBreaker(failure_threshold=3, reset_timeout_s=10.0, clock=clock)
+        for _ in range(3):
+            self.assertTrue(cb.allow())
+            cb.record_failure()
+        self.assertEqual(cb.state, OPEN)
+        self.assertFalse(cb.allow())
+
+        # After the reset timeout exactly one probe is allowed
+        clock.t = 10.0
+        self.assertTrue(cb.allow())
+        self.assertEqual(cb.state, HALF_OPEN)
+        self.assertFalse(cb.allow())
+
+        # Failed probe: offline again for another reset timeout
+        cb.record_failure()
+        self.assertEqual(cb.state, OPEN)
+        clock.t = 15.0
+        self.assertFalse(cb.allow())
+        clock.t = 20.0
+        self.assertTrue(cb.allow())
+        cb.record_success()
+        self.assertEqual(cb.state, CLOSED)
+        self.assertEqual(cb.trips, 1)
+
+
+class TestStaleValues(unittest.TestCase):
+    """A dead board costs one deadline and leaves values stale, not zero."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.board = SilentBoard(board="board1")
+        self.conn = HomeAutomationSystemConnection(transport=self.board, comPort="FAKE1", baudRate=9600)
+        self.conn.retry_policy = RetryPolicy(deadline_s=0.5, rng=random.Random(1))
+        self.conn.breaker = CircuitBreaker(failure_threshold=3, reset_timeout_s=5.0, clock=self.clock)
+        self.conn.open()
+        self.air = AirConditionerSystemConnection(connection=self.conn)
+
+    def test_dead_board(self):
+        self.air.update()
+        self.assertEqual(self.air.stale, frozenset())
+        self.assertEqual(self.air.getAmbientTemp(), 24.0)
+
+        self.board.silent = True
+        t0 = time.monotonic()
+        self.air.update()
+        self.assertLess(time.monotonic() - t0, 0.6)
+        self.assertEqual(self.air.stale, {"desired_temp", "ambient_temp", "fan_speed_rps"})
+        self.assertEqual(self.air.getAmbientTemp(), 24.0)   # Old value kept
+        self.assertEqual(self.conn.breaker.state, OPEN)
+
+        # Board offline: the next update fails fast without sending
+        sent = self.conn.stats_snapshot().bytes_sent
+        self.air.update()
+        self.assertEqual(self.conn.stats_snapshot().bytes_sent, sent)
+
+        # Board is back: after the reset timeout the probe closes the breaker
+        self.board.silent = False
+        self.clock.t = 5.0
+        self.air.update()
+        self.assertEqual(self.air.stale, frozenset())
+        self.assertEqual(self.conn.breaker.state, CLOSED)
+
+    def test_set_clears_stale_without_cache(self):
+        self.board.silent = True
+        self.air.update()
+        self.assertIn("desired_temp", self.air.stale)
+
+        # The value written is known, even though the board was not read back
+        self.assertTrue(self.air.setDesiredTemp(30.0))
+        self.assertEqual(self.air.stale, {"ambient_temp", "fan_speed_rps"})
+
+    def test_expired_deadline_keeps_the_probe(self):
+        self.board.silent = True
+        self.air.update()
+        self.assertEqual(self.conn.breaker.state, OPEN)
+
+        # No time left: no request, and the probe is still free for later
+        self.clock.t = 5.0
+        self.assertIsNone(request_byte(self.conn, 0x01, deadline=time.monotonic() - 1.0))
+        self.assertTrue(self.conn.breaker.allow())
+        self.assertEqual(self.conn.breaker.state, HALF_OPEN)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_rx_ring.py
+DESCRIPTION:
+    Unit tests for the receive ring buffer and the background reader mode of
+    SerialTransport. The reader is tested on a pseudo terminal (POSIX only)
+    with a simulated board on the other end.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import os
+import threading
+import time
+import unittest
+
+from home_automation.api import AirConditionerSystemConnection, HomeAutomationSystemConnection
+from home_automation.protocol import board1
+from home_automation.transport import FakeTransport, TransportError
+from home_automation.transport.rx_ring import RxRingBuffer
+
+
+class TestRxRingBuffer(unittest.TestCase):
+    """FIFO behaviour, timestamps, waiting and overruns."""
+
+    def test_fifo_with_timestamps(self):
+        rb = RxRingBuffer(8)
+        rb.put(b"\x01\x02", t=1.0)
+        rb.put(b"\x03", t=2.0)
+        self.assertEqual(rb.get(2, time.monotonic()), [(1.0, 1), (1.0, 2)])
+        self.assertEqual(rb.clear(), [(2.0, 3)])
+        self.assertEqual(len(rb), 0)
+
+    def test_timeout_consumes_nothing(self):
+        rb = RxRingBuffer(8)
+        rb.put(b"\x01")
+        self.assertIsNone(rb.get(2, time.monotonic() + 0.01))
+        self.assertEqual(len(rb), 1)
+
+    def test_reader_is_woken_up(self):
+        """A waiting get() returns as soon as another thread puts the data."""
+        rb = RxRingBuffer(8)
+        threading.Timer(0.02, rb.put, args=(b"\x2a",)).start()
+        t0 = time.monotonic()
+        items = rb.get(1, t0 + 1.0)
+        self.assertEqual(items[0][1], 0x2A)
+        self.assertLess(time.monotonic() - t0, 0.5)
+
+    def test_overrun_drops_oldest(self):
+        rb = RxRingBuffer(4)
+        rb.put(bytes(range(6)))
+        self.assertEqual(rb.overruns, 2)
+        self.assertEqual([b for _, b in rb.clear()], [2, 3, 4, 5])
+
+
+@unittest.skipUnless(hasattr(os, "openpty"), "needs a POSIX pseudo terminal")
+class TestSerialBackgroundReader(unittest.TestCase):
+    """SerialTransport(background_reader=True) on a pseudo terminal."""
+
+    def setUp(self):
+        from home_automation.transport.serial_transport import SerialTransport
+
+        self.master, self.slave = os.openpty()
+        self.board = FakeTransport(board="board1")
+        self.board.open()
+        self.stop = False
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+        self.t = SerialTransport(port=os.ttyname(self.slave), open_mode="probe",
+                                 ready_timeout_s=1.0, background_reader=True)
+        self.t.open()
+
+    def tearDown(self):
+        self.t.close()
+        self.stop = True
+        os.close(self.slave)
+        os.close(self.master)
+
+    def _serve(self):
+        """Simulated board on the master side of the pty."""
+        while not self.stop:
+            try:
+                data = os.read(self.master, 64)
+            except OSError:
+                return
+            self.board.write_bytes(data)
+            out = bytes(self.board._rx_queue)
+            self.board.drain()
+            if out:
+                os.write(self.master, out)
+
+    def test_update_through_ring_buffer(self):
+        """update() works and RTTs are measured from arrival timestamps."""
+        c = HomeAutomationSystemConnection(transport=self.t, comPort="PTY", baudRate=9600)
+        air = AirConditionerSystemConnection(connection=c)
+        air.update()
+        self.assertEqual(air.getDesiredTemp(), 25.0)
+        self.assertEqual(air.getAmbientTemp(), 24.0)
+        self.assertGreaterEqual(self.t.timing.commands[board1.GET_ALL].samples, 1)
+        self.assertEqual(self.t.stray_bytes, 0)
+
+    def test_stray_bytes_are_detected(self):
+        """Unrequested bytes are counted and kept by drain() for diagnosis."""
+        os.write(self.master, b"\x55\x66")
+        deadline = time.monotonic() + 1.0
+        while self.t.stray_bytes < 2 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.assertEqual(self.t.stray_bytes, 2)
+        self.assertEqual(self.t.drain(), 2)
+        self.assertEqual([b for _, b in self.t.last_discarded], [0x55, 0x66])
+
+    def test_timeout_without_answer(self):
+        """A SET gets no answer, so a read times out."""
+        self.t.write_bytes(bytes(board1.encode_set_desired_temp(30.0)))
+        with self.assertRaises(TransportError):
+            self.t.read_byte(timeout_s=0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
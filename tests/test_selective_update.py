@@ -0,0 +1,72 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_selective_update.py
+DESCRIPTION:
+    Unit tests for update(fields=...): only the GETs of the selected
+    registers are sent, other members are not touched and every register
+    gets its own read time.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import math
+import unittest
+
+from home_automation.api import (
+    AirConditionerSystemConnection,
+    CurtainControlSystemConnection,
+    HomeAutomationSystemConnection,
+)
+from home_automation.protocol import board2
+from home_automation.transport import FakeTransport
+
+
+def make_connection(board):
+    c = HomeAutomationSystemConnection(transport=FakeTransport(board=board), comPort="FAKE", baudRate=9600)
+    c.open()
+    return c
+
+
+class TestSelectiveUpdate(unittest.TestCase):
+    """update(fields=...) on both boards."""
+
+    def test_curtain_light_only(self):
+        c = make_connection("board2")
+        curtain = CurtainControlSystemConnection(connection=c)
+        curtain.update(fields=["light_intensity"])
+
+        st = c.stats_snapshot()
+        self.assertEqual(set(st.commands), {board2.GET_LIGHT_INTENSITY_LOW, curtain.light_high_cmd})
+        self.assertEqual(st.bytes_sent, 2)
+        self.assertEqual(curtain.getLightIntensity(), 200.0)
+        self.assertEqual(curtain.getOutdoorTemp(), 0.0)     # Not touched
+        self.assertEqual(set(curtain.updated_at), {"light_intensity"})
+        self.assertEqual(curtain.age_s("outdoor_temp"), math.inf)
+        self.assertLess(curtain.age_s("light_intensity"), 1.0)
+
+    def test_other_fields_keep_values_and_times(self):
+        c = make_connection("board1")
+        air = AirConditionerSystemConnection(connection=c)
+        air.update()
+        t_ambient = air.updated_at["ambient_temp"]
+        air.desiredTemperature = 99.0   # Marker: must survive the next update
+
+        air.update(fields=("fan_speed_rps",))
+        self.assertEqual(air.desiredTemperature, 99.0)
+        self.assertEqual(air.updated_at["ambient_temp"], t_ambient)
+        self.assertGreaterEqual(air.updated_at["fan_speed_rps"], t_ambient)
+        self.assertEqual(c.stats_snapshot().bytes_sent, 1 + 1)    # GET_ALL, then one GET
+
+    def test_unknown_field(self):
+        air = AirConditionerSystemConnection(connection=make_connection("board1"))
+        with self.assertRaises(ValueError):
+            air.update(fields=["humidity"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_set_coalescer.py
+DESCRIPTION:
+    Unit tests for the coalescing SET path: queued set-points collapse to
+    the newest one, SETs of the value the board already has are skipped and
+    the saved commands are counted.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import time
+import unittest
+from dataclasses import dataclass
+
+from home_automation.api import (
+    AirConditionerSystemConnection,
+    CurtainControlSystemConnection,
+    HomeAutomationSystemConnection,
+)
+from home_automation.protocol import board2
+from home_automation.transport import FakeTransport
+
+
+@dataclass
+class SlowBoard(FakeTransport):
+    """Fake board whose writes take as long as a few bytes at 9600 baud."""
+    write_s: float = 0.005
+    writes: int = 0
+
+    def write_bytes(self, buf: bytes) -> None:
+        time.sleep(self.write_s)
+        self.writes += 1
+        super().write_bytes(buf)
+
+
+def make_connection(transport):
+    c = HomeAutomationSystemConnection(transport=transport, comPort="FAKE", baudRate=9600)
+    c.open()
+    return c
+
+
+class TestSetCoalescing(unittest.TestCase):
+    """Slider-like SET bursts."""
+
+    def test_slider_burst_collapses_to_last_value(self):
+        board = SlowBoard(board="board2")
+        c = make_connection(board)
+        c.start_worker()
+        cur = CurtainControlSystemConnection(connection=c)
+        try:
+            for i in range(200):
+                self.assertTrue(cur.setCurtainStatus(i / 2.0, coalesce=True))
+        finally:
+            c.stop_worker()
+
+        st = cur.set_stats()
+        self.assertEqual(st.requested, 200)
+        self.assertEqual(st.sent, board.writes)
+        self.assertEqual(st.sent + st.saved(), st.requested)
+        self.assertLess(st.sent, 20)                 # At least 10x fewer writes
+        self.assertEqual(c.worker_stats().coalesced, st.coalesced)
+
+        # Last write wins: the board has the final slider position
+        low, high = board2.encode_set_desired_curtain(99.5)
+        self.assertEqual(board._state.desired_curtain.integral, high & 0x3F)
+        self.assertEqual(board._state.desired_curtain.frac_digit, low & 0x3F)
+
+    def test_equal_value_is_skipped(self):
+        board = SlowBoard(board="board1", write_s=0.0)
+        air = AirConditionerSystemConnection(connection=make_connection(board))
+        air.setDesiredTemp(30.0, coalesce=True)
+        air.setDesiredTemp(30.04, coalesce=True)     # Same Fixed1dp encoding
+        self.assertEqual(board.writes, 1)
+        self.assertEqual(air.set_stats().skipped, 1)
+
+        # A value read back from the board is known too
+        air.update()
+        air.setDesiredTemp(30.0, coalesce=True)
+        self.assertEqual(air.set_stats().skipped, 2)
+
+        # A normal SET always goes out and makes the known value unknown
+        air.setDesiredTemp(30.0)
+        air.setDesiredTemp(30.0, coalesce=True)
+        self.assertEqual(air.set_stats().sent, 2)
+
+    def test_polled_value_is_known(self):
+        board = SlowBoard(board="board1", write_s=0.0)
+        air = AirConditionerSystemConnection(connection=make_connection(board))
+        air.setDesiredTemp(30.0, coalesce=True)
+        poller = air.start_polling()
+        poller.stop()
+
+        # The set-point was changed on the board; the poller reads it back
+        board._state.desired_temp.integral = 27
+        poller.poll_once(["desired_temp"])
+        air.setDesiredTemp(27.0, coalesce=True)
+        self.assertEqual(air.set_stats().skipped, 1)
+        air.setDesiredTemp(30.0, coalesce=True)
+        self.assertEqual(air.set_stats().sent, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
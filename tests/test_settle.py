@@ -0,0 +1,103 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_settle.py
+DESCRIPTION:
+    Unit tests for the event-driven waits: wait_for_value() with an
+    adaptive poll interval, wait_until_reached() of the curtain and
+    wait_until_settled() of the air conditioner.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import unittest
+
+from home_automation.api import (
+    AirConditionerSystemConnection,
+    CurtainControlSystemConnection,
+    HomeAutomationSystemConnection,
+)
+from home_automation.api.settle import wait_for_value
+from home_automation.protocol import board2
+from home_automation.transport import FakeTransport
+from home_automation.transport.emulated_transport import EmulatedTransport
+
+
+def make_connection(board):
+    c = HomeAutomationSystemConnection(transport=FakeTransport(board=board), comPort="FAKE", baudRate=9600)
+    c.open()
+    return c
+
+
+class TestWaitForValue(unittest.TestCase):
+    """Reached, stalled, timeout."""
+
+    def test_returns_when_reached(self):
+        values = iter([10.0, 20.0, 30.0, 40.0, 50.0])
+        seen = []
+        res = wait_for_value(lambda: next(values), 40.0, 0.5, 5.0, seen.append, min_interval_s=0.001)
+        self.assertTrue(res.reached)
+        self.assertEqual(res.reads, 4)
+        self.assertEqual(seen, [10.0, 20.0, 30.0, 40.0])
+
+    def test_stall_is_detected_with_backoff(self):
+        res = wait_for_value(lambda: 25.0, 40.0, 0.5, 5.0, min_interval_s=0.01,
+                             max_interval_s=0.04, settle_s=0.1)
+        self.assertFalse(res.reached)
+        self.assertTrue(res.settled)
+        self.assertEqual(res.value, 25.0)
+        self.assertLess(res.reads, 8)           # Interval grew while unchanged
+
+    def test_timeout_without_answer(self):
+        res = wait_for_value(lambda: None, 40.0, 0.5, 0.05, min_interval_s=0.01)
+        self.assertFalse(res.reached or res.settled)
+        self.assertIsNone(res.value)
+
+
+class TestBoardWaits(unittest.TestCase):
+    """The board classes read only their own registers."""
+
+    def test_curtain_reached(self):
+        c = make_connection("board2")
+        cur = CurtainControlSystemConnection(connection=c)
+        self.assertTrue(cur.setCurtainStatus(80.0))
+        res = cur.wait_until_reached(timeout=2.0)
+        self.assertTrue(res.reached)
+        self.assertAlmostEqual(cur.curtainStatus, 80.0, delta=0.5)
+        gets = {cmd for cmd in c.stats_snapshot().commands if cmd < 0x80}   # SETs start with 1
+        self.assertEqual(gets, {0x01, 0x02})
+
+    def test_curtain_reached_in_whole_steps(self):
+        self.assertEqual(board2.curtain_stop_position(50.0), 49.2)     # Step 31 of 63
+        c = HomeAutomationSystemConnection(transport=EmulatedTransport("board2"), comPort="EMU", baudRate=9600)
+        c.open()
+        cur = CurtainControlSystemConnection(connection=c)
+        for target, stop in ((50.0, 49.2), (80.0, 79.4)):
+            self.assertTrue(cur.setCurtainStatus(target))
+            res = cur.wait_until_reached(timeout=10.0)
+            self.assertTrue(res.reached)
+            self.assertEqual(res.value, stop)
+
+        # Raw mode: the same whole steps, as raw 0-63 values
+        self.assertEqual(board2.curtain_stop_position(40.5, mode="raw_0_63"), 40.0)
+        cur.curtain_set_mode = "raw_0_63"
+        self.assertTrue(cur.setCurtainStatus(40.5))
+        res = cur.wait_until_reached(tolerance=0.25, timeout=10.0)    # Raw units
+        self.assertTrue(res.reached)
+        self.assertEqual(res.value, 40.0)
+
+    def test_ambient_settled(self):
+        c = make_connection("board1")
+        air = AirConditionerSystemConnection(connection=c)
+        res = air.wait_until_settled(24.2, timeout=2.0)
+        self.assertTrue(res.reached)
+        self.assertEqual(res.reads, 1)
+        self.assertEqual(set(c.stats_snapshot().commands), {0x03, 0x04})
+
+
+if __name__ == "__main__":
+    unittest.main()
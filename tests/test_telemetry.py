@@ -0,0 +1,131 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_telemetry.py
+DESCRIPTION:
+    Unit tests for the columnar telemetry store: batched appends, segment
+    boundaries, time-index range queries, reopening and the recorder that
+    samples the background pollers.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+from home_automation.api import BoardPoller, HomeAutomationSystemConnection
+from home_automation.protocol import board1
+from home_automation.telemetry import TelemetryRecorder, TelemetryStore
+from home_automation.transport import FakeTransport
+
+
+class TestTelemetryStore(unittest.TestCase):
+    """Store on a temporary folder with small segments."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix="telemetry_test_")
+        self.path = os.path.join(self.dir, "store")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def fill(self, st, n):
+        for i in range(n):
+            board = "board1" if i % 2 == 0 else "board2"
+            st.append(1000.0 + i, board, ambient_temp=20.0 + i / 10.0)
+        return st.flush()
+
+    def test_batch_is_written_on_flush(self):
+        with TelemetryStore(self.path, segment_rows=16) as st:
+            st.append(1.0, "board1", desired_temp=25.0)
+            self.assertEqual(st.pending(), 1)
+            self.assertEqual(len(st), 0)
+            self.assertEqual(st.flush(), 1)
+            self.assertEqual(len(st), 1)
+
+    def test_range_query_across_segments(self):
+        with TelemetryStore(self.path, segment_rows=16) as st:
+            self.assertEqual(self.fill(st, 100), 100)
+            self.assertEqual(len(st.segments), 7)
+            self.assertEqual(st.time_range(), (1000.0, 1099.0))
+
+            res = st.query(1010.0, 1040.0, ["ambient_temp"])
+            self.assertEqual(list(res["t"]), [1000.0 + i for i in range(10, 41)])
+            self.assertAlmostEqual(float(res["ambient_temp"][0]), 21.0, places=5)
+
+            only1 = st.query(1010.0, 1040.0, ["ambient_temp"], board="board1")
+            self.assertEqual(len(only1["t"]), 16)
+            self.assertNotIn("board", only1)
+            self.assertTrue(math.isnan(float(st.query(1000.0, 1000.0)["light"][0])))
+            self.assertEqual(len(st.query(5000.0, 6000.0)["t"]), 0)
+
+    def test_reopen_continues_segment(self):
+        with TelemetryStore(self.path, segment_rows=16) as st:
+            self.fill(st, 20)
+        with TelemetryStore(self.path) as st:
+            self.assertEqual(st.segment_rows, 16)
+            self.assertEqual(len(st), 20)
+            with self.assertRaises(ValueError):
+                st.append(500.0, "board1")      # Older than the last sample
+            st.append(2000.0, "board2", light=150.0)
+            st.flush()
+            self.assertEqual(len(st.segments), 2)
+            self.assertEqual(list(st.query(1019.0, 3000.0)["t"]), [1019.0, 2000.0])
+
+    def test_bulk_import(self):
+        with TelemetryStore(self.path, segment_rows=16) as st:
+            n = st.append_columns({"t": [float(i) for i in range(40)], "board": [1] * 40,
+                                   "fan_rps": [3.0] * 40})
+            self.assertEqual(n, 40)
+            res = st.query(30.0, 39.0, ["fan_rps", "curtain"])
+            self.assertEqual(list(res["fan_rps"]), [3.0] * 10)
+            self.assertTrue(all(math.isnan(float(v)) for v in res["curtain"]))
+
+    def test_recorder_samples_poller(self):
+        c = HomeAutomationSystemConnection(transport=FakeTransport(board="board1"), comPort="FAKE1", baudRate=9600)
+        c.open()
+        poller = BoardPoller(c, board1.REGISTER_MAP)
+        clock = iter([10.0, 10.5, 11.0])
+        with TelemetryStore(self.path) as st:
+            rec = TelemetryRecorder(st, interval_s=1.0, clock=lambda: next(clock))
+            rec.attach(poller, "board1")
+            for _ in range(3):
+                poller.poll_once()
+            rec.stop()
+            res = st.query(0.0, 100.0)
+            self.assertEqual(list(res["t"]), [10.0, 11.0])     # 10.5 is within 1 s
+            self.assertEqual(float(res["ambient_temp"][0]), 24.0)
+            self.assertEqual(float(res["desired_temp"][1]), 25.0)
+
+    def test_rejected_sample_is_not_counted(self):
+        c = HomeAutomationSystemConnection(transport=FakeTransport(board="board1"), comPort="FAKE1", baudRate=9600)
+        c.open()
+        snap = BoardPoller(c, board1.REGISTER_MAP).poll_once()
+        clock = iter([10.0, 10.5])
+        with TelemetryStore(self.path) as st:
+            rec = TelemetryRecorder(st, interval_s=1.0, clock=lambda: next(clock))
+            append = st.append_snapshot
+
+            def disk_full(*args):
+                raise OSError("disk full")
+
+            st.append_snapshot = disk_full
+            with self.assertRaises(OSError):
+                rec.record("board1", snap)
+            self.assertEqual(rec.samples, 0)
+
+            # The failed sample does not count for the 1 s interval
+            st.append_snapshot = append
+            self.assertTrue(rec.record("board1", snap))
+            self.assertEqual(rec.samples, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
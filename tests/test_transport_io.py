@@ -0,0 +1,209 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_transport_io.py
+DESCRIPTION:
+    Unit tests for the bulk transport operations (write_bytes, read_exact,
+    drain) on FakeTransport and SerialTransport.
+    SerialTransport is tested with a small in-memory port object, so no
+    hardware is needed.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import time
+import unittest
+
+from home_automation.protocol import board1, board2
+from home_automation.transport import FakeTransport, TransportError
+from home_automation.transport.serial_transport import SerialTransport
+
+
+class _LoopbackPort:
+    """Minimal stand-in for serial.Serial: records writes, serves queued input."""
+
+    def __init__(self, rx=b""):
+        self.is_open = True
+        self.timeout = 2.0
+        self.rx = bytearray(rx)
+        self.writes = []
+
+    @property
+    def in_waiting(self):
+        return len(self.rx)
+
+    def write(self, data):
+        self.writes.append((time.monotonic(), bytes(data)))
+        return len(data)
+
+    def read(self, n=1):
+        out = bytes(self.rx[:n])
+        del self.rx[:n]
+        return out
+
+    def reset_input_buffer(self):
+        self.rx.clear()
+
+    def reset_output_buffer(self):
+        pass
+
+
+class _BootingBoard(_LoopbackPort):
+    """Port whose board ignores the first 'boot_writes' commands, then echoes 0x00."""
+
+    def __init__(self, boot_writes):
+        super().__init__()
+        self.boot_writes = boot_writes
+
+    def write(self, data):
+        super().write(data)
+        if len(self.writes) > self.boot_writes:
+            self.rx += b"\x00"
+        return len(data)
+
+
+class TestFakeTransportBulkIO(unittest.TestCase):
+    """Bulk operations on the simulated board."""
+
+    def setUp(self):
+        self.t = FakeTransport(board="board1")
+        self.t.open()
+
+    def test_write_bytes_then_read_exact(self):
+        """Several GETs in one write produce the answers in order."""
+        self.t.write_bytes(bytes([board1.GET_DESIRED_TEMP_HIGH, board1.GET_AMBIENT_TEMP_HIGH]))
+        data = self.t.read_exact(2, time.monotonic() + 1.0)
+        self.assertEqual(data, bytes([25, 24]))
+
+    def test_read_exact_short_raises(self):
+        """Asking for more bytes than available is a transport error."""
+        self.t.write_byte(board1.GET_FAN_SPEED_RPS)
+        with self.assertRaises(TransportError):
+            self.t.read_exact(2, time.monotonic() + 0.1)
+
+    def test_drain_discards_pending(self):
+        """drain() reports and removes unread answers."""
+        self.t.write_bytes(bytes([board1.GET_DESIRED_TEMP_LOW] * 3))
+        self.assertEqual(self.t.drain(), 3)
+        self.assertEqual(self.t.drain(), 0)
+
+
+class TestSerialTransportBulkIO(unittest.TestCase):
+    """Pacing and buffering behaviour of the real transport."""
+
+    def make(self, rx=b"", gap=0.0):
+        t = SerialTransport(port="TEST", inter_byte_gap_s=gap)
+        t._ser = _LoopbackPort(rx)
+        return t
+
+    def test_zero_gap_is_single_write(self):
+        """Without a gap the whole buffer goes out in one call."""
+        t = self.make()
+        t.write_bytes(b"\x81\xd9")
+        self.assertEqual([w for _, w in t._ser.writes], [b"\x81\xd9"])
+
+    def test_gap_spaces_bytes(self):
+        """With a gap, consecutive bytes are at least 'gap' apart."""
+        t = self.make(gap=0.02)
+        t.write_bytes(b"\x01\x02\x03")
+        times = [ts for ts, _ in t._ser.writes]
+        self.assertEqual(len(times), 3)
+        for a, b in zip(times, times[1:]):
+            self.assertGreaterEqual(b - a, 0.019)
+
+    def test_board_gap_is_the_floor(self):
+        """A board's safe gap applies even if a smaller gap was configured."""
+        t = self.make(gap=0.0)
+        t.board = "board2"
+        self.assertEqual(t.current_gap(), board2.MIN_BYTE_GAP_S)
+        t.adaptive_timing = False
+        self.assertEqual(t.current_gap(), board2.MIN_BYTE_GAP_S)
+        t.board = "board1"
+        self.assertEqual(t.current_gap(), board1.MIN_BYTE_GAP_S)
+
+    def test_board_gap_only_while_the_fifo_could_be_full(self):
+        """The safe gap spaces a byte behind unread ones, not one after an answer."""
+        t = self.make(gap=0.0)
+        t.board, t.adaptive_timing = "board2", False
+        t.write_bytes(board2.REGISTER_MAP.encode_set(50.0))     # Fits into the FIFO
+        t.write_byte(board2.GET_DESIRED_CURTAIN_HIGH)           # Behind two unread bytes
+        t._ser.rx += b"\x1f"
+        t.read_byte(timeout_s=0.1)
+        t.write_byte(board2.GET_DESIRED_CURTAIN_LOW)            # After the answer
+        (t0, _), (t1, _), (t2, _) = t._ser.writes
+        self.assertGreaterEqual(t1 - t0, board2.MIN_BYTE_GAP_S - 0.001)
+        self.assertLess(t2 - t1, board2.MIN_BYTE_GAP_S / 2)
+
+    def test_write_does_not_flush_input(self):
+        """An early answer survives the next write (no reset per byte)."""
+        t = self.make(rx=b"\x19")
+        t.write_byte(board1.GET_DESIRED_TEMP_HIGH)
+        self.assertEqual(t.read_byte(timeout_s=0.1), 0x19)
+
+    def test_read_exact_and_drain(self):
+        """read_exact returns the requested bytes, drain the rest."""
+        t = self.make(rx=b"\x01\x02\x03\x04")
+        self.assertEqual(t.read_exact(2, time.monotonic() + 0.1), b"\x01\x02")
+        self.assertEqual(t.drain(), 2)
+        with self.assertRaises(TransportError):
+            t.read_exact(1, time.monotonic() + 0.01)
+
+    def test_answered_get_feeds_timing(self):
+        """An answered GET is measured; a missing answer backs off."""
+        t = self.make(rx=b"\x19")
+        t.write_byte(board1.GET_DESIRED_TEMP_HIGH)
+        t.read_byte()
+        self.assertEqual(t.timing.commands[board1.GET_DESIRED_TEMP_HIGH].samples, 1)
+
+        t.write_byte(board1.GET_FAN_SPEED_RPS)
+        with self.assertRaises(TransportError):
+            t.read_byte(timeout_s=0.01)
+        self.assertEqual(t.timing.commands[board1.GET_FAN_SPEED_RPS].backoff, 1)
+
+
+class TestSerialTransportFastOpen(unittest.TestCase):
+    """Readiness probe used by open_mode='probe'."""
+
+    def make(self, port, **kw):
+        t = SerialTransport(port="TEST", open_mode="probe", probe_interval_s=0.005, **kw)
+        t._ser = port
+        return t
+
+    def test_ready_after_first_answer(self):
+        """The probe stops as soon as the board answers."""
+        t = self.make(_BootingBoard(boot_writes=3), probe_cmd=board1.GET_FAN_SPEED_RPS)
+        report = t._wait_ready_probe()
+        self.assertTrue(report.ready)
+        self.assertEqual(report.probes, 4)
+        self.assertLess(report.ready_s, 1.0)
+        self.assertTrue(all(w == bytes([board1.GET_FAN_SPEED_RPS]) for _, w in t._ser.writes))
+
+    def test_gives_up_after_ready_timeout(self):
+        """A silent board is reported as not ready once the bound is reached."""
+        t = self.make(_BootingBoard(boot_writes=10 ** 6), ready_timeout_s=0.05)
+        report = t._wait_ready_probe()
+        self.assertFalse(report.ready)
+        self.assertGreaterEqual(report.ready_s, 0.05)
+
+    def test_probes_keep_the_board_gap(self):
+        """Probes are never closer than the board's safe gap."""
+        t = self.make(_BootingBoard(boot_writes=1), board="board2")
+        report = t._wait_ready_probe()
+        self.assertTrue(report.ready)
+        (t0, _), (t1, _) = t._ser.writes
+        self.assertGreaterEqual(t1 - t0, board2.MIN_BYTE_GAP_S - 0.001)
+        self.assertGreaterEqual(report.ready_s, 2 * board2.MIN_BYTE_GAP_S - 0.002)
+
+    def test_probe_accept_filters_answers(self):
+        """Answers rejected by probe_accept do not count as ready."""
+        t = self.make(_BootingBoard(boot_writes=0), ready_timeout_s=0.05,
+                      probe_accept=lambda b: b == 0xFF)
+        self.assertFalse(t._wait_ready_probe().ready)
+
+
+if __name__ == "__main__":
+    unittest.main()
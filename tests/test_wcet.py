@@ -0,0 +1,156 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tests/test_wcet.py
+DESCRIPTION:
+    Unit tests for the static response latency analysis (pic/wcet.py):
+    exact bounds of counted delay loops, loops without a bound, the bounds
+    of board1.asm against the emulator, and the bounds applied as the
+    floor of the link timing profile.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import random
+import time
+import unittest
+
+from home_automation.pic import p16f877a as chip
+from home_automation.pic.assembler import assemble
+from home_automation.pic.cpu import PIC16
+from home_automation.pic.wcet import LatencyAnalyzer, LatencyReport, analyze_board
+from home_automation.protocol import BOARD_MAPS
+from home_automation.transport.emulated_transport import EmulatedTransport
+from home_automation.transport.link_timing import LinkTimingProfile
+
+# Echo firmware: answers every byte after a 100-pass delay loop
+_ECHO = """
+    LIST P=16F877A
+    INCLUDE "P16F877A.INC"
+    CBLOCK 0x20
+        A1, B1
+    ENDC
+    ORG 0
+    BANKSEL SPBRG
+    MOVLW   d'25'
+    MOVWF   SPBRG
+    MOVLW   b'00100100'
+    MOVWF   TXSTA
+    BANKSEL RCSTA
+    MOVLW   b'10010000'
+    MOVWF   RCSTA
+WAIT BTFSS PIR1, RCIF
+    GOTO    WAIT
+    MOVF    RCREG, W
+    MOVWF   B1
+    MOVLW   d'100'
+    MOVWF   A1
+LOOP DECFSZ A1, F
+    GOTO    LOOP
+    MOVF    B1, W
+    MOVWF   TXREG
+    GOTO    WAIT
+    END
+"""
+
+
+class TestAnalyzer(unittest.TestCase):
+    """Bounds of small programs."""
+
+    def test_delay_loop_is_exact(self):
+        rep = LatencyAnalyzer(assemble(_ECHO)).analyze()
+        self.assertEqual(rep.unbounded, [])
+        self.assertEqual(rep.bit_cycles, 104)
+        self.assertEqual(rep.poll_interval_cycles, 3)       # BTFSS + GOTO
+        # Poll (2) + 4 + delay loop (99 * 3 + 2) + MOVF + MOVWF TXREG
+        self.assertEqual(rep.commands[0x41].service_cycles, 2 + 4 + 299 + 2)
+        # The next byte comes after the answer, when the loop polls again
+        self.assertEqual(rep.busy_interval_cycles, 0)
+        self.assertEqual(len(rep.commands), 256)
+
+        # The emulator answers within the bound, at every phase of the loop
+        bound = rep.commands[0x41].response_cycles - 10 * rep.bit_cycles
+        for phase in range(0, 320, 7):
+            cpu = PIC16(assemble(_ECHO))
+            sent = []
+            cpu.tx_sink = lambda c, b: sent.append(c)
+            cpu.run(50)
+            cpu.uart_receive(0x41, 1000 + phase)
+            cpu.run(5000)
+            self.assertLessEqual(sent[0] - (1000 + phase), bound)
+
+    def test_loop_on_an_input_is_unbounded(self):
+        held = _ECHO.replace("    MOVF    B1, W\n", "KEY BTFSS PORTB, 0\n    GOTO    KEY\n    MOVF    B1, W\n")
+        rep = LatencyAnalyzer(assemble(held)).analyze()
+        self.assertEqual(len(rep.unbounded), 1)
+        self.assertIn("KEY", rep.unbounded[0])
+        self.assertEqual(rep.commands, {})
+
+        # With the input assumed high the loop is left at once
+        rep = LatencyAnalyzer(assemble(held), assumptions={chip.PORTB: (0x01, 0x01)}).analyze()
+        self.assertEqual(rep.unbounded, [])
+        self.assertEqual(rep.commands[0x41].service_cycles, 307 + 2)
+
+    def test_report_round_trip(self):
+        rep = LatencyAnalyzer(assemble(_ECHO)).analyze()
+        again = LatencyReport.from_dict(rep.to_dict())
+        self.assertEqual(again, rep)
+        self.assertEqual(again.timeout_s(0x41), rep.commands[0x41].response_s)
+
+
+class TestFirmware(unittest.TestCase):
+    """board1.asm: static bounds against the emulated firmware."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.rep = analyze_board("board1")
+
+    def test_every_get_is_bounded(self):
+        rep = self.rep
+        self.assertEqual(rep.unbounded, [])
+        board_map = BOARD_MAPS["board1"]
+        self.assertEqual(sorted(rep.commands), sorted(board_map.commands_for(None) + (board_map.get_all,)))
+        self.assertGreater(rep.commands[board_map.get_all].burst_cycles, 0)
+        self.assertIsNotNone(rep.isr_period_cycles)         # Timer0 interrupt of the fan counter
+        self.assertGreater(rep.min_gap_s, 0.0)
+
+    def test_emulator_stays_within_the_bounds(self):
+        t = EmulatedTransport("board1")
+        t.open()
+        rng = random.Random(3)
+        board_map = BOARD_MAPS["board1"]
+        for cmd in self.rep.commands:
+            size = 1 + len(board_map.get_commands) if cmd == board_map.get_all else 1
+            for _ in range(3):
+                t.advance(rng.uniform(0.0, 0.05))
+                t.write_byte(cmd)
+                t.read_exact(size, time.monotonic() + 1.0)
+                self.assertLessEqual(t.exchanges[-1].latency_s, self.rep.timeout_s(cmd))
+
+
+class TestStaticFloor(unittest.TestCase):
+    """LinkTimingProfile with the static bounds applied."""
+
+    REPORT = {"min_gap_s": 0.006, "commands": {"0x01": {"response_s": 0.05}}}
+
+    def test_floors(self):
+        prof = LinkTimingProfile()
+        prof.apply_static(self.REPORT)
+        for _ in range(20):
+            prof.observe(0x01, 0.01)       # Faster than the bound (e.g. a lucky phase)
+        self.assertGreaterEqual(prof.timeout_for(0x01), 0.05)
+        self.assertLess(prof.timeout_for(0x02), 0.05)     # No bound for 0x02
+        self.assertGreaterEqual(prof.inter_byte_gap(10 / 9600, 0.005), 0.006)
+        self.assertEqual(LinkTimingProfile().inter_byte_gap(10 / 9600, 0.005), 0.005)
+
+        again = LinkTimingProfile.from_dict(prof.to_dict())
+        self.assertEqual(again.floor_timeouts, {0x01: 0.05})
+        self.assertEqual(again.floor_gap_s, 0.006)
+
+
+if __name__ == "__main__":
+    unittest.main()
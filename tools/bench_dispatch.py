@@ -0,0 +1,177 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tools/bench_dispatch.py
+DESCRIPTION:
+    Microbenchmark: old if/elif command chains vs. the 256-entry dispatch
+    tables (protocol/dispatch.py).
+    The old chains are kept here as reference implementations; the unit
+    tests also use them to check that the tables behave the same for every
+    command byte.
+
+    Usage: python -m home_automation.tools.bench_dispatch [--n 200000]
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import argparse
+import random
+import time
+
+from home_automation.protocol import board1, board2
+from home_automation.protocol.common import PAYLOAD_MASK_6BIT, join_1dp
+from home_automation.protocol.dispatch import decode, respond, respond_bytes
+
+
+# ------------------------------------------------------------------------------
+# OLD IMPLEMENTATIONS (if/elif chains)
+# ------------------------------------------------------------------------------
+
+def legacy_respond_board1(cmd: int, st: board1.AirState):
+    """Old FakeTransport._handle_board1. Returns the answer byte or None."""
+    if cmd == board1.GET_DESIRED_TEMP_LOW:
+        return st.desired_temp.frac_digit & 0xFF
+    elif cmd == board1.GET_DESIRED_TEMP_HIGH:
+        return st.desired_temp.integral & 0xFF
+    elif cmd == board1.GET_AMBIENT_TEMP_LOW:
+        return st.ambient_temp.frac_digit & 0xFF
+    elif cmd == board1.GET_AMBIENT_TEMP_HIGH:
+        return st.ambient_temp.integral & 0xFF
+    elif cmd == board1.GET_FAN_SPEED_RPS:
+        return st.fan_speed_rps & 0xFF
+    elif (cmd & 0b1100_0000) == 0b1000_0000:
+        st.desired_temp.frac_digit = cmd & PAYLOAD_MASK_6BIT
+    elif (cmd & 0b1100_0000) == 0b1100_0000:
+        st.desired_temp.integral = cmd & PAYLOAD_MASK_6BIT
+        desired = join_1dp(st.desired_temp.integral, st.desired_temp.frac_digit)
+        ambient = join_1dp(st.ambient_temp.integral, st.ambient_temp.frac_digit)
+        st.fan_speed_rps = 30 if desired > ambient else 0
+    return None
+
+
+def legacy_respond_board2(cmd: int, cs: board2.CurtainState, light_high_cmd: int):
+    """Old FakeTransport._handle_board2. Returns the answer byte or None."""
+    if cmd == board2.GET_DESIRED_CURTAIN_LOW:
+        return cs.desired_curtain.frac_digit & 0xFF
+    elif cmd == board2.GET_DESIRED_CURTAIN_HIGH:
+        return cs.desired_curtain.integral & 0xFF
+    elif cmd == board2.GET_OUTDOOR_TEMP_LOW:
+        return cs.outdoor_temp.frac_digit & 0xFF
+    elif cmd == board2.GET_OUTDOOR_TEMP_HIGH:
+        return cs.outdoor_temp.integral & 0xFF
+    elif cmd == board2.GET_OUTDOOR_PRESS_LOW:
+        return cs.outdoor_press.frac_digit & 0xFF
+    elif cmd == board2.GET_OUTDOOR_PRESS_HIGH:
+        return cs.outdoor_press.integral & 0xFF
+    elif cmd == board2.GET_LIGHT_INTENSITY_LOW:
+        return cs.light_intensity.frac_digit & 0xFF
+    elif cmd == light_high_cmd or cmd == board2.GET_LIGHT_INTENSITY_HIGH:
+        return cs.light_intensity.integral & 0xFF
+    elif (cmd & 0b1100_0000) == 0b1000_0000:
+        cs.desired_curtain.frac_digit = cmd & PAYLOAD_MASK_6BIT
+    elif (cmd & 0b1100_0000) == 0b1100_0000:
+        cs.desired_curtain.integral = cmd & PAYLOAD_MASK_6BIT
+    return None
+
+
+def legacy_decode_board1(cmd: int, data_byte: int, state: board1.AirState):
+    """Old board1.decode_get_response."""
+    b = int(data_byte) & 0xFF
+    if cmd == board1.GET_DESIRED_TEMP_LOW:
+        state.desired_temp.frac_digit = b & PAYLOAD_MASK_6BIT
+    elif cmd == board1.GET_DESIRED_TEMP_HIGH:
+        state.desired_temp.integral = b & PAYLOAD_MASK_6BIT
+    elif cmd == board1.GET_AMBIENT_TEMP_LOW:
+        state.ambient_temp.frac_digit = b & PAYLOAD_MASK_6BIT
+    elif cmd == board1.GET_AMBIENT_TEMP_HIGH:
+        state.ambient_temp.integral = b & PAYLOAD_MASK_6BIT
+    elif cmd == board1.GET_FAN_SPEED_RPS:
+        state.fan_speed_rps = b
+    return state
+
+
+def legacy_decode_board2(cmd: int, data_byte: int, state: board2.CurtainState, light_high_cmd: int):
+    """Old board2.decode_get_response."""
+    b = int(data_byte) & 0xFF
+    if cmd == board2.GET_DESIRED_CURTAIN_LOW:
+        state.desired_curtain.frac_digit = b
+    elif cmd == board2.GET_DESIRED_CURTAIN_HIGH:
+        state.desired_curtain.integral = b
+    elif cmd == board2.GET_OUTDOOR_TEMP_LOW:
+        state.outdoor_temp.frac_digit = b
+    elif cmd == board2.GET_OUTDOOR_TEMP_HIGH:
+        state.outdoor_temp.integral = b
+    elif cmd == board2.GET_OUTDOOR_PRESS_LOW:
+        state.outdoor_press.frac_digit = b
+    elif cmd == board2.GET_OUTDOOR_PRESS_HIGH:
+        state.outdoor_press.integral = b
+    elif cmd == board2.GET_LIGHT_INTENSITY_LOW:
+        state.light_intensity.frac_digit = b
+    elif cmd == light_high_cmd or cmd == board2.GET_LIGHT_INTENSITY_HIGH:
+        state.light_intensity.integral = b
+    return state
+
+
+# ------------------------------------------------------------------------------
+# BENCHMARK
+# ------------------------------------------------------------------------------
+
+def _rate(fn, cmds) -> float:
+    """Runs fn over all commands and returns commands per second."""
+    t0 = time.perf_counter()
+    for c in cmds:
+        fn(c)
+    return len(cmds) / (time.perf_counter() - t0)
+
+
+def _bulk_rate(fn, cmds) -> float:
+    """Like _rate(), but fn gets the whole buffer at once."""
+    data = bytes(cmds)
+    t0 = time.perf_counter()
+    fn(data)
+    return len(cmds) / (time.perf_counter() - t0)
+
+
+def run(n: int = 200_000, seed: int = 1) -> dict:
+    """
+    Measures commands per second for both implementations.
+    The command mix is mostly GETs (the last ones in the chains are the
+    slowest) plus some SET bytes, like a polling load test.
+    """
+    rng = random.Random(seed)
+    b1_cmds = [rng.choice([1, 2, 3, 4, 5, 5, 5, 0x80 | 5, 0xC0 | 25]) for _ in range(n)]
+    b2_cmds = [rng.choice([1, 2, 3, 4, 5, 6, 7, 8, 8, 8, 0x80, 0xC0 | 32]) for _ in range(n)]
+
+    air, cs = board1.AirState(), board2.CurtainState()
+    light = board2.GET_LIGHT_INTENSITY_HIGH_DEFAULT
+    t2 = board2.dispatch_table(light)
+
+    return {
+        "board1 respond (chain)": _rate(lambda c: legacy_respond_board1(c, air), b1_cmds),
+        "board1 respond (table)": _rate(lambda c: respond(board1.DISPATCH, c, air), b1_cmds),
+        "board2 respond (chain)": _rate(lambda c: legacy_respond_board2(c, cs, light), b2_cmds),
+        "board2 respond (table)": _rate(lambda c: respond(t2, c, cs), b2_cmds),
+        "board1 respond (bulk)": _bulk_rate(lambda d: respond_bytes(board1.DISPATCH, d, air), b1_cmds),
+        "board2 respond (bulk)": _bulk_rate(lambda d: respond_bytes(t2, d, cs), b2_cmds),
+        "board1 decode (chain)": _rate(lambda c: legacy_decode_board1(c, 7, air), b1_cmds),
+        "board1 decode (table)": _rate(lambda c: decode(board1.DISPATCH, c, 7, air), b1_cmds),
+        "board2 decode (chain)": _rate(lambda c: legacy_decode_board2(c, 7, cs, light), b2_cmds),
+        "board2 decode (table)": _rate(lambda c: decode(t2, c, 7, cs), b2_cmds),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark protocol dispatch")
+    ap.add_argument("--n", type=int, default=200_000, help="Commands per run")
+    args = ap.parse_args()
+
+    for name, rate in run(args.n).items():
+        print(f"{name:<26} {rate / 1000.0:10.1f} k cmd/s")
+
+
+if __name__ == "__main__":
+    main()
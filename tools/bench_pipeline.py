@@ -0,0 +1,106 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tools/bench_pipeline.py
+DESCRIPTION:
+    Snapshot latency of update() with 1 (stop-and-wait), 2 and 3 GETs in
+    flight, for firmware without GET_ALL (the register by register path).
+    - emulated: board1.asm / board2.asm on the PIC emulator; the time is
+      emulated time, started at a random moment of the main loop, so it
+      includes the real turnaround of the firmware. --usb-ms is the delay
+      until a received byte reaches the PC (USB-serial latency), which
+      stop-and-wait pays once per GET,
+    - fake:     FakeTransport (answers at once); wall time per update(),
+      i.e. the cost of the API and protocol code alone.
+    The GET_ALL row is the same update() with the snapshot command.
+    'fallbacks' counts updates in which a GET timed out in the pipeline
+    (e.g. lost in an overrun of the 2-byte receive FIFO).
+
+    Usage: python -m home_automation.tools.bench_pipeline [--n 40] [--usb-ms 4] [--fake-n 20000]
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from home_automation.api import (
+    AirConditionerSystemConnection,
+    CurtainControlSystemConnection,
+    HomeAutomationSystemConnection,
+)
+from home_automation.transport import FakeTransport
+from home_automation.transport.emulated_transport import EmulatedTransport
+
+API = {"board1": AirConditionerSystemConnection, "board2": CurtainControlSystemConnection}
+WINDOWS = (1, 2, 3)
+
+
+def _connect(board: str, transport, window: int, snapshot: bool):
+    conn = HomeAutomationSystemConnection(transport=transport, comPort="BENCH", baudRate=9600)
+    conn.open()
+    conn.pipeline_window = window
+    if not snapshot:
+        conn.snapshot_support[board] = False
+    return conn, API[board](connection=conn)
+
+
+def emulated(board: str, window: int, n: int, snapshot: bool = False, usb_s: float = 0.0, seed: int = 1):
+    """(update times in emulated seconds, updates with a pipeline fallback)."""
+    t = EmulatedTransport(board, rx_latency_s=usb_s)
+    conn, api = _connect(board, t, window, snapshot)
+    t.advance(3.0)      # Board #2 is busy for about 2 s after reset
+    rng = random.Random(seed)
+    times, fallbacks = [], 0
+    for _ in range(n):
+        t.advance(rng.uniform(0.0, 0.2))            # Random phase of the main loop
+        before = conn.stats_snapshot().commands
+        t0 = t.now_s()
+        api.update()
+        times.append(t.now_s() - t0)
+        after = conn.stats_snapshot().commands
+        if any(s.timeouts > (before[c].timeouts if c in before else 0) for c, s in after.items()):
+            fallbacks += 1
+    return times, fallbacks
+
+
+def fake(board: str, window: int, n: int, snapshot: bool = False) -> float:
+    """Mean wall time of one update() in seconds."""
+    conn, api = _connect(board, FakeTransport(board=board), window, snapshot)
+    conn.enable_stats(False)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        api.update()
+    return (time.perf_counter() - t0) / n
+
+
+def _ms(values, q):
+    values = sorted(values)
+    return f"{values[min(len(values) - 1, int(q * len(values)))] * 1000:7.2f}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="update() latency with pipelined GETs")
+    ap.add_argument("--n", type=int, default=40, help="Updates per row on the emulator")
+    ap.add_argument("--usb-ms", type=float, default=4.0, help="Receive latency of the USB-serial adapter (ms)")
+    ap.add_argument("--fake-n", type=int, default=20000, help="Updates per row on FakeTransport")
+    args = ap.parse_args()
+
+    for board in ("board1", "board2"):
+        print(f"\n{board}  emulated ({args.usb_ms:g} ms USB): mean ms   p95 ms   max ms  fallbacks | fake us/update")
+        rows = [(f"window {w}", w, False) for w in WINDOWS] + [("GET_ALL", 1, True)]
+        for name, window, snapshot in rows:
+            times, fallbacks = emulated(board, window, args.n, snapshot, args.usb_ms / 1000)
+            us = fake(board, window, args.fake_n, snapshot) * 1e6
+            print(f"  {name:10s}              {statistics.fmean(times) * 1000:7.2f}  {_ms(times, 0.95)}  "
+                  f"{_ms(times, 1.0)}  {fallbacks:9d} | {us:14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tools/bench_replay.py
+DESCRIPTION:
+    Throughput of the Board #1 API (update() / setDesiredTemp()) against a
+    recorded UART session, without hardware.
+    The session is 'n' rounds of setDesiredTemp() + update(). It is recorded
+    from the simulated board (or taken from a real capture made with the
+    console's --capture option using the same calls) and then replayed as
+    fast as possible through ReplayTransport, so only the API, protocol and
+    transport code is measured.
+
+    Usage: python -m home_automation.tools.bench_replay [--n 20000] [--capture board1.cap]
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from home_automation.api import AirConditionerSystemConnection, HomeAutomationSystemConnection
+from home_automation.transport import CaptureTransport, FakeTransport, ReplayTransport
+
+
+def session(transport, n: int) -> AirConditionerSystemConnection:
+    """The recorded/replayed calls: n x (setDesiredTemp, update)."""
+    conn = HomeAutomationSystemConnection(transport=transport, comPort="BENCH", baudRate=9600)
+    conn.open()
+    air = AirConditionerSystemConnection(connection=conn)
+    for i in range(n):
+        air.setDesiredTemp(20.0 + (i % 100) / 10.0)
+        air.update()
+    return air
+
+
+def record(path: str, n: int) -> None:
+    session(CaptureTransport(FakeTransport(board="board1"), path), n).connection.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay benchmark of the Board #1 API")
+    ap.add_argument("--n", type=int, default=20_000, help="Rounds of setDesiredTemp() + update()")
+    ap.add_argument("--capture", type=str, default="", help="Existing capture of the same session")
+    args = ap.parse_args()
+
+    path = args.capture
+    if not path:
+        path = os.path.join(tempfile.mkdtemp(prefix="replay_bench_"), "board1.cap")
+        record(path, args.n)
+
+    replay = ReplayTransport(path)
+    t0 = time.perf_counter()
+    session(replay, args.n)
+    spent = time.perf_counter() - t0
+    replay.assert_finished()
+
+    print(f"events replayed     {len(replay.capture.events):10d}")
+    print(f"rounds              {args.n / spent:10.0f} /s")
+    print(f"time per round      {spent / args.n * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
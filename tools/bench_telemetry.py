@@ -0,0 +1,108 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tools/bench_telemetry.py
+DESCRIPTION:
+    Benchmark of the telemetry store (telemetry/store.py).
+    - ingest: rows/s through append() + flush() (the polling path) and
+      through append_columns() (bulk import),
+    - query: time of day / week / month range queries over the whole data
+      set (default: one year of 1 Hz samples, about 1.2 GB on disk).
+
+    Usage: python -m home_automation.tools.bench_telemetry [--days 365] [--dir PATH]
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import argparse
+import math
+import random
+import shutil
+import tempfile
+import time
+
+from home_automation.telemetry import store as tstore
+from home_automation.telemetry.store import TelemetryStore
+
+DAY_S = 86400
+T0 = 1_700_000_000.0     # Start of the synthetic data
+
+
+def synthetic_day(day: int):
+    """One day of 1 Hz samples, alternating Board #1 / Board #2 rows."""
+    t = [T0 + day * DAY_S + i for i in range(DAY_S)]
+    board = [1 + (i & 1) for i in range(DAY_S)]
+    amb = [22.0 + 3.0 * math.sin(2 * math.pi * i / DAY_S) for i in range(DAY_S)]
+    cols = {"t": t, "board": board, "ambient_temp": amb, "desired_temp": [24.0] * DAY_S,
+            "light": [max(0.0, 500.0 * math.sin(math.pi * i / DAY_S)) for i in range(DAY_S)]}
+    if tstore.np is not None:
+        cols = {k: tstore.np.asarray(v) for k, v in cols.items()}
+    return cols
+
+
+def bench_append(path: str, n: int) -> float:
+    """Rows/s through the polling path (append one row, flush in batches)."""
+    with TelemetryStore(path) as st:
+        t0 = time.perf_counter()
+        for i in range(n):
+            st.append(T0 + i, "board1", desired_temp=24.0, ambient_temp=23.5, fan_rps=3.0)
+            if (i & 1023) == 1023:
+                st.flush()
+        st.flush()
+        return n / (time.perf_counter() - t0)
+
+
+def bench_bulk(path: str, days: int) -> float:
+    """Rows/s of append_columns() for 'days' days of data (data generation excluded)."""
+    spent = 0.0
+    with TelemetryStore(path) as st:
+        for d in range(days):
+            cols = synthetic_day(d)
+            t0 = time.perf_counter()
+            st.append_columns(cols)
+            spent += time.perf_counter() - t0
+    return days * DAY_S / spent
+
+
+def bench_query(path: str, days: int, span_s: float, repeat: int = 20) -> float:
+    """Mean seconds of a random range query of length 'span_s'."""
+    st = TelemetryStore(path)
+    rng = random.Random(1)
+    total = 0.0
+    for _ in range(repeat):
+        a = T0 + rng.uniform(0, max(0.0, days * DAY_S - span_s))
+        t0 = time.perf_counter()
+        res = st.query(a, a + span_s, ["ambient_temp"], board="board1")
+        total += time.perf_counter() - t0
+        assert len(res["t"]) > 0
+    return total / repeat
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the telemetry store")
+    ap.add_argument("--days", type=int, default=365, help="Days of 1 Hz data")
+    ap.add_argument("--append-rows", type=int, default=200_000, help="Rows for the append() benchmark")
+    ap.add_argument("--dir", type=str, default="", help="Folder for the data (default: temporary)")
+    args = ap.parse_args()
+
+    root = args.dir or tempfile.mkdtemp(prefix="telemetry_bench_")
+    try:
+        print(f"NumPy: {'yes' if tstore.np is not None else 'no (array.array results)'}")
+        rate = bench_append(root + "/append", args.append_rows)
+        print(f"append()+flush      {rate / 1000.0:10.1f} k rows/s")
+        rate = bench_bulk(root + "/year", args.days)
+        print(f"append_columns()    {rate / 1e6:10.2f} M rows/s ({args.days} days)")
+        for label, span in (("1 day", DAY_S), ("1 week", 7 * DAY_S), ("30 days", 30 * DAY_S)):
+            if span <= args.days * DAY_S:
+                print(f"query {label:<13} {bench_query(root + '/year', args.days, span) * 1000:10.2f} ms")
+    finally:
+        if not args.dir:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
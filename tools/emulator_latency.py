@@ -0,0 +1,82 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tools/emulator_latency.py
+DESCRIPTION:
+    End-to-end response latency of every GET of board1.asm / board2.asm,
+    measured on the PIC16F877A emulator (cycle accurate at --clock).
+    Each GET is sent 'n' times at random moments of the main loop; the
+    table shows the round trip (first bit out to last bit of the answer)
+    and the pickup delay (how long the byte waited in the receive FIFO
+    until UART_HANDLER / UART_DINLE_VE_ISLE read RCREG).
+    The two wire frames alone take 2 x 1.04 ms at 9600 Bd.
+
+    Usage: python -m home_automation.tools.emulator_latency [--n 50] [--clock 4e6]
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from home_automation.protocol import BOARD_MAPS
+from home_automation.transport import TransportError
+from home_automation.transport.emulated_transport import EmulatedTransport
+
+
+def measure(board: str, n: int, clock_hz: float, seed: int = 1):
+    """{cmd: (latencies_s, pickups_s, timeouts)} for every GET of the board."""
+    t = EmulatedTransport(board, clock_hz=clock_hz)
+    t.open()
+    rng = random.Random(seed)
+    out = {}
+    for cmd in BOARD_MAPS[board].commands_for(None):
+        lat, pick, lost = [], [], 0
+        for _ in range(n):
+            t.advance(rng.uniform(0.0, 0.2))        # Random phase of the main loop
+            t.write_byte(cmd)
+            try:
+                t.read_byte(timeout_s=1.0)
+            except TransportError:
+                lost += 1
+                continue
+            ex = t.exchanges[-1]
+            lat.append(ex.latency_s)
+            pick.append(ex.pickup_s)
+        out[cmd] = (lat, pick, lost)
+    return out
+
+
+def _ms(values, q):
+    if not values:
+        return "      -"
+    values = sorted(values)
+    return f"{values[min(len(values) - 1, int(q * len(values)))] * 1000:7.2f}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="GET latency of the real firmware on the emulator")
+    ap.add_argument("--n", type=int, default=50, help="Requests per command")
+    ap.add_argument("--clock", type=float, default=4e6, help="Oscillator frequency (Hz)")
+    args = ap.parse_args()
+
+    for board in ("board1", "board2"):
+        t0 = time.perf_counter()
+        res = measure(board, args.n, args.clock)
+        print(f"\n{board} @ {args.clock / 1e6:g} MHz ({time.perf_counter() - t0:.1f} s to emulate)")
+        print("  cmd    min ms  mean ms   p95 ms   max ms | pickup mean  p95 ms | lost")
+        for cmd, (lat, pick, lost) in res.items():
+            mean = f"{statistics.fmean(lat) * 1000:7.2f}" if lat else "      -"
+            pmean = f"{statistics.fmean(pick) * 1000:7.2f}" if pick else "      -"
+            print(f"  0x{cmd:02X} {_ms(lat, 0.0)}  {mean}  {_ms(lat, 0.95)}  {_ms(lat, 1.0)} |"
+                  f"     {pmean} {_ms(pick, 0.95)} | {lost}")
+
+
+if __name__ == "__main__":
+    main()
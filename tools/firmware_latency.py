@@ -0,0 +1,68 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/tools/firmware_latency.py
+DESCRIPTION:
+    Static worst-case response latency of board1.asm / board2.asm at the
+    given oscillator frequency (see pic/wcet.py). Unlike
+    emulator_latency.py nothing is measured: the bounds hold for every
+    phase of the main loop, as long as the assumptions of the analysis
+    hold (keypad idle on Board #1, one command at a time).
+
+    With --out DIR the reports are written as DIR/board1_static.json and
+    DIR/board2_static.json; the console loads them from its --timing-dir
+    as the lower bound of the response timeouts and of the inter-byte gap.
+
+    Usage: python -m home_automation.tools.firmware_latency [--clock 4e6] [--out DIR]
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+import argparse
+import os
+import time
+
+from home_automation.pic.wcet import analyze_board
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Static worst-case response latency of the firmware")
+    ap.add_argument("--clock", type=float, default=4e6, help="Oscillator frequency (Hz)")
+    ap.add_argument("--out", type=str, default="", help="Folder for board1_static.json / board2_static.json")
+    args = ap.parse_args()
+
+    failed = False
+    for board in ("board1", "board2"):
+        t0 = time.perf_counter()
+        rep = analyze_board(board, args.clock)
+        print(f"\n{board} @ {args.clock / 1e6:g} MHz ({time.perf_counter() - t0:.1f} s to analyze)")
+        for w in rep.warnings:
+            print(f"  warning: {w}")
+        if rep.unbounded:
+            failed = True
+            for u in rep.unbounded:
+                print(f"  UNBOUNDED: {u}")
+            continue
+        print(f"  UART {rep.baudrate:.0f} Bd, poll interval {rep.poll_interval_cycles} cycles idle, "
+              f"{rep.busy_interval_cycles} busy ({rep.worst_path})")
+        if rep.isr_period_cycles:
+            print(f"  ISR {rep.isr_cycles} cycles every {rep.isr_period_cycles} cycles")
+        print(f"  min inter-byte gap {rep.min_gap_s * 1000:.2f} ms")
+        print("  cmd   service cycles   response ms")
+        for cmd, b in rep.commands.items():
+            print(f"  0x{cmd:02X} {b.service_cycles:15d}   {b.response_s * 1000:11.2f}")
+        if args.out:
+            os.makedirs(args.out, exist_ok=True)
+            path = os.path.join(args.out, f"{board}_static.json")
+            rep.save(path)
+            print(f"  written to {path}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
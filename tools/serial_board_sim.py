@@ -9,6 +9,8 @@ DESCRIPTION:
     Useful for testing the PC Interface [R2.4-1] without hardware.
 
     Defaults: Board1=COM11, Board2=COM13
+    With --v2 the boards also speak the framed protocol v2
+    (protocol/frames.py), so the PC negotiates it with --framing auto.
 
 AUTHORS:
     1. Yusuf Yaman - 152120221075
@@ -23,10 +25,12 @@ import time
 import serial
 
 from home_automation.protocol import board1, board2
-from home_automation.protocol.common import PAYLOAD_MASK_6BIT, Fixed1dp
+from home_automation.protocol.common import Fixed1dp
+from home_automation.protocol.dispatch import respond_bytes
+from home_automation.protocol.frames import BoardLink
 
 
-def run_board1(port: str, baud: int):
+def run_board1(port: str, baud: int, v2: bool = False):
     """
     Simulates Board #1 (Air Conditioner).
     It manages temperature drifting and fan speed logic.
@@ -35,7 +39,8 @@ def run_board1(port: str, baud: int):
     ser = serial.Serial(port, baudrate=baud, timeout=0.1)
     
     # Initial State: Desired=25.0, Ambient=24.0, Fan=0
-    st = board1.AirState()
+    st = board1.REGISTER_MAP.simulated_state()
+    link = BoardLink(board1.DISPATCH) if v2 else None
 
     last_drift = time.time()
 
@@ -59,89 +64,43 @@ def run_board1(port: str, baud: int):
 
             # Update Fan Speed logic [R2.1.1-5]
             # If Desired > Ambient (Heating needed), turn fan on
-            amb2 = st.ambient_temp.to_float()
-            des2 = st.desired_temp.to_float()
-            st.fan_speed_rps = 30 if des2 > amb2 else 0
+            board1.update_fan_speed(st)
 
         # --- Handle UART Communication ---
         b = ser.read(1)
         if not b:
             continue
-        
-        cmd = b[0] & 0xFF
-
-        # Handle GET Commands [R2.1.4-1]
-        if cmd == board1.GET_DESIRED_TEMP_LOW:
-            ser.write(bytes([st.desired_temp.frac_digit & 0xFF]))
-        elif cmd == board1.GET_DESIRED_TEMP_HIGH:
-            ser.write(bytes([st.desired_temp.integral & 0xFF]))
-        elif cmd == board1.GET_AMBIENT_TEMP_LOW:
-            ser.write(bytes([st.ambient_temp.frac_digit & 0xFF]))
-        elif cmd == board1.GET_AMBIENT_TEMP_HIGH:
-            ser.write(bytes([st.ambient_temp.integral & 0xFF]))
-        elif cmd == board1.GET_FAN_SPEED_RPS:
-            ser.write(bytes([st.fan_speed_rps & 0xFF]))
-
-        # Handle SET Commands (10xxxxxx and 11xxxxxx)
-        elif (cmd & 0b1100_0000) == 0b1000_0000:
-            # Set Low Byte (Fraction)
-            st.desired_temp.frac_digit = cmd & PAYLOAD_MASK_6BIT
-
-        elif (cmd & 0b1100_0000) == 0b1100_0000:
-            # Set High Byte (Integral)
-            st.desired_temp.integral = cmd & PAYLOAD_MASK_6BIT
-
-            # Recalculate fan speed immediately after set point change
-            amb = st.ambient_temp.to_float()
-            des = st.desired_temp.to_float()
-            st.fan_speed_rps = 30 if des > amb else 0
 
+        # GET answers (GET_ALL: the whole burst) and SET updates (incl. fan
+        # logic) come from the dispatch table [R2.1.4-1]; v2 frames too
+        resp = link.feed(b, st) if link is not None else respond_bytes(board1.DISPATCH, b, st)
+        if resp:
+            ser.write(resp)
 
-def run_board2(port: str, baud: int, light_high_cmd: int):
+
+def run_board2(port: str, baud: int, light_high_cmd: int, v2: bool = False):
     """
     Simulates Board #2 (Curtain Control).
     It holds sensor values and responds to requests.
     """
     ser = serial.Serial(port, baudrate=baud, timeout=0.1)
-    st = board2.CurtainState()
+    board_map = board2.register_map(light_high_cmd)
 
-    # Default Sensor Values
-    # Note: These values are raw bytes to fit into 6-bit or 8-bit limits
-    st.desired_curtain = Fixed1dp(32, 0)    # Approx 50% open
-    st.outdoor_temp = Fixed1dp(20, 0)       # 20.0 C
-    st.outdoor_press = Fixed1dp(101, 3)     # 101.3 hPa
-    st.light_intensity = Fixed1dp(200, 0)   # 200.0 Lux
+    # Default Sensor Values from the register map
+    # (curtain 32 raw = approx 50% open, 20.0 C, 101.3 hPa, 200.0 Lux)
+    st = board_map.simulated_state()
+    table = board_map.dispatch
+    link = BoardLink(table) if v2 else None
 
     while True:
         b = ser.read(1)
         if not b:
             continue
-        
-        cmd = b[0] & 0xFF
-
-        # Handle GET Commands [R2.2.6-1]
-        if cmd == board2.GET_DESIRED_CURTAIN_LOW:
-            ser.write(bytes([st.desired_curtain.frac_digit & 0xFF]))
-        elif cmd == board2.GET_DESIRED_CURTAIN_HIGH:
-            ser.write(bytes([st.desired_curtain.integral & 0xFF]))
-        elif cmd == board2.GET_OUTDOOR_TEMP_LOW:
-            ser.write(bytes([st.outdoor_temp.frac_digit & 0xFF]))
-        elif cmd == board2.GET_OUTDOOR_TEMP_HIGH:
-            ser.write(bytes([st.outdoor_temp.integral & 0xFF]))
-        elif cmd == board2.GET_OUTDOOR_PRESS_LOW:
-            ser.write(bytes([st.outdoor_press.frac_digit & 0xFF]))
-        elif cmd == board2.GET_OUTDOOR_PRESS_HIGH:
-            ser.write(bytes([st.outdoor_press.integral & 0xFF]))
-        elif cmd == board2.GET_LIGHT_INTENSITY_LOW:
-            ser.write(bytes([st.light_intensity.frac_digit & 0xFF]))
-        elif cmd == light_high_cmd or cmd == board2.GET_LIGHT_INTENSITY_HIGH:
-            ser.write(bytes([st.light_intensity.integral & 0xFF]))
-
-        # Handle SET Commands (For Curtain Position)
-        elif (cmd & 0b1100_0000) == 0b1000_0000:
-            st.desired_curtain.frac_digit = cmd & PAYLOAD_MASK_6BIT
-        elif (cmd & 0b1100_0000) == 0b1100_0000:
-            st.desired_curtain.integral = cmd & PAYLOAD_MASK_6BIT
+
+        # Handle GET, GET_ALL and SET commands with the dispatch table [R2.2.6-1]
+        resp = link.feed(b, st) if link is not None else respond_bytes(table, b, st)
+        if resp:
+            ser.write(resp)
 
 
 def main():
@@ -150,11 +109,12 @@ def main():
     ap.add_argument("--b2", default="COM13", help="Port for Board 2")
     ap.add_argument("--baud", type=int, default=9600)
     ap.add_argument("--light-high-cmd", type=int, default=board2.GET_LIGHT_INTENSITY_HIGH_DEFAULT)
+    ap.add_argument("--v2", action="store_true", help="Also answer framed protocol v2 requests")
     args = ap.parse_args()
 
     # Create threads for each board simulation
-    t1 = threading.Thread(target=run_board1, args=(args.b1, args.baud), daemon=True)
-    t2 = threading.Thread(target=run_board2, args=(args.b2, args.baud, args.light_high_cmd), daemon=True)
+    t1 = threading.Thread(target=run_board1, args=(args.b1, args.baud, args.v2), daemon=True)
+    t2 = threading.Thread(target=run_board2, args=(args.b2, args.baud, args.light_high_cmd, args.v2), daemon=True)
 
     # Start Board 1 Simulation
     t1.start()
@@ -1,4 +1,8 @@
 from .base import Transport, TransportError
 from .fake_transport import FakeTransport
+from .async_base import AsyncTransport
+from .async_fake_transport import AsyncFakeTransport
+from .capture import CaptureTransport, ReplayDivergence, ReplayTransport, read_capture
 
-__all__ = ["Transport", "TransportError", "FakeTransport"]
+__all__ = ["Transport", "TransportError", "FakeTransport", "AsyncTransport", "AsyncFakeTransport",
+           "CaptureTransport", "ReplayTransport", "ReplayDivergence", "read_capture"]
@@ -0,0 +1,86 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/transport/async_base.py
+DESCRIPTION:
+    This file defines the asyncio counterpart of the Transport interface.
+    It has the same functions as 'base.Transport', but the I/O functions are
+    coroutines, so one event loop can serve many boards at the same time
+    without one thread per port.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import asyncio
+from abc import ABC, abstractmethod
+
+
+class AsyncTransport(ABC):
+    """
+    Abstract Base Class for asyncio transports.
+    Mirrors 'Transport': open, close, read and write, plus the bulk
+    operations (write_bytes, read_exact, drain).
+    """
+
+    @abstractmethod
+    async def open(self) -> None:
+        """Opens the connection."""
+        ...
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Closes the connection."""
+        ...
+
+    @abstractmethod
+    def is_open(self) -> bool:
+        """Checks if the connection is currently open."""
+        ...
+
+    @abstractmethod
+    async def write_bytes(self, buf: bytes) -> None:
+        """Sends several bytes in order."""
+        ...
+
+    @abstractmethod
+    async def read_exact(self, n: int, deadline: float) -> bytes:
+        """
+        Reads exactly 'n' bytes.
+        'deadline' is an absolute loop.time() value. If the bytes do not
+        arrive before it, a TransportError is raised.
+        """
+        ...
+
+    async def write_byte(self, b: int) -> None:
+        """Sends a single byte of data."""
+        await self.write_bytes(bytes([int(b) & 0xFF]))
+
+    async def read_byte(self, timeout_s: float = 1.0) -> int:
+        """
+        Reads a single byte of data.
+        If no data arrives within 'timeout_s', it raises an error.
+        """
+        loop = asyncio.get_running_loop()
+        data = await self.read_exact(1, loop.time() + timeout_s)
+        return data[0]
+
+    async def drain(self) -> int:
+        """
+        Discards any bytes waiting in the input buffer.
+        Returns the number of discarded bytes.
+        """
+        return 0
+
+    def response_timeout(self, cmd: int) -> float:
+        """How long to wait for the answer to 'cmd' (seconds)."""
+        return 1.0
+
+    def retry_delay(self, cmd: int) -> float:
+        """How long to wait after a timeout of 'cmd' before retrying."""
+        return 0.3
@@ -0,0 +1,65 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/transport/async_fake_transport.py
+DESCRIPTION:
+    asyncio version of the 'Fake' transport layer.
+    It reuses the board simulation of FakeTransport, so the async and the
+    blocking API are tested against exactly the same simulated boards.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+
+from .async_base import AsyncTransport
+from .fake_transport import FakeTransport
+
+
+@dataclass
+class AsyncFakeTransport(AsyncTransport):
+    """
+    Simulates a serial connection to a board for asyncio code.
+    Each instance represents one board (either 'board1' or 'board2').
+    """
+
+    board: str  # "board1" or "board2"
+    fake: FakeTransport = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Creates the simulated board."""
+        self.fake = FakeTransport(board=self.board)
+
+    async def open(self) -> None:
+        """Simulates opening the port."""
+        self.fake.open()
+
+    async def close(self) -> None:
+        """Simulates closing the port."""
+        self.fake.close()
+
+    def is_open(self) -> bool:
+        """Checks if the fake connection is open."""
+        return self.fake.is_open()
+
+    async def write_bytes(self, buf: bytes) -> None:
+        """Processes the bytes on the simulated board."""
+        self.fake.write_bytes(buf)
+        # Let other boards on the same loop run, like a real write would
+        await asyncio.sleep(0)
+
+    async def read_exact(self, n: int, deadline: float) -> bytes:
+        """Returns the next 'n' simulated response bytes."""
+        await asyncio.sleep(0)
+        return self.fake.read_exact(n, deadline)
+
+    async def drain(self) -> int:
+        """Discards all queued response bytes."""
+        return self.fake.drain()
@@ -0,0 +1,270 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/transport/async_serial_transport.py
+DESCRIPTION:
+    asyncio implementation of the real UART communication.
+    PySerial is only used to configure the port (8N1, baudrate). The port is
+    then used as a non-blocking file descriptor registered with the event
+    loop, so no thread is blocked while waiting for the PIC.
+
+    Works on POSIX systems (Linux, macOS), where serial ports have a file
+    descriptor the event loop can watch.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Optional
+
+import serial  # type: ignore
+
+from .async_base import AsyncTransport
+from .base import TransportError
+from .link_timing import LinkTimingProfile
+from ..protocol import BOARD_MIN_BYTE_GAP_S
+from ..protocol.common import RX_FIFO_DEPTH
+
+
+@dataclass
+class AsyncSerialTransport(AsyncTransport):
+    """
+    Non-blocking serial port driven by the asyncio event loop.
+    Uses the same pacing and self-calibrating timing as SerialTransport.
+    """
+    port: str
+    baudrate: int = 9600
+
+    inter_byte_gap_s: float = 0.005
+    board: Optional[str] = None     # Safe gap while the FIFO could be full
+    adaptive_timing: bool = True
+    timing: LinkTimingProfile = field(default_factory=LinkTimingProfile)
+
+    # "reset": fixed 2 s warm-up, "probe": GET 'probe_cmd' until answered
+    open_mode: str = "reset"
+    probe_cmd: int = 0x01
+    probe_interval_s: float = 0.02
+    ready_timeout_s: float = 3.0
+
+    _ser: Optional[serial.Serial] = None
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _rx: bytearray = field(default_factory=bytearray)
+    _rx_event: Optional[asyncio.Event] = None
+    _last_write_t: float = 0.0
+    _pending_cmd: Optional[int] = None
+    _awaiting: int = 0              # Answer bytes expected for the GETs written
+    _unread_sets: int = 0           # SET bytes written since the last answer
+
+    async def open(self) -> None:
+        """
+        Opens the port in non-blocking mode and registers it with the loop.
+        """
+        if self.is_open():
+            return
+        try:
+            self._ser = serial.Serial(
+                port=self.port,
+                baudrate=self.baudrate,
+                bytesize=serial.EIGHTBITS,
+                parity=serial.PARITY_NONE,
+                stopbits=serial.STOPBITS_ONE,
+                timeout=0,              # Non-blocking reads
+                write_timeout=0,        # Non-blocking writes
+            )
+            self._loop = asyncio.get_running_loop()
+            self._rx_event = asyncio.Event()
+            self._rx.clear()
+            self._loop.add_reader(self._ser.fileno(), self._on_readable)
+        except Exception as e:
+            raise TransportError(f"Failed to open serial port {self.port}: {e}") from e
+
+        if self.open_mode == "probe":
+            await self._wait_ready_probe()
+        else:
+            await asyncio.sleep(2)  # Wait for the PIC to reset after DTR
+            await self.drain()
+
+    async def _wait_ready_probe(self) -> None:
+        """
+        Sends 'probe_cmd' until the board answers or the bound is reached,
+        never closer than the board's safe gap.
+        """
+        interval = max(self.probe_interval_s, self.current_gap())
+        end = self._loop.time() + self.ready_timeout_s
+        probes = 0
+        while self._loop.time() < end:
+            await self.drain()
+            await self.write_byte(self.probe_cmd)
+            probes += 1
+            try:
+                await self.read_exact(1, min(end, self._loop.time() + interval))
+                break
+            except TransportError:
+                continue
+        self._pending_cmd = None
+        if probes > 1:
+            await asyncio.sleep(interval)   # Late answers to earlier probes
+        await self.drain()
+
+    async def close(self) -> None:
+        """Unregisters the port from the loop and closes it."""
+        if self._ser:
+            try:
+                if self._loop is not None:
+                    self._loop.remove_reader(self._ser.fileno())
+                self._ser.close()
+            except Exception:
+                pass
+
+    def is_open(self) -> bool:
+        """Checks if the serial connection is currently active."""
+        return bool(self._ser and self._ser.is_open)
+
+    def _on_readable(self) -> None:
+        """Event loop callback: move all available bytes into the buffer."""
+        try:
+            data = self._ser.read(self._ser.in_waiting or 1)
+        except Exception:
+            return
+        if data:
+            self._rx += data
+            self._rx_event.set()
+
+    def _check_open(self) -> None:
+        if not self.is_open():
+            raise TransportError("Serial port is not open")
+
+    async def write_bytes(self, buf: bytes) -> None:
+        """
+        Sends bytes spaced by the inter-byte gap (asyncio.sleep, so other
+        boards keep running while this one is paced). As in SerialTransport,
+        only bytes that could find the receive FIFO full wait for the
+        board's safe gap.
+        """
+        self._check_open()
+        data = bytes(buf)
+        if not data:
+            return
+
+        idle = self._awaiting == 0 and not self._rx
+        unconfirmed = self._awaiting + self._unread_sets
+        self._awaiting += sum(1 for b in data if b < 0x80)
+        self._unread_sets += sum(1 for b in data if b >= 0x80)
+
+        gap, full_gap = self.link_gap(), self.current_gap()
+        if gap <= 0 and (full_gap <= 0 or unconfirmed + len(data) <= RX_FIFO_DEPTH):
+            await self._write_all(data)
+        else:
+            for i, b in enumerate(data):
+                # Wait only for the part of the gap that has not elapsed yet
+                g = full_gap if unconfirmed + i >= RX_FIFO_DEPTH else gap
+                wait = self._last_write_t + g - self._loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                await self._write_all(bytes([b]))
+
+        # Only a single GET (00xxxxxx) gives an unambiguous RTT sample, and
+        # only if no earlier answer is outstanding (pipelined GETs)
+        if idle and len(data) == 1 and data[0] < 0x80:
+            self._pending_cmd = data[0]
+        else:
+            self._pending_cmd = None
+
+    async def _write_all(self, chunk: bytes) -> None:
+        """Writes 'chunk' completely; a full OS buffer is waited out."""
+        while chunk:
+            n = self._ser.write(chunk) or 0
+            chunk = chunk[n:]
+            if chunk:
+                await asyncio.sleep(self.byte_time_s())
+        self._last_write_t = self._loop.time()
+
+    async def read_exact(self, n: int, deadline: float) -> bytes:
+        """Waits (without blocking the loop) until 'n' bytes are buffered."""
+        self._check_open()
+        while len(self._rx) < n:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                self._awaiting = 0      # Given up on
+                self._answer_missing()
+                raise TransportError(f"Timeout: got {len(self._rx)} of {n} bytes from {self.port}")
+            self._rx_event.clear()
+            try:
+                await asyncio.wait_for(self._rx_event.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+        out = bytes(self._rx[:n])
+        del self._rx[:n]
+        self._awaiting = max(0, self._awaiting - n)
+        self._unread_sets = 0          # The board read everything before the GET
+        if n == 1:
+            self._answer_received()
+        else:
+            self._pending_cmd = None
+        return out
+
+    async def read_byte(self, timeout_s: Optional[float] = None) -> int:
+        """Reads one byte; without a timeout the learned one is used."""
+        if timeout_s is None:
+            cmd = self._pending_cmd
+            timeout_s = self.response_timeout(cmd) if cmd is not None else 1.0
+        return await super().read_byte(timeout_s)
+
+    async def drain(self) -> int:
+        """Discards everything received so far."""
+        self._check_open()
+        if self._ser.in_waiting:
+            self._on_readable()
+        count = len(self._rx)
+        self._rx.clear()
+        self._awaiting = 0
+        return count
+
+    # --------------------------------------------------------------------------
+    # Adaptive timing (same rules as SerialTransport)
+    # --------------------------------------------------------------------------
+    def byte_time_s(self) -> float:
+        """Time of one 8N1 frame (10 bits) on the wire."""
+        return 10.0 / float(self.baudrate)
+
+    def link_gap(self) -> float:
+        """The inter-byte gap for a byte that finds room in the receive FIFO."""
+        if not self.adaptive_timing:
+            return self.inter_byte_gap_s
+        return self.timing.inter_byte_gap(self.byte_time_s(), self.inter_byte_gap_s)
+
+    def current_gap(self) -> float:
+        """The inter-byte gap for a byte that could find the FIFO full."""
+        return max(self.link_gap(), BOARD_MIN_BYTE_GAP_S.get(self.board, 0.0))
+
+    def response_timeout(self, cmd: int) -> float:
+        """Learned timeout for the answer to 'cmd'."""
+        if not self.adaptive_timing:
+            return super().response_timeout(cmd)
+        return self.timing.timeout_for(cmd)
+
+    def retry_delay(self, cmd: int) -> float:
+        """Learned wait before retrying 'cmd' after a timeout."""
+        if not self.adaptive_timing:
+            return super().retry_delay(cmd)
+        return self.timing.retry_delay_for(cmd)
+
+    def _answer_received(self) -> None:
+        cmd = self._pending_cmd
+        self._pending_cmd = None
+        if cmd is not None and self.adaptive_timing:
+            self.timing.observe(cmd, self._loop.time() - self._last_write_t)
+
+    def _answer_missing(self) -> None:
+        cmd = self._pending_cmd
+        self._pending_cmd = None
+        if cmd is not None and self.adaptive_timing:
+            self.timing.on_timeout(cmd)
@@ -16,6 +16,7 @@ AUTHORS:
 
 from __future__ import annotations
 
+import time
 from abc import ABC, abstractmethod
 from typing import Optional
 
@@ -58,4 +59,47 @@ class Transport(ABC):
         Reads a single byte of data.
         If no data arrives within 'timeout_s', it raises an error.
         """
-        ...
\ No newline at end of file
+        ...
+
+    def write_bytes(self, buf: bytes) -> None:
+        """
+        Sends several bytes in order.
+        The default implementation calls write_byte() for every byte;
+        real transports override it to send the whole buffer at once.
+        """
+        for b in bytes(buf):
+            self.write_byte(b)
+
+    def read_exact(self, n: int, deadline: float) -> bytes:
+        """
+        Reads exactly 'n' bytes.
+        'deadline' is an absolute time.monotonic() value. If the bytes do not
+        arrive before it, a TransportError is raised.
+        """
+        out = bytearray()
+        while len(out) < n:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TransportError(f"Timeout: got {len(out)} of {n} bytes")
+            out.append(self.read_byte(timeout_s=remaining))
+        return bytes(out)
+
+    def drain(self) -> int:
+        """
+        Discards any bytes waiting in the input buffer (late answers, noise).
+        Returns the number of discarded bytes.
+        """
+        return 0
+
+    def response_timeout(self, cmd: int) -> float:
+        """
+        How long to wait for the answer to 'cmd' (seconds).
+        Transports that measure the link return a learned value.
+        """
+        return 1.0
+
+    def retry_delay(self, cmd: int) -> float:
+        """
+        How long to wait after a timeout of 'cmd' before retrying (seconds).
+        """
+        return 0.3
@@ -0,0 +1,357 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/transport/capture.py
+DESCRIPTION:
+    Recording and replaying the raw UART traffic of a board.
+
+    - CaptureTransport wraps any Transport (normally SerialTransport) and
+      logs every byte written and read, every read timeout and every
+      drained byte with a monotonic timestamp into a capture file.
+    - ReplayTransport plays a capture file back as a Transport: the bytes
+      the API writes must be exactly the recorded ones, and reads return
+      the recorded answers (or the recorded timeouts). Playback runs with
+      the original timing or as fast as possible. Any divergence from the
+      capture raises ReplayDivergence and is remembered, so a test can not
+      miss it even if the API layer catches the exception.
+
+    File format (little endian):
+        header  8 bytes  b"HACAP" + version (1) + 2 reserved bytes
+                8 bytes  time.time() of the first open (float64)
+        record 10 bytes  ns since the first open (uint64), kind, byte
+    Kinds: TX (byte written), RX (byte read), TIMEOUT (read failed, byte 0),
+    DRAIN (byte = number of bytes discarded by drain(), split into 255s).
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, NamedTuple, Optional, Union
+
+from .base import Transport, TransportError
+
+MAGIC = b"HACAP"
+VERSION = 1
+_HEADER = struct.Struct("<5sBxxd")
+_RECORD = struct.Struct("<QBB")
+
+TX = 0
+RX = 1
+TIMEOUT = 2
+DRAIN = 3
+KIND_NAMES = ("TX", "RX", "TIMEOUT", "DRAIN")
+
+
+class CaptureEvent(NamedTuple):
+    t: float        # Seconds since the capture was started
+    kind: int       # TX / RX / TIMEOUT / DRAIN
+    value: int      # Byte (TX, RX) or count (DRAIN)
+
+
+@dataclass
+class Capture:
+    """A capture file loaded into memory."""
+    start_wall: float                   # time.time() when recording started
+    events: List[CaptureEvent] = field(default_factory=list)
+
+    def count(self, kind: int) -> int:
+        return sum(1 for ev in self.events if ev.kind == kind)
+
+    def duration_s(self) -> float:
+        return self.events[-1].t if self.events else 0.0
+
+
+class ReplayDivergence(AssertionError):
+    """The API did something other than what the capture recorded."""
+    pass
+
+
+def read_capture(path: str) -> Capture:
+    """Loads a capture file. Raises ValueError if it is not one."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"{path}: not a capture file (too short)")
+    magic, version, start_wall = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a capture file")
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported capture version {version}")
+
+    # A record cut off by a crash is ignored
+    end = _HEADER.size + (len(data) - _HEADER.size) // _RECORD.size * _RECORD.size
+    events = [CaptureEvent(ns * 1e-9, kind, value)
+              for ns, kind, value in _RECORD.iter_unpack(data[_HEADER.size:end])]
+    return Capture(start_wall, events)
+
+
+@dataclass
+class CaptureWriter:
+    """
+    Appends records to a capture file. Records are buffered in memory and
+    written every 'flush_bytes' (and by flush()/close()), so recording
+    costs no system call per byte.
+    """
+    path: str
+    flush_bytes: int = 64 * 1024
+
+    records: int = field(default=0, init=False)
+    _file: Optional[object] = field(default=None, init=False, repr=False)
+    _buf: bytearray = field(default_factory=bytearray, init=False, repr=False)
+    _t0: Optional[float] = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def open(self) -> None:
+        """Creates the file, or continues it after close() (same time base)."""
+        with self._lock:
+            if self._file is not None:
+                return
+            if self._t0 is None:
+                self._t0 = time.monotonic()
+                self._file = open(self.path, "wb")
+                self._file.write(_HEADER.pack(MAGIC, VERSION, time.time()))
+            else:
+                self._file = open(self.path, "ab")
+
+    def record(self, kind: int, data: bytes, t: Optional[float] = None) -> None:
+        """Adds one record per byte of 'data', all with time 't' (default: now)."""
+        if t is None:
+            t = time.monotonic()
+        with self._lock:
+            if self._file is None:
+                return
+            ns = max(0, int((t - self._t0) * 1e9))
+            for b in data:
+                self._buf += _RECORD.pack(ns, kind, b)
+            self.records += len(data)
+            if len(self._buf) >= self.flush_bytes:
+                self._write()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._write()
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._write()
+                self._file.close()
+                self._file = None
+
+    def _write(self) -> None:
+        if self._buf:
+            self._file.write(self._buf)
+            self._buf.clear()
+
+
+def _drain_counts(n: int) -> bytes:
+    """Splits a drained byte count into DRAIN records of at most 255."""
+    out = bytearray()
+    while n > 0:
+        out.append(min(n, 255))
+        n -= out[-1]
+    return bytes(out)
+
+
+@dataclass
+class CaptureTransport(Transport):
+    """
+    Transport wrapper that records all traffic of 'inner' into 'path'.
+    Everything else (timing, retries) is left to the wrapped transport.
+    """
+    inner: Transport
+    path: str
+    writer: CaptureWriter = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.writer = CaptureWriter(self.path)
+
+    def open(self) -> None:
+        self.inner.open()
+        self.writer.open()
+
+    def close(self) -> None:
+        try:
+            self.inner.close()
+        finally:
+            self.writer.close()
+
+    def is_open(self) -> bool:
+        return self.inner.is_open()
+
+    def write_byte(self, b: int) -> None:
+        self.write_bytes(bytes([int(b) & 0xFF]))
+
+    def write_bytes(self, buf: bytes) -> None:
+        data = bytes(buf)
+        self.writer.record(TX, data)
+        self.inner.write_bytes(data)
+
+    def read_byte(self, timeout_s: float = 1.0) -> int:
+        try:
+            b = self.inner.read_byte(timeout_s)
+        except TransportError:
+            self.writer.record(TIMEOUT, b"\x00")
+            raise
+        self.writer.record(RX, bytes([b]))
+        return b
+
+    def read_exact(self, n: int, deadline: float) -> bytes:
+        try:
+            data = self.inner.read_exact(n, deadline)
+        except TransportError:
+            self.writer.record(TIMEOUT, b"\x00")
+            raise
+        self.writer.record(RX, data)
+        return data
+
+    def drain(self) -> int:
+        n = self.inner.drain()
+        if n:
+            self.writer.record(DRAIN, _drain_counts(n))
+        return n
+
+    def response_timeout(self, cmd: int) -> float:
+        return self.inner.response_timeout(cmd)
+
+    def retry_delay(self, cmd: int) -> float:
+        return self.inner.retry_delay(cmd)
+
+
+@dataclass
+class ReplayTransport(Transport):
+    """
+    Plays back a capture (file path or loaded Capture).
+
+    realtime=False: as fast as possible (retry delays are 0 as well).
+    realtime=True:  every answer is returned at its recorded time after
+                    open(), divided by 'speed'.
+    """
+    capture: Union[str, Capture]
+    realtime: bool = False
+    speed: float = 1.0
+
+    position: int = field(default=0, init=False)
+    divergence: Optional[ReplayDivergence] = field(default=None, init=False)
+    _events: List[CaptureEvent] = field(default_factory=list, init=False, repr=False)
+    _open: bool = field(default=False, init=False, repr=False)
+    _t0: float = field(default=0.0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if isinstance(self.capture, (str, os.PathLike)):
+            self.capture = read_capture(os.fspath(self.capture))
+        self._events = self.capture.events
+
+    def open(self) -> None:
+        self._open = True
+        self._t0 = time.monotonic()
+
+    def close(self) -> None:
+        self._open = False
+
+    def is_open(self) -> bool:
+        return self._open
+
+    def rewind(self) -> None:
+        """Starts the playback again from the first event."""
+        self.position = 0
+        self.divergence = None
+        self._t0 = time.monotonic()
+
+    def remaining(self) -> int:
+        return len(self._events) - self.position
+
+    def finished(self) -> bool:
+        return self.position >= len(self._events)
+
+    def assert_finished(self) -> None:
+        """Raises ReplayDivergence if playback diverged or did not reach the end."""
+        if self.divergence is not None:
+            raise self.divergence
+        if not self.finished():
+            ev = self._events[self.position]
+            raise ReplayDivergence(f"Replay stopped at event {self.position} of {len(self._events)} "
+                                   f"(next: {KIND_NAMES[ev.kind]} 0x{ev.value:02X} at {ev.t:.6f} s)")
+
+    # --------------------------------------------------------------------------
+    # Transport interface
+    # --------------------------------------------------------------------------
+    def write_byte(self, b: int) -> None:
+        self.write_bytes(bytes([int(b) & 0xFF]))
+
+    def write_bytes(self, buf: bytes) -> None:
+        self._check_open()
+        for b in bytes(buf):
+            ev = self._next("write", TX)
+            if ev.value != b:
+                self._diverge(f"wrote 0x{b:02X}, capture has 0x{ev.value:02X}")
+            self.position += 1
+
+    def read_byte(self, timeout_s: float = 1.0) -> int:
+        return self.read_exact(1, 0.0)[0]
+
+    def read_exact(self, n: int, deadline: float) -> bytes:
+        self._check_open()
+        ev = self._next("read", RX, TIMEOUT)
+        if ev.kind == TIMEOUT:
+            self._wait_until(ev.t)
+            self.position += 1
+            raise TransportError(f"Timeout (replayed event {self.position - 1})")
+
+        out = bytearray()
+        for _ in range(n):
+            ev = self._next("read", RX)
+            self._wait_until(ev.t)
+            out.append(ev.value)
+            self.position += 1
+        return bytes(out)
+
+    def drain(self) -> int:
+        self._check_open()
+        n = 0
+        while self.position < len(self._events) and self._events[self.position].kind == DRAIN:
+            n += self._events[self.position].value
+            self.position += 1
+        return n
+
+    def retry_delay(self, cmd: int) -> float:
+        return super().retry_delay(cmd) / self.speed if self.realtime else 0.0
+
+    # --------------------------------------------------------------------------
+    # Helpers
+    # --------------------------------------------------------------------------
+    def _check_open(self) -> None:
+        if self.divergence is not None:
+            raise self.divergence
+        if not self._open:
+            raise TransportError("ReplayTransport not open")
+
+    def _next(self, what: str, *kinds: int) -> CaptureEvent:
+        if self.position >= len(self._events):
+            self._diverge(f"{what} after the end of the capture")
+        ev = self._events[self.position]
+        if ev.kind not in kinds:
+            self._diverge(f"{what}, capture has {KIND_NAMES[ev.kind]} 0x{ev.value:02X}")
+        return ev
+
+    def _diverge(self, msg: str) -> None:
+        self.divergence = ReplayDivergence(f"Replay diverged at event {self.position}: {msg}")
+        raise self.divergence
+
+    def _wait_until(self, t: float) -> None:
+        if self.realtime:
+            wait = self._t0 + t / self.speed - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
@@ -0,0 +1,245 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/transport/emulated_transport.py
+DESCRIPTION:
+    Transport to a board whose real firmware (board1.asm / board2.asm) runs
+    on the PIC16F877A emulator (pic/cpu.py) instead of a Python model of it.
+
+    Time is the emulated time of the PIC: every byte from the PC takes 10
+    bit times on the wire and answers arrive when the firmware has sent
+    them, so the delay caused by the main loop polling RCIF is part of
+    every exchange. By default the emulator runs as fast as it can and
+    only advances while the PC waits for an answer (or in advance());
+    with 'realtime' it is paced to the wall clock.
+
+    Every command byte is recorded as an Exchange: when it was sent, when
+    its stop bit reached the PIC, when the firmware read it from RCREG and
+    (for GETs) when the answer was back at the PC.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+from .base import Transport, TransportError
+from ..pic.boards import load_board
+from ..pic.cpu import PIC16
+from ..protocol import BOARD_MIN_BYTE_GAP_S
+from ..protocol.common import RX_FIFO_DEPTH
+
+
+@dataclass
+class Exchange:
+    """Timing of one command byte (seconds of emulated time)."""
+    cmd: int
+    sent_s: float                       # Start bit leaves the PC
+    received_s: float                   # Stop bit at the PIC (RCIF set)
+    picked_s: Optional[float] = None    # Firmware read RCREG
+    answered_s: Optional[float] = None  # Stop bit of the (last) answer byte at the PC
+    answer: Optional[int] = None        # First answer byte
+
+    @property
+    def pickup_s(self) -> Optional[float]:
+        """How long the byte waited in the receive FIFO."""
+        return None if self.picked_s is None else self.picked_s - self.received_s
+
+    @property
+    def latency_s(self) -> Optional[float]:
+        """Round trip of a GET, from the first bit sent to the last bit of the answer."""
+        return None if self.answered_s is None else self.answered_s - self.sent_s
+
+
+@dataclass
+class EmulatedTransport(Transport):
+    """
+    Transport to the emulated 'board' ("board1" or "board2").
+    'environment' is the model around the chip (see pic/boards.py) and can
+    be changed while running (e.g. the ambient temperature).
+    """
+    board: str
+    clock_hz: float = 4e6
+    baudrate: int = 9600
+    asm_path: Optional[str] = None
+    environment: Any = None
+    boot_s: float = 0.5                 # Emulated time from reset to open() returning
+    # Minimum time between the start bits of two bytes from the PC. None
+    # paces like SerialTransport with 'board' set: 5 ms, and the board's
+    # safe gap (MIN_BYTE_GAP_S) for a byte that could find the FIFO full.
+    # A number is used for every byte; 0 sends back to back, and the
+    # firmware then overruns its 2-byte FIFO if it does not poll RCIF in time.
+    inter_byte_gap_s: Optional[float] = None
+    # Delay until a received byte is visible to the PC (USB-serial adapters
+    # hand bytes over in USB frames / after their latency timer). 0 models
+    # a UART that is read at once.
+    rx_latency_s: float = 0.0
+    realtime: bool = False
+    slice_s: float = 0.002              # Pacing granularity in realtime mode
+
+    cpu: Optional[PIC16] = field(default=None, init=False, repr=False)
+    exchanges: List[Exchange] = field(default_factory=list, init=False, repr=False)
+    _rx: Deque[Tuple[int, int]] = field(default_factory=deque, init=False, repr=False)
+    _unpicked: Deque[Exchange] = field(default_factory=deque, init=False, repr=False)
+    _unanswered: Deque[Exchange] = field(default_factory=deque, init=False, repr=False)
+    _answering: Optional[Exchange] = field(default=None, init=False, repr=False)
+    _line_free: int = field(default=0, init=False, repr=False)
+    _last_start: int = field(default=-(10 ** 9), init=False, repr=False)
+    _wall0: float = field(default=0.0, init=False, repr=False)
+    # What the PC knows (see SerialTransport): answers still expected, SET
+    # bytes written since the last answer
+    _awaiting: int = field(default=0, init=False, repr=False)
+    _unread_sets: int = field(default=0, init=False, repr=False)
+
+    def open(self) -> None:
+        """Resets the emulated board and runs it for 'boot_s'."""
+        if self.cpu is not None:
+            return
+        try:
+            cpu = load_board(self.board, self.clock_hz, self.asm_path, self.environment)
+        except (OSError, ValueError) as e:
+            raise TransportError(f"Cannot load firmware of {self.board}: {e}") from e
+        self.environment = cpu.environment
+        cpu.tx_sink = self._on_tx
+        cpu.rx_read_sink = self._on_rcreg
+        self.cpu = cpu
+        self.exchanges.clear()
+        self._rx.clear()
+        self._unpicked.clear()
+        self._unanswered.clear()
+        self._answering = None
+        self._line_free, self._last_start = 0, -(10 ** 9)
+        self._awaiting = self._unread_sets = 0
+        cpu.run_for(self.boot_s)
+        self._wall0 = time.monotonic() - cpu.seconds()
+
+    def close(self) -> None:
+        self.cpu = None
+        self._rx.clear()
+
+    def is_open(self) -> bool:
+        return self.cpu is not None
+
+    # --------------------------------------------------------------------------
+    # Transport interface
+    # --------------------------------------------------------------------------
+    def write_byte(self, b: int) -> None:
+        self.write_bytes(bytes([int(b) & 0xFF]))
+
+    def write_bytes(self, buf: bytes) -> None:
+        cpu = self._check_open()
+        self._catch_up()
+        frame = 10 * cpu.cycle_hz / self.baudrate       # Start + 8 data + stop bits
+        if self.inter_byte_gap_s is None:
+            gap = cpu.cycles_for(0.005)
+            full_gap = max(gap, cpu.cycles_for(BOARD_MIN_BYTE_GAP_S.get(self.board, 0.0)))
+        else:
+            gap = full_gap = cpu.cycles_for(self.inter_byte_gap_s)
+        for b in bytes(buf):
+            g = full_gap if self._awaiting + self._unread_sets >= RX_FIFO_DEPTH else gap
+            if b < 0x80:
+                self._awaiting += 1
+            else:
+                self._unread_sets += 1
+            start = max(cpu.cycles, self._line_free, self._last_start + g)
+            done = int(round(start + frame))
+            self._line_free, self._last_start = done, start
+            cpu.uart_receive(b, done)
+            ex = Exchange(b, cpu.seconds(start), cpu.seconds(done))
+            self.exchanges.append(ex)
+            self._unpicked.append(ex)
+            if b < 0x80:
+                self._unanswered.append(ex)
+
+    def read_byte(self, timeout_s: float = 1.0) -> int:
+        return self.read_exact(1, time.monotonic() + timeout_s)[0]
+
+    def read_exact(self, n: int, deadline: float) -> bytes:
+        """
+        Runs the board until 'n' answer bytes arrived. The time left until
+        'deadline' is the budget in emulated time.
+        """
+        cpu = self._check_open()
+        budget = max(0.0, deadline - time.monotonic())
+        until = cpu.cycles + cpu.cycles_for(budget)
+        self._advance(until, lambda: len(self._rx) >= n)
+        if len(self._rx) < n:
+            self._awaiting = 0      # Given up on, like SerialTransport
+            raise TransportError(f"Timeout: got {len(self._rx)} of {n} bytes from emulated {self.board}")
+        if self.rx_latency_s > 0:
+            visible = self._rx[n - 1][0] + cpu.cycles_for(self.rx_latency_s)
+            if visible > until:
+                raise TransportError(f"Timeout: answer of emulated {self.board} not visible in time")
+            self._advance(visible, None)
+        self._awaiting = max(0, self._awaiting - n)
+        self._unread_sets = 0
+        return bytes(self._rx.popleft()[1] for _ in range(n))
+
+    def drain(self) -> int:
+        self._check_open()
+        count = len(self._rx)
+        self._rx.clear()
+        self._awaiting = 0
+        return count
+
+    # --------------------------------------------------------------------------
+    # Emulation control
+    # --------------------------------------------------------------------------
+    def now_s(self) -> float:
+        """Emulated time since reset."""
+        return self._check_open().seconds()
+
+    def advance(self, seconds: float) -> None:
+        """Lets the board run for 'seconds' of emulated time (e.g. after a SET)."""
+        cpu = self._check_open()
+        self._advance(cpu.cycles + cpu.cycles_for(seconds), None)
+
+    def _advance(self, until: int, stop: Optional[Callable[[], bool]]) -> None:
+        cpu = self.cpu
+        if not self.realtime:
+            cpu.run(until, stop)
+            return
+        step = max(1, cpu.cycles_for(self.slice_s))
+        while cpu.cycles < until:
+            if cpu.run(min(until, cpu.cycles + step), stop):
+                break
+            wait = self._wall0 + cpu.seconds() - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+    def _catch_up(self) -> None:
+        """Realtime mode: runs the board for the wall time that passed."""
+        if self.realtime:
+            cpu = self.cpu
+            cpu.run(cpu.cycles_for(time.monotonic() - self._wall0))
+
+    def _check_open(self) -> PIC16:
+        if self.cpu is None:
+            raise TransportError("EmulatedTransport not open")
+        return self.cpu
+
+    def _on_tx(self, cycle: int, byte: int) -> None:
+        self._rx.append((cycle, byte))
+        if self._unanswered:
+            ex = self._unanswered.popleft()
+            ex.answered_s, ex.answer = self.cpu.seconds(cycle), byte
+            self._answering = ex
+        elif self._answering is not None:
+            # Further bytes of a multi-byte answer (GET_ALL)
+            self._answering.answered_s = self.cpu.seconds(cycle)
+
+    def _on_rcreg(self, cycle: int, byte: int) -> None:
+        # Bytes lost in an overrun are never read: skip them
+        while self._unpicked:
+            ex = self._unpicked.popleft()
+            if ex.cmd == byte:
+                ex.picked_s = self.cpu.seconds(cycle)
+                return
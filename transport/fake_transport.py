@@ -9,8 +9,13 @@ DESCRIPTION:
     This allows testing the PC application without connecting real hardware.
 
     Features:
-    - Responds to GET commands immediately.
+    - Responds to GET commands immediately (GET_ALL with the whole burst).
     - Updates internal state on SET commands.
+    - Uses the register maps and dispatch tables of the protocol package
+      (one lookup per byte), so it can be driven very fast for load tests
+      and any board with a register map can be simulated.
+    - With 'framed' the board also speaks the framed protocol v2
+      (protocol/frames.py), like a firmware that supports it.
 
 AUTHORS:
     1. Yusuf Yaman - 152120221075
@@ -21,11 +26,13 @@ AUTHORS:
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import List
+from typing import Any, List, Optional
 
 from .base import Transport, TransportError
-from ..protocol import board1, board2
-from ..protocol.common import PAYLOAD_MASK_6BIT, join_1dp
+from ..protocol import BOARD_MAPS, board1, board2
+from ..protocol.dispatch import DispatchTable, respond, respond_bytes
+from ..protocol.frames import BoardLink
+from ..protocol.registers import BoardMap
 
 
 @dataclass
@@ -37,6 +44,8 @@ class FakeTransport(Transport):
 
     board: str  # "board1" or "board2"
     light_high_cmd: int = board2.GET_LIGHT_INTENSITY_HIGH_DEFAULT
+    board_map: Optional[BoardMap] = None  # Simulate any other board
+    framed: bool = False                  # Firmware also speaks protocol v2
 
     _open: bool = False
     _rx_queue: List[int] = field(default_factory=list)
@@ -45,6 +54,11 @@ class FakeTransport(Transport):
     air_state: board1.AirState = field(default_factory=board1.AirState)
     curtain_state: board2.CurtainState = field(default_factory=board2.CurtainState)
 
+    # Dispatch table and state of the simulated board (set in __post_init__)
+    _table: Optional[DispatchTable] = field(default=None, repr=False)
+    _state: Any = field(default=None, repr=False)
+    _link: Optional[BoardLink] = field(default=None, repr=False)
+
     def open(self) -> None:
         """Simulates opening the port."""
         self._open = True
@@ -66,15 +80,21 @@ class FakeTransport(Transport):
         if not self._open:
             raise TransportError("FakeTransport not open")
         
-        cmd = int(b) & 0xFF
-
-        if self.board == "board1":
-            self._handle_board1(cmd)
-        elif self.board == "board2":
-            self._handle_board2(cmd)
-        else:
+        if self._table is None:
             raise TransportError("Unknown board type")
 
+        if self._link is not None:
+            self._rx_queue.extend(self._link.feed(bytes([int(b) & 0xFF]), self._state))
+            return
+
+        # One table lookup per byte [R2.1.4-1] / [R2.2.6-1]
+        cmd = int(b) & 0xFF
+        resp = respond(self._table, cmd, self._state)
+        if resp is not None:
+            self._rx_queue.append(resp)
+        elif self._table.bursts[cmd] is not None:
+            self._rx_queue.extend(self._table.bursts[cmd](self._state))
+
     def read_byte(self, timeout_s: float = 1.0) -> int:
         """
         Sends a byte to the PC (Simulation of receiving data from PIC).
@@ -87,93 +107,56 @@ class FakeTransport(Transport):
         # Return the first byte from the queue
         return self._rx_queue.pop(0)
 
-    def _handle_board1(self, cmd: int) -> None:
+    def write_bytes(self, buf: bytes) -> None:
         """
-        Processes commands for Board #1 (Air Conditioner).
-        Refers to Protocol [R2.1.4-1].
+        Receives several bytes from the PC and processes them in order.
         """
-        # --- Handle GET Commands (Read Data) ---
-        if cmd == board1.GET_DESIRED_TEMP_LOW:
-            self._rx_queue.append(self.air_state.desired_temp.frac_digit & 0xFF)
-        elif cmd == board1.GET_DESIRED_TEMP_HIGH:
-            self._rx_queue.append(self.air_state.desired_temp.integral & 0xFF)
-        elif cmd == board1.GET_AMBIENT_TEMP_LOW:
-            self._rx_queue.append(self.air_state.ambient_temp.frac_digit & 0xFF)
-        elif cmd == board1.GET_AMBIENT_TEMP_HIGH:
-            self._rx_queue.append(self.air_state.ambient_temp.integral & 0xFF)
-        elif cmd == board1.GET_FAN_SPEED_RPS:
-            self._rx_queue.append(self.air_state.fan_speed_rps & 0xFF)
-
-        # --- Handle SET Commands (Write Data) ---
-        # Low Byte (10xxxxxx)
-        elif (cmd & 0b1100_0000) == 0b1000_0000:
-            self.air_state.desired_temp.frac_digit = cmd & PAYLOAD_MASK_6BIT
-
-        # High Byte (11xxxxxx)
-        elif (cmd & 0b1100_0000) == 0b1100_0000:
-            self.air_state.desired_temp.integral = cmd & PAYLOAD_MASK_6BIT
-
-            # Update Logic: Turn on fan if heating is needed
-            desired = join_1dp(
-                self.air_state.desired_temp.integral,
-                self.air_state.desired_temp.frac_digit,
-            )
-            ambient = join_1dp(
-                self.air_state.ambient_temp.integral,
-                self.air_state.ambient_temp.frac_digit,
-            )
-
-            self.air_state.fan_speed_rps = 30 if desired > ambient else 0
-
-    def _handle_board2(self, cmd: int) -> None:
+        if not self._open:
+            raise TransportError("FakeTransport not open")
+        if self._table is None:
+            raise TransportError("Unknown board type")
+        if self._link is not None:
+            self._rx_queue.extend(self._link.feed(bytes(buf), self._state))
+            return
+        self._rx_queue.extend(respond_bytes(self._table, bytes(buf), self._state))
+
+    def read_exact(self, n: int, deadline: float) -> bytes:
         """
-        Processes commands for Board #2 (Curtain Control).
-        Refers to Protocol [R2.2.6-1].
+        Returns the next 'n' queued response bytes.
+        The fake board answers immediately, so the deadline is not used.
         """
-        cs = self.curtain_state
-        
-        # --- Handle GET Commands ---
-        if cmd == board2.GET_DESIRED_CURTAIN_LOW:
-            self._rx_queue.append(cs.desired_curtain.frac_digit & 0xFF)
-        elif cmd == board2.GET_DESIRED_CURTAIN_HIGH:
-            self._rx_queue.append(cs.desired_curtain.integral & 0xFF)
-        elif cmd == board2.GET_OUTDOOR_TEMP_LOW:
-            self._rx_queue.append(cs.outdoor_temp.frac_digit & 0xFF)
-        elif cmd == board2.GET_OUTDOOR_TEMP_HIGH:
-            self._rx_queue.append(cs.outdoor_temp.integral & 0xFF)
-        elif cmd == board2.GET_OUTDOOR_PRESS_LOW:
-            self._rx_queue.append(cs.outdoor_press.frac_digit & 0xFF)
-        elif cmd == board2.GET_OUTDOOR_PRESS_HIGH:
-            self._rx_queue.append(cs.outdoor_press.integral & 0xFF)
-        elif cmd == board2.GET_LIGHT_INTENSITY_LOW:
-            self._rx_queue.append(cs.light_intensity.frac_digit & 0xFF)
-        elif cmd == self.light_high_cmd or cmd == board2.GET_LIGHT_INTENSITY_HIGH:
-            self._rx_queue.append(cs.light_intensity.integral & 0xFF)
-
-        # --- Handle SET Commands (Curtain Position) ---
-        elif (cmd & 0b1100_0000) == 0b1000_0000:
-            cs.desired_curtain.frac_digit = cmd & PAYLOAD_MASK_6BIT
-        elif (cmd & 0b1100_0000) == 0b1100_0000:
-            cs.desired_curtain.integral = cmd & PAYLOAD_MASK_6BIT
-        else:
-            pass
-
-    def __post_init__(self) -> None:
-        """Sets default values for simulation."""
-        cs = self.curtain_state
-
-        # Curtain: 50% approx (Raw value 32 out of 63)
-        cs.desired_curtain.integral = 32
-        cs.desired_curtain.frac_digit = 0
+        if not self._open:
+            raise TransportError("FakeTransport not open")
+        if len(self._rx_queue) < n:
+            raise TransportError(f"Only {len(self._rx_queue)} of {n} bytes available (fake)")
 
-        # Outdoor Temp: 20.0 C
-        cs.outdoor_temp.integral = 20
-        cs.outdoor_temp.frac_digit = 0
+        out = bytes(self._rx_queue[:n])
+        del self._rx_queue[:n]
+        return out
 
-        # Pressure: 101.3 hPa
-        cs.outdoor_press.integral = 101
-        cs.outdoor_press.frac_digit = 3
+    def drain(self) -> int:
+        """Discards all queued response bytes."""
+        count = len(self._rx_queue)
+        self._rx_queue.clear()
+        return count
 
-        # Light: 200.0 Lux
-        cs.light_intensity.integral = 200
-        cs.light_intensity.frac_digit = 0
\ No newline at end of file
+    def __post_init__(self) -> None:
+        """Sets default values for simulation and picks the dispatch table."""
+        board_map = self.board_map or BOARD_MAPS.get(self.board)
+        if board_map is None:
+            return  # write_byte() reports the unknown board
+        if self.board == "board2" and self.board_map is None:
+            board_map = board2.register_map(self.light_high_cmd)
+
+        # Start values come from the register map
+        # (Board 2: curtain 32 raw, 20.0 C, 101.3 hPa, 200.0 Lux)
+        if self.board_map is not None:
+            self._state = board_map.new_state()
+        elif self.board == "board1":
+            self._state = self.air_state
+        else:
+            self._state = self.curtain_state
+        board_map.simulated_state(self._state)
+        self._table = board_map.dispatch
+        if self.framed:
+            self._link = BoardLink(self._table)
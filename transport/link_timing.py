@@ -0,0 +1,183 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/transport/link_timing.py
+DESCRIPTION:
+    Self-calibrating timing for the UART link.
+    Instead of fixed sleeps and timeouts, the round-trip time (RTT) of every
+    GET command is measured and smoothed the same way TCP estimates its
+    retransmission timeout (RFC 6298):
+
+        SRTT   <- (1 - alpha) * SRTT + alpha * sample
+        RTTVAR <- (1 - beta) * RTTVAR + beta * |SRTT - sample|
+        RTO    =  SRTT + k * RTTVAR
+
+    The timeout doubles after every timeout (back-off) and returns to normal
+    after the next valid answer. The learned profile can be saved to a JSON
+    file and loaded again on the next start.
+
+    The static worst case of the firmware (pic/wcet.py) can be applied as a
+    floor: no timeout is shorter than the bound of its command and no gap
+    shorter than the time the main loop may take to poll RCIF.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict
+
+
+@dataclass
+class RttEstimate:
+    """
+    Smoothed round-trip statistics of one command (or of the whole link).
+    All times are in seconds.
+    """
+    srtt: float = 0.0       # Smoothed mean RTT
+    rttvar: float = 0.0     # Smoothed mean deviation
+    samples: int = 0        # Number of valid measurements
+    backoff: int = 0        # Consecutive timeouts (timeout is doubled each time)
+
+    def observe(self, sample: float, alpha: float, beta: float) -> None:
+        """Adds one RTT measurement."""
+        if self.samples == 0:
+            # First measurement (RFC 6298, 2.2)
+            self.srtt = sample
+            self.rttvar = sample / 2.0
+        else:
+            self.rttvar = (1.0 - beta) * self.rttvar + beta * abs(self.srtt - sample)
+            self.srtt = (1.0 - alpha) * self.srtt + alpha * sample
+        self.samples += 1
+        self.backoff = 0
+
+
+@dataclass
+class LinkTimingProfile:
+    """
+    Per-command RTT estimates and the timeouts / gaps derived from them.
+    Until a command has been measured, the conservative 'initial_*' values
+    are used.
+    """
+    alpha: float = 0.125
+    beta: float = 0.25
+    k: float = 4.0
+
+    initial_timeout_s: float = 1.0
+    min_timeout_s: float = 0.02
+    max_timeout_s: float = 2.0
+
+    initial_retry_delay_s: float = 0.3
+    min_gap_s: float = 0.0
+    max_gap_s: float = 0.1
+
+    commands: Dict[int, RttEstimate] = field(default_factory=dict)
+    link: RttEstimate = field(default_factory=RttEstimate)
+
+    # Static worst case of the firmware (see apply_static)
+    floor_timeouts: Dict[int, float] = field(default_factory=dict)
+    floor_gap_s: float = 0.0
+
+    def _clamp(self, value: float, lo: float, hi: float) -> float:
+        return max(lo, min(hi, value))
+
+    def observe(self, cmd: int, rtt_s: float) -> None:
+        """Records the RTT of one answered command."""
+        est = self.commands.setdefault(int(cmd) & 0xFF, RttEstimate())
+        est.observe(rtt_s, self.alpha, self.beta)
+        self.link.observe(rtt_s, self.alpha, self.beta)
+
+    def on_timeout(self, cmd: int) -> None:
+        """Records that 'cmd' got no answer; its next timeout is doubled."""
+        est = self.commands.setdefault(int(cmd) & 0xFF, RttEstimate())
+        est.backoff = min(est.backoff + 1, 8)
+
+    def _rto(self, est: RttEstimate) -> float:
+        if est.samples:
+            return est.srtt + self.k * est.rttvar
+        if self.link.samples:
+            # Unknown command: use what we know about the board in general
+            return self.link.srtt + self.k * self.link.rttvar
+        return self.initial_timeout_s
+
+    def apply_static(self, report: Dict[str, Any]) -> None:
+        """
+        Uses a static latency report (LatencyReport.to_dict() of pic/wcet.py)
+        as the lower bound of the timeouts and of the inter-byte gap.
+        """
+        self.floor_timeouts = {int(k, 16): float(v["response_s"])
+                               for k, v in report.get("commands", {}).items()}
+        self.floor_gap_s = float(report.get("min_gap_s") or 0.0)
+
+    def timeout_for(self, cmd: int) -> float:
+        """Time to wait for the answer to 'cmd' (seconds)."""
+        est = self.commands.get(int(cmd) & 0xFF, RttEstimate())
+        floor = self.floor_timeouts.get(int(cmd) & 0xFF, 0.0)
+        rto = max(self._rto(est), floor) * (2 ** est.backoff)
+        return self._clamp(rto, max(self.min_timeout_s, floor), max(self.max_timeout_s, floor))
+
+    def retry_delay_for(self, cmd: int) -> float:
+        """
+        Time to wait after a timeout before retrying 'cmd'.
+        This gives a very late answer the chance to arrive, so it can be
+        drained instead of being read as the answer to the retry.
+        """
+        est = self.commands.get(int(cmd) & 0xFF, RttEstimate())
+        if not est.samples and not self.link.samples:
+            return self.initial_retry_delay_s
+        return self._clamp(self._rto(est), self.min_timeout_s, self.max_timeout_s)
+
+    def inter_byte_gap(self, byte_time_s: float, default_s: float) -> float:
+        """
+        Minimum safe time between two written bytes.
+        The board's own processing time is the RTT minus the two byte times
+        on the wire; until that is known, 'default_s' is returned.
+        """
+        floor = self.floor_gap_s
+        if not self.link.samples:
+            return max(default_s, floor)
+        processing = self.link.srtt + 2.0 * self.link.rttvar - 2.0 * byte_time_s
+        return self._clamp(processing, max(self.min_gap_s, floor), max(self.max_gap_s, floor))
+
+    # --------------------------------------------------------------------------
+    # Persistence
+    # --------------------------------------------------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the profile as plain JSON-compatible data."""
+        d = asdict(self)
+        d["commands"] = {f"0x{cmd:02X}": asdict(est) for cmd, est in self.commands.items()}
+        d["floor_timeouts"] = {f"0x{cmd:02X}": t for cmd, t in self.floor_timeouts.items()}
+        return d
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "LinkTimingProfile":
+        """Creates a profile from data produced by to_dict()."""
+        d = dict(d)
+        commands = {int(k, 16): RttEstimate(**v) for k, v in d.pop("commands", {}).items()}
+        link = RttEstimate(**d.pop("link", {}))
+        floors = {int(k, 16): v for k, v in d.pop("floor_timeouts", {}).items()}
+        prof = cls(**d)
+        prof.commands = commands
+        prof.floor_timeouts = floors
+        prof.link = link
+        # A saved back-off must not slow down the next start
+        for est in prof.commands.values():
+            est.backoff = 0
+        return prof
+
+    def save(self, path: str) -> None:
+        """Writes the profile to a JSON file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "LinkTimingProfile":
+        """Reads a profile written by save()."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,94 @@
+"""
+================================================================================
+UNIVERSITY: ESOGU - Electrical & Electronics / Computer Engineering
+COURSE:     Introduction to Microcomputers - Term Project
+FILE:       home_automation/transport/rx_ring.py
+DESCRIPTION:
+    Receive ring buffer for the background reader of SerialTransport.
+    A preallocated bytearray holds the received bytes and a parallel array
+    holds their arrival times (time.monotonic()). The reader thread puts
+    bytes in; read functions wait on a condition variable until enough
+    bytes are there, so no polling and no port timeout changes are needed.
+
+    If the buffer is full, the oldest bytes are overwritten and counted in
+    'overruns'.
+
+AUTHORS:
+    1. Yusuf Yaman - 152120221075
+    2. Yiğit Ata - 152120221106
+================================================================================
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from array import array
+from typing import List, Optional, Tuple
+
+
+class RxRingBuffer:
+    """
+    Fixed-size, thread-safe byte FIFO with a timestamp per byte.
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be > 0")
+        self.capacity = int(capacity)
+        self._data = bytearray(self.capacity)
+        self._times = array("d", bytes(8 * self.capacity))
+        self._head = 0          # Index of the oldest byte
+        self._count = 0         # Number of bytes stored
+        self._cond = threading.Condition()
+        self.overruns = 0       # Bytes lost because the buffer was full
+
+    def __len__(self) -> int:
+        with self._cond:
+            return self._count
+
+    def put(self, data: bytes, t: Optional[float] = None) -> None:
+        """Appends bytes that arrived at time 't' and wakes up readers."""
+        if not data:
+            return
+        t = time.monotonic() if t is None else t
+        with self._cond:
+            for b in data:
+                if self._count == self.capacity:
+                    # Full: drop the oldest byte
+                    self._head = (self._head + 1) % self.capacity
+                    self._count -= 1
+                    self.overruns += 1
+                i = (self._head + self._count) % self.capacity
+                self._data[i] = b
+                self._times[i] = t
+                self._count += 1
+            self._cond.notify_all()
+
+    def _take(self, n: int) -> List[Tuple[float, int]]:
+        """Removes 'n' bytes (lock must be held)."""
+        out = []
+        for _ in range(n):
+            out.append((self._times[self._head], self._data[self._head]))
+            self._head = (self._head + 1) % self.capacity
+            self._count -= 1
+        return out
+
+    def get(self, n: int, deadline: float) -> Optional[List[Tuple[float, int]]]:
+        """
+        Waits until 'n' bytes are available or the monotonic 'deadline'
+        passes. Returns a list of (arrival time, byte), or None on timeout
+        (nothing is consumed then).
+        """
+        with self._cond:
+            while self._count < n:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            return self._take(n)
+
+    def clear(self) -> List[Tuple[float, int]]:
+        """Removes and returns everything buffered as (arrival time, byte)."""
+        with self._cond:
+            return self._take(self._count)
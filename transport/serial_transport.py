@@ -24,12 +24,30 @@ AUTHORS:
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import serial  # type: ignore
 
 from .base import Transport, TransportError
+from ..protocol import BOARD_MIN_BYTE_GAP_S
+from ..protocol.common import RX_FIFO_DEPTH
+from .link_timing import LinkTimingProfile
+from .rx_ring import RxRingBuffer
+
+
+@dataclass
+class OpenReport:
+    """
+    Result of the last SerialTransport.open().
+    'ready_s' is the time from opening the port until the board was usable.
+    """
+    mode: str               # "reset" or "probe"
+    ready: bool             # False if the board never answered the probe
+    ready_s: float          # Seconds until ready (or until giving up)
+    probes: int = 0         # Number of probe commands sent
 
 
 @dataclass
@@ -41,7 +59,58 @@ class SerialTransport(Transport):
     port: str
     baudrate: int = 9600
 
+    # Minimum time between two bytes sent to the PIC. The boards poll RCIF
+    # from their main loop, so bytes must not arrive faster than that loop
+    # can empty the 2-byte receive FIFO. With 'board' set, a byte that could
+    # find the FIFO full (RX_FIFO_DEPTH earlier bytes not known to be read:
+    # GETs without answer, SET bytes since the last answer) is also spaced
+    # by that board's safe gap (protocol/boardN.py MIN_BYTE_GAP_S).
+    inter_byte_gap_s: float = 0.005
+    board: Optional[str] = None
+
+    # Self-calibrating timing (see link_timing.py). When enabled, the gap,
+    # the read timeouts and the retry delays are derived from measured
+    # round-trip times; 'inter_byte_gap_s' is only used until then.
+    adaptive_timing: bool = True
+    timing: LinkTimingProfile = field(default_factory=LinkTimingProfile)
+
+    # Open behaviour:
+    #   "reset": wait a fixed 2 s for the board to reboot after DTR (old way)
+    #   "probe": send 'probe_cmd' (a harmless GET) until the board answers,
+    #            giving up after 'ready_timeout_s'
+    open_mode: str = "reset"
+    probe_cmd: int = 0x01
+    probe_accept: Optional[Callable[[int], bool]] = None   # None: any byte is valid
+    probe_interval_s: float = 0.02
+    ready_timeout_s: float = 3.0
+    last_open_report: Optional[OpenReport] = None
+
+    # Background reader: a thread continuously drains the port into a ring
+    # buffer with arrival timestamps (see rx_ring.py). Reads then wait on
+    # the buffer instead of changing the port timeout for every byte.
+    background_reader: bool = False
+    rx_buffer_size: int = 4096
+    stray_bytes: int = 0        # Bytes that arrived while no answer was expected
+    late_bytes: int = 0         # Bytes discarded by drain()
+    last_discarded: List[Tuple[float, int]] = field(default_factory=list)
+
     _ser: Optional[serial.Serial] = None
+    _last_write_t: float = 0.0
+
+    # GET command whose answer has not been read yet (for RTT measurement)
+    _pending_cmd: Optional[int] = None
+    # Answer length of GETs that answer with more than one byte (GET_ALL),
+    # learned from the first complete answer
+    answer_sizes: Dict[int, int] = field(default_factory=dict)
+    # Number of answer bytes still expected for the GETs written so far
+    _awaiting: int = 0
+    # SET bytes written since the last answer (maybe not read by the board)
+    _unread_sets: int = 0
+    _await_lock: threading.Lock = field(default_factory=threading.Lock)
+
+    _rx: Optional[RxRingBuffer] = None
+    _reader: Optional[threading.Thread] = None
+    _reader_stop: threading.Event = field(default_factory=threading.Event)
 
     def open(self) -> None:
         """
@@ -61,35 +130,132 @@ class SerialTransport(Transport):
                 timeout=2.0,                    # Read timeout (2 seconds)
             )
             
-            # Clear buffers to remove any old data
-            if self._ser:
-                import time
-                time.sleep(2)  # Wait for PIC/Arduino to reset and stabilize
-                
-                # Reset buffers multiple times to ensure clean state
-                for _ in range(3):
-                    self._ser.reset_input_buffer()
-                    self._ser.reset_output_buffer()
-                    time.sleep(0.1)
-                
-                # Final flush
-                self._ser.flushInput()
-                self._ser.flushOutput()
-                
+            if self.open_mode == "probe":
+                self.last_open_report = self._wait_ready_probe()
+            else:
+                self.last_open_report = self._wait_ready_reset()
+
+            if self.background_reader:
+                self._start_reader()
+
         except Exception as e:
             raise TransportError(f"Failed to open serial port {self.port}: {e}") from e
 
+    def _wait_ready_reset(self) -> OpenReport:
+        """
+        Fixed warm-up: wait for the PIC to reset and clear the buffers.
+        """
+        t0 = time.monotonic()
+        time.sleep(2)  # Wait for PIC/Arduino to reset and stabilize
+
+        # Reset buffers multiple times to ensure clean state
+        for _ in range(3):
+            self._ser.reset_input_buffer()
+            self._ser.reset_output_buffer()
+            time.sleep(0.1)
+
+        # Final flush
+        self._ser.flushInput()
+        self._ser.flushOutput()
+        return OpenReport(mode="reset", ready=True, ready_s=time.monotonic() - t0)
+
+    def _wait_ready_probe(self) -> OpenReport:
+        """
+        Readiness probe: send 'probe_cmd' in a tight loop and return as soon
+        as a valid answer arrives. A board that does not reset on DTR is
+        usable after the first round trip. Probes are never closer than the
+        board's safe gap, so they cannot overrun its receive FIFO.
+        """
+        t0 = time.monotonic()
+        old_timeout = self._ser.timeout
+        self._ser.reset_output_buffer()
+        interval = max(self.probe_interval_s, self.current_gap())
+        probes = 0
+        last = -interval
+        while True:
+            wait = last + interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._ser.reset_input_buffer()
+            self._ser.write(bytes([self.probe_cmd & 0xFF]))
+            last = time.monotonic()
+            probes += 1
+
+            remaining = self.ready_timeout_s - (time.monotonic() - t0)
+            self._ser.timeout = max(0.0, min(interval, remaining))
+            data = self._ser.read(1)
+            if data and (self.probe_accept is None or self.probe_accept(data[0])):
+                ready = True
+                break
+            if time.monotonic() - t0 >= self.ready_timeout_s:
+                ready = False
+                break
+
+        # Late answers to earlier probes must not be read as real data: give
+        # them one more probe interval to arrive, then drop them
+        if probes > 1:
+            time.sleep(interval)
+        self._ser.timeout = old_timeout
+        self._ser.reset_input_buffer()
+        self._last_write_t = time.monotonic()
+        return OpenReport(mode="probe", ready=ready, ready_s=time.monotonic() - t0, probes=probes)
+
     def close(self) -> None:
         """
         [R2.3-1] Closes the connection to the board.
         Releases the serial port resource.
         """
+        self._stop_reader()
         if self._ser:
             try:
                 self._ser.close()
             except Exception:
                 pass
 
+    # --------------------------------------------------------------------------
+    # Background reader
+    # --------------------------------------------------------------------------
+    def _start_reader(self) -> None:
+        """Starts the thread that moves received bytes into the ring buffer."""
+        self._rx = RxRingBuffer(self.rx_buffer_size)
+        self._reader_stop.clear()
+        self._reader = threading.Thread(target=self._reader_loop, name=f"SerialReader-{self.port}", daemon=True)
+        self._reader.start()
+
+    def _stop_reader(self) -> None:
+        if self._reader is not None:
+            self._reader_stop.set()
+            self._reader.join(1.0)
+            self._reader = None
+        self._rx = None
+
+    def _reader_loop(self) -> None:
+        ser = self._ser
+        # The reader owns the port timeout; it only limits how fast stop() works
+        ser.timeout = 0.05
+        while not self._reader_stop.is_set():
+            try:
+                data = ser.read(ser.in_waiting or 1)
+            except Exception:
+                return  # Port closed or unplugged
+            if not data:
+                continue
+            t = time.monotonic()
+            with self._await_lock:
+                expected = min(len(data), max(self._awaiting, 0))
+                self._awaiting -= expected
+            self.stray_bytes += len(data) - expected
+            self._rx.put(data, t)
+
+    def _read_ring(self, n: int, deadline: float) -> bytes:
+        """Takes 'n' bytes from the ring buffer (background reader mode)."""
+        items = self._rx.get(n, deadline)
+        if items is None:
+            self._answer_missing()
+            raise TransportError(f"Timeout: got {len(self._rx)} of {n} bytes from {self.port}")
+        self._answer_complete(n, items[-1][0])
+        return bytes(b for _, b in items)
+
     def is_open(self) -> bool:
         """
         Checks if the serial connection is currently active.
@@ -101,29 +267,71 @@ class SerialTransport(Transport):
         Sends a single byte to the PIC microcontroller.
         Used for sending commands (e.g., GET/SET requests).
         """
+        self.write_bytes(bytes([int(b) & 0xFF]))
+
+    def write_bytes(self, buf: bytes) -> None:
+        """
+        Sends several bytes to the PIC.
+        Consecutive bytes are spaced by 'inter_byte_gap_s'. Time already spent
+        since the previous write (e.g. waiting for an answer) counts towards
+        the gap, so a GET following a response is sent without any sleep.
+        Only bytes that could find the receive FIFO full wait for the
+        board's safe gap (see 'inter_byte_gap_s').
+        """
         if not self._ser or not self._ser.is_open:
             raise TransportError("Serial port is not open")
-        
-        # Clear input buffer before writing to avoid reading our own echo (if any)
-        self._ser.reset_input_buffer()
-        
-        # Write the byte (mask with 0xFF to ensure 8-bit)
-        self._ser.write(bytes([int(b) & 0xFF]))
-        
-        # [Wait] Give PIC some time to process the interrupt
-        import time
-        time.sleep(0.1)  # 100ms delay for stability
 
-    def read_byte(self, timeout_s: float = 1.0) -> int:
+        data = bytes(buf)
+        if not data:
+            return
+
+        # Count the expected answers before writing: a fast board may answer
+        # before write() returns
+        with self._await_lock:
+            idle = self._awaiting == 0 and not self._rx
+            unconfirmed = self._awaiting + self._unread_sets
+            self._awaiting += sum(self.answer_sizes.get(b, 1) for b in data if b < 0x80)
+            self._unread_sets += sum(1 for b in data if b >= 0x80)
+
+        gap, full_gap = self.link_gap(), self.current_gap()
+        if gap <= 0 and (full_gap <= 0 or unconfirmed + len(data) <= RX_FIFO_DEPTH):
+            self._ser.write(data)
+            self._last_write_t = time.monotonic()
+        else:
+            for i, b in enumerate(data):
+                # Wait only for the part of the gap that has not elapsed yet
+                g = full_gap if unconfirmed + i >= RX_FIFO_DEPTH else gap
+                wait = self._last_write_t + g - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                self._ser.write(bytes([b]))
+                self._last_write_t = time.monotonic()
+
+        # Only a single GET (00xxxxxx) gives an unambiguous RTT sample, and
+        # only if no earlier answer is outstanding (pipelined GETs)
+        if idle and len(data) == 1 and data[0] < 0x80:
+            self._pending_cmd = data[0]
+        else:
+            self._pending_cmd = None
+
+    def read_byte(self, timeout_s: Optional[float] = None) -> int:
         """
         Receives a single byte from the PIC microcontroller.
         Used for reading sensor data or status codes.
         
         Args:
             timeout_s: Custom timeout for this specific read operation.
+                       If None, the learned timeout of the last GET is used.
         """
         if not self._ser or not self._ser.is_open:
             raise TransportError("Serial port is not open")
+
+        if timeout_s is None:
+            cmd = self._pending_cmd
+            timeout_s = self.response_timeout(cmd) if cmd is not None else 1.0
+
+        if self._rx is not None:
+            return self._read_ring(1, time.monotonic() + timeout_s)[0]
         
         # Temporarily change the timeout for this read
         old_timeout = self._ser.timeout
@@ -133,9 +341,139 @@ class SerialTransport(Transport):
             # Read exactly 1 byte
             data = self._ser.read(1)
             if data and len(data) == 1:
+                self._awaiting = max(0, self._awaiting - 1)
+                self._answer_received()
                 return int(data[0])
             else:
+                self._awaiting = 0      # Given up on; see write_bytes()
+                self._answer_missing()
                 raise TransportError(f"Timeout while reading byte from {self.port}")
         finally:
             # Restore the original timeout setting
             self._ser.timeout = old_timeout
+
+    def read_exact(self, n: int, deadline: float) -> bytes:
+        """
+        Reads exactly 'n' bytes before the monotonic 'deadline'.
+        The port timeout is changed once for the whole read instead of once
+        per byte.
+        """
+        if not self._ser or not self._ser.is_open:
+            raise TransportError("Serial port is not open")
+
+        if self._rx is not None:
+            return self._read_ring(n, deadline)
+
+        out = bytearray()
+        old_timeout = self._ser.timeout
+        try:
+            while len(out) < n:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._ser.timeout = remaining
+                out += self._ser.read(n - len(out))
+        finally:
+            self._ser.timeout = old_timeout
+
+        if len(out) < n:
+            self._awaiting = 0
+            self._answer_missing()
+            raise TransportError(f"Timeout: got {len(out)} of {n} bytes from {self.port}")
+        self._awaiting = max(0, self._awaiting - n)
+        self._answer_complete(n)
+        return bytes(out)
+
+    def drain(self) -> int:
+        """
+        Discards everything waiting in the input buffer.
+        Returns the number of discarded bytes.
+        """
+        if not self._ser or not self._ser.is_open:
+            raise TransportError("Serial port is not open")
+
+        self._awaiting = 0
+        if self._rx is not None:
+            # Keep the discarded bytes (with arrival times) for diagnosis
+            items = self._rx.clear()
+            if items:
+                self.late_bytes += len(items)
+                self.last_discarded = items
+            return len(items)
+
+        waiting = int(self._ser.in_waiting)
+        if waiting:
+            self._ser.read(waiting)
+        self._ser.reset_input_buffer()
+        self.late_bytes += waiting
+        return waiting
+
+    # --------------------------------------------------------------------------
+    # Adaptive timing
+    # --------------------------------------------------------------------------
+    def byte_time_s(self) -> float:
+        """Time of one 8N1 frame (10 bits) on the wire."""
+        return 10.0 / float(self.baudrate)
+
+    def link_gap(self) -> float:
+        """The inter-byte gap for a byte that finds room in the receive FIFO."""
+        if not self.adaptive_timing:
+            return self.inter_byte_gap_s
+        return self.timing.inter_byte_gap(self.byte_time_s(), self.inter_byte_gap_s)
+
+    def current_gap(self) -> float:
+        """The inter-byte gap for a byte that could find the FIFO full."""
+        return max(self.link_gap(), BOARD_MIN_BYTE_GAP_S.get(self.board, 0.0))
+
+    def apply_static_bounds(self, report: Dict[str, Any]) -> None:
+        """
+        Applies the static worst case of the firmware (LatencyReport.to_dict()
+        of pic/wcet.py): timeouts and gaps never go below its bounds.
+        """
+        self.timing.apply_static(report)
+        self.inter_byte_gap_s = max(self.inter_byte_gap_s, float(report.get("min_gap_s") or 0.0))
+
+    def response_timeout(self, cmd: int) -> float:
+        """Learned timeout for the answer to 'cmd'."""
+        if not self.adaptive_timing:
+            return super().response_timeout(cmd)
+        return self.timing.timeout_for(cmd)
+
+    def retry_delay(self, cmd: int) -> float:
+        """Learned wait before retrying 'cmd' after a timeout."""
+        if not self.adaptive_timing:
+            return super().retry_delay(cmd)
+        return self.timing.retry_delay_for(cmd)
+
+    def _answer_complete(self, n: int, arrival_t: Optional[float] = None) -> None:
+        """
+        'n' bytes were read as the answer to the pending GET. A longer answer
+        than expected (GET_ALL) teaches its size; the bytes beyond the
+        first were counted as stray by the background reader.
+        """
+        cmd = self._pending_cmd
+        if cmd is not None and n > self.answer_sizes.get(cmd, 1):
+            with self._await_lock:
+                self.stray_bytes = max(0, self.stray_bytes - (n - self.answer_sizes.get(cmd, 1)))
+            self.answer_sizes[cmd] = n
+        self._answer_received(arrival_t)
+
+    def _answer_received(self, arrival_t: Optional[float] = None) -> None:
+        """
+        Feeds the RTT of the pending GET into the timing profile.
+        'arrival_t' is the time the byte arrived (background reader mode);
+        otherwise the time it was read is used.
+        """
+        self._unread_sets = 0      # The board read everything before the GET
+        cmd = self._pending_cmd
+        self._pending_cmd = None
+        if cmd is not None and self.adaptive_timing:
+            t = time.monotonic() if arrival_t is None else arrival_t
+            self.timing.observe(cmd, t - self._last_write_t)
+
+    def _answer_missing(self) -> None:
+        """Backs off the timeout of the pending GET."""
+        cmd = self._pending_cmd
+        self._pending_cmd = None
+        if cmd is not None and self.adaptive_timing:
+            self.timing.on_timeout(cmd)